@@ -0,0 +1,125 @@
+#!/usr/bin/env node
+// Micro-benchmark for the browser audio byte path (src/lib/audio-buffers.js)
+// Compares the old per-character base64 helpers and per-chunk typed-array
+// allocation against audio-buffers.js as the app calls it ("shipped"). The
+// Gemini path decodes each chunk into a fresh array (chunks are kept for the
+// turn's WAV), so "decode into out" is the codec's ceiling, not an app path.
+//
+//   node --expose-gc scripts/bench-audio-codec.js          # 100 ms chunks
+//   BENCH_CHUNK_MS=20 BENCH_SECONDS=2 node --expose-gc scripts/bench-audio-codec.js
+//
+// Each case runs for BENCH_SECONDS and reports MB/s of PCM processed plus
+// heap growth and GC pauses observed while it ran. The native toBase64 fast
+// path is hidden so the table encoder itself is measured.
+import { PerformanceObserver, performance } from 'perf_hooks';
+import {
+  encodeBase64, decodeBase64, decodedBase64Length,
+  pcm16ToFloat32, float32ToPcm16,
+} from '../src/lib/audio-buffers.js';
+
+const CHUNK_MS = +process.env.BENCH_CHUNK_MS || 100;
+const SECONDS = +process.env.BENCH_SECONDS || 1;
+const SAMPLES = 24 * CHUNK_MS;                    // 24 kHz mono
+const chunk = new Uint8Array(SAMPLES * 2);
+for (let i = 0; i < chunk.length; i++) chunk[i] = (i * 131 + 7) & 0xff;
+Object.defineProperty(chunk, 'toBase64', { value: undefined });
+const b64 = Buffer.from(chunk).toString('base64');
+const f32 = pcm16ToFloat32(chunk);
+
+// --- Legacy implementations (as shipped before audio-buffers.js) ---
+
+function legacyUint8ToBase64(bytes) {
+  let binary = '';
+  for (let i = 0; i < bytes.length; i++) binary += String.fromCharCode(bytes[i]);
+  return btoa(binary);
+}
+
+function legacyBase64ToUint8(s) {
+  const binary = atob(s);
+  const bytes = new Uint8Array(binary.length);
+  for (let i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
+  return bytes;
+}
+
+function legacyPcm16ToFloat32(pcmData) {
+  const samples = pcmData.length / 2;
+  const out = new Float32Array(samples);
+  for (let i = 0; i < samples; i++) {
+    const lo = pcmData[i * 2];
+    const hi = pcmData[i * 2 + 1];
+    out[i] = ((hi << 24 | lo << 16) >> 16) / 32768;
+  }
+  return out;
+}
+
+function legacyFloat32ToPcm16(float32) {
+  const pcm = new Int16Array(float32.length);
+  for (let i = 0; i < float32.length; i++) {
+    pcm[i] = Math.max(-32768, Math.min(32767, Math.floor(float32[i] * 32768)));
+  }
+  return pcm;
+}
+
+// --- Cases ---
+
+const decodeOut = new Uint8Array(decodedBase64Length(b64));
+const floatOut = new Float32Array(SAMPLES);
+const pcmOut = new Int16Array(SAMPLES);
+
+// PCM conversions use reused outputs as audio-worklet.js does
+const cases = [
+  ['base64 encode', 'legacy', () => legacyUint8ToBase64(chunk)],
+  ['base64 encode', 'shipped', () => encodeBase64(chunk)],
+  ['base64 decode', 'legacy', () => legacyBase64ToUint8(b64)],
+  ['base64 decode', 'shipped', () => decodeBase64(b64)],
+  ['base64 decode', 'into out', () => decodeBase64(b64, decodeOut)],
+  ['pcm16 → f32', 'legacy', () => legacyPcm16ToFloat32(chunk)],
+  ['pcm16 → f32', 'shipped', () => pcm16ToFloat32(chunk, floatOut)],
+  ['f32 → pcm16', 'legacy', () => legacyFloat32ToPcm16(f32)],
+  ['f32 → pcm16', 'shipped', () => float32ToPcm16(f32, pcmOut)],
+  ['playback path', 'legacy', () => legacyPcm16ToFloat32(legacyBase64ToUint8(b64))],
+  ['playback path', 'shipped', () => pcm16ToFloat32(decodeBase64(b64), floatOut)],
+];
+
+let gcPauses = [];
+const obs = new PerformanceObserver((list) => { for (const e of list.getEntries()) gcPauses.push(e.duration); });
+obs.observe({ entryTypes: ['gc'] });
+
+const settle = () => new Promise((r) => setImmediate(r));
+
+const rows = [];
+for (const [name, impl, fn] of cases) {
+  for (let i = 0; i < 50; i++) fn(); // warm up
+  globalThis.gc?.();
+  await settle();
+  gcPauses = [];
+  const heapBefore = process.memoryUsage().heapUsed;
+  let iterations = 0;
+  const start = performance.now();
+  const deadline = start + SECONDS * 1000;
+  while (performance.now() < deadline) {
+    for (let i = 0; i < 20; i++) fn();
+    iterations += 20;
+  }
+  const elapsed = (performance.now() - start) / 1000;
+  const heapDelta = process.memoryUsage().heapUsed - heapBefore;
+  await settle(); // let the observer deliver this case's gc entries
+  rows.push({
+    case: name,
+    impl,
+    'MB/s': +((iterations * chunk.length) / elapsed / 1e6).toFixed(1),
+    'chunks/s': Math.round(iterations / elapsed),
+    'heap Δ KB': Math.round(heapDelta / 1024),
+    gcs: gcPauses.length,
+    'gc ms': +gcPauses.reduce((s, d) => s + d, 0).toFixed(1),
+  });
+}
+obs.disconnect();
+
+console.log(`chunk ${CHUNK_MS} ms = ${chunk.length} bytes PCM16 @ 24 kHz, ${SECONDS}s per case${globalThis.gc ? '' : ' (run with --expose-gc for stable heap numbers)'}`);
+console.table(rows);
+for (const row of rows) {
+  if (row.impl === 'legacy') continue;
+  const legacy = rows.find((r) => r.case === row.case && r.impl === 'legacy');
+  console.log(`${row.case.padEnd(14)} ${row.impl.padEnd(9)} ${(row['MB/s'] / legacy['MB/s']).toFixed(1)}x`);
+}
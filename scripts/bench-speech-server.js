@@ -0,0 +1,121 @@
+#!/usr/bin/env node
+// Stand-in speech gateway for scripts/bench-speech-ws.py
+// Runs the real handleSpeechConnection with a fake provider injected via
+// deps.providers, so load tests measure our WebSocket path, not a vendor.
+//
+//   node scripts/bench-speech-server.js > /dev/null     # PORT=3457 by default
+//
+// Fake STT/S2S: each PCM frame carries a uint32 sequence number in its first
+// 4 bytes; every BENCH_TRANSCRIPT_EVERY frames the provider emits an interim
+// transcript "seq:<n>" (after BENCH_PROVIDER_MS) so the client can time
+// frame → transcript. GET /stats reports sessions, memory, event-loop lag and
+// the handler's frame/byte/backpressure counters (createSpeechMetrics).
+import { createServer } from 'http';
+import { monitorEventLoopDelay } from 'perf_hooks';
+import { WebSocketServer } from 'ws';
+import { handleSpeechConnection, createSpeechMetrics } from '../src/lib/speech-ws.js';
+
+const PORT = +process.env.PORT || 3457;
+const EVERY = +process.env.BENCH_TRANSCRIPT_EVERY || 5;
+const PROVIDER_MS = +process.env.BENCH_PROVIDER_MS || 0;
+const BYTES_PER_MS = 32; // 16 kHz mono PCM16
+
+const later = (fn) => (PROVIDER_MS ? setTimeout(fn, PROVIDER_MS) : fn());
+const seqOf = (chunk) => (chunk.length >= 4 ? chunk.readUInt32LE(0) : -1);
+
+function fakeRecognizer(onText) {
+  let frames = 0;
+  let bytes = 0;
+  let lastSeq = -1;
+  return {
+    feed(chunk) {
+      frames++;
+      bytes += chunk.length;
+      lastSeq = seqOf(chunk);
+      const seq = lastSeq;
+      if (frames % EVERY === 0) later(() => onText(`seq:${seq}`, false));
+    },
+    get lastSeq() { return lastSeq; },
+    get durationMs() { return bytes / BYTES_PER_MS; },
+  };
+}
+
+const providers = {
+  async *streamTts() {
+    yield Buffer.alloc(3200);
+  },
+  createSttSession(provider, { onInterim }) {
+    const rec = fakeRecognizer((text, isFinal) => onInterim?.(text, isFinal));
+    return {
+      feed: (chunk) => rec.feed(chunk),
+      async finish() { return { transcript: `seq:${rec.lastSeq}`, durationMs: rec.durationMs }; },
+    };
+  },
+  createS2sSession() {
+    let audioCb = () => {};
+    let transcriptCb = () => {};
+    let destroyed = false;
+    const rec = fakeRecognizer((text, isFinal) => { if (!destroyed) transcriptCb(text, isFinal); });
+    return {
+      feed(chunk) {
+        rec.feed(chunk);
+        if (!destroyed) audioCb(chunk); // echo as the "model voice"
+      },
+      onAudio(cb) { audioCb = cb; },
+      onTranscript(cb) { transcriptCb = cb; },
+      finish() {},
+      destroy() { destroyed = true; },
+    };
+  },
+};
+
+// Any profile: "bench-s2s" selects S2S, everything else server-side STT
+const resolvers = {
+  resolveMode: (profileId) => (profileId === 'bench-s2s' ? 's2s' : 'tts+stt'),
+  resolveTtsProvider: () => 'fake',
+  resolveSttProvider: () => 'fake',
+  resolveS2sProvider: () => 'fake',
+  estimateCost: () => 0,
+};
+
+const loopDelay = monitorEventLoopDelay({ resolution: 10 });
+loopDelay.enable();
+let sessions = 0;
+let peakSessions = 0;
+const metrics = createSpeechMetrics();
+
+const server = createServer((req, res) => {
+  if (!req.url.startsWith('/stats')) {
+    res.writeHead(404).end();
+    return;
+  }
+  const mem = process.memoryUsage();
+  const ms = (ns) => Math.round(ns / 1e4) / 100;
+  const body = {
+    sessions,
+    peakSessions,
+    rss: mem.rss,
+    heapUsed: mem.heapUsed,
+    external: mem.external,
+    loopDelayMs: { p50: ms(loopDelay.percentile(50)), p99: ms(loopDelay.percentile(99)), max: ms(loopDelay.max) },
+    cpu: process.cpuUsage(),
+    speech: metrics.snapshot(),
+  };
+  if (req.url.includes('reset')) loopDelay.reset();
+  res.writeHead(200, { 'Content-Type': 'application/json' }).end(JSON.stringify(body));
+});
+
+const wss = new WebSocketServer({ noServer: true });
+server.on('upgrade', (req, socket, head) => {
+  if (req.url !== '/ws/speech') return socket.destroy();
+  wss.handleUpgrade(req, socket, head, (ws) => {
+    sessions++;
+    peakSessions = Math.max(peakSessions, sessions);
+    ws.on('close', () => { sessions--; });
+    handleSpeechConnection(ws, { providers, resolvers, metrics, getApiKey: () => 'bench' });
+  });
+});
+
+server.listen(PORT, () => {
+  process.stderr.write(`bench speech server on :${PORT} (transcript every ${EVERY} frames, +${PROVIDER_MS}ms)\n`);
+});
@@ -0,0 +1,220 @@
+"""Load and latency benchmark for /ws/speech against a stand-in provider.
+
+Opens N WebSocket clients that each stream 16 kHz PCM16 at real-time pace
+(one frame every --frame-ms) into handleSpeechConnection, and measures:
+
+  - frame -> transcript latency (frames carry a sequence number the fake
+    provider echoes back as "seq:<n>")
+  - server event-loop lag and RSS per session (from the stand-in's /stats)
+  - client pacing slip, i.e. frames sent late because the socket backed up
+  - frames the server dropped (inbound rate limit or outbound backpressure)
+
+Start the stand-in, then ramp clients until the latency SLO breaks:
+
+    node scripts/bench-speech-server.js > /dev/null
+    python scripts/bench-speech-ws.py --ramp 10,50,100,200,400 --duration 10
+    python scripts/bench-speech-ws.py --clients 50 --mode s2s
+
+speech-ws logs per-frame events only at LOG_LEVEL=debug (sampled); run the
+stand-in with that set and stdout redirected to a file to include the
+logging cost in the numbers.
+"""
+import argparse
+import asyncio
+import json
+import os
+import struct
+import sys
+import time
+
+from bench.http import Connection
+from bench.stats import Recorder, percentile
+from bench.ws import WebSocket, WebSocketClosed
+
+BASE_URL = os.environ.get("THINKDONE_SPEECH_URL", "http://localhost:3457").rstrip("/")
+SAMPLE_RATE = 16000
+
+
+class Client:
+    def __init__(self, idx, args, rec):
+        self.idx = idx
+        self.args = args
+        self.rec = rec
+        self.sent_at = {}
+        self.frames = 0
+        self.late = 0
+        self.error = None
+
+    async def run(self, deadline):
+        url = BASE_URL.replace("http", "ws", 1) + "/ws/speech"
+        try:
+            ws = await WebSocket.connect(url)
+        except OSError as e:
+            self.error = f"connect: {e}"
+            return
+        try:
+            profile = "bench-s2s" if self.args.mode == "s2s" else "bench"
+            await ws.send_json({"type": "session.start", "profile": profile})
+            msg = json.loads(await ws.recv())
+            if msg.get("type") != "session.ready":
+                self.error = f"session.start: {msg}"
+                return
+            await ws.send_json({"type": "listen.start"})
+            receiver = asyncio.ensure_future(self._receive(ws))
+            await self._stream(ws, deadline)
+            await ws.send_json({"type": "listen.stop"})
+            # Give the final transcript / usage a moment to arrive
+            await asyncio.sleep(0.2)
+            receiver.cancel()
+        except (OSError, WebSocketClosed, asyncio.IncompleteReadError) as e:
+            self.error = f"{type(e).__name__}: {e}"
+        finally:
+            await ws.close()
+
+    async def _stream(self, ws, deadline):
+        frame_s = self.args.frame_ms / 1000
+        samples = SAMPLE_RATE * self.args.frame_ms // 1000
+        pad = b"\x00" * (samples * 2 - 4)
+        # Stagger start so clients don't all send in the same tick
+        start = time.monotonic() + (self.idx % 50) * frame_s / 50
+        seq = 0
+        while True:
+            due = start + seq * frame_s
+            if due >= deadline:
+                return
+            delay = due - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            elif -delay > frame_s:
+                self.late += 1
+            self.sent_at[seq] = time.monotonic()
+            await ws.send_bytes(struct.pack("<I", seq) + pad)
+            self.frames += 1
+            seq += 1
+
+    async def _receive(self, ws):
+        while True:
+            data = await ws.recv()
+            if not isinstance(data, str):
+                continue  # S2S audio echo
+            msg = json.loads(data)
+            if msg.get("type") == "transcript" and str(msg.get("text", "")).startswith("seq:"):
+                sent = self.sent_at.pop(int(msg["text"][4:]), None)
+                if sent is not None:
+                    self.rec.add("transcript", (time.monotonic() - sent) * 1000)
+            elif msg.get("type") == "error":
+                self.rec.add("server-error", 0, ok=False)
+
+
+async def server_stats(conn, reset=False):
+    status, data = await conn.request("GET", "/stats?reset" if reset else "/stats")
+    return data if status == 200 else {}
+
+
+async def sample_stats(conn, samples, stop):
+    while not stop.is_set():
+        samples.append(await server_stats(conn))
+        try:
+            await asyncio.wait_for(stop.wait(), 1)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_stage(n, args, conn):
+    """One load level: n concurrent clients for --duration seconds."""
+    await asyncio.sleep(0.5)  # let the previous stage's sockets close
+    baseline = await server_stats(conn, reset=True)
+    rec = Recorder()
+    clients = [Client(i, args, rec) for i in range(n)]
+    samples, stop = [], asyncio.Event()
+    sampler = asyncio.ensure_future(sample_stats(conn, samples, stop))
+    deadline = time.monotonic() + args.duration
+    await asyncio.gather(*(c.run(deadline) for c in clients))
+    stop.set()
+    await sampler
+    final = await server_stats(conn)
+
+    lat = sorted(rec.samples.get("transcript", []))
+    peak_rss = max([s.get("rss", 0) for s in samples] + [final.get("rss", 0)])
+    frames = sum(c.frames for c in clients)
+    before, after = baseline.get("speech", {}), final.get("speech", {})
+    dropped = sum(after.get(k, 0) - before.get(k, 0) for k in ("framesInDropped", "framesOutDropped"))
+    return {
+        "clients": n,
+        "errors": sum(1 for c in clients if c.error) + rec.errors.get("server-error", 0),
+        "frames": frames,
+        "late": sum(c.late for c in clients),
+        "dropped": dropped,
+        "p50": percentile(lat, 50),
+        "p95": percentile(lat, 95),
+        "p99": percentile(lat, 99),
+        "loop_p99": max([s.get("loopDelayMs", {}).get("p99", 0) for s in samples] + [0]),
+        "loop_max": final.get("loopDelayMs", {}).get("max", 0),
+        "rss_per_session_kb": (peak_rss - baseline.get("rss", 0)) / max(n, 1) / 1024,
+        "first_error": next((c.error for c in clients if c.error), None),
+    }
+
+
+def saturated(stage, args):
+    reasons = []
+    if stage["p99"] > args.slo_ms:
+        reasons.append(f"p99 {stage['p99']:.0f}ms > {args.slo_ms}ms")
+    if stage["loop_p99"] > args.max_loop_ms:
+        reasons.append(f"loop lag p99 {stage['loop_p99']:.0f}ms > {args.max_loop_ms}ms")
+    if stage["errors"]:
+        reasons.append(f"{stage['errors']} errors")
+    if stage["frames"] and stage["late"] / stage["frames"] > 0.01:
+        reasons.append(f"{stage['late']} late frames")
+    if stage["dropped"]:
+        reasons.append(f"{stage['dropped']} frames dropped by the server")
+    return reasons
+
+
+async def main_async(args):
+    conn = Connection(BASE_URL)
+    try:
+        await server_stats(conn)
+    except OSError:
+        sys.exit(f"No stand-in at {BASE_URL}; start: node scripts/bench-speech-server.js > /dev/null")
+
+    levels = [int(x) for x in args.ramp.split(",")] if args.ramp else [args.clients]
+    print(f"mode={args.mode} frame={args.frame_ms}ms duration={args.duration}s SLO p99<{args.slo_ms}ms")
+    print(f"\n  {'clients':>7} {'frames':>8} {'late':>6} {'drop':>6} {'err':>4} {'p50':>7} {'p95':>7} {'p99':>7} "
+          f"{'loop99':>7} {'loopmax':>7} {'KB/sess':>8}")
+    saturation = None
+    for n in levels:
+        s = await run_stage(n, args, conn)
+        print(f"  {n:7d} {s['frames']:8d} {s['late']:6d} {s['dropped']:6d} {s['errors']:4d} {s['p50']:7.1f} {s['p95']:7.1f} "
+              f"{s['p99']:7.1f} {s['loop_p99']:7.1f} {s['loop_max']:7.1f} {s['rss_per_session_kb']:8.0f}")
+        if s["first_error"]:
+            print(f"          first error: {s['first_error']}")
+        reasons = saturated(s, args)
+        if reasons and saturation is None:
+            saturation = (n, reasons)
+            if not args.keep_going:
+                break
+    await conn.close()
+
+    if saturation:
+        print(f"\nSaturated at {saturation[0]} clients: {'; '.join(saturation[1])}")
+    else:
+        print(f"\nNo saturation up to {levels[-1]} clients")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark /ws/speech with a stand-in provider")
+    parser.add_argument("--clients", "-c", type=int, default=20)
+    parser.add_argument("--ramp", help="comma-separated client counts to step through (overrides --clients)")
+    parser.add_argument("--duration", "-d", type=float, default=10, help="seconds per stage")
+    parser.add_argument("--frame-ms", type=int, default=20, help="PCM frame size (20ms = 50 frames/s)")
+    parser.add_argument("--mode", choices=["stt", "s2s"], default="stt")
+    parser.add_argument("--slo-ms", type=float, default=200, help="p99 frame->transcript budget")
+    parser.add_argument("--max-loop-ms", type=float, default=50, help="server event-loop lag budget")
+    parser.add_argument("--keep-going", action="store_true", help="run every ramp stage even after saturation")
+    args = parser.parse_args(argv)
+    return asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
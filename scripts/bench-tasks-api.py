@@ -0,0 +1,208 @@
+"""Load-test /api/tasks with a realistic mix of dashboard actions.
+
+Every POST to /api/tasks re-reads and rewrites plans/meta/today.md (and a
+check spawns `node src/memory.js store`), so concurrent actions race. This
+replays toggle/add/delete/edit/reorder from N virtual users against a local
+server.js and reports latency percentiles, throughput and lost updates.
+
+Run the server against a scratch workspace and memory DB — the benchmark
+writes tasks and every check stores a memory:
+
+    mkdir -p /tmp/td-bench/plans/meta
+    THINKDONE_WORKSPACE=/tmp/td-bench THINKDONE_DB=/tmp/td-bench/memory.db node server.js
+    python scripts/bench-tasks-api.py --concurrency 16 --duration 30
+    python scripts/bench-tasks-api.py --mix reorder=60,add=40 --seed 200
+
+Lost updates are counted at the end by comparing every virtual user's
+expected tasks with a final GET: tasks that vanished, deleted tasks that
+came back, and check marks that flipped back. Actions that returned
+ok=false because their task had already been clobbered are counted too.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+from bench.http import Connection
+from bench.stats import Recorder
+
+BASE_URL = os.environ.get("THINKDONE_URL", "http://localhost:3456").rstrip("/")
+ENDPOINT = "/api/tasks"
+DEFAULT_MIX = "toggle=35,reorder=25,add=15,edit=10,delete=10,get=5"
+
+
+def parse_mix(spec):
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ("toggle", "reorder", "add", "edit", "delete", "get"):
+            raise argparse.ArgumentTypeError(f"unknown action '{name}'")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class VirtualUser:
+    """Owns its own tasks so the expected end state is known exactly."""
+
+    def __init__(self, vu_id, prefix, conn, rec, rng):
+        self.prefix = f"{prefix}-u{vu_id}"
+        self.conn = conn
+        self.rec = rec
+        self.rng = rng
+        self.serial = 0
+        self.tasks = {}        # text -> expected checked flag
+        self.deleted = set()
+        self.not_found = 0
+
+    def _new_text(self, tag="t"):
+        self.serial += 1
+        return f"{self.prefix}-{tag}{self.serial}"
+
+    async def _post(self, label, body):
+        started = time.perf_counter()
+        try:
+            status, data = await self.conn.request("POST", ENDPOINT, body)
+        except (OSError, asyncio.IncompleteReadError):
+            self.rec.add(label, 0, ok=False)
+            return None
+        ms = (time.perf_counter() - started) * 1000
+        ok = status == 200 and isinstance(data, dict)
+        self.rec.add(label, ms, ok=ok)
+        if ok and not data.get("ok"):
+            self.not_found += 1
+        return data if ok else None
+
+    async def get(self):
+        started = time.perf_counter()
+        try:
+            status, data = await self.conn.request("GET", ENDPOINT)
+        except (OSError, asyncio.IncompleteReadError):
+            self.rec.add("get", 0, ok=False)
+            return None
+        self.rec.add("get", (time.perf_counter() - started) * 1000, ok=status == 200)
+        return data if status == 200 else None
+
+    async def step(self, action):
+        if action in ("toggle", "edit", "delete") and not self.tasks:
+            action = "add"
+        if action == "add":
+            text = self._new_text()
+            if await self._post("add", {"action": "add", "task": text}):
+                self.tasks[text] = False
+        elif action == "toggle":
+            text = self.rng.choice(list(self.tasks))
+            if await self._post("toggle", {"action": "toggle", "task": text}):
+                self.tasks[text] = not self.tasks[text]
+        elif action == "delete":
+            text = self.rng.choice(list(self.tasks))
+            if await self._post("delete", {"action": "delete", "task": text}):
+                del self.tasks[text]
+                self.deleted.add(text)
+        elif action == "edit":
+            old = self.rng.choice(list(self.tasks))
+            new = self._new_text("e")
+            if await self._post("edit", {"action": "edit", "oldTask": old, "newTask": new}):
+                self.tasks[new] = self.tasks.pop(old)
+                self.deleted.add(old)
+        elif action == "reorder":
+            # Drag-reorder: the client posts the whole list it last rendered
+            data = await self.get()
+            tasks = list((data or {}).get("tasks", []))
+            if len(tasks) > 1:
+                i = self.rng.randrange(len(tasks))
+                j = self.rng.randrange(len(tasks))
+                tasks.insert(j, tasks.pop(i))
+                await self._post("reorder", {"action": "reorder", "tasks": tasks})
+        else:
+            await self.get()
+
+
+async def run_user(vu, mix, deadline, think_ms):
+    actions, weights = list(mix), list(mix.values())
+    while time.monotonic() < deadline:
+        await vu.step(vu.rng.choices(actions, weights)[0])
+        if think_ms:
+            await asyncio.sleep(vu.rng.uniform(0, 2 * think_ms) / 1000)
+
+
+def count_lost(users, final_tasks):
+    present = {t["text"]: t["checked"] for t in final_tasks}
+    vanished = resurrected = flipped = 0
+    for vu in users:
+        for text, checked in vu.tasks.items():
+            if text not in present:
+                vanished += 1
+            elif present[text] != checked:
+                flipped += 1
+        resurrected += sum(1 for text in vu.deleted if text in present)
+    return vanished, resurrected, flipped
+
+
+async def main_async(args):
+    control = Connection(BASE_URL)
+    status, data = await control.request("GET", ENDPOINT)
+    if status != 200:
+        sys.exit(f"GET {ENDPOINT} returned {status}: is server.js running at {BASE_URL}?")
+    existing = data.get("tasks", [])
+    if existing and not args.allow_existing:
+        sys.exit(f"Workspace already has {len(existing)} tasks; point the server at a scratch "
+                 "THINKDONE_WORKSPACE or pass --allow-existing")
+
+    prefix = f"load-{int(time.time())}"
+    if args.seed:
+        seeded = [{"text": f"{prefix}-seed{i}", "checked": False, "details": ""} for i in range(args.seed)]
+        await control.request("POST", ENDPOINT, {"action": "reorder", "tasks": existing + seeded})
+
+    rec = Recorder()
+    rng = random.Random(args.random_seed)
+    conns = [Connection(BASE_URL) for _ in range(args.concurrency)]
+    users = [VirtualUser(i, prefix, conns[i], rec, random.Random(rng.random()))
+             for i in range(args.concurrency)]
+
+    print(f"{args.concurrency} users x {args.duration}s against {BASE_URL}{ENDPOINT} "
+          f"(mix {args.mix_spec}, seed {args.seed} tasks)")
+    started = time.monotonic()
+    deadline = started + args.duration
+    await asyncio.gather(*(run_user(vu, args.mix, deadline, args.think_ms) for vu in users))
+    elapsed = time.monotonic() - started
+
+    status, final = await control.request("GET", ENDPOINT)
+    final_tasks = final.get("tasks", []) if status == 200 else []
+    vanished, resurrected, flipped = count_lost(users, final_tasks)
+    not_found = sum(vu.not_found for vu in users)
+
+    rec.print_table("LATENCY", elapsed_s=elapsed)
+    print("\n=== LOST UPDATES ===")
+    print(f"  vanished tasks       {vanished}")
+    print(f"  resurrected deletes  {resurrected}")
+    print(f"  reverted toggles     {flipped}")
+    print(f"  ok=false (not found) {not_found}")
+    print(f"  total                {vanished + resurrected + flipped + not_found}")
+
+    if not args.keep:
+        keep = [t for t in final_tasks if not t["text"].startswith(prefix)]
+        await control.request("POST", ENDPOINT, {"action": "reorder", "tasks": keep})
+    for conn in [control, *conns]:
+        await conn.close()
+    return 1 if rec.total()[1] else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test /api/tasks on a local server.js")
+    parser.add_argument("--concurrency", "-c", type=int, default=8, help="virtual users")
+    parser.add_argument("--duration", "-d", type=float, default=20, help="seconds")
+    parser.add_argument("--mix", dest="mix_spec", default=DEFAULT_MIX, help=f"action weights ({DEFAULT_MIX})")
+    parser.add_argument("--think-ms", type=float, default=0, help="mean pause between a user's actions")
+    parser.add_argument("--seed", type=int, default=0, help="pre-populate today.md with N tasks")
+    parser.add_argument("--random-seed", type=int, default=None)
+    parser.add_argument("--keep", action="store_true", help="leave benchmark tasks in today.md")
+    parser.add_argument("--allow-existing", action="store_true", help="run even if today.md has tasks")
+    args = parser.parse_args(argv)
+    args.mix = parse_mix(args.mix_spec)
+    return asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
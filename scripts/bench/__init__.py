@@ -0,0 +1,4 @@
+"""Stdlib-only load and latency tooling for a local server.js.
+
+Kept separate from scripts/harness so benchmarks run without Playwright.
+"""
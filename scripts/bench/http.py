@@ -0,0 +1,83 @@
+"""Minimal asyncio HTTP/1.1 keep-alive client (JSON in, JSON out)."""
+import asyncio
+import json
+from urllib.parse import urlsplit
+
+
+class HttpError(Exception):
+    pass
+
+
+class Connection:
+    """One persistent connection; requests on it are serialised."""
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.reader = None
+        self.writer = None
+
+    async def _open(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def close(self):
+        if self.writer:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+            self.writer = None
+
+    async def request(self, method, path, body=None):
+        """Send one request; returns (status, parsed JSON or raw text)."""
+        for attempt in (0, 1):
+            if self.writer is None:
+                await self._open()
+            try:
+                return await self._roundtrip(method, path, body)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # Server closed an idle keep-alive socket — reconnect once
+                await self.close()
+                if attempt:
+                    raise
+
+    async def _roundtrip(self, method, path, body):
+        payload = json.dumps(body).encode() if body is not None else b""
+        head = (f"{method} {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+                f"Connection: keep-alive\r\nContent-Length: {len(payload)}\r\n")
+        if body is not None:
+            head += "Content-Type: application/json\r\n"
+        self.writer.write(head.encode() + b"\r\n" + payload)
+        await self.writer.drain()
+
+        status_line = await self.reader.readuntil(b"\r\n")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            key, _, value = line.decode().partition(":")
+            headers[key.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self.reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                data = await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+                chunks.append(data[:-2])
+            raw = b"".join(chunks)
+        else:
+            raw = await self.reader.readexactly(int(headers.get("content-length", 0)))
+        if headers.get("connection", "").lower() == "close":
+            await self.close()
+
+        text = raw.decode()
+        try:
+            return status, json.loads(text)
+        except ValueError:
+            return status, text
@@ -0,0 +1,53 @@
+"""Latency recording and percentile reports."""
+import math
+from collections import defaultdict
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Recorder:
+    """Per-label latency samples (ms) and error counts."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def add(self, label, ms, ok=True):
+        if ok:
+            self.samples[label].append(ms)
+        else:
+            self.errors[label] += 1
+
+    def summary(self, label):
+        values = sorted(self.samples.get(label, []))
+        return {
+            "count": len(values),
+            "errors": self.errors.get(label, 0),
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "p99": percentile(values, 99),
+            "max": values[-1] if values else 0.0,
+        }
+
+    def labels(self):
+        return sorted(set(self.samples) | set(self.errors))
+
+    def total(self):
+        return sum(len(v) for v in self.samples.values()), sum(self.errors.values())
+
+    def print_table(self, title, elapsed_s=None, unit="ms"):
+        print(f"\n=== {title} ({unit}) ===")
+        print(f"  {'label':14} {'count':>7} {'err':>5} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+        for label in self.labels():
+            s = self.summary(label)
+            print(f"  {label:14} {s['count']:7d} {s['errors']:5d} "
+                  f"{s['p50']:9.1f} {s['p95']:9.1f} {s['p99']:9.1f} {s['max']:9.1f}")
+        if elapsed_s:
+            ok, err = self.total()
+            print(f"  throughput: {ok / elapsed_s:.1f} ok/s over {elapsed_s:.1f}s ({err} errors)")
@@ -0,0 +1,100 @@
+"""Minimal asyncio WebSocket client (RFC 6455) — enough to drive /ws/speech."""
+import asyncio
+import base64
+import json
+import os
+import struct
+from urllib.parse import urlsplit
+
+OP_TEXT, OP_BINARY, OP_CLOSE, OP_PING, OP_PONG = 0x1, 0x2, 0x8, 0x9, 0xA
+
+
+class WebSocketClosed(Exception):
+    pass
+
+
+def _mask(payload, key):
+    # XOR through one big int instead of a per-byte Python loop
+    n = len(payload)
+    if not n:
+        return payload
+    stream = (key * (n // 4 + 1))[:n]
+    return (int.from_bytes(payload, "big") ^ int.from_bytes(stream, "big")).to_bytes(n, "big")
+
+
+class WebSocket:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.closed = False
+
+    @classmethod
+    async def connect(cls, url):
+        parts = urlsplit(url)
+        host, port = parts.hostname, parts.port or 80
+        reader, writer = await asyncio.open_connection(host, port)
+        key = base64.b64encode(os.urandom(16)).decode()
+        writer.write((f"GET {parts.path or '/'} HTTP/1.1\r\nHost: {host}:{port}\r\n"
+                      "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n").encode())
+        await writer.drain()
+        status = await reader.readuntil(b"\r\n")
+        if b" 101 " not in status:
+            writer.close()
+            raise ConnectionError(f"WebSocket upgrade refused: {status.decode().strip()}")
+        while await reader.readuntil(b"\r\n") != b"\r\n":
+            pass
+        return cls(reader, writer)
+
+    def _frame(self, opcode, payload):
+        n = len(payload)
+        if n < 126:
+            head = struct.pack("!BB", 0x80 | opcode, 0x80 | n)
+        elif n < 1 << 16:
+            head = struct.pack("!BBH", 0x80 | opcode, 0x80 | 126, n)
+        else:
+            head = struct.pack("!BBQ", 0x80 | opcode, 0x80 | 127, n)
+        key = os.urandom(4)
+        return head + key + _mask(payload, key)
+
+    async def send_bytes(self, data, opcode=OP_BINARY):
+        if self.closed:
+            raise WebSocketClosed()
+        self.writer.write(self._frame(opcode, data))
+        await self.writer.drain()
+
+    async def send_json(self, obj):
+        await self.send_bytes(json.dumps(obj).encode(), OP_TEXT)
+
+    async def recv(self):
+        """Next data message: str for text frames, bytes for binary."""
+        while True:
+            b1, b2 = await self.reader.readexactly(2)
+            opcode, n = b1 & 0x0F, b2 & 0x7F
+            if n == 126:
+                n = struct.unpack("!H", await self.reader.readexactly(2))[0]
+            elif n == 127:
+                n = struct.unpack("!Q", await self.reader.readexactly(8))[0]
+            payload = await self.reader.readexactly(n)
+            if opcode == OP_TEXT:
+                return payload.decode()
+            if opcode == OP_BINARY:
+                return payload
+            if opcode == OP_PING:
+                await self.send_bytes(payload, OP_PONG)
+            elif opcode == OP_CLOSE:
+                self.closed = True
+                raise WebSocketClosed()
+
+    async def close(self):
+        if not self.closed:
+            try:
+                await self.send_bytes(struct.pack("!H", 1000), OP_CLOSE)
+            except (OSError, WebSocketClosed):
+                pass
+            self.closed = True
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except OSError:
+            pass
@@ -1,14 +1,10 @@
-from playwright.sync_api import sync_playwright
-with sync_playwright() as p:
-    browser = p.chromium.launch(headless=True)
-    page = browser.new_page(viewport={"width": 1400, "height": 900})
-    page.goto("http://localhost:3456/blog/")
-    page.wait_for_load_state("networkidle")
-    page.screenshot(path="test-results/final-blog-index.png", full_page=True)
-    print("Blog index captured")
-    for slug in ["todoist-review", "trello-review", "getting-things-done-guide", "monday-com-review"]:
-        page.goto(f"http://localhost:3456/blog/{slug}/")
-        page.wait_for_load_state("networkidle")
-        page.screenshot(path=f"test-results/final-hero-{slug}.png")
-        print(f"Captured {slug}")
-    browser.close()
+"""Blog index and hero crops for a final visual check.
+
+Shots are manifest group "final" in capture-manifest.json; see harness/capture.py.
+"""
+import sys
+
+from harness.capture import main
+
+if __name__ == "__main__":
+    sys.exit(main(groups=["final"]))
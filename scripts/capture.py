@@ -0,0 +1,13 @@
+"""Capture marketing screenshots in parallel from capture-manifest.json.
+
+    python scripts/capture.py --list
+    python scripts/capture.py --group all-articles --workers 8
+
+See harness/capture.py for the manifest format.
+"""
+import sys
+
+from harness.capture import main
+
+if __name__ == "__main__":
+    sys.exit(main())
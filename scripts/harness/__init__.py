@@ -0,0 +1,25 @@
+"""Shared async Playwright harness for the diagnostic scripts in scripts/.
+
+One Chromium is launched per run and every scenario gets its own browser
+context (isolated storage, fresh OPFS) on top of it:
+
+    from harness import run
+
+    async def scenario(h):
+        async with h.page("/meeting") as s:
+            info = await s.db("return { count: (await dbjs.getTasks(db, today)).length };")
+            print(info)
+
+    if __name__ == "__main__":
+        run(scenario)
+
+Waits are event-driven (see harness.ready): start_meeting() and
+send_message() return a Ready naming the signal that ended the wait, with
+the timeout only as a ceiling.
+
+Run several scripts against one browser with scripts/run-scenarios.py.
+"""
+from .browser import BASE_URL, DEFAULT_VIEWPORT, Harness, Scenario, run, run_many
+from .ready import Ready, first_signal
+
+__all__ = ["BASE_URL", "DEFAULT_VIEWPORT", "Harness", "Ready", "Scenario", "first_signal", "run", "run_many"]
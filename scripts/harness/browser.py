@@ -0,0 +1,251 @@
+"""Browser lifecycle and per-scenario page helpers."""
+import asyncio
+import os
+import re
+import time
+import traceback
+from contextlib import asynccontextmanager
+
+from playwright.async_api import async_playwright
+
+from .ready import (
+    DASHBOARD_INIT, S2S_TURN_COMPLETE, STATUS_PROBE_JS, TURN_ERROR,
+    console_line, extraction_parsed, first_signal, status_refresh, task_count_change,
+)
+
+BASE_URL = os.environ.get("THINKDONE_URL", "http://localhost:3456").rstrip("/")
+DEFAULT_VIEWPORT = {"width": 1280, "height": 900}
+
+# Wraps a JS body so it runs with `dbjs` (the db.js module), an open `db`
+# with schema ensured, and `today` (YYYY-MM-DD) in scope. Errors come back
+# as { error, stack } instead of rejecting the evaluate() call.
+DB_WRAPPER = """async () => {
+    try {
+        const dbjs = await import('/src/lib/db.js');
+        const db = await dbjs.getDb();
+        await dbjs.ensureSchema(db);
+        const today = new Date().toISOString().slice(0, 10);
+        return await (async () => { __BODY__ })();
+    } catch (e) {
+        return { error: e.message, stack: e.stack };
+    }
+}"""
+
+TASKS_JS = """
+    const todayTasks = await dbjs.getTasks(db, today);
+    const allTasks = await db.prepare('SELECT id, text, plan_date, source FROM tasks ORDER BY id DESC LIMIT __LIMIT__').all();
+    return {
+        today,
+        todayCount: todayTasks.length,
+        todayTasks: todayTasks.map(t => ({ id: t.id, text: t.text, date: t.plan_date })),
+        allCount: allTasks.length,
+        allTasks: allTasks.map(t => ({ id: t.id, text: t.text, date: t.plan_date, source: t.source })),
+    };
+"""
+
+START_BUTTON = "button.meeting-trigger:not(.meeting-stop)"
+
+SESSION_STATE_JS = """
+    const active = await dbjs.getActiveSession(db);
+    if (!active) return null;
+    return {
+        session: { type: active.session_type, state: active.state, messages: active.messages },
+        meetingStarted: active.messages.length > 0,
+    };
+"""
+
+
+class Scenario:
+    """One browser context + page with console capture."""
+
+    def __init__(self, context, page):
+        self.context = context
+        self.page = page
+        self.logs = []
+        self._waiters = []
+        page.on("console", self._on_console)
+
+    def _on_console(self, msg):
+        line = f"[{msg.type}] {msg.text}"
+        self.logs.append(line)
+        for rx, fut in self._waiters:
+            match = rx.search(line)
+            if match and not fut.done():
+                fut.set_result(match)
+
+    def mark(self):
+        """Position in the console log; pass as `since` to only see newer lines."""
+        return len(self.logs)
+
+    async def wait_for_log(self, pattern, since=0, timeout_ms=None):
+        """Wait for a console line matching `pattern` logged at or after `since`."""
+        rx = re.compile(pattern)
+        for line in self.logs[since:]:
+            match = rx.search(line)
+            if match:
+                return match
+        waiter = (rx, asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        try:
+            return await asyncio.wait_for(waiter[1], timeout_ms / 1000 if timeout_ms else None)
+        finally:
+            self._waiters.remove(waiter)
+
+    async def goto(self, path="/", settle_ms=0):
+        url = path if path.startswith("http") else BASE_URL + path
+        await self.page.goto(url)
+        await self.page.wait_for_load_state("networkidle")
+        if settle_ms:
+            await self.page.wait_for_timeout(settle_ms)
+
+    async def db(self, body):
+        """Evaluate a JS body against the in-browser db.js (see DB_WRAPPER)."""
+        return await self.page.evaluate(DB_WRAPPER.replace("__BODY__", body))
+
+    async def tasks(self, limit=10):
+        """Today's tasks plus the most recent `limit` tasks of any date."""
+        return await self.db(TASKS_JS.replace("__LIMIT__", str(int(limit))))
+
+    async def task_count(self):
+        return await self.db("return (await dbjs.getTasks(db, today)).length;")
+
+    async def status_refreshes(self):
+        return await self.page.evaluate("() => window.__statusRefreshes || 0")
+
+    async def wait_for_dashboard(self, timeout_ms=10000):
+        """Wait until the meeting dashboard has initialised (replaces settle sleeps)."""
+        return await first_signal({
+            "init": console_line(self, DASHBOARD_INIT),
+            "button": self.page.locator(START_BUTTON).first.wait_for(state="visible", timeout=0),
+        }, timeout_ms)
+
+    async def start_meeting(self, timeout_ms=15000):
+        """Click Start Meeting and wait for the opening turn to finish.
+
+        Returns None when the button is absent, otherwise a Ready saying
+        which signal ended the wait (status refresh, S2S turn, or error).
+        """
+        btn = self.page.locator(START_BUTTON)
+        if await btn.count() == 0:
+            return None
+        since, refreshes = self.mark(), await self.status_refreshes()
+        await btn.click()
+        return await first_signal({
+            "status": status_refresh(self, refreshes),
+            "s2s": console_line(self, S2S_TURN_COMPLETE, since),
+            "error": console_line(self, TURN_ERROR, since),
+        }, timeout_ms)
+
+    async def send_message(self, text, selector="[placeholder]", timeout_ms=20000):
+        """Type into the chat input, press Enter and wait for the turn to land.
+
+        Resolves on whichever comes first: the extraction `Parsed:` line, a
+        change in today's task count, the status-bar refresh that ends the
+        turn, or a turn error. If extraction reports tasks, keeps waiting
+        (within the same ceiling) until they reach the DB. Returns None when
+        the input is absent.
+        """
+        inp = self.page.locator(selector).first
+        if await inp.count() == 0:
+            return None
+        started = time.monotonic()
+        since, refreshes, baseline = self.mark(), await self.status_refreshes(), await self.task_count()
+        await inp.fill(text)
+        await inp.press("Enter")
+        ready = await first_signal({
+            "extraction": extraction_parsed(self, since),
+            "tasks": task_count_change(self, baseline),
+            "status": status_refresh(self, refreshes),
+            "error": console_line(self, TURN_ERROR, since),
+        }, timeout_ms)
+        if ready.signal == "extraction" and ready.value > 0:
+            remaining = timeout_ms - (time.monotonic() - started) * 1000
+            ready = await first_signal({
+                "tasks": task_count_change(self, baseline),
+                "status": status_refresh(self, refreshes),
+            }, max(remaining, 0))
+            ready = ready._replace(elapsed_ms=(time.monotonic() - started) * 1000)
+        return ready
+
+    async def session_state(self):
+        """The open meeting session as persisted in the DB, or None."""
+        return await self.db(SESSION_STATE_JS)
+
+    async def screenshot(self, path, **kwargs):
+        await self.page.screenshot(path=path, **kwargs)
+
+    def logs_matching(self, *keywords):
+        return [log for log in self.logs if any(kw in log.lower() for kw in keywords)]
+
+    def print_logs(self, title, keywords, width=250):
+        print(f"\n=== {title} ===")
+        for log in self.logs_matching(*keywords):
+            print(log[:width])
+
+
+class Harness:
+    """Owns a single headless Chromium shared by every scenario in a run."""
+
+    def __init__(self, headless=True):
+        self.headless = headless
+        self._pw = None
+        self.browser = None
+
+    async def __aenter__(self):
+        self._pw = await async_playwright().start()
+        self.browser = await self._pw.chromium.launch(headless=self.headless)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.browser.close()
+        await self._pw.stop()
+
+    @asynccontextmanager
+    async def scenario(self, viewport=None):
+        context = await self.browser.new_context(viewport=viewport or DEFAULT_VIEWPORT)
+        await context.add_init_script(STATUS_PROBE_JS)
+        try:
+            yield Scenario(context, await context.new_page())
+        finally:
+            await context.close()
+
+    @asynccontextmanager
+    async def page(self, path="/", settle_ms=0, viewport=None):
+        """Shorthand: new scenario already navigated to `path`."""
+        async with self.scenario(viewport=viewport) as s:
+            await s.goto(path, settle_ms=settle_ms)
+            yield s
+
+
+def run(scenario, headless=True):
+    """Entry point for a single script: `run(scenario)` under __main__."""
+    async def main():
+        async with Harness(headless=headless) as h:
+            return await scenario(h)
+    return asyncio.run(main())
+
+
+async def _run_one(h, name, scenario, sem):
+    async with sem:
+        started = time.monotonic()
+        print(f"\n##### {name} #####")
+        try:
+            await scenario(h)
+            ok = True
+        except Exception:
+            traceback.print_exc()
+            ok = False
+        return name, ok, time.monotonic() - started
+
+
+def run_many(scenarios, jobs=1, headless=True):
+    """Run named scenarios against one browser, `jobs` at a time.
+
+    `scenarios` is a list of (name, async fn(h)) pairs. Returns a list of
+    (name, ok, seconds) in input order.
+    """
+    async def main():
+        sem = asyncio.Semaphore(max(1, jobs))
+        async with Harness(headless=headless) as h:
+            return await asyncio.gather(*(_run_one(h, n, fn, sem) for n, fn in scenarios))
+    return asyncio.run(main())
@@ -0,0 +1,109 @@
+"""Content-hash cache so capture only re-shoots pages whose sources changed.
+
+Each shot is keyed by a hash of what renders it: the shared layouts,
+components and styles, the page's route file, its article folder (or all
+articles for index pages), and the job itself (URL, viewport, shot spec).
+The map lives next to the PNGs in <out>/.capture-cache.json.
+"""
+import hashlib
+import json
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+CACHE_FILE = ".capture-cache.json"
+
+# Rendered into every page
+SHARED_INPUTS = [
+    "astro.config.js",
+    "src/content.config.ts",
+    "src/layouts",
+    "src/components",
+    "src/styles",
+    "src/content/authors",
+]
+
+
+def _files(rel):
+    path = os.path.join(ROOT, rel)
+    if os.path.isfile(path):
+        return [rel]
+    found = []
+    for dirpath, _, names in os.walk(path):
+        for name in names:
+            found.append(os.path.relpath(os.path.join(dirpath, name), ROOT))
+    return sorted(found)
+
+
+def _article_folder(slug):
+    base = os.path.join("src", "content", "articles")
+    for folder in os.listdir(os.path.join(ROOT, base)):
+        if folder.split("_", 1)[-1] == slug:
+            return os.path.join(base, folder)
+    return None
+
+
+def job_inputs(job):
+    """Source paths (files or dirs, relative to the repo) a job renders from."""
+    parts = [p for p in job.url.strip("/").split("/") if p]
+    inputs = list(SHARED_INPUTS)
+    if not parts:
+        inputs.append("src/pages/index.astro")
+    elif len(parts) == 1:
+        inputs += [f"src/pages/{parts[0]}", "src/content"]
+    else:
+        inputs.append(f"src/pages/{parts[0]}")
+        folder = _article_folder(job.slug or parts[1]) if parts[0] == "articles" else None
+        inputs.append(folder or "src/content")
+    return inputs
+
+
+class ShotCache:
+    def __init__(self, out_dir):
+        self.path = os.path.join(out_dir, CACHE_FILE)
+        self.out_dir = out_dir
+        self._file_digests = {}
+        self.hits = 0
+        self.misses = 0
+        try:
+            with open(self.path) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def _digest_file(self, rel):
+        if rel not in self._file_digests:
+            with open(os.path.join(ROOT, rel), "rb") as f:
+                self._file_digests[rel] = hashlib.sha256(f.read()).hexdigest()
+        return self._file_digests[rel]
+
+    def job_hash(self, job):
+        h = hashlib.sha256()
+        spec = {"url": job.url, "viewport": job.viewport, "shots": job.shots, "reveal": job.reveal}
+        h.update(json.dumps(spec, sort_keys=True).encode())
+        for rel in job_inputs(job):
+            for f in _files(rel):
+                h.update(f"{f}\0{self._digest_file(f)}\n".encode())
+        return h.hexdigest()
+
+    def fresh(self, job, paths):
+        """True when every shot of `job` exists and was made from the same inputs."""
+        digest = self.job_hash(job)
+        ok = all(os.path.exists(p) and self.entries.get(self._key(p)) == digest for p in paths)
+        if ok:
+            self.hits += len(paths)
+        else:
+            self.misses += len(paths)
+        return ok
+
+    def record(self, job, paths):
+        digest = self.job_hash(job)
+        for p in paths:
+            self.entries[self._key(p)] = digest
+
+    def save(self):
+        os.makedirs(self.out_dir, exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+
+    def _key(self, path):
+        return os.path.relpath(path, self.out_dir)
@@ -0,0 +1,217 @@
+"""Parallel screenshot capture driven by a declarative manifest.
+
+The manifest (scripts/capture-manifest.json) lists pages; each page is
+captured once per viewport, and each load takes every shot listed for it
+(scroll targets, element crops, full-page). Loads are spread over a pool of
+browser contexts on one Chromium:
+
+    python scripts/capture.py                    # everything, one worker per core
+    python scripts/capture.py --group article --workers 4
+    python scripts/capture.py --list
+    python scripts/capture.py --force            # ignore the content-hash cache
+
+Shots whose source inputs are unchanged since the last run are skipped
+(see harness/cache.py).
+
+Manifest page keys:
+    group       name used by --group (the old capture-*.py script it replaces)
+    url         path under BASE_URL; may contain {slug}
+    viewports   names from the top-level "viewports" map
+    articles    true to expand the page once per article in src/content/articles
+    reveal      force .blog-reveal elements visible (default true)
+    shots       list of {name, full_page, scroll, selector, element}
+
+Shot keys:
+    name        output file stem; may contain {slug} and {viewport}
+    full_page   capture the whole document
+    scroll      pixel offset, "bottom" or "bottom-<px>"
+    selector    scroll this element to the viewport centre first
+    element     screenshot just this element instead of the viewport
+"""
+import asyncio
+import json
+import os
+import time
+from collections import namedtuple
+
+from .browser import BASE_URL, Harness
+from .cache import ROOT, ShotCache
+
+MANIFEST = os.path.join(ROOT, "scripts", "capture-manifest.json")
+ARTICLES_DIR = os.path.join(ROOT, "src", "content", "articles")
+OUT_DIR = os.path.join(ROOT, "test-results")
+
+# One page load: a URL at one viewport, plus the shots taken from it
+Job = namedtuple("Job", "group url viewport_name viewport slug shots reveal")
+
+# Fonts loaded, in-viewport images decoded (bounded), then two frames so
+# layout and scroll-triggered classes have been painted.
+SETTLE_JS = """async (limitMs) => {
+    const deadline = new Promise(r => setTimeout(r, limitMs));
+    const ready = (async () => {
+        await document.fonts.ready;
+        const imgs = [...document.images].filter(img => {
+            const r = img.getBoundingClientRect();
+            return !img.complete && r.bottom > 0 && r.top < innerHeight;
+        });
+        await Promise.all(imgs.map(img => new Promise(r => { img.onload = img.onerror = r; })));
+    })();
+    await Promise.race([ready, deadline]);
+    await new Promise(r => requestAnimationFrame(() => requestAnimationFrame(r)));
+}"""
+
+REVEAL_JS = """() => {
+    document.querySelectorAll('.blog-reveal').forEach(el => el.classList.add('visible'));
+}"""
+
+SCROLL_JS = """(target) => {
+    if (typeof target === 'number') return window.scrollTo(0, target);
+    const offset = parseInt(target.split('-')[1] || '0', 10);
+    window.scrollTo(0, document.body.scrollHeight - (offset || innerHeight));
+}"""
+
+CENTER_JS = """(sel) => {
+    const el = document.querySelector(sel);
+    if (el) el.scrollIntoView({ block: 'center' });
+    return !!el;
+}"""
+
+
+def article_slugs():
+    """Slugs as the content loader derives them: folder name minus the date."""
+    slugs = []
+    for folder in sorted(os.listdir(ARTICLES_DIR)):
+        if os.path.isfile(os.path.join(ARTICLES_DIR, folder, "en.mdx")):
+            slugs.append(folder.split("_", 1)[-1])
+    return slugs
+
+
+def load_manifest(path=MANIFEST):
+    with open(path) as f:
+        return json.load(f)
+
+
+def expand(manifest, groups=None):
+    """Flatten the manifest into Jobs, optionally keeping only some groups."""
+    viewports = manifest["viewports"]
+    jobs = []
+    for page in manifest["pages"]:
+        if groups and page["group"] not in groups:
+            continue
+        slugs = article_slugs() if page.get("articles") else [None]
+        for slug in slugs:
+            for vp in page.get("viewports", ["desktop"]):
+                jobs.append(Job(
+                    group=page["group"],
+                    url=page["url"].format(slug=slug),
+                    viewport_name=vp,
+                    viewport=viewports[vp],
+                    slug=slug,
+                    shots=page["shots"],
+                    reveal=page.get("reveal", True),
+                ))
+    return jobs
+
+
+def shot_path(out_dir, shot, job):
+    return os.path.join(out_dir, shot["name"].format(slug=job.slug, viewport=job.viewport_name) + ".png")
+
+
+async def settle(page, limit_ms=5000):
+    await page.evaluate(SETTLE_JS, limit_ms)
+
+
+async def take(page, job, out_dir):
+    """Load one job's URL and take its shots in order. Returns paths written."""
+    await page.set_viewport_size(job.viewport)
+    await page.goto(BASE_URL + job.url, wait_until="networkidle")
+    written = []
+    for shot in job.shots:
+        if "scroll" in shot:
+            await page.evaluate(SCROLL_JS, shot["scroll"])
+        if "selector" in shot and not await page.evaluate(CENTER_JS, shot["selector"]):
+            print(f"  skip {shot['name']}: {shot['selector']} not found on {job.url}")
+            continue
+        if job.reveal:
+            await page.evaluate(REVEAL_JS)
+        await settle(page)
+        path = shot_path(out_dir, shot, job)
+        if "element" in shot:
+            await page.locator(shot["element"]).first.screenshot(path=path, animations="disabled")
+        else:
+            await page.screenshot(path=path, full_page=shot.get("full_page", False), animations="disabled")
+        written.append(path)
+    return written
+
+
+async def _worker(h, queue, out_dir, results):
+    async with h.scenario() as s:
+        while True:
+            try:
+                job = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            started = time.monotonic()
+            try:
+                paths = await take(s.page, job, out_dir)
+                results.append((job, paths, None))
+                print(f"  {job.url} @{job.viewport_name}: {len(paths)} shots ({time.monotonic() - started:.1f}s)")
+            except Exception as e:
+                results.append((job, [], e))
+                print(f"  FAIL {job.url} @{job.viewport_name}: {e}")
+
+
+async def capture(jobs, out_dir=OUT_DIR, workers=None, headless=True):
+    """Run jobs across `workers` contexts (default: one per CPU)."""
+    os.makedirs(out_dir, exist_ok=True)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs) or 1))
+    queue = asyncio.Queue()
+    for job in jobs:
+        queue.put_nowait(job)
+    results = []
+    async with Harness(headless=headless) as h:
+        await asyncio.gather(*(_worker(h, queue, out_dir, results) for _ in range(workers)))
+    return results
+
+
+def main(argv=None, groups=None):
+    """CLI entry; the capture-*.py wrappers pass their group in `groups`."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Capture screenshots from capture-manifest.json")
+    parser.add_argument("--group", action="append", help="only these manifest groups (repeatable)")
+    parser.add_argument("--workers", type=int, help="parallel browser contexts (default: CPU count)")
+    parser.add_argument("--out", default=OUT_DIR, help="output directory")
+    parser.add_argument("--manifest", default=MANIFEST)
+    parser.add_argument("--list", action="store_true", help="print the expanded jobs and exit")
+    parser.add_argument("--force", action="store_true", help="re-shoot even if inputs are unchanged")
+    parser.add_argument("--headed", action="store_true")
+    args = parser.parse_args(argv)
+
+    jobs = expand(load_manifest(args.manifest), groups=args.group or groups)
+    if args.list:
+        for job in jobs:
+            names = ", ".join(shot_path("", s, job)[:-4] for s in job.shots)
+            print(f"{job.group:10} {job.url} @{job.viewport_name}: {names}")
+        return 0
+
+    started = time.monotonic()
+    cache = ShotCache(args.out)
+    if args.force:
+        stale = jobs
+        print("cache: ignored (--force)")
+    else:
+        stale = [job for job in jobs if not cache.fresh(job, [shot_path(args.out, s, job) for s in job.shots])]
+        print(f"cache: {cache.hits} hit, {cache.misses} miss")
+    if not stale:
+        return 0
+
+    results = asyncio.run(capture(stale, out_dir=args.out, workers=args.workers, headless=not args.headed))
+    for job, paths, err in results:
+        if not err:
+            cache.record(job, paths)
+    cache.save()
+    shots = sum(len(paths) for _, paths, _ in results)
+    failed = [job for job, _, err in results if err]
+    print(f"{shots} screenshots from {len(stale)} page loads in {time.monotonic() - started:.1f}s -> {args.out}")
+    return 1 if failed else 0
@@ -0,0 +1,100 @@
+"""Readiness signals: resolve on what the app actually does, not on sleeps.
+
+Each signal is a coroutine that finishes when its condition is observed.
+`first_signal` races several of them under one timeout ceiling, so a step
+costs only as long as the model takes:
+
+    ready = await first_signal({
+        "extraction": extraction_parsed(s, since=mark),
+        "tasks": task_count_change(s, baseline),
+        "status": status_refresh(s, refreshes),
+    }, timeout_ms=20000)
+    print(ready)   # "ready: tasks after 2.4s" / "ready: timed out after 20.0s"
+"""
+import asyncio
+import time
+from collections import namedtuple
+
+# Console lines logged by src/lib/extraction.js and MeetingDashboard.svelte
+EXTRACTION_PARSED = r"\[extractFromTranscript\] (?:Server proxy )?[Pp]arsed: (\d+) tasks"
+TURN_ERROR = r"\[Dashboard\] (?:startMeeting|handleSendMessage|S2S extraction) (?:error|failed)"
+S2S_TURN_COMPLETE = r"\[Dashboard\] S2S turn complete"
+DASHBOARD_INIT = r"\[Dashboard\] init: session="
+
+# Counts `statusbar-refresh` events — the dashboard fires one in the finally
+# block of every turn, which is what makes StatusBar.svelte re-render.
+STATUS_PROBE_JS = """
+window.__statusRefreshes = 0;
+window.addEventListener('statusbar-refresh', () => { window.__statusRefreshes += 1; });
+"""
+
+
+class Ready(namedtuple("Ready", "signal value elapsed_ms")):
+    """Which signal fired first (None on timeout), its value, and when."""
+
+    @property
+    def timed_out(self):
+        return self.signal is None
+
+    def __str__(self):
+        secs = self.elapsed_ms / 1000
+        if self.timed_out:
+            return f"ready: timed out after {secs:.1f}s"
+        return f"ready: {self.signal} after {secs:.1f}s"
+
+
+async def first_signal(signals, timeout_ms):
+    """Race named awaitables; return a Ready for the first to finish.
+
+    Losers are cancelled. On hitting the ceiling returns Ready(None, None, ...)
+    rather than raising, so scripts can still report what state they reached.
+    """
+    started = time.monotonic()
+    deadline = started + timeout_ms / 1000
+    tasks = {asyncio.ensure_future(aw): name for name, aw in signals.items()}
+    pending = set(tasks)
+    try:
+        # A signal that errors (e.g. page closed mid-poll) just drops out
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining,
+                                               return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    elapsed_ms = (time.monotonic() - started) * 1000
+                    return Ready(tasks[task], task.result(), elapsed_ms)
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return Ready(None, None, (time.monotonic() - started) * 1000)
+
+
+async def console_line(s, pattern, since=0):
+    """Resolve with the regex match of the first console line after `since`."""
+    return await s.wait_for_log(pattern, since=since)
+
+
+async def extraction_parsed(s, since=0):
+    """Resolve with the parsed task count once extraction logs its result."""
+    match = await s.wait_for_log(EXTRACTION_PARSED, since=since)
+    return int(match.group(1))
+
+
+async def task_count_change(s, baseline, poll_ms=250):
+    """Resolve with today's task count once it differs from `baseline`."""
+    while True:
+        count = await s.task_count()
+        if count != baseline:
+            return count
+        await asyncio.sleep(poll_ms / 1000)
+
+
+async def status_refresh(s, since):
+    """Resolve once the status bar has been refreshed more than `since` times."""
+    await s.page.wait_for_function(
+        "(n) => (window.__statusRefreshes || 0) > n", arg=since, timeout=0)
+    return await s.page.evaluate("() => document.querySelector('.status-bar')?.innerText ?? null")
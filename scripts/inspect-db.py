@@ -0,0 +1,170 @@
+"""Inspect a ThinkDone database offline — no browser, no dev server.
+
+Opens the SQLite file read-only: the CLI's memory.db (THINKDONE_DB or
+../.claude/memory.db) or a thinkdone.db exported from the browser's OPFS.
+
+    python scripts/inspect-db.py summary
+    python scripts/inspect-db.py tasks --date 2026-10-17
+    python scripts/inspect-db.py memories --type blocker --project thinkdone --active
+    python scripts/inspect-db.py conversations --limit 5 --json
+    python scripts/inspect-db.py --db ~/Downloads/thinkdone.db connections
+
+Rows are streamed straight from the cursor; --json writes one object per
+line (NDJSON) so large tables can be piped into jq without buffering.
+"""
+import argparse
+import datetime
+import json
+import os
+import sqlite3
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DB = os.environ.get("THINKDONE_DB") or os.path.join(ROOT, "..", ".claude", "memory.db")
+
+# Columns never worth printing (384-dim vectors, secrets)
+HIDDEN = {"embedding", "access_token", "refresh_token", "id_token"}
+
+REPORTS = {
+    "tasks": {"table": "tasks", "order": "plan_date DESC, position, id"},
+    "memories": {"table": "memories", "order": "created_at DESC"},
+    "conversations": {"table": "conversations", "order": "started_at DESC"},
+    "connections": {"table": "connections", "order": "provider"},
+    "routines": {"table": "routines", "order": "id"},
+    "completions": {"table": "completions", "order": "completed_date DESC"},
+    "settings": {"table": "settings", "order": "key"},
+    "usage": {"table": "api_usage", "order": "created_at DESC"},
+}
+
+
+def connect(path):
+    if not os.path.exists(path):
+        sys.exit(f"No database at {path} (set --db or THINKDONE_DB)")
+    db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    db.row_factory = sqlite3.Row
+    # memory.db declares a libsql vector index; stock SQLite only needs the
+    # function name to exist to parse the schema — it is never called here.
+    db.create_function("libsql_vector_idx", -1, lambda *a: None, deterministic=True)
+    return db
+
+
+def columns(db, table):
+    return [r["name"] for r in db.execute(f"PRAGMA table_info({table})")]
+
+
+def tables(db):
+    rows = db.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name")
+    return [r["name"] for r in rows]
+
+
+def build_query(db, report, args):
+    spec = REPORTS[report]
+    table = spec["table"]
+    cols = columns(db, table)
+    if not cols:
+        sys.exit(f"Table '{table}' does not exist in this database")
+    shown = [c for c in cols if c not in HIDDEN]
+    if table == "connections" and "access_token" in cols:
+        shown.append("access_token IS NOT NULL AS has_token")
+
+    where, params = [], []
+    if args.date and "plan_date" in cols:
+        where.append("plan_date = ?")
+        params.append(args.date)
+    if args.type and "type" in cols:
+        where.append("type = ?")
+        params.append(args.type)
+    if args.project and "project" in cols:
+        where.append("project = ?")
+        params.append(args.project)
+    if args.active and "superseded_by" in cols:
+        where.append("superseded_by IS NULL")
+
+    sql = f"SELECT {', '.join(shown)} FROM {table}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    order = ", ".join(c for c in spec["order"].split(", ") if c.split()[0] in cols)
+    if order:
+        sql += f" ORDER BY {order}"
+    if args.limit:
+        sql += f" LIMIT {int(args.limit)}"
+    return sql, params
+
+
+def emit(cursor, as_json, width):
+    """Stream rows to stdout as NDJSON or one compact line per row."""
+    count = 0
+    for row in cursor:
+        record = dict(row)
+        if as_json:
+            sys.stdout.write(json.dumps(record, default=str) + "\n")
+        else:
+            line = "  " + "  ".join(f"{k}={v}" for k, v in record.items() if v not in (None, ""))
+            print(line[:width] if width else line)
+        count += 1
+    return count
+
+
+def summary(db, as_json):
+    today = utc_today()
+    report = {"tables": {t: db.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in tables(db)}}
+    if "tasks" in report["tables"]:
+        row = db.execute("SELECT COUNT(*), COALESCE(SUM(checked), 0) FROM tasks WHERE plan_date = ?", [today]).fetchone()
+        report["today"] = {"date": today, "tasks": row[0], "done": row[1]}
+    if "memories" in report["tables"]:
+        rows = db.execute("SELECT type, COUNT(*) FROM memories WHERE superseded_by IS NULL GROUP BY type ORDER BY 2 DESC")
+        report["active_memories"] = {t: n for t, n in rows}
+    if as_json:
+        print(json.dumps(report))
+        return
+    print("=== TABLES ===")
+    for name, n in report["tables"].items():
+        print(f"  {name:20} {n}")
+    if "today" in report:
+        t = report["today"]
+        print(f"\n=== TODAY ({t['date']}) ===\n  {t['tasks']} tasks, {t['done']} done")
+    if report.get("active_memories"):
+        print("\n=== ACTIVE MEMORIES ===")
+        for kind, n in report["active_memories"].items():
+            print(f"  {kind:20} {n}")
+
+
+def utc_today():
+    """The app's notion of today: new Date().toISOString().slice(0, 10)."""
+    return datetime.datetime.now(datetime.timezone.utc).date().isoformat()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Read-only reports over a ThinkDone SQLite file")
+    parser.add_argument("report", choices=["summary", "sql", *REPORTS])
+    parser.add_argument("query", nargs="?", help="SQL for the 'sql' report")
+    parser.add_argument("--db", default=DEFAULT_DB, help=f"database file (default {DEFAULT_DB})")
+    parser.add_argument("--date", help="tasks: plan_date (YYYY-MM-DD, 'today' allowed)")
+    parser.add_argument("--type", help="memories: type")
+    parser.add_argument("--project", help="filter by project")
+    parser.add_argument("--active", action="store_true", help="memories: skip superseded")
+    parser.add_argument("--limit", type=int, help="max rows")
+    parser.add_argument("--json", action="store_true", help="NDJSON output")
+    parser.add_argument("--width", type=int, default=200, help="truncate text lines (0 = no limit)")
+    args = parser.parse_args(argv)
+    if args.date == "today":
+        args.date = utc_today()
+
+    db = connect(args.db)
+    if args.report == "summary":
+        summary(db, args.json)
+        return 0
+    if args.report == "sql":
+        if not args.query:
+            parser.error("the 'sql' report needs a query")
+        cursor = db.execute(args.query)
+    else:
+        cursor = db.execute(*build_query(db, args.report, args))
+    count = emit(cursor, args.json, args.width)
+    if not args.json:
+        print(f"({count} rows)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
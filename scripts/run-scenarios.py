@@ -0,0 +1,53 @@
+"""Run several harness scripts against one shared Chromium.
+
+    python scripts/run-scenarios.py                      # all diagnostic scripts
+    python scripts/run-scenarios.py diagnose-tasks inspect-meeting --jobs 2
+"""
+import argparse
+import importlib.util
+import os
+import sys
+
+from harness import run_many
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+DIAGNOSTICS = [
+    "diagnose-tasks",
+    "diagnose-real",
+    "inspect-meeting",
+    "test-extraction-live",
+    "trace-extraction",
+    "e2e-extraction",
+    "verify-tasks-visible",
+]
+
+
+def load_scenario(name):
+    path = os.path.join(HERE, name if name.endswith(".py") else f"{name}.py")
+    spec = importlib.util.spec_from_file_location(name.replace("-", "_"), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    if not hasattr(module, "scenario"):
+        sys.exit(f"{name}: no scenario(h) function")
+    return module.scenario
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", default=DIAGNOSTICS)
+    parser.add_argument("--jobs", type=int, default=1, help="scenarios to run at once")
+    parser.add_argument("--headed", action="store_true")
+    args = parser.parse_args()
+
+    scenarios = [(name, load_scenario(name)) for name in args.names]
+    results = run_many(scenarios, jobs=args.jobs, headless=not args.headed)
+
+    print("\n##### SUMMARY #####")
+    for name, ok, secs in results:
+        print(f"  {'ok  ' if ok else 'FAIL'} {name} ({secs:.1f}s)")
+    sys.exit(0 if all(ok for _, ok, _ in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
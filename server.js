@@ -1,19 +1,64 @@
 import http from 'node:http';
+import cluster from 'node:cluster';
 import { WebSocketServer } from 'ws';
-import { handleSpeechConnection } from './src/lib/speech-ws.js';
+import { handleSpeechConnection, createSpeechMetrics } from './src/lib/speech-ws.js';
+import { speechWorkerCount, createSpeechGateway, runSpeechWorker, drainSpeechClients } from './src/lib/speech-gateway.js';
 import * as providers from './src/lib/speech-providers.js';
 
-process.env.ASTRO_NODE_AUTOSTART = 'disabled';
-const { handler } = await import('./dist/server/entry.mjs');
-const server = http.createServer(handler);
-const wss = new WebSocketServer({ noServer: true });
-server.on('upgrade', (req, socket, head) => {
-  if (req.url === '/ws/speech') {
-    wss.handleUpgrade(req, socket, head, (ws) => {
-      handleSpeechConnection(ws, { providers });
-    });
-  } else {
-    socket.destroy();
-  }
-});
-server.listen(process.env.PORT || 3456, process.env.HOST || '0.0.0.0');
+// SPEECH_WORKERS=N|auto moves /ws/speech sessions into N worker processes
+// (see speech-gateway.js); unset/0 serves them from this process as before.
+// SPEECH_GRACE_MS bounds how long shutdown waits for live sessions.
+const graceMs = +process.env.SPEECH_GRACE_MS || undefined;
+
+if (cluster.isWorker) {
+  // Ctrl-C and group-wide SIGTERM (e.g. systemd KillMode=control-group) reach
+  // every worker; the primary drives the drain with speech:shutdown
+  process.on('SIGINT', () => {});
+  process.on('SIGTERM', () => {});
+  runSpeechWorker({ WebSocketServer, handleConnection: handleSpeechConnection, deps: { providers } });
+} else {
+  const workers = speechWorkerCount(process.env.SPEECH_WORKERS);
+  const gateway = workers ? createSpeechGateway({ count: workers, fork: () => cluster.fork() }) : null;
+  const wss = gateway ? null : new WebSocketServer({ noServer: true });
+  const metrics = createSpeechMetrics();
+
+  process.env.ASTRO_NODE_AUTOSTART = 'disabled';
+  const { handler } = await import('./dist/server/entry.mjs');
+
+  // Speech load: per worker when clustered; loopback only
+  const isLoopback = (addr) => addr === '127.0.0.1' || addr === '::1' || addr === '::ffff:127.0.0.1';
+  const server = http.createServer((req, res) => {
+    if (req.url === '/_speech/load' && isLoopback(req.socket.remoteAddress)) {
+      const speech = gateway ? null : metrics.snapshot();
+      const body = gateway ? gateway.stats() : { workers: [], sessions: speech.active, speech };
+      res.writeHead(200, { 'Content-Type': 'application/json' }).end(JSON.stringify(body));
+      return;
+    }
+    handler(req, res);
+  });
+  server.on('upgrade', (req, socket, head) => {
+    if (req.url !== '/ws/speech') {
+      socket.destroy();
+    } else if (gateway) {
+      gateway.handleUpgrade(req, socket, head);
+    } else {
+      wss.handleUpgrade(req, socket, head, (ws) => {
+        handleSpeechConnection(ws, { providers, metrics });
+      });
+    }
+  });
+  server.listen(process.env.PORT || 3456, process.env.HOST || '0.0.0.0');
+
+  // Graceful shutdown: stop accepting, drain speech sessions, then exit
+  let stopping = false;
+  const stop = async () => {
+    if (stopping) return;
+    stopping = true;
+    server.close();
+    if (gateway) await gateway.close({ graceMs });
+    else await drainSpeechClients(wss, graceMs);
+    process.exit(0);
+  };
+  process.on('SIGTERM', stop);
+  process.on('SIGINT', stop);
+}
@@ -1,6 +1,8 @@
 // Agenda generation + management
 // Runs in the browser. Generates agenda items from local database state.
 
+import { getMemorySnapshot, ofType, newestFirst, since, projectActivity } from './memory-snapshot.js';
+
 let _itemCounter = 0;
 
 const PRIORITY_ORDER = { critical: 0, high: 1, normal: 2, low: 3 };
@@ -73,11 +75,10 @@ export function getNextItem(agenda) {
 
 export async function generateMorningAgenda(db) {
   const agenda = [];
+  const snapshot = await getMemorySnapshot(db);
 
   // Critical: Overdue blockers
-  const blockers = await db.prepare(
-    "SELECT id, content, project FROM memories WHERE type = 'blocker' AND superseded_by IS NULL ORDER BY created_at ASC"
-  ).all();
+  const blockers = ofType(snapshot, 'blocker');
   for (const b of blockers) {
     agenda.push(createAgendaItem(
       'FOLLOW-UP', 'critical', b.content,
@@ -87,9 +88,7 @@ export async function generateMorningAgenda(db) {
   }
 
   // High: Overdue commitments
-  const commitments = await db.prepare(
-    "SELECT id, content, project, person FROM memories WHERE type = 'commitment' AND superseded_by IS NULL ORDER BY created_at ASC"
-  ).all();
+  const commitments = ofType(snapshot, 'commitment');
   for (const c of commitments) {
     agenda.push(createAgendaItem(
       'FOLLOW-UP', 'high', c.content,
@@ -99,9 +98,7 @@ export async function generateMorningAgenda(db) {
   }
 
   // High: Waiting-for items
-  const waiting = await db.prepare(
-    "SELECT id, content, project, person FROM memories WHERE type = 'waiting_for' AND superseded_by IS NULL ORDER BY created_at ASC"
-  ).all();
+  const waiting = ofType(snapshot, 'waiting_for');
   for (const w of waiting) {
     agenda.push(createAgendaItem(
       'FOLLOW-UP', 'high', w.content,
@@ -111,12 +108,10 @@ export async function generateMorningAgenda(db) {
   }
 
   // Normal: Active project statuses
-  const statuses = await db.prepare(
-    "SELECT DISTINCT project FROM memories WHERE type = 'status' AND superseded_by IS NULL AND project != '' ORDER BY project"
-  ).all();
+  const statuses = [...new Set(ofType(snapshot, 'status').filter(s => s.project).map(s => s.project))].sort();
   if (statuses.length) {
     // Group as a single INFORM item unless there are specific issues
-    const projects = statuses.map(s => s.project).join(', ');
+    const projects = statuses.join(', ');
     agenda.push(createAgendaItem(
       'INFORM', 'normal',
       `Active projects: ${projects}`,
@@ -125,9 +120,9 @@ export async function generateMorningAgenda(db) {
   }
 
   // Normal: Recent discoveries
-  const discoveries = await db.prepare(
-    "SELECT id, content, project FROM memories WHERE type = 'discovery' AND superseded_by IS NULL AND created_at >= ? ORDER BY created_at DESC LIMIT 3"
-  ).all(new Date(Date.now() - 2 * 86400000).toISOString());
+  const discoveries = newestFirst(
+    since(ofType(snapshot, 'discovery'), new Date(Date.now() - 2 * 86400000).toISOString())
+  ).slice(0, 3);
   for (const d of discoveries) {
     agenda.push(createAgendaItem(
       'RESEARCH', 'normal', d.content,
@@ -137,9 +132,11 @@ export async function generateMorningAgenda(db) {
   }
 
   // Low: Stale projects (no recent activity)
-  const staleProjects = await db.prepare(
-    "SELECT project, MAX(created_at) as last_activity FROM memories WHERE superseded_by IS NULL AND project != '' GROUP BY project HAVING last_activity < ? ORDER BY last_activity ASC LIMIT 3"
-  ).all(new Date(Date.now() - 5 * 86400000).toISOString());
+  const staleCutoff = new Date(Date.now() - 5 * 86400000).toISOString();
+  const staleProjects = projectActivity(snapshot)
+    .filter(p => p.last_activity < staleCutoff)
+    .reverse()
+    .slice(0, 3);
   for (const sp of staleProjects) {
     // Don't add if already covered by blockers/commitments/waiting
     if (agenda.some(a => a.content.includes(sp.project))) continue;
@@ -160,21 +157,18 @@ export async function generateCheckInAgenda(db, userMessage) {
   const agenda = [];
 
   // Check if user mentions a project
-  const projects = await db.prepare(
-    "SELECT DISTINCT project FROM memories WHERE superseded_by IS NULL AND project != ''"
-  ).all();
-  const mentioned = projects.find(p => userMessage.toLowerCase().includes(p.project.toLowerCase()));
+  const snapshot = await getMemorySnapshot(db);
+  const message = userMessage.toLowerCase();
+  const mentioned = [...snapshot.byProject.keys()].find(p => message.includes(p.toLowerCase()));
 
   if (mentioned) {
     // Add a context item for the mentioned project
-    const status = await db.prepare(
-      "SELECT content FROM memories WHERE type = 'status' AND superseded_by IS NULL AND project = ? ORDER BY created_at DESC LIMIT 1"
-    ).get(mentioned.project);
+    const status = newestFirst(snapshot.byProject.get(mentioned)).find(r => r.type === 'status');
 
     if (status) {
       agenda.push(createAgendaItem(
         'INFORM', 'normal',
-        `Latest on ${mentioned.project}: ${status.content}`,
+        `Latest on ${mentioned}: ${status.content}`,
         null
       ));
     }
@@ -278,14 +272,12 @@ export async function generateWeeklyAgenda(db) {
 
   // Phase 2-6 items generated during the meeting dynamically
   // Pre-generate project review items
-  const projects = await db.prepare(
-    "SELECT DISTINCT project FROM memories WHERE superseded_by IS NULL AND project != '' ORDER BY project"
-  ).all();
-  for (const p of projects) {
+  const projects = [...(await getMemorySnapshot(db)).byProject.keys()].sort();
+  for (const project of projects) {
     agenda.push(createAgendaItem(
       'DECIDE', 'normal',
-      `Review: ${p.project}`,
-      `${p.project} — still active? What's the next action?`
+      `Review: ${project}`,
+      `${project} — still active? What's the next action?`
     ));
   }
 
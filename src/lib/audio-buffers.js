@@ -0,0 +1,140 @@
+// Allocation-light audio byte helpers for the browser speech path
+// - Base64: native Uint8Array toBase64 / fromBase64 / setFromBase64 where the
+//   engine has them. Otherwise encode is a table codec that never builds
+//   strings one character at a time (24 KiB slices through one scratch) and
+//   decode writes atob output into a caller-supplied buffer.
+// - PCM16 ↔ Float32 conversion into caller-supplied (reusable) arrays.
+// - PcmRingBuffer: fixed-capacity Float32 FIFO. Self-contained (no outside
+//   references) because audio-worklet.js ships its source into the worklet.
+
+const ALPHABET = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/';
+const ENC = new Uint8Array(64);
+for (let i = 0; i < 64; i++) ENC[i] = ALPHABET.charCodeAt(i);
+const PAD = 61; // '='
+
+const ENCODE_SLICE = 24576;                     // bytes per slice (multiple of 3)
+const encodeScratch = new Uint8Array(ENCODE_SLICE / 3 * 4);
+
+export function encodeBase64(bytes) {
+  if (typeof bytes.toBase64 === 'function') return bytes.toBase64();
+  let out = '';
+  for (let off = 0; off < bytes.length; off += ENCODE_SLICE) {
+    const end = Math.min(off + ENCODE_SLICE, bytes.length);
+    let j = 0;
+    let i = off;
+    for (; i + 2 < end; i += 3) {
+      const n = (bytes[i] << 16) | (bytes[i + 1] << 8) | bytes[i + 2];
+      encodeScratch[j++] = ENC[n >> 18];
+      encodeScratch[j++] = ENC[(n >> 12) & 63];
+      encodeScratch[j++] = ENC[(n >> 6) & 63];
+      encodeScratch[j++] = ENC[n & 63];
+    }
+    if (i < end) {
+      const n = (bytes[i] << 16) | (i + 1 < end ? bytes[i + 1] << 8 : 0);
+      encodeScratch[j++] = ENC[n >> 18];
+      encodeScratch[j++] = ENC[(n >> 12) & 63];
+      encodeScratch[j++] = i + 1 < end ? ENC[(n >> 6) & 63] : PAD;
+      encodeScratch[j++] = PAD;
+    }
+    out += String.fromCharCode.apply(null, encodeScratch.subarray(0, j));
+  }
+  return out;
+}
+
+export function decodedBase64Length(b64) {
+  let len = b64.length;
+  while (len > 0 && b64.charCodeAt(len - 1) === PAD) len--;
+  return (len * 3) >> 2;
+}
+
+// Decode into `out` when given (must hold decodedBase64Length bytes; the
+// returned view covers exactly the decoded bytes), else a new Uint8Array.
+// atob is native everywhere we run and beats any JS table decoder, so the
+// fallback only removes the per-chunk allocation, not the string step.
+export function decodeBase64(b64, out = null) {
+  if (!out && typeof Uint8Array.fromBase64 === 'function') return Uint8Array.fromBase64(b64);
+  const size = decodedBase64Length(b64);
+  let dst;
+  if (!out) dst = new Uint8Array(size);
+  else if (out.length < size) throw new RangeError(`decodeBase64: need ${size} bytes, buffer has ${out.length}`);
+  else dst = out.length === size ? out : out.subarray(0, size);
+  if (typeof dst.setFromBase64 === 'function') {
+    dst.setFromBase64(b64);
+    return dst;
+  }
+  const binary = atob(b64);
+  for (let i = 0; i < size; i++) dst[i] = binary.charCodeAt(i);
+  return dst;
+}
+
+// --- PCM conversion (16-bit signed LE ↔ Float32) ---
+
+export function pcm16ToFloat32(pcmData, out = null) {
+  const samples = pcmData.length >> 1;
+  const dst = out ? (out.length === samples ? out : out.subarray(0, samples)) : new Float32Array(samples);
+  for (let i = 0, b = 0; i < samples; i++, b += 2) {
+    dst[i] = (((pcmData[b + 1] << 24) | (pcmData[b] << 16)) >> 16) / 32768;
+  }
+  return dst;
+}
+
+export function float32ToPcm16(float32, out = null) {
+  const dst = out ? (out.length === float32.length ? out : out.subarray(0, float32.length)) : new Int16Array(float32.length);
+  for (let i = 0; i < float32.length; i++) {
+    dst[i] = Math.max(-32768, Math.min(32767, Math.floor(float32[i] * 32768)));
+  }
+  return dst;
+}
+
+// --- Float32 ring buffer ---
+
+export class PcmRingBuffer {
+  constructor(capacity) {
+    this.data = new Float32Array(capacity);
+    this.capacity = capacity;
+    this.readIndex = 0;
+    this.writeIndex = 0;
+    this.available = 0;
+    this.dropped = 0;   // samples overwritten because the ring was full
+  }
+
+  _push(sample) {
+    this.data[this.writeIndex] = sample;
+    if (++this.writeIndex === this.capacity) this.writeIndex = 0;
+    if (this.available === this.capacity) {
+      this.readIndex = this.writeIndex;
+      this.dropped++;
+    } else {
+      this.available++;
+    }
+  }
+
+  // Append Float32 samples; the oldest are overwritten when full
+  write(samples) {
+    for (let i = 0; i < samples.length; i++) this._push(samples[i]);
+  }
+
+  // Append 16-bit signed LE PCM bytes without an intermediate Float32Array
+  writePcm16(bytes) {
+    for (let b = 0; b + 1 < bytes.length; b += 2) {
+      this._push((((bytes[b + 1] << 24) | (bytes[b] << 16)) >> 16) / 32768);
+    }
+  }
+
+  // Fill out[offset..] with up to `count` samples; returns how many were read
+  read(out, offset = 0, count = out.length - offset) {
+    const n = Math.min(count, this.available);
+    for (let i = 0; i < n; i++) {
+      out[offset + i] = this.data[this.readIndex];
+      if (++this.readIndex === this.capacity) this.readIndex = 0;
+    }
+    this.available -= n;
+    return n;
+  }
+
+  clear() {
+    this.readIndex = 0;
+    this.writeIndex = 0;
+    this.available = 0;
+  }
+}
@@ -0,0 +1,213 @@
+// AudioWorklet capture/playback pipeline for the browser voice session
+// One worklet module (built from source and loaded through a Blob URL, so no
+// separate asset has to survive bundling) registers two processors:
+//  - 'pcm-capture' converts each 128-sample render quantum straight into a
+//    PCM16 frame and transfers full frames (with their RMS level) to the main
+//    thread, which hands the ArrayBuffers back for reuse.
+//  - 'pcm-playback' feeds PCM16 bytes into a PcmRingBuffer and renders from
+//    it, posting { type: 'drained' } when it runs dry after playing.
+// Contexts without audioWorklet (tests, older browsers) fall back to a
+// ScriptProcessor / AudioBufferSource path that reuses its scratch arrays.
+import { PcmRingBuffer, float32ToPcm16, pcm16ToFloat32 } from './audio-buffers.js';
+
+// Runs inside AudioWorkletGlobalScope (AudioWorkletProcessor, registerProcessor
+// and sampleRate are globals there); receives the ring buffer class by value.
+function registerPcmProcessors(RingBuffer) {
+  class PcmCaptureProcessor extends AudioWorkletProcessor {
+    constructor(options) {
+      super();
+      this.frameSamples = options?.processorOptions?.frameSamples || 1600;
+      this.spare = [];
+      this.frame = this.take();
+      this.filled = 0;
+      this.sumSquares = 0;
+      this.port.onmessage = (e) => {
+        if (e.data instanceof ArrayBuffer && e.data.byteLength === this.frameSamples * 2) this.spare.push(e.data);
+      };
+    }
+
+    take() {
+      return new Int16Array(this.spare.pop() || new ArrayBuffer(this.frameSamples * 2));
+    }
+
+    process(inputs) {
+      const input = inputs[0]?.[0];
+      if (!input) return true;
+      for (let i = 0; i < input.length; i++) {
+        const s = input[i];
+        this.sumSquares += s * s;
+        this.frame[this.filled++] = Math.max(-32768, Math.min(32767, Math.floor(s * 32768)));
+        if (this.filled === this.frameSamples) {
+          const level = Math.min(1, Math.sqrt(this.sumSquares / this.frameSamples) * 10);
+          const buffer = this.frame.buffer;
+          this.port.postMessage({ buffer, level }, [buffer]);
+          this.frame = this.take();
+          this.filled = 0;
+          this.sumSquares = 0;
+        }
+      }
+      return true;
+    }
+  }
+
+  class PcmPlaybackProcessor extends AudioWorkletProcessor {
+    constructor(options) {
+      super();
+      this.ring = new RingBuffer(options?.processorOptions?.capacity || sampleRate * 120);
+      this.playing = false;
+      this.port.onmessage = (e) => {
+        const d = e.data;
+        if (d?.type === 'clear') {
+          this.ring.clear();
+          this.playing = false;
+          return;
+        }
+        this.ring.writePcm16(d instanceof ArrayBuffer ? new Uint8Array(d) : d);
+      };
+    }
+
+    process(_inputs, outputs) {
+      const out = outputs[0][0];
+      const n = this.ring.read(out);
+      if (n > 0) this.playing = true;
+      if (n < out.length) {
+        out.fill(0, n);
+        if (this.playing) {
+          this.playing = false;
+          this.port.postMessage({ type: 'drained' });
+        }
+      }
+      return true;
+    }
+  }
+
+  registerProcessor('pcm-capture', PcmCaptureProcessor);
+  registerProcessor('pcm-playback', PcmPlaybackProcessor);
+}
+
+export const PCM_WORKLET_SOURCE = `(${registerPcmProcessors.toString()})(${PcmRingBuffer.toString()});\n`;
+
+let _moduleUrl = null;
+const _loaded = new WeakMap(); // AudioContext → Promise
+
+function loadWorklet(ctx) {
+  if (!_loaded.has(ctx)) {
+    if (!_moduleUrl) _moduleUrl = URL.createObjectURL(new Blob([PCM_WORKLET_SOURCE], { type: 'text/javascript' }));
+    _loaded.set(ctx, ctx.audioWorklet.addModule(_moduleUrl));
+  }
+  return _loaded.get(ctx);
+}
+
+function canUseWorklet(ctx, WorkletNode) {
+  return !!(ctx.audioWorklet && WorkletNode && typeof Blob !== 'undefined' && typeof URL?.createObjectURL === 'function');
+}
+
+// Mic capture: onFrame(pcmBytes) gets 16-bit LE frames that are only valid
+// during the call (buffers are recycled); copy to keep them.
+// onLevel(rms 0..1) fires once per frame.
+export async function createCapturePipeline(ctx, sourceNode, { onFrame, onLevel, frameSamples = 1600, AudioWorkletNode: WorkletNode = globalThis.AudioWorkletNode } = {}) {
+  if (canUseWorklet(ctx, WorkletNode)) {
+    await loadWorklet(ctx);
+    const node = new WorkletNode(ctx, 'pcm-capture', { processorOptions: { frameSamples } });
+    node.port.onmessage = ({ data }) => {
+      if (onLevel) onLevel(data.level);
+      if (onFrame) onFrame(new Uint8Array(data.buffer));
+      node.port.postMessage(data.buffer, [data.buffer]);
+    };
+    sourceNode.connect(node);
+    node.connect(ctx.destination); // keeps the graph pulling; outputs silence
+    return {
+      worklet: true,
+      disconnect() { node.port.onmessage = null; node.disconnect(); },
+    };
+  }
+  const processor = ctx.createScriptProcessor(4096, 1, 1);
+  const pcm = new Int16Array(4096);
+  const bytes = new Uint8Array(pcm.buffer);
+  processor.onaudioprocess = (e) => {
+    const float32 = e.inputBuffer.getChannelData(0);
+    if (onLevel) {
+      let sum = 0;
+      for (let i = 0; i < float32.length; i++) sum += float32[i] * float32[i];
+      onLevel(Math.min(1, Math.sqrt(sum / float32.length) * 10));
+    }
+    if (!onFrame) return;
+    float32ToPcm16(float32, float32.length === pcm.length ? pcm : pcm.subarray(0, float32.length));
+    onFrame(float32.length === pcm.length ? bytes : bytes.subarray(0, float32.length * 2));
+  };
+  sourceNode.connect(processor);
+  processor.connect(ctx.destination);
+  return {
+    worklet: false,
+    disconnect() { processor.onaudioprocess = null; processor.disconnect(); },
+  };
+}
+
+// Gapless PCM16 playback. push(bytes) queues audio (bytes are copied);
+// remainingSeconds estimates what is still queued; clear() drops it.
+export async function createPlaybackPipeline(ctx, { sampleRate = ctx.sampleRate, onDrained, AudioWorkletNode: WorkletNode = globalThis.AudioWorkletNode } = {}) {
+  let playhead = ctx.currentTime;
+  const queue = (samples) => {
+    const startAt = Math.max(ctx.currentTime, playhead);
+    playhead = startAt + samples / sampleRate;
+    return startAt;
+  };
+  const remaining = () => Math.max(0, playhead - ctx.currentTime);
+
+  if (canUseWorklet(ctx, WorkletNode)) {
+    await loadWorklet(ctx);
+    const node = new WorkletNode(ctx, 'pcm-playback', {
+      numberOfInputs: 0,
+      outputChannelCount: [1],
+      processorOptions: { capacity: sampleRate * 120 },
+    });
+    node.port.onmessage = ({ data }) => {
+      if (data?.type === 'drained' && onDrained) onDrained();
+    };
+    node.connect(ctx.destination);
+    return {
+      worklet: true,
+      get remainingSeconds() { return remaining(); },
+      push(pcm) {
+        queue(pcm.length >> 1);
+        // Own copy, transferred: cloning a view would copy its whole buffer
+        const bytes = pcm.slice();
+        node.port.postMessage(bytes, [bytes.buffer]);
+      },
+      clear() {
+        playhead = ctx.currentTime;
+        node.port.postMessage({ type: 'clear' });
+      },
+      close() { node.port.onmessage = null; node.disconnect(); },
+    };
+  }
+
+  let scratch = new Float32Array(4096);
+  let sources = [];
+  return {
+    worklet: false,
+    get remainingSeconds() { return remaining(); },
+    push(pcm) {
+      const samples = pcm.length >> 1;
+      if (scratch.length < samples) scratch = new Float32Array(samples);
+      const float32 = pcm16ToFloat32(pcm, scratch.subarray(0, samples));
+      const buffer = ctx.createBuffer(1, samples, sampleRate);
+      buffer.copyToChannel(float32, 0);
+      const source = ctx.createBufferSource();
+      source.buffer = buffer;
+      source.connect(ctx.destination);
+      source.start(queue(samples));
+      sources.push(source);
+      source.onended = () => {
+        sources = sources.filter(s => s !== source);
+        if (!sources.length && onDrained) onDrained();
+      };
+    },
+    clear() {
+      for (const s of sources) { s.onended = null; try { s.stop(); } catch {} }
+      sources = [];
+      playhead = ctx.currentTime;
+    },
+    close() { this.clear(); },
+  };
+}
@@ -2,6 +2,7 @@
 // Runs in the browser. Server is only a streaming proxy.
 
 import { buildContext } from './memory-engine.js';
+import { getDataVersions } from './db.js';
 // Legacy imports used only when providerOpts.callAI is not provided (backward compat for tests)
 let _callWithFallback, _callProvider;
 async function loadLegacyProvider() {
@@ -12,12 +13,13 @@ async function loadLegacyProvider() {
   }
 }
 // Recall module lazy import
-let _recallForTurn, _formatRecalledContext;
+let _recallForTurn, _formatRecalledContext, _buildRecallQuery;
 async function loadRecall() {
   if (!_recallForTurn) {
     const mod = await import('./recall.js');
     _recallForTurn = mod.recallForTurn;
     _formatRecalledContext = mod.formatRecalledContext;
+    _buildRecallQuery = mod.buildRecallQuery;
   }
 }
 
@@ -105,12 +107,44 @@ export function transitionState(session, event) {
   }
 }
 
-// --- Prompt Assembly (4 blocks, stable → volatile for cache optimization) ---
+// --- Prompt Block Cache ---
+// Blocks 1, 3 and 3b only change when their inputs do, so they are cached per
+// db and keyed on data_versions counters (bumped by triggers on memories,
+// personality and conversations). Memory context also expires after
+// CONTEXT_MAX_AGE_MS because getPriority2/3 use rolling date cutoffs.
+
+const CONTEXT_MAX_AGE_MS = 15 * 60 * 1000;
+const _promptCache = new WeakMap();
+const _promptStats = {};
+
+async function cachedBlock(db, name, key, build) {
+  const stats = (_promptStats[name] ??= { hits: 0, rebuilds: 0 });
+  let cache = _promptCache.get(db);
+  if (!cache) {
+    cache = {};
+    _promptCache.set(db, cache);
+  }
+  if (key !== null && cache[name]?.key === key) {
+    stats.hits++;
+    return cache[name].value;
+  }
+  const value = await build();
+  stats.rebuilds++;
+  if (key !== null) cache[name] = { key, value };
+  return value;
+}
 
-export async function assembleSystemPrompt(session, db) {
-  const blocks = [];
+// Per-block { hits, rebuilds } since load (or the last reset)
+export function getPromptCacheStats() {
+  return Object.fromEntries(Object.entries(_promptStats).map(([k, v]) => [k, { ...v }]));
+}
 
-  // Block 1 — SOUL + calibration (most stable, changes rarely)
+export function resetPromptCache(db) {
+  if (db) _promptCache.delete(db);
+  for (const k of Object.keys(_promptStats)) delete _promptStats[k];
+}
+
+async function buildSoulText(db) {
   let soulText = '';
   const personality = await db.prepare('SELECT soul, disposition FROM personality WHERE id = 1').get();
   if (personality) {
@@ -122,6 +156,26 @@ export async function assembleSystemPrompt(session, db) {
       } catch {}
     }
   }
+  return soulText;
+}
+
+function cachedSoul(db, versions) {
+  return cachedBlock(db, 'soul', versions ? versions.personality : null, () => buildSoulText(db));
+}
+
+async function cachedContext(db, versions) {
+  const key = versions ? `${versions.memories}:${Math.floor(Date.now() / CONTEXT_MAX_AGE_MS)}` : null;
+  return cachedBlock(db, 'context', key, async () => (await buildContext(db, { maxTokens: 8000 })).text);
+}
+
+// --- Prompt Assembly (4 blocks, stable → volatile for cache optimization) ---
+
+export async function assembleSystemPrompt(session, db) {
+  const blocks = [];
+  const versions = await getDataVersions(db);
+
+  // Block 1 — SOUL + calibration (most stable, changes rarely)
+  const soulText = await cachedSoul(db, versions);
   if (soulText) {
     blocks.push({ type: 'text', text: soulText, cache_control: { type: 'ephemeral' } });
   }
@@ -130,16 +184,18 @@ export async function assembleSystemPrompt(session, db) {
   blocks.push({ type: 'text', text: getMeetingRules(session.type), cache_control: { type: 'ephemeral' } });
 
   // Block 3 — Memory context (changes when memories added, but stable within a turn)
-  const context = await buildContext(db, { maxTokens: 8000 });
-  if (context.text) {
-    blocks.push({ type: 'text', text: '\n## Current Context\n' + context.text, cache_control: { type: 'ephemeral' } });
+  const contextText = await cachedContext(db, versions);
+  if (contextText) {
+    blocks.push({ type: 'text', text: '\n## Current Context\n' + contextText, cache_control: { type: 'ephemeral' } });
   }
 
-  // Block 3b — Recalled context (subconscious memory search)
+  // Block 3b — Recalled context (subconscious memory search; rebuilt when the query text changes)
   try {
     await loadRecall();
-    const recalled = await _recallForTurn(db, session);
-    const recalledText = _formatRecalledContext(recalled);
+    const key = versions ? `${versions.memories}:${versions.conversations}:${_buildRecallQuery(session)}` : null;
+    const recalledText = await cachedBlock(db, 'recall', key, async () =>
+      _formatRecalledContext(await _recallForTurn(db, session))
+    );
     if (recalledText) {
       blocks.push({ type: 'text', text: '\n## Recalled Context\n' + recalledText });
     }
@@ -345,18 +401,9 @@ export function stripExtractionFormat(rules) {
 
 export async function assembleS2sSystemPrompt(session, db) {
   const blocks = [];
+  const versions = await getDataVersions(db);
   // Block 1 — SOUL + calibration (same as assembleSystemPrompt)
-  let soulText = '';
-  const personality = await db.prepare('SELECT soul, disposition FROM personality WHERE id = 1').get();
-  if (personality) {
-    soulText = personality.soul;
-    if (personality.disposition) {
-      try {
-        const disp = JSON.parse(personality.disposition);
-        soulText += '\n\n## Personality Calibration\n' + Object.entries(disp).map(([k, v]) => `- ${k}: ${v}`).join('\n');
-      } catch {}
-    }
-  }
+  const soulText = await cachedSoul(db, versions);
   if (soulText) {
     blocks.push({ type: 'text', text: soulText, cache_control: { type: 'ephemeral' } });
   }
@@ -371,9 +418,9 @@ This is a VOICE conversation — you are speaking aloud, not writing.
 - Never narrate what you're about to do — just do it
 - Think: quick coffee chat, not a presentation` });
   // Block 3 — Memory context
-  const context = await buildContext(db, { maxTokens: 8000 });
-  if (context.text) {
-    blocks.push({ type: 'text', text: '\n## Current Context\n' + context.text, cache_control: { type: 'ephemeral' } });
+  const contextText = await cachedContext(db, versions);
+  if (contextText) {
+    blocks.push({ type: 'text', text: '\n## Current Context\n' + contextText, cache_control: { type: 'ephemeral' } });
   }
   // Block 4 — Turn context
   const turnContext = buildTurnContext(session);
@@ -1,6 +1,10 @@
 // Browser database layer — Turso WASM (OPFS) in browser, injected adapter in tests
 // All methods are async to match Turso WASM API
 
+import { dropVectorIndex } from './vector-index.js';
+import { EMBEDDING_CACHE_SCHEMA } from './embedding-cache.js';
+import { createTtftHistogram, recordTtft, mergeHistogram, ttftPercentile } from './latency.js';
+
 const DEFAULT_SOUL = `# Think→Done — Your Strategic Partner
 
 ## Identity
@@ -81,6 +85,21 @@ export async function ensureSchema(db) {
     )
   `);
 
+  await db.exec(`
+    CREATE INDEX IF NOT EXISTS tasks_plan_position_idx ON tasks (plan_date, position)
+  `);
+  // Weekly review: open tasks before a date, wins since a date;
+  // heartbeat: does a project have any open task
+  await db.exec(`
+    CREATE INDEX IF NOT EXISTS tasks_open_idx ON tasks (checked, plan_date)
+  `);
+  await db.exec(`
+    CREATE INDEX IF NOT EXISTS tasks_completed_idx ON tasks (checked, completed_at)
+  `);
+  await db.exec(`
+    CREATE INDEX IF NOT EXISTS tasks_project_idx ON tasks (project, checked)
+  `);
+
   await db.exec(`
     CREATE TABLE IF NOT EXISTS memories (
       id              INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -98,16 +117,30 @@ export async function ensureSchema(db) {
     )
   `);
 
+  // (type, superseded_by) lookups nearly always ORDER BY created_at; the
+  // trailing column lets the index deliver that order. Replaces the older
+  // two-column memories_type_idx, which is a prefix of it.
+  await db.exec(`
+    CREATE INDEX IF NOT EXISTS memories_type_created_idx ON memories (type, superseded_by, created_at)
+  `);
+  await db.exec('DROP INDEX IF EXISTS memories_type_idx');
+  // Active-memory snapshot (memory-snapshot.js): all live rows, oldest first
   await db.exec(`
-    CREATE INDEX IF NOT EXISTS memories_type_idx ON memories (type, superseded_by)
+    CREATE INDEX IF NOT EXISTS memories_active_idx ON memories (superseded_by, created_at)
   `);
+  // Per-project lookups filter on created_at too (heartbeat recent-status,
+  // project activity); replaces the two-column memories_project_idx
+  await db.exec('DROP INDEX IF EXISTS memories_project_idx');
   await db.exec(`
-    CREATE INDEX IF NOT EXISTS memories_project_idx ON memories (project, superseded_by)
+    CREATE INDEX IF NOT EXISTS memories_project_created_idx ON memories (project, superseded_by, created_at)
   `);
   await db.exec(`
     CREATE INDEX IF NOT EXISTS memories_person_idx ON memories (person, superseded_by)
   `);
 
+  // Content-hash → vector cache, shared with memory.db (see embedding-cache.js)
+  for (const sql of EMBEDDING_CACHE_SCHEMA) await db.exec(sql);
+
   await db.exec(`
     CREATE TABLE IF NOT EXISTS routines (
       id                INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -165,6 +198,23 @@ export async function ensureSchema(db) {
     CREATE INDEX IF NOT EXISTS completions_date_idx ON completions (completed_date)
   `);
 
+  // Materialized per-routine habit stats (see routines.js, rebuildable)
+  await db.exec(`
+    CREATE TABLE IF NOT EXISTS routine_stats (
+      routine_id      INTEGER PRIMARY KEY,
+      as_of           TEXT NOT NULL,
+      window_days     INTEGER NOT NULL,
+      applicable_days INTEGER NOT NULL,
+      completions     INTEGER NOT NULL,
+      quality_sum     REAL NOT NULL DEFAULT 0,
+      quality_count   INTEGER NOT NULL DEFAULT 0,
+      two_min_count   INTEGER NOT NULL DEFAULT 0,
+      day_counts      TEXT NOT NULL DEFAULT '{}',
+      streak          INTEGER NOT NULL DEFAULT 0,
+      updated_at      TEXT NOT NULL
+    )
+  `);
+
   await db.exec(`
     CREATE TABLE IF NOT EXISTS conversations (
       id              INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -178,6 +228,17 @@ export async function ensureSchema(db) {
     )
   `);
 
+  // Append-only transcript: one row per message, written incrementally
+  await db.exec(`
+    CREATE TABLE IF NOT EXISTS conversation_messages (
+      conversation_id INTEGER NOT NULL,
+      seq             INTEGER NOT NULL,
+      role            TEXT NOT NULL,
+      content         TEXT NOT NULL,
+      PRIMARY KEY (conversation_id, seq)
+    )
+  `);
+
   await db.exec(`
     CREATE TABLE IF NOT EXISTS personality (
       id          INTEGER PRIMARY KEY,
@@ -233,23 +294,164 @@ export async function ensureSchema(db) {
   try { await db.exec("ALTER TABLE conversations ADD COLUMN agenda TEXT DEFAULT '[]'"); } catch {}
   try { await db.exec("ALTER TABLE conversations ADD COLUMN state TEXT DEFAULT 'INITIALIZING'"); } catch {}
   //
+  // Range scans on created_at (usage dashboard) and the open-session lookup
+  await db.exec(`
+    CREATE INDEX IF NOT EXISTS api_usage_created_idx ON api_usage (created_at)
+  `);
+  await db.exec(`
+    CREATE INDEX IF NOT EXISTS conversations_open_idx ON conversations (ended_at)
+  `);
+  //
+  // Provider latency telemetry: raw rows per attempt, folded into daily rollups
+  await db.exec(`
+    CREATE TABLE IF NOT EXISTS provider_latency (
+      id            INTEGER PRIMARY KEY AUTOINCREMENT,
+      provider      TEXT NOT NULL,
+      model         TEXT NOT NULL,
+      session_type  TEXT NOT NULL DEFAULT 'chat',
+      ttft_ms       INTEGER DEFAULT NULL,
+      duration_ms   INTEGER DEFAULT NULL,
+      output_tokens INTEGER DEFAULT NULL,
+      hops          INTEGER NOT NULL DEFAULT 0,
+      hedged        INTEGER NOT NULL DEFAULT 0,
+      error_class   TEXT DEFAULT NULL,
+      created_at    TEXT NOT NULL
+    )
+  `);
+  await db.exec(`
+    CREATE INDEX IF NOT EXISTS provider_latency_created_idx ON provider_latency (created_at)
+  `);
+  await db.exec(`
+    CREATE TABLE IF NOT EXISTS provider_latency_daily (
+      day            TEXT NOT NULL,
+      provider       TEXT NOT NULL,
+      model          TEXT NOT NULL,
+      calls          INTEGER NOT NULL DEFAULT 0,
+      errors         INTEGER NOT NULL DEFAULT 0,
+      hops           INTEGER NOT NULL DEFAULT 0,
+      duration_ms    INTEGER NOT NULL DEFAULT 0,
+      stream_ms      INTEGER NOT NULL DEFAULT 0,
+      stream_tokens  INTEGER NOT NULL DEFAULT 0,
+      ttft_counts    TEXT NOT NULL DEFAULT '[]',
+      error_counts   TEXT NOT NULL DEFAULT '{}',
+      PRIMARY KEY (day, provider, model)
+    )
+  `);
+  //
+  // Full-text indexes for recall (no-op where the engine lacks FTS5)
+  await ensureFullTextIndex(db, 'memories', 'content');
+  await ensureFullTextIndex(db, 'conversations', 'summary');
+  //
+  // Change counters for prompt caching (bumped by triggers, so raw UPDATEs count too)
+  await ensureDataVersions(db);
+  //
   // Seed default settings (INSERT OR IGNORE preserves user changes)
   await db.exec(`INSERT OR IGNORE INTO settings (key, value) VALUES ('ai_providers_enabled', '["thinkdone"]')`);
   await db.exec(`INSERT OR IGNORE INTO settings (key, value) VALUES ('voice_provider', 'web-speech')`);
   await db.exec(`INSERT OR IGNORE INTO settings (key, value) VALUES ('display_name', 'User')`);
 }
 
+// External-content FTS5 table <table>_fts over one column, kept in sync by
+// triggers. Table, triggers and the initial build from existing rows are
+// created together in one transaction; if any part is missing (an
+// interrupted earlier run) all of it is rebuilt, and if any part fails
+// (e.g. FTS5 not compiled in) none of it is left behind and recall falls
+// back to LIKE scans.
+async function ensureFullTextIndex(db, table, column) {
+  const fts = `${table}_fts`;
+  const parts = [fts, `${fts}_ai`, `${fts}_ad`, `${fts}_au`];
+  const found = await db.prepare(
+    `SELECT COUNT(*) AS n FROM sqlite_master WHERE name IN (${parts.map(() => '?').join(', ')})`
+  ).get(...parts);
+  if (found.n === parts.length) return;
+  try {
+    await withTransaction(db, async (tx) => {
+      for (const trigger of parts.slice(1)) await tx.exec(`DROP TRIGGER IF EXISTS ${trigger}`);
+      await tx.exec(`DROP TABLE IF EXISTS ${fts}`);
+      await tx.exec(`
+        CREATE VIRTUAL TABLE ${fts} USING fts5(
+          ${column}, content='${table}', content_rowid='id', tokenize='porter unicode61'
+        )
+      `);
+      await tx.exec(`
+        CREATE TRIGGER ${fts}_ai AFTER INSERT ON ${table} BEGIN
+          INSERT INTO ${fts} (rowid, ${column}) VALUES (new.id, new.${column});
+        END
+      `);
+      await tx.exec(`
+        CREATE TRIGGER ${fts}_ad AFTER DELETE ON ${table} BEGIN
+          INSERT INTO ${fts} (${fts}, rowid, ${column}) VALUES ('delete', old.id, old.${column});
+        END
+      `);
+      await tx.exec(`
+        CREATE TRIGGER ${fts}_au AFTER UPDATE OF ${column} ON ${table} BEGIN
+          INSERT INTO ${fts} (${fts}, rowid, ${column}) VALUES ('delete', old.id, old.${column});
+          INSERT INTO ${fts} (rowid, ${column}) VALUES (new.id, new.${column});
+        END
+      `);
+      await tx.exec(`INSERT INTO ${fts} (${fts}) VALUES ('rebuild')`);
+    });
+  } catch {
+    // Rolled back: no full-text table, recall uses LIKE scans
+  }
+}
+
+// data_versions holds one counter per watched table. Conversations only
+// count summary/end changes — messages are rewritten every turn.
+const VERSIONED = {
+  memories: ['INSERT', 'UPDATE', 'DELETE'],
+  personality: ['INSERT', 'UPDATE', 'DELETE'],
+  conversations: ['INSERT', 'UPDATE OF summary, ended_at', 'DELETE'],
+};
+
+async function ensureDataVersions(db) {
+  await db.exec(`
+    CREATE TABLE IF NOT EXISTS data_versions (
+      name     TEXT PRIMARY KEY,
+      version  INTEGER NOT NULL DEFAULT 0
+    )
+  `);
+  try {
+    for (const [table, events] of Object.entries(VERSIONED)) {
+      await db.prepare('INSERT OR IGNORE INTO data_versions (name, version) VALUES (?, 0)').run(table);
+      for (const event of events) {
+        const tag = event.split(' ')[0].toLowerCase();
+        await db.exec(`
+          CREATE TRIGGER IF NOT EXISTS ${table}_version_${tag} AFTER ${event} ON ${table} BEGIN
+            UPDATE data_versions SET version = version + 1 WHERE name = '${table}';
+          END
+        `);
+      }
+    }
+  } catch {
+    // No trigger support — an empty table makes getDataVersions() return null
+    await db.exec('DELETE FROM data_versions');
+  }
+}
+
+// { memories, personality, conversations } counters, or null when untracked
+export async function getDataVersions(db) {
+  const rows = await db.prepare('SELECT name, version FROM data_versions').all();
+  if (!rows.length) return null;
+  return Object.fromEntries(rows.map(r => [r.name, r.version]));
+}
+
 // --- Reset ---
 
 export async function clearDatabase(db) {
   // Clear session/content data but preserve user configuration
   await db.exec('DELETE FROM tasks');
   await db.exec('DELETE FROM memories');
+  dropVectorIndex(db);
   await db.exec('DELETE FROM routines');
   await db.exec('DELETE FROM completions');
+  await db.exec('DELETE FROM routine_stats');
   await db.exec('DELETE FROM conversations');
+  await db.exec('DELETE FROM conversation_messages');
   await db.exec('DELETE FROM personality');
   await db.exec('DELETE FROM api_usage');
+  await db.exec('DELETE FROM provider_latency');
+  await db.exec('DELETE FROM provider_latency_daily');
   // Keep settings + connections — these are user config (API keys, speech profile, providers)
   await seedPersonality(db);
 }
@@ -262,12 +464,13 @@ export async function getTasks(db, date) {
   ).all(date);
 }
 
-export async function addTask(db, text, opts = {}) {
-  const planDate = opts.planDate || new Date().toISOString().slice(0, 10);
-  const source = opts.source || 'manual';
-  const now = new Date().toISOString();
+// Positions are gapped: a new task goes POSITION_GAP above the current top,
+// and reorders renumber with the same gap, so no insert ever shifts the day.
+export const POSITION_GAP = 1024;
+const TASK_INSERT_CHUNK = 100; // 8 params per row, under SQLite's bound-parameter limit
+const REORDER_CHUNK = 400;
 
-  // Parse minutes and project from text
+function parseTaskText(text) {
   let minutes = null;
   const timeMatch = text.match(/~(\d+(?:\.\d+)?)(m|h)/);
   if (timeMatch) {
@@ -276,55 +479,111 @@ export async function addTask(db, text, opts = {}) {
   let project = '';
   const projMatch = text.match(/\s+[—–]\s+(\S+)$/);
   if (projMatch) project = projMatch[1];
+  return { minutes, project };
+}
 
-  // Shift existing tasks down
-  await db.prepare(
-    'UPDATE tasks SET position = position + 1 WHERE plan_date = ?'
-  ).run(planDate);
+export async function addTask(db, text, opts = {}) {
+  const planDate = opts.planDate || new Date().toISOString().slice(0, 10);
+  const source = opts.source || 'manual';
+  const now = new Date().toISOString();
+  const { minutes, project } = parseTaskText(text);
 
-  const result = await db.prepare(
-    'INSERT INTO tasks (text, project, minutes, position, plan_date, created_at, source) VALUES (?, ?, ?, 0, ?, ?, ?)'
-  ).run(text, project, minutes, planDate, now, source);
+  // Top of the day in one statement: MIN(position) is an index seek
+  const result = await queueWrite(db, (db) => db.prepare(
+    `INSERT INTO tasks (text, project, minutes, position, plan_date, created_at, source)
+     SELECT ?, ?, ?, COALESCE(MIN(position) - ${POSITION_GAP}, 0), ?, ?, ?
+     FROM tasks WHERE plan_date = ?`
+  ).run(text, project, minutes, planDate, now, source, planDate));
 
   return result.lastInsertRowid;
 }
 
-export async function toggleTask(db, id) {
-  const task = await db.prepare('SELECT checked FROM tasks WHERE id = ?').get(id);
-  if (!task) return null;
-
-  if (task.checked) {
-    await db.prepare('UPDATE tasks SET checked = 0, completed_at = NULL WHERE id = ?').run(id);
-    return 'unchecked';
-  } else {
-    await db.prepare('UPDATE tasks SET checked = 1, completed_at = ? WHERE id = ?').run(new Date().toISOString(), id);
-    return 'checked';
+// Bulk insert: tasks are strings or { text, planDate, source }. Same result as
+// calling addTask for each in turn (later tasks end up on top), but one
+// multi-row INSERT per chunk, all chunks in one transaction. Returns the new
+// ids in input order.
+export async function addTasks(db, tasks, opts = {}) {
+  if (tasks.length > TASK_INSERT_CHUNK && !_txViews.has(db)) {
+    return withTransaction(db, (tx) => addTasks(tx, tasks, opts));
+  }
+  const defaultDate = opts.planDate || new Date().toISOString().slice(0, 10);
+  const now = new Date().toISOString();
+  const rows = tasks.map((task) => {
+    const t = typeof task === 'string' ? { text: task } : task;
+    return {
+      text: t.text,
+      planDate: t.planDate || defaultDate,
+      source: t.source || opts.source || 'manual',
+      ...parseTaskText(t.text),
+    };
+  });
+
+  const ids = [];
+  for (let i = 0; i < rows.length; i += TASK_INSERT_CHUNK) {
+    const chunk = rows.slice(i, i + TASK_INSERT_CHUNK);
+    // Offset k within each day, relative to that day's top before this
+    // statement (earlier chunks are already written and count as the top)
+    const depth = new Map();
+    const params = [];
+    const values = chunk.map((row) => {
+      const k = depth.get(row.planDate) || 0;
+      depth.set(row.planDate, k + 1);
+      params.push(row.text, row.project, row.minutes, row.planDate, k, row.planDate, now, row.source);
+      return `(?, ?, ?, COALESCE((SELECT MIN(position) FROM tasks WHERE plan_date = ?), ${POSITION_GAP}) - (? + 1) * ${POSITION_GAP}, ?, ?, ?)`;
+    });
+    const result = await db.prepare(
+      `INSERT INTO tasks (text, project, minutes, position, plan_date, created_at, source) VALUES ${values.join(', ')}`
+    ).run(...params);
+    // One statement on an AUTOINCREMENT table: rowids are consecutive
+    const last = Number(result.lastInsertRowid);
+    for (let j = chunk.length - 1; j >= 0; j--) ids.push(last - j);
   }
+  return ids;
+}
+
+export async function toggleTask(db, id) {
+  return queueWrite(db, async (db) => {
+    const task = await db.prepare('SELECT checked FROM tasks WHERE id = ?').get(id);
+    if (!task) return null;
+
+    if (task.checked) {
+      await db.prepare('UPDATE tasks SET checked = 0, completed_at = NULL WHERE id = ?').run(id);
+      return 'unchecked';
+    } else {
+      await db.prepare('UPDATE tasks SET checked = 1, completed_at = ? WHERE id = ?').run(new Date().toISOString(), id);
+      return 'checked';
+    }
+  });
 }
 
 export async function deleteTask(db, id) {
-  await db.prepare('DELETE FROM tasks WHERE id = ?').run(id);
+  await queueWrite(db, (db) => db.prepare('DELETE FROM tasks WHERE id = ?').run(id));
 }
 
 export async function editTask(db, id, newText) {
-  let minutes = null;
-  const timeMatch = newText.match(/~(\d+(?:\.\d+)?)(m|h)/);
-  if (timeMatch) {
-    minutes = timeMatch[2] === 'h' ? Math.round(parseFloat(timeMatch[1]) * 60) : parseInt(timeMatch[1]);
-  }
-  let project = '';
-  const projMatch = newText.match(/\s+[—–]\s+(\S+)$/);
-  if (projMatch) project = projMatch[1];
+  const { minutes, project } = parseTaskText(newText);
 
-  await db.prepare(
+  await queueWrite(db, (db) => db.prepare(
     'UPDATE tasks SET text = ?, project = ?, minutes = ? WHERE id = ?'
-  ).run(newText, project, minutes, id);
+  ).run(newText, project, minutes, id));
 }
 
+// Renumber with gaps in a single UPDATE ... CASE (one per REORDER_CHUNK ids,
+// in one transaction when there is more than one)
 export async function reorderTasks(db, orderedIds) {
-  for (let i = 0; i < orderedIds.length; i++) {
-    await db.prepare('UPDATE tasks SET position = ? WHERE id = ?').run(i, orderedIds[i]);
+  if (orderedIds.length > REORDER_CHUNK && !_txViews.has(db)) {
+    return withTransaction(db, (tx) => reorderTasks(tx, orderedIds));
   }
+  await queueWrite(db, async (db) => {
+    for (let i = 0; i < orderedIds.length; i += REORDER_CHUNK) {
+      const chunk = orderedIds.slice(i, i + REORDER_CHUNK);
+      const cases = chunk.map((_, j) => `WHEN ? THEN ${(i + j) * POSITION_GAP}`).join(' ');
+      const placeholders = chunk.map(() => '?').join(', ');
+      await db.prepare(
+        `UPDATE tasks SET position = CASE id ${cases} END WHERE id IN (${placeholders})`
+      ).run(...chunk, ...chunk);
+    }
+  });
 }
 
 // --- Memory CRUD ---
@@ -378,6 +637,79 @@ export async function supersedeMemory(db, oldId, newContent, opts = {}) {
   return newId;
 }
 
+// --- Batch writes ---
+
+// One write queue per connection. BEGIN on a connection that is already
+// inside a transaction fails, and a plain write issued between another
+// caller's BEGIN and COMMIT joins that transaction (and is rolled back with
+// it). So transactions and the UI's writes (task edits, conversation
+// snapshots) all take turns here. A transaction body gets `tx`, the same
+// connection marked as inside it: queued writes given `tx` run at once.
+const _writeQueues = new WeakMap();
+const _txViews = new WeakSet();
+
+// Run fn(db) after every write queued before it on this connection
+export function queueWrite(db, fn) {
+  if (_txViews.has(db)) return fn(db);
+  const prev = _writeQueues.get(db) || Promise.resolve();
+  const run = prev.then(() => fn(db));
+  _writeQueues.set(db, run.catch(() => {}));
+  return run;
+}
+
+// Run fn(tx) inside BEGIN/COMMIT (ROLLBACK and rethrow on error), queued
+// behind other writes on the same db. fn writes through `tx`; queued writes
+// on the outer db would wait for this transaction to finish.
+export async function withTransaction(db, fn) {
+  if (_txViews.has(db)) throw new Error('withTransaction: already inside a transaction');
+  return queueWrite(db, async () => {
+    const tx = Object.assign(Object.create(db), {
+      prepare: (sql) => db.prepare(sql),
+      exec: (sql) => db.exec(sql),
+    });
+    _txViews.add(tx);
+    await db.exec('BEGIN');
+    try {
+      const result = await fn(tx);
+      await db.exec('COMMIT');
+      return result;
+    } catch (err) {
+      await db.exec('ROLLBACK');
+      throw err;
+    }
+  });
+}
+
+// Write a batch in one transaction and return the created ids:
+//   tasks:      addTasks() input (strings or { text, planDate, source })
+//   memories:   [{ content, ...storeMemory opts }]
+//   statements: [[sql, ...params]] — extra writes, run after the inserts
+// Memory inserts share one prepared statement.
+export async function writeBatch(db, batch = {}) {
+  const { tasks = [], memories = [], statements = [] } = batch;
+  const created = { tasks: [], memories: [] };
+  if (!tasks.length && !memories.length && !statements.length) return created;
+
+  await withTransaction(db, async (tx) => {
+    if (tasks.length) created.tasks = await addTasks(tx, tasks);
+    if (memories.length) {
+      const now = new Date().toISOString();
+      const insert = tx.prepare(
+        'INSERT INTO memories (content, project, person, type, source, priority, created_at, embedding) VALUES (?, ?, ?, ?, ?, ?, ?, ?)'
+      );
+      for (const m of memories) {
+        const { content, project = '', type = 'insight', person = '', source = 'manual', priority = 0, embedding = null } = m;
+        const result = await insert.run(content, project, person, type, source, priority, now, embedding);
+        created.memories.push(Number(result.lastInsertRowid));
+      }
+    }
+    for (const [sql, ...params] of statements) {
+      await tx.prepare(sql).run(...params);
+    }
+  });
+  return created;
+}
+
 // --- Personality ---
 
 // --- API Usage CRUD ---
@@ -390,6 +722,14 @@ export async function storeUsage(db, { conversationId = null, sessionType = 'cha
   return Number(result.lastInsertRowid);
 }
 
+// Inclusive YYYY-MM-DD range → half-open created_at bounds. Comparing the raw
+// ISO timestamp (not DATE(created_at)) lets api_usage_created_idx serve it.
+function usageRange(from, to) {
+  const end = new Date(`${to}T00:00:00Z`);
+  end.setUTCDate(end.getUTCDate() + 1);
+  return [from, end.toISOString().slice(0, 10)];
+}
+
 export async function getUsageSummary(db, { from, to }) {
   const row = await db.prepare(
     `SELECT
@@ -398,8 +738,8 @@ export async function getUsageSummary(db, { from, to }) {
       COALESCE(SUM(cost_usd), 0)      AS total_cost,
       COUNT(*)                         AS session_count
     FROM api_usage
-    WHERE DATE(created_at) >= ? AND DATE(created_at) <= ?`
-  ).get(from, to);
+    WHERE created_at >= ? AND created_at < ?`
+  ).get(...usageRange(from, to));
   return row;
 }
 
@@ -414,10 +754,10 @@ export async function getUsageByDay(db, { from, to }) {
       SUM(cache_read_tokens)          AS cache_read,
       SUM(cache_write_tokens)         AS cache_write
     FROM api_usage
-    WHERE DATE(created_at) >= ? AND DATE(created_at) <= ?
+    WHERE created_at >= ? AND created_at < ?
     GROUP BY DATE(created_at)
     ORDER BY date ASC`
-  ).all(from, to);
+  ).all(...usageRange(from, to));
 }
 
 export async function getUsageBySession(db, { from, to }) {
@@ -429,34 +769,162 @@ export async function getUsageBySession(db, { from, to }) {
       SUM(output_tokens)              AS total_output,
       SUM(cost_usd)                   AS total_cost
     FROM api_usage
-    WHERE DATE(created_at) >= ? AND DATE(created_at) <= ?
+    WHERE created_at >= ? AND created_at < ?
     GROUP BY session_type
     ORDER BY total_cost DESC`
-  ).all(from, to);
+  ).all(...usageRange(from, to));
 }
 
 export async function getUsageByModel(db, { from, to }) {
   return db.prepare(
     `SELECT model, COUNT(*) AS sessions, SUM(input_tokens) AS total_input, SUM(output_tokens) AS total_output, SUM(cost_usd) AS total_cost
-    FROM api_usage WHERE DATE(created_at) >= ? AND DATE(created_at) <= ? GROUP BY model ORDER BY total_cost DESC`
-  ).all(from, to);
+    FROM api_usage WHERE created_at >= ? AND created_at < ? GROUP BY model ORDER BY total_cost DESC`
+  ).all(...usageRange(from, to));
 }
 //
 export async function getUsageByProvider(db, { from, to }) {
   return db.prepare(
     `SELECT provider, COUNT(*) AS sessions, SUM(input_tokens) AS total_input, SUM(output_tokens) AS total_output, SUM(cost_usd) AS total_cost
-    FROM api_usage WHERE DATE(created_at) >= ? AND DATE(created_at) <= ? GROUP BY provider ORDER BY total_cost DESC`
-  ).all(from, to);
+    FROM api_usage WHERE created_at >= ? AND created_at < ? GROUP BY provider ORDER BY total_cost DESC`
+  ).all(...usageRange(from, to));
 }
 //
 export async function getCacheSavings(db, { from, to }) {
   const row = await db.prepare(
     `SELECT COALESCE(SUM(input_tokens), 0) AS total_input, COALESCE(SUM(cache_read_tokens), 0) AS total_cache_read, COALESCE(SUM(cache_write_tokens), 0) AS total_cache_write
-    FROM api_usage WHERE DATE(created_at) >= ? AND DATE(created_at) <= ?`
-  ).get(from, to);
+    FROM api_usage WHERE created_at >= ? AND created_at < ?`
+  ).get(...usageRange(from, to));
   return row;
 }
 //
+// --- Provider Latency ---
+// One raw row per provider attempt: the served call (ttft/duration/tokens,
+// hops = failed attempts before it) or a failed attempt (error_class set).
+// rollupProviderLatency folds raw rows older than LATENCY_RAW_DAYS into
+// provider_latency_daily. Percentiles come from the latency.js histogram
+// buckets so raw rows and rollups merge.
+
+export const LATENCY_RAW_DAYS = 7;
+
+export async function storeLatency(db, { provider, model, sessionType = 'chat', ttftMs = null, durationMs = null, outputTokens = null, hops = 0, hedged = false, errorClass = null, createdAt = null }) {
+  const now = createdAt || new Date().toISOString();
+  const result = await db.prepare(
+    'INSERT INTO provider_latency (provider, model, session_type, ttft_ms, duration_ms, output_tokens, hops, hedged, error_class, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'
+  ).run(provider, model, sessionType, ttftMs, durationMs, outputTokens, hops, hedged ? 1 : 0, errorClass, now);
+  return Number(result.lastInsertRowid);
+}
+
+function emptyLatencyGroup() {
+  return { calls: 0, errors: 0, hops: 0, duration_ms: 0, stream_ms: 0, stream_tokens: 0, ttft: createTtftHistogram(), error_counts: {} };
+}
+
+function addLatencyRow(g, row) {
+  g.calls++;
+  if (row.error_class) {
+    g.errors++;
+    g.error_counts[row.error_class] = (g.error_counts[row.error_class] || 0) + 1;
+    return;
+  }
+  g.hops += row.hops || 0;
+  g.duration_ms += row.duration_ms || 0;
+  if (row.ttft_ms != null) {
+    recordTtft(g.ttft, row.ttft_ms);
+    if (row.output_tokens && row.duration_ms > row.ttft_ms) {
+      g.stream_ms += row.duration_ms - row.ttft_ms;
+      g.stream_tokens += row.output_tokens;
+    }
+  }
+}
+
+function addLatencyRollup(g, row) {
+  g.calls += row.calls;
+  g.errors += row.errors;
+  g.hops += row.hops;
+  g.duration_ms += row.duration_ms;
+  g.stream_ms += row.stream_ms;
+  g.stream_tokens += row.stream_tokens;
+  mergeHistogram(g.ttft, JSON.parse(row.ttft_counts || '[]'));
+  for (const [cls, n] of Object.entries(JSON.parse(row.error_counts || '{}'))) {
+    g.error_counts[cls] = (g.error_counts[cls] || 0) + n;
+  }
+}
+
+export async function rollupProviderLatency(db, { keepDays = LATENCY_RAW_DAYS, now = new Date() } = {}) {
+  const cutoff = new Date(now);
+  cutoff.setUTCDate(cutoff.getUTCDate() - keepDays);
+  const before = cutoff.toISOString().slice(0, 10);
+  const rows = await db.prepare(
+    'SELECT provider, model, ttft_ms, duration_ms, output_tokens, hops, error_class, created_at FROM provider_latency WHERE created_at < ?'
+  ).all(before);
+  if (!rows.length) return 0;
+  const groups = new Map();
+  for (const row of rows) {
+    const key = JSON.stringify([row.created_at.slice(0, 10), row.provider, row.model]);
+    if (!groups.has(key)) groups.set(key, emptyLatencyGroup());
+    addLatencyRow(groups.get(key), row);
+  }
+  await withTransaction(db, async (tx) => {
+    const existing = tx.prepare('SELECT * FROM provider_latency_daily WHERE day = ? AND provider = ? AND model = ?');
+    const upsert = tx.prepare(
+      'INSERT OR REPLACE INTO provider_latency_daily (day, provider, model, calls, errors, hops, duration_ms, stream_ms, stream_tokens, ttft_counts, error_counts) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'
+    );
+    for (const [key, g] of groups) {
+      const [day, provider, model] = JSON.parse(key);
+      const prior = await existing.get(day, provider, model);
+      if (prior) addLatencyRollup(g, prior);
+      await upsert.run(day, provider, model, g.calls, g.errors, g.hops, g.duration_ms, g.stream_ms, g.stream_tokens,
+        JSON.stringify(g.ttft.counts), JSON.stringify(g.error_counts));
+    }
+    await tx.prepare('DELETE FROM provider_latency WHERE created_at < ?').run(before);
+  });
+  return rows.length;
+}
+
+// Latency per provider or model over raw rows + daily rollups in the range.
+// Fastest median TTFT first; groups with no served call sort last.
+async function getLatencyBy(db, { from, to }, field) {
+  const [lo, hi] = usageRange(from, to);
+  const rows = await db.prepare(
+    'SELECT provider, model, ttft_ms, duration_ms, output_tokens, hops, error_class FROM provider_latency WHERE created_at >= ? AND created_at < ?'
+  ).all(lo, hi);
+  const rollups = await db.prepare(
+    'SELECT * FROM provider_latency_daily WHERE day >= ? AND day < ?'
+  ).all(lo, hi);
+  const groups = new Map();
+  const group = (key) => {
+    if (!groups.has(key)) groups.set(key, emptyLatencyGroup());
+    return groups.get(key);
+  };
+  for (const row of rows) addLatencyRow(group(row[field]), row);
+  for (const row of rollups) addLatencyRollup(group(row[field]), row);
+  const out = [];
+  for (const [key, g] of groups) {
+    const served = g.calls - g.errors;
+    out.push({
+      [field]: key,
+      calls: g.calls,
+      errors: g.errors,
+      error_rate: g.calls ? g.errors / g.calls : 0,
+      error_counts: g.error_counts,
+      avg_hops: served ? g.hops / served : 0,
+      avg_duration_ms: served ? Math.round(g.duration_ms / served) : null,
+      tokens_per_sec: g.stream_ms ? Math.round((g.stream_tokens / g.stream_ms) * 10000) / 10 : null,
+      ttft_p50: ttftPercentile(g.ttft, 0.5),
+      ttft_p90: ttftPercentile(g.ttft, 0.9),
+      ttft_p99: ttftPercentile(g.ttft, 0.99),
+    });
+  }
+  return out.sort((a, b) => (a.ttft_p50 ?? Infinity) - (b.ttft_p50 ?? Infinity) || b.calls - a.calls);
+}
+
+export async function getLatencyByProvider(db, range) {
+  return getLatencyBy(db, range, 'provider');
+}
+//
+export async function getLatencyByModel(db, range) {
+  return getLatencyBy(db, range, 'model');
+}
+
 // --- Settings CRUD ---
 //
 export async function getSetting(db, key) {
@@ -519,17 +987,58 @@ export async function seedPersonality(db) {
 
 // --- Active Session ---
 
+// Open session with messages/agenda parsed. Messages come from
+// conversation_messages; rows saved before that table existed fall back to
+// the legacy conversations.messages JSON.
 export async function getActiveSession(db) {
-  return db.prepare(
-    'SELECT * FROM conversations WHERE ended_at IS NULL ORDER BY id DESC LIMIT 1'
+  const row = await db.prepare(
+    'SELECT id, session_type, started_at, ended_at, summary, agenda, state FROM conversations WHERE ended_at IS NULL ORDER BY id DESC LIMIT 1'
   ).get();
+  if (!row) return row;
+  let messages = await getConversationMessages(db, row.id);
+  if (!messages.length) {
+    const legacy = await db.prepare('SELECT messages FROM conversations WHERE id = ?').get(row.id);
+    try { messages = JSON.parse(legacy?.messages || '[]'); } catch { messages = []; }
+  }
+  let agenda = [];
+  try { agenda = JSON.parse(row.agenda || '[]'); } catch {}
+  return { ...row, messages, agenda };
+}
+
+export async function getConversationMessages(db, convId) {
+  return db.prepare(
+    'SELECT role, content FROM conversation_messages WHERE conversation_id = ? ORDER BY seq'
+  ).all(convId);
+}
+
+// Write only messages added since the last save. session._savedCount tracks
+// how many are on disk; if the last saved message was edited in place (or the
+// list shrank) the tail is rewritten from there. INSERT OR REPLACE keeps
+// overlapping fire-and-forget saves idempotent.
+export async function appendSessionMessages(db, convId, session) {
+  const messages = session.messages || [];
+  let from = session._savedCount || 0;
+  const last = session._savedLast;
+  if (from > messages.length || (from && (messages[from - 1].role !== last?.role || messages[from - 1].content !== last?.content))) {
+    from = Math.max(0, Math.min(from, messages.length) - 1);
+    await db.prepare('DELETE FROM conversation_messages WHERE conversation_id = ? AND seq >= ?').run(convId, from);
+  }
+  for (let i = from; i < messages.length; i += 100) {
+    const chunk = messages.slice(i, i + 100);
+    await db.prepare(
+      `INSERT OR REPLACE INTO conversation_messages (conversation_id, seq, role, content) VALUES ${chunk.map(() => '(?, ?, ?, ?)').join(', ')}`
+    ).run(...chunk.flatMap((m, j) => [convId, i + j, m.role, m.content ?? '']));
+  }
+  session._savedCount = messages.length;
+  const tail = messages[messages.length - 1];
+  session._savedLast = tail ? { role: tail.role, content: tail.content } : null;
 }
 
 export async function saveSessionState(db, convId, session) {
+  await appendSessionMessages(db, convId, session);
   await db.prepare(
-    'UPDATE conversations SET messages = ?, agenda = ?, state = ?, session_type = ? WHERE id = ?'
+    'UPDATE conversations SET agenda = ?, state = ?, session_type = ? WHERE id = ?'
   ).run(
-    JSON.stringify(session.messages),
     JSON.stringify(session.agenda),
     session.state,
     session.type,
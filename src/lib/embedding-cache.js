@@ -0,0 +1,107 @@
+// Content-hash → embedding cache (embedding_cache table)
+// Shared by the browser db layer and src/memory.js, so a memory.db and a
+// browser thinkdone.db never re-embed text they have already seen.
+//
+// Key: sha256 hex of "<model>\n<text>" — changing the model invalidates keys.
+// LRU: hits bump used_at; after inserts the oldest rows beyond maxEntries go.
+//
+// `db` is either connection shape: prepare(sql).all/run (Turso WASM, tests)
+// or a libsql client's execute({ sql, args }) → { rows } (src/memory.js).
+
+export const EMBEDDING_MODEL = 'Xenova/bge-small-en-v1.5';
+export const CACHE_MAX_ENTRIES = 5000;
+const IN_CHUNK = 500; // stay well under SQLite's bound-parameter limit
+const INSERT_CHUNK = 100;
+
+export const EMBEDDING_CACHE_SCHEMA = [
+  `CREATE TABLE IF NOT EXISTS embedding_cache (
+    hash     TEXT PRIMARY KEY,
+    vector   BLOB NOT NULL,
+    used_at  INTEGER NOT NULL
+  )`,
+  'CREATE INDEX IF NOT EXISTS embedding_cache_used_idx ON embedding_cache (used_at)',
+];
+
+function all(db, sql, args) {
+  if (db.prepare) return db.prepare(sql).all(...args);
+  return db.execute({ sql, args }).then((r) => r.rows);
+}
+
+function run(db, sql, args) {
+  if (db.prepare) return db.prepare(sql).run(...args);
+  return db.execute({ sql, args });
+}
+
+export async function embeddingKey(text) {
+  const bytes = new TextEncoder().encode(`${EMBEDDING_MODEL}\n${text}`);
+  const digest = new Uint8Array(await crypto.subtle.digest('SHA-256', bytes));
+  let hex = '';
+  for (const b of digest) hex += b.toString(16).padStart(2, '0');
+  return hex;
+}
+
+function toBlob(vec) {
+  return new Uint8Array(vec.buffer, vec.byteOffset, vec.byteLength);
+}
+
+function fromBlob(blob) {
+  const bytes = blob instanceof ArrayBuffer ? new Uint8Array(blob) : blob;
+  // Copy: driver buffers may be pooled or unaligned
+  return new Float32Array(bytes.slice().buffer, 0, bytes.byteLength / 4);
+}
+
+// Map of key → Float32Array for the keys present; bumps their used_at
+export async function getCachedEmbeddings(db, keys) {
+  const found = new Map();
+  const now = Date.now();
+  for (let i = 0; i < keys.length; i += IN_CHUNK) {
+    const chunk = keys.slice(i, i + IN_CHUNK);
+    const placeholders = chunk.map(() => '?').join(', ');
+    const rows = await all(db, `SELECT hash, vector FROM embedding_cache WHERE hash IN (${placeholders})`, chunk);
+    if (!rows.length) continue;
+    for (const row of rows) found.set(row.hash, fromBlob(row.vector));
+    const hits = rows.map((r) => r.hash);
+    await run(db, `UPDATE embedding_cache SET used_at = ? WHERE hash IN (${hits.map(() => '?').join(', ')})`, [now, ...hits]);
+  }
+  return found;
+}
+
+// entries: [key, Float32Array][] — one multi-row INSERT per chunk
+export async function putCachedEmbeddings(db, entries) {
+  const now = Date.now();
+  for (let i = 0; i < entries.length; i += INSERT_CHUNK) {
+    const chunk = entries.slice(i, i + INSERT_CHUNK);
+    const values = chunk.map(() => '(?, ?, ?)').join(', ');
+    await run(db, `INSERT OR REPLACE INTO embedding_cache (hash, vector, used_at) VALUES ${values}`,
+      chunk.flatMap(([key, vec]) => [key, toBlob(vec), now]));
+  }
+}
+
+export async function evictEmbeddingCache(db, maxEntries = CACHE_MAX_ENTRIES) {
+  const [{ n }] = await all(db, 'SELECT COUNT(*) AS n FROM embedding_cache', []);
+  if (n <= maxEntries) return 0;
+  await run(db, 'DELETE FROM embedding_cache WHERE hash IN (SELECT hash FROM embedding_cache ORDER BY used_at ASC LIMIT ?)',
+    [n - maxEntries]);
+  return n - maxEntries;
+}
+
+// Embed texts through the cache. Only distinct misses reach embedBatch
+// (texts → Float32Array[]); results come back in input order.
+export async function embedWithCache(db, texts, embedBatch, opts = {}) {
+  const { maxEntries = CACHE_MAX_ENTRIES } = opts;
+  const keys = await Promise.all(texts.map(embeddingKey));
+  const vectors = await getCachedEmbeddings(db, [...new Set(keys)]);
+
+  const missing = new Map(); // key → text, deduped
+  keys.forEach((key, i) => {
+    if (!vectors.has(key)) missing.set(key, texts[i]);
+  });
+  if (missing.size) {
+    const fresh = await embedBatch([...missing.values()]);
+    const entries = [...missing.keys()].map((key, i) => [key, fresh[i]]);
+    for (const [key, vec] of entries) vectors.set(key, vec);
+    await putCachedEmbeddings(db, entries);
+    await evictEmbeddingCache(db, maxEntries);
+  }
+  return keys.map((key) => vectors.get(key));
+}
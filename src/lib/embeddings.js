@@ -1,9 +1,11 @@
 import { pipeline } from '@huggingface/transformers';
+import { searchMemoryVectors } from './vector-index.js';
+import { embedWithCache, EMBEDDING_MODEL } from './embedding-cache.js';
 //
 let _embedder = null;
 export async function getEmbedder() {
   if (!_embedder) {
-    _embedder = await pipeline('feature-extraction', 'Xenova/bge-small-en-v1.5', { dtype: 'fp32' });
+    _embedder = await pipeline('feature-extraction', EMBEDDING_MODEL, { dtype: 'fp32' });
   }
   return _embedder;
 }
@@ -20,31 +22,33 @@ export function cosineSimilarity(a, b) {
   return dot;
 }
 //
+// Per-db binary-quantized index (see vector-index.js): Hamming prefilter, exact rerank
 export async function semanticSearch(db, queryEmbedding, opts = {}) {
-  const { limit = 10, threshold = 0.3 } = opts;
-  const rows = await db.prepare(
-    'SELECT id, content, compressed, project, person, type, priority, created_at, embedding FROM memories WHERE superseded_by IS NULL AND embedding IS NOT NULL'
-  ).all();
-  const results = [];
-  for (const row of rows) {
-    if (!row.embedding) continue;
-    const memEmb = new Float32Array(row.embedding.buffer || row.embedding);
-    const sim = cosineSimilarity(queryEmbedding, memEmb);
-    if (sim >= threshold) results.push({ ...row, similarity: sim });
-  }
-  results.sort((a, b) => b.similarity - a.similarity);
-  return results.slice(0, limit);
+  return searchMemoryVectors(db, queryEmbedding, opts);
 }
 //
-export async function batchEmbed(texts, chunkSize = 10) {
+// One forward pass per chunk. Texts are length-sorted first so each batch
+// pads to similar lengths; results come back in input order.
+export async function batchEmbed(texts, chunkSize = 32) {
   const embedder = await getEmbedder();
-  const results = [];
-  for (let i = 0; i < texts.length; i += chunkSize) {
-    const chunk = texts.slice(i, i + chunkSize);
-    for (const text of chunk) {
-      const result = await embedder(text, { pooling: 'cls', normalize: true });
-      results.push(new Float32Array(result.data));
-    }
+  const order = texts.map((_, i) => i).sort((a, b) => texts[a].length - texts[b].length);
+  const results = new Array(texts.length);
+  for (let i = 0; i < order.length; i += chunkSize) {
+    const idx = order.slice(i, i + chunkSize);
+    const output = await embedder(idx.map((j) => texts[j]), { pooling: 'cls', normalize: true });
+    const dim = output.dims[output.dims.length - 1];
+    idx.forEach((j, row) => {
+      results[j] = output.data.slice(row * dim, (row + 1) * dim);
+    });
   }
   return results;
 }
+//
+// Cached variants: only text the embedding_cache hasn't seen hits the model
+export async function embedMany(db, texts) {
+  return embedWithCache(db, texts, batchEmbed);
+}
+//
+export async function embedCached(db, text) {
+  return (await embedWithCache(db, [text], batchEmbed))[0];
+}
@@ -1,6 +1,6 @@
 // Post-meeting extraction — persist tasks, memories, conversations, deferred items
 //
-import { storeMemory, addTask, getActiveMemories } from './db.js';
+import { storeMemory, writeBatch, queueWrite, getActiveMemories, appendSessionMessages } from './db.js';
 import { parseMeetingState } from './conversation.js';
 //
 // Validate deadline is a proper YYYY-MM-DD date; return null if not.
@@ -12,50 +12,45 @@ function normalizeDeadline(deadline) {
 }
 
 export async function processExtractions(db, extractions) {
-  const created = { tasks: [], memories: [] };
   const today = new Date().toISOString().slice(0, 10);
   // Load existing tasks for dedup (case-insensitive)
   const existing = await db.prepare('SELECT text FROM tasks WHERE plan_date = ?').all(today);
   const existingSet = new Set(existing.map(t => t.text.toLowerCase().trim()));
-  // Process tasks
+  // Tasks
+  const tasks = [];
   for (const task of extractions.tasks || []) {
     const key = task.text.toLowerCase().trim();
     if (existingSet.has(key)) continue;
     existingSet.add(key);
-    const id = await addTask(db, task.text, {
+    tasks.push({
+      text: task.text,
       planDate: normalizeDeadline(task.deadline) || today,
       source: 'meeting',
     });
-    created.tasks.push(id);
   }
-  // Process decisions
-  for (const dec of extractions.decisions || []) {
-    const id = await storeMemory(db, dec.content, {
+  // Decisions, commitments, waiting_for
+  const memories = [
+    ...(extractions.decisions || []).map(dec => ({
+      content: dec.content,
       type: 'decision',
       project: dec.project || '',
       source: 'conversation',
-    });
-    created.memories.push(id);
-  }
-  // Process commitments
-  for (const com of extractions.commitments || []) {
-    const id = await storeMemory(db, com.content, {
+    })),
+    ...(extractions.commitments || []).map(com => ({
+      content: com.content,
       type: 'commitment',
       person: com.to || '',
       source: 'conversation',
-    });
-    created.memories.push(id);
-  }
-  // Process waiting_for
-  for (const wf of extractions.waitingFor || []) {
-    const id = await storeMemory(db, wf.content, {
+    })),
+    ...(extractions.waitingFor || []).map(wf => ({
+      content: wf.content,
       type: 'waiting_for',
       person: wf.from || '',
       source: 'conversation',
-    });
-    created.memories.push(id);
-  }
-  return created;
+    })),
+  ];
+  // One transaction for the whole extraction result
+  return writeBatch(db, { tasks, memories });
 }
 //
 // Map onboarding agenda content to personality.disposition field names
@@ -69,7 +64,8 @@ const PROFILE_FIELD_MAP = {
 // Called immediately after applyAgendaUpdates so facts are stored the moment they're learned.
 export async function persistResolutions(db, agenda, updates, sessionType) {
   if (!updates?.resolves?.length) return [];
-  const stored = [];
+  const memories = [];
+  const queued = new Set();
   let dispUpdated = false;
   let disp = {};
 
@@ -86,19 +82,15 @@ export async function persistResolutions(db, agenda, updates, sessionType) {
     const item = agenda.find(a => a.id === r.id);
     if (!item?.question) continue;
 
-    // Dedup: skip if we already have this exact Q+A stored
+    // Dedup: skip if we already have this exact Q+A stored (or queued)
     const content = `${item.content}: ${r.resolution}`;
+    if (queued.has(content)) continue;
     const existing = await db.prepare(
       "SELECT id FROM memories WHERE content = ? AND superseded_by IS NULL LIMIT 1"
     ).get(content);
     if (existing) continue;
-
-    // Store as memory
-    const memId = await storeMemory(db, content, {
-      type: 'insight',
-      source: 'conversation',
-    });
-    stored.push(memId);
+    queued.add(content);
+    memories.push({ content, type: 'insight', source: 'conversation' });
 
     // For onboarding, also update personality.disposition
     if (sessionType === 'onboarding') {
@@ -110,12 +102,11 @@ export async function persistResolutions(db, agenda, updates, sessionType) {
     }
   }
 
-  if (dispUpdated) {
-    await db.prepare('UPDATE personality SET disposition = ?, updated_at = ? WHERE id = 1').run(
-      JSON.stringify(disp), new Date().toISOString()
-    );
-  }
-
+  // Memories and the disposition update land in one transaction
+  const statements = dispUpdated
+    ? [['UPDATE personality SET disposition = ?, updated_at = ? WHERE id = 1', JSON.stringify(disp), new Date().toISOString()]]
+    : [];
+  const { memories: stored } = await writeBatch(db, { memories, statements });
   return stored;
 }
 //
@@ -168,15 +159,21 @@ export function buildSessionSummary(session) {
   return parts.join('. ') || 'Session started';
 }
 //
-// Upsert an active conversation snapshot (called periodically)
+// Upsert an active conversation snapshot (called periodically).
+// Messages are appended to conversation_messages; only the small
+// summary/agenda/state fields are rewritten on the conversations row.
+// Queued so a snapshot never lands inside an extraction batch.
 export async function snapshotConversation(db, session) {
   if (!session || !db) return;
+  return queueWrite(db, (db) => writeSnapshot(db, session));
+}
+//
+async function writeSnapshot(db, session) {
   const summary = buildSessionSummary(session);
   const decisions = session.agenda
     .filter(a => a.status === 'resolved' && a.resolution)
     .map(a => a.resolution);
 
-  const messagesJson = JSON.stringify(session.messages);
   const agendaJson = JSON.stringify(session.agenda);
   const stateVal = session.state || 'INITIALIZING';
 
@@ -189,16 +186,18 @@ export async function snapshotConversation(db, session) {
       session._convId = existing.id;
     } else {
       const result = await db.prepare(
-        'INSERT INTO conversations (session_type, started_at, summary, messages, agenda, state) VALUES (?, ?, ?, ?, ?, ?)'
-      ).run(session.type, session.startedAt, summary, messagesJson, agendaJson, stateVal);
+        'INSERT INTO conversations (session_type, started_at, summary, agenda, state) VALUES (?, ?, ?, ?, ?)'
+      ).run(session.type, session.startedAt, summary, agendaJson, stateVal);
       session._convId = Number(result.lastInsertRowid);
+      await appendSessionMessages(db, session._convId, session);
       return;
     }
   }
 
+  await appendSessionMessages(db, session._convId, session);
   await db.prepare(
-    'UPDATE conversations SET summary = ?, key_decisions = ?, messages = ?, agenda = ?, state = ? WHERE id = ?'
-  ).run(summary, decisions.length ? JSON.stringify(decisions) : null, messagesJson, agendaJson, stateVal, session._convId);
+    'UPDATE conversations SET summary = ?, key_decisions = ?, agenda = ?, state = ? WHERE id = ?'
+  ).run(summary, decisions.length ? JSON.stringify(decisions) : null, agendaJson, stateVal, session._convId);
 }
 //
 export async function processOnboardingExtractions(db, extractions) {
@@ -235,29 +234,37 @@ export async function persistOnboardingSummary(db, session) {
 //
 export async function carryOverDeferred(db, session) {
   const deferred = (session.agenda || []).filter(a => a.status === 'deferred');
+  if (!deferred.length) return [];
+  // Existing deferred-pattern memories, read once and matched per item
+  // (same test as LIKE '%deferred:%<content>%', ASCII case-insensitive)
+  const patterns = (await db.prepare(
+    "SELECT content FROM memories WHERE content LIKE '%deferred:%' AND type = 'pattern'"
+  ).all()).map(r => r.content.toLowerCase());
+  const priorityMap = { low: 0, normal: 0, high: 1, critical: 1 };
   const carried = [];
+  const memories = [];
   for (const item of deferred) {
-    // Count existing deferred pattern memories for this content
-    const existing = await db.prepare(
-      "SELECT COUNT(*) as cnt FROM memories WHERE content LIKE ? AND type = 'pattern'"
-    ).get(`%deferred:%${item.content}%`);
-    const deferCount = (existing?.cnt || 0) + 1;
+    const needle = item.content.toLowerCase();
+    const prior = patterns.filter(c => c.indexOf(needle, c.indexOf('deferred:') + 9) !== -1).length;
+    const deferCount = prior + 1;
     if (deferCount >= 3) {
       // Flag as pattern — stop auto-surfacing
-      await storeMemory(db, `deferred:${deferCount}x: ${item.content}. Consider breaking down or dropping.`, {
+      memories.push({
+        content: `deferred:${deferCount}x: ${item.content}. Consider breaking down or dropping.`,
         type: 'pattern',
         source: 'conversation',
       });
     }
     // Store as follow-up memory with escalated priority
-    const priorityMap = { low: 0, normal: 0, high: 1, critical: 1 };
-    await storeMemory(db, `Deferred from meeting: ${item.content}`, {
+    memories.push({
+      content: `Deferred from meeting: ${item.content}`,
       type: 'follow_up',
       priority: (priorityMap[item.priority] || 0) + 1,
       source: 'conversation',
     });
     carried.push({ content: item.content, deferCount });
   }
+  await writeBatch(db, { memories });
   return carried;
 }
 //
@@ -1,24 +1,29 @@
 // GTD Engine — Inbox, Projects, Waiting-For, Weekly Review, Triage
 //
+import { getMemorySnapshot, ofType, newestFirst } from './memory-snapshot.js';
+//
 export async function getInbox(db) {
   return db.prepare(
     "SELECT * FROM memories WHERE type = 'idea' AND (project = '' OR project IS NULL) AND superseded_by IS NULL ORDER BY created_at DESC"
   ).all();
 }
 //
+// Per-project activity over active memories. Shared by getProjects,
+// getStaleProjects and the heartbeat so the aggregation lives in one place.
+export const PROJECT_STATS_SQL =
+  "SELECT project, COUNT(*) AS memory_count, MAX(created_at) AS last_activity FROM memories WHERE superseded_by IS NULL AND project != '' GROUP BY project";
+//
 export async function getProjects(db) {
-  const projects = await db.prepare(
-    "SELECT project, COUNT(*) as memory_count, MAX(created_at) as last_activity FROM memories WHERE superseded_by IS NULL AND project != '' GROUP BY project ORDER BY last_activity DESC"
-  ).all();
   const today = new Date().toISOString().slice(0, 10);
-  for (const p of projects) {
-    const taskCount = await db.prepare(
-      'SELECT COUNT(*) as cnt FROM tasks WHERE project = ? AND plan_date = ?'
-    ).get(p.project, today);
-    p.task_count = taskCount?.cnt || 0;
-    const fiveDaysAgo = new Date(Date.now() - 5 * 86400000).toISOString();
-    p.stale = p.last_activity < fiveDaysAgo;
-  }
+  const fiveDaysAgo = new Date(Date.now() - 5 * 86400000).toISOString();
+  // One round-trip: project stats joined to today's per-project task counts
+  const projects = await db.prepare(
+    `SELECT ps.project, ps.memory_count, ps.last_activity, COALESCE(t.cnt, 0) AS task_count
+     FROM (${PROJECT_STATS_SQL}) ps
+     LEFT JOIN (SELECT project, COUNT(*) AS cnt FROM tasks WHERE plan_date = ? GROUP BY project) t ON t.project = ps.project
+     ORDER BY ps.last_activity DESC`
+  ).all(today);
+  for (const p of projects) p.stale = p.last_activity < fiveDaysAgo;
   return projects;
 }
 //
@@ -31,7 +36,7 @@ export async function getWaitingFor(db) {
 export async function getStaleProjects(db, days = 5) {
   const cutoff = new Date(Date.now() - days * 86400000).toISOString();
   return db.prepare(
-    "SELECT project, MAX(created_at) as last_activity FROM memories WHERE superseded_by IS NULL AND project != '' GROUP BY project HAVING last_activity < ? ORDER BY last_activity ASC"
+    `SELECT project, last_activity FROM (${PROJECT_STATS_SQL}) WHERE last_activity < ? ORDER BY last_activity ASC`
   ).all(cutoff);
 }
 //
@@ -47,17 +52,13 @@ export async function generateWeeklyReview(db) {
     "SELECT text, project, plan_date FROM tasks WHERE checked = 0 AND plan_date < ? ORDER BY plan_date ASC"
   ).all(today);
   //
-  const projectStatuses = await db.prepare(
-    "SELECT project, content, created_at FROM memories WHERE type = 'status' AND superseded_by IS NULL AND project != '' ORDER BY project, created_at DESC"
-  ).all();
-  //
-  const commitments = await db.prepare(
-    "SELECT content, person, project FROM memories WHERE type = 'commitment' AND superseded_by IS NULL ORDER BY created_at ASC"
-  ).all();
-  //
-  const waitingFor = await db.prepare(
-    "SELECT content, person, project FROM memories WHERE type = 'waiting_for' AND superseded_by IS NULL ORDER BY created_at ASC"
-  ).all();
+  // Statuses, commitments and waiting-for come from one memory snapshot
+  const snapshot = await getMemorySnapshot(db);
+  const projectStatuses = newestFirst(ofType(snapshot, 'status').filter(s => s.project))
+    .sort((a, b) => (a.project < b.project ? -1 : a.project > b.project ? 1 : 0));
+  const pick = ({ content, person, project }) => ({ content, person, project });
+  const commitments = ofType(snapshot, 'commitment').map(pick);
+  const waitingFor = ofType(snapshot, 'waiting_for').map(pick);
   //
   const completions = await db.prepare(
     "SELECT r.name, COUNT(c.id) as done FROM routines r LEFT JOIN completions c ON r.id = c.routine_id AND c.completed_date >= ? WHERE r.active = 1 AND r.kind = 'habit' GROUP BY r.id ORDER BY r.name"
@@ -3,6 +3,8 @@
 // Level 1: basics (profile, empty tables)
 // Level 2: per-entity depth (per project, routine, person)
 
+import { getStaleProjects } from './gtd-engine.js';
+
 export const HEARTBEAT_INTERVALS = {
   free: 5 * 60 * 1000,     // 5 min — most frequent (free users need more guidance)
   starter: 10 * 60 * 1000, // 10 min
@@ -110,10 +112,7 @@ export async function detectDataGaps(db) {
     });
   }
 
-  const cutoff5d = new Date(Date.now() - 5 * 86400000).toISOString();
-  const staleProjects = await db.prepare(
-    "SELECT project, MAX(created_at) as last_activity FROM memories WHERE superseded_by IS NULL AND project != '' GROUP BY project HAVING last_activity < ? ORDER BY last_activity ASC"
-  ).all(cutoff5d);
+  const staleProjects = await getStaleProjects(db, 5);
   for (const sp of staleProjects) {
     gaps.push({
       id: `stale_project:${sp.project}`,
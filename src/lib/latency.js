@@ -0,0 +1,51 @@
+// Latency histograms — fixed log-spaced buckets shared by hedged racing
+// (provider.js) and the provider_latency telemetry rollups (db.js).
+// Histograms are { counts, samples, failures } and merge by adding counts,
+// so daily rollups can be combined with raw rows at query time.
+
+// Bucket upper bounds in ms (last bucket catches everything slower)
+export const TTFT_BUCKETS_MS = [
+  50, 75, 100, 150, 200, 300, 400, 600, 800, 1200, 1600, 2400, 3200, 4800, 6400, 9600, 12800, 25600, 60000, Infinity,
+];
+
+export function createTtftHistogram() {
+  return { counts: new Array(TTFT_BUCKETS_MS.length).fill(0), samples: 0, failures: 0 };
+}
+
+export function recordTtft(histogram, ms) {
+  histogram.counts[TTFT_BUCKETS_MS.findIndex(b => ms <= b)]++;
+  histogram.samples++;
+}
+
+export function mergeHistogram(into, counts) {
+  for (let i = 0; i < into.counts.length; i++) {
+    const n = counts[i] || 0;
+    into.counts[i] += n;
+    into.samples += n;
+  }
+  return into;
+}
+
+// Upper bound of the bucket holding the p-th percentile (0..1), null if empty
+export function ttftPercentile(histogram, p) {
+  if (!histogram?.samples) return null;
+  const target = Math.max(1, Math.ceil(p * histogram.samples));
+  let seen = 0;
+  for (let i = 0; i < histogram.counts.length; i++) {
+    seen += histogram.counts[i];
+    if (seen >= target) return TTFT_BUCKETS_MS[i];
+  }
+  return Infinity;
+}
+
+// Failure category for one provider attempt: { status } for HTTP responses,
+// { error } for thrown fetches, { stream: true } when the body broke mid-read
+export function classifyError({ status, error, stream } = {}) {
+  if (stream) return 'stream';
+  if (status === 429) return 'rate_limited';
+  if (status === 503) return 'unavailable';
+  if (status >= 500) return 'server_error';
+  if (status >= 400) return 'client_error';
+  if (error) return 'network';
+  return null;
+}
@@ -0,0 +1,45 @@
+// Structured, sampled logging for hot server paths (speech WebSocket)
+// Each record is one JSON line: { ts, level, scope, event, ...fields }.
+// Level comes from LOG_LEVEL (error | warn | info | debug; default info);
+// disabled levels return before any formatting. Events listed in `sample`
+// are emitted once every N occurrences, with `count` carrying how many
+// occurrences the record stands for. Children share the sampling counters,
+// so a busy event is sampled across all connections, not per connection.
+
+export const LOG_LEVELS = { error: 0, warn: 1, info: 2, debug: 3 };
+
+export function createLogger(scope, { level = process.env.LOG_LEVEL, sample = {}, sink = console } = {}) {
+  return makeLogger(scope, LOG_LEVELS[level] ?? LOG_LEVELS.info, sample, sink, new Map(), null);
+}
+
+function makeLogger(scope, max, sample, sink, seen, fields) {
+  function emit(level, event, data) {
+    if (LOG_LEVELS[level] > max) return;
+    let count = 0;
+    const every = sample[event];
+    if (every > 1) {
+      count = (seen.get(event) || 0) + 1;
+      if (count < every) {
+        seen.set(event, count);
+        return;
+      }
+      seen.set(event, 0);
+    }
+    const record = { ts: new Date().toISOString(), level, scope, event, ...fields, ...data };
+    if (count) record.count = count;
+    const line = JSON.stringify(record);
+    if (level === 'error') sink.error(line);
+    else if (level === 'warn') sink.warn(line);
+    else sink.log(line);
+  }
+
+  return {
+    enabled: (level) => LOG_LEVELS[level] <= max,
+    error: (event, data) => emit('error', event, data),
+    warn: (event, data) => emit('warn', event, data),
+    info: (event, data) => emit('info', event, data),
+    debug: (event, data) => emit('debug', event, data),
+    // Same sink, level and sampling counters; `extra` fields on every record
+    child: (extra) => makeLogger(scope, max, sample, sink, seen, { ...fields, ...extra }),
+  };
+}
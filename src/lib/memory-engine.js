@@ -1,97 +1,87 @@
 // Context budget builder — assembles prioritized memory blocks for LLM prompt
 //
+import { getMemorySnapshot, ofType, newestFirst, since } from './memory-snapshot.js';
+//
 export async function buildContext(db, opts = {}) {
   const { focusProjects = [], focusPeople = [], maxTokens = 20000 } = opts;
+  const snapshot = opts.snapshot || await getMemorySnapshot(db);
   const blocks = [];
   let tokenCount = 0;
   // Priority 1 — Always loaded (~4K tokens)
-  const p1 = await getPriority1(db);
+  const p1 = await getPriority1(db, snapshot);
   blocks.push(p1);
   tokenCount += estimateTokens(p1);
   // Priority 2 — Focus-derived (~4K tokens)
   if (tokenCount < maxTokens) {
-    const p2 = await getPriority2(db, { focusProjects, focusPeople });
+    const p2 = await getPriority2(db, { focusProjects, focusPeople }, snapshot);
     blocks.push(p2);
     tokenCount += estimateTokens(p2);
   }
   // Priority 3 — Contextual (~4K tokens, shed if needed)
   if (tokenCount < maxTokens * 0.8) {
-    const p3 = await getPriority3(db, null);
+    const p3 = await getPriority3(db, null, snapshot);
     blocks.push(p3);
     tokenCount += estimateTokens(p3);
   }
   // Priority 4 — Background (~2K tokens, shed first)
   if (tokenCount < maxTokens * 0.6) {
-    const p4 = await getPriority4(db);
+    const p4 = await getPriority4(db, snapshot);
     blocks.push(p4);
     tokenCount += estimateTokens(p4);
   }
   return { text: blocks.filter(Boolean).join('\n\n'), tokenEstimate: tokenCount };
 }
 //
-export async function getPriority1(db) {
+// getPriority1–4 slice an active-memory snapshot (loaded if not passed in)
+export async function getPriority1(db, snapshot = null) {
+  const snap = snapshot || await getMemorySnapshot(db);
   const sections = [];
-  const blockers = await db.prepare(
-    "SELECT content, project FROM memories WHERE type = 'blocker' AND superseded_by IS NULL ORDER BY created_at DESC"
-  ).all();
+  const blockers = newestFirst(ofType(snap, 'blocker'));
   if (blockers.length) sections.push('BLOCKERS:\n' + blockers.map(r => `  - ${r.content}`).join('\n'));
-  const commitments = await db.prepare(
-    "SELECT content, project, person FROM memories WHERE type = 'commitment' AND superseded_by IS NULL ORDER BY created_at DESC"
-  ).all();
+  const commitments = newestFirst(ofType(snap, 'commitment'));
   if (commitments.length) sections.push('COMMITMENTS:\n' + commitments.map(r => `  - ${r.content}`).join('\n'));
-  const waiting = await db.prepare(
-    "SELECT content, project, person FROM memories WHERE type = 'waiting_for' AND superseded_by IS NULL ORDER BY created_at DESC"
-  ).all();
+  const waiting = newestFirst(ofType(snap, 'waiting_for'));
   if (waiting.length) sections.push('WAITING FOR:\n' + waiting.map(r => `  - ${r.content}`).join('\n'));
   return sections.join('\n\n');
 }
 //
-export async function getPriority2(db, focus = {}) {
+export async function getPriority2(db, focus = {}, snapshot = null) {
   const { focusProjects = [], focusPeople = [] } = focus;
+  const snap = snapshot || await getMemorySnapshot(db);
   const sections = [];
   const cutoff = new Date(Date.now() - 7 * 86400000).toISOString();
   // Focus project summaries
   if (focusProjects.length) {
-    const placeholders = focusProjects.map(() => '?').join(',');
-    const statuses = await db.prepare(
-      `SELECT content, project FROM memories WHERE type = 'status' AND superseded_by IS NULL AND project IN (${placeholders}) ORDER BY created_at DESC`
-    ).all(...focusProjects);
+    const wanted = new Set(focusProjects);
+    const statuses = newestFirst(ofType(snap, 'status').filter(r => wanted.has(r.project)));
     if (statuses.length) sections.push('FOCUS PROJECTS:\n' + statuses.map(r => `  [${r.project}] ${r.content}`).join('\n'));
   }
   // Person facts for focus people
   if (focusPeople.length) {
-    const placeholders = focusPeople.map(() => '?').join(',');
-    const facts = await db.prepare(
-      `SELECT content, person FROM memories WHERE type = 'person_fact' AND superseded_by IS NULL AND person IN (${placeholders})`
-    ).all(...focusPeople);
+    const wanted = new Set(focusPeople);
+    const facts = ofType(snap, 'person_fact').filter(r => wanted.has(r.person));
     if (facts.length) sections.push('KEY PEOPLE:\n' + facts.map(r => `  [${r.person}] ${r.content}`).join('\n'));
   }
   // Recent decisions
-  const decisions = await db.prepare(
-    "SELECT content, project FROM memories WHERE type = 'decision' AND superseded_by IS NULL AND created_at >= ? ORDER BY created_at DESC"
-  ).all(cutoff);
+  const decisions = newestFirst(since(ofType(snap, 'decision'), cutoff));
   if (decisions.length) sections.push('RECENT DECISIONS:\n' + decisions.map(r => `  ${r.content}`).join('\n'));
   return sections.join('\n\n');
 }
 //
-export async function getPriority3(db, queryEmbedding) {
+export async function getPriority3(db, queryEmbedding, snapshot = null) {
+  const snap = snapshot || await getMemorySnapshot(db);
   const cutoff = new Date(Date.now() - 14 * 86400000).toISOString();
-  const related = await db.prepare(
-    "SELECT content, type, project FROM memories WHERE superseded_by IS NULL AND type IN ('pattern', 'dependency', 'insight') AND created_at >= ? ORDER BY created_at DESC LIMIT 20"
-  ).all(cutoff);
+  const related = newestFirst(since(ofType(snap, 'pattern', 'dependency', 'insight'), cutoff)).slice(0, 20);
   if (!related.length) return '';
   return 'RELATED CONTEXT:\n' + related.map(r => `  [${r.type}] ${r.content}`).join('\n');
 }
 //
-export async function getPriority4(db) {
+export async function getPriority4(db, snapshot = null) {
+  const snap = snapshot || await getMemorySnapshot(db);
   const sections = [];
-  const statuses = await db.prepare(
-    "SELECT content, project FROM memories WHERE type = 'status' AND superseded_by IS NULL ORDER BY created_at DESC LIMIT 10"
-  ).all();
+  const statuses = newestFirst(ofType(snap, 'status')).slice(0, 10);
   if (statuses.length) sections.push('OTHER PROJECTS:\n' + statuses.map(r => `  [${r.project}] ${r.content}`).join('\n'));
-  const ideas = await db.prepare(
-    "SELECT content FROM memories WHERE type = 'idea' AND superseded_by IS NULL ORDER BY created_at DESC LIMIT 5"
-  ).all();
+  const ideas = newestFirst(ofType(snap, 'idea')).slice(0, 5);
   if (ideas.length) sections.push('IDEAS (untriaged):\n' + ideas.map(r => `  - ${r.content}`).join('\n'));
   return sections.join('\n\n');
 }
@@ -0,0 +1,73 @@
+// Active memory snapshot — one read of every non-superseded memory, indexed
+// in memory by type / project / person. The agenda, context and weekly-review
+// builders all slice this instead of issuing their own per-type SELECTs.
+//
+// Rows are kept oldest-first (created_at, id); newestFirst() reverses, which
+// matches what ORDER BY created_at DESC returns from the type index.
+// getMemorySnapshot caches per db on the memories data version (see
+// getDataVersions), so back-to-back builders at meeting start share one load.
+import { getDataVersions } from './db.js';
+
+const _snapshots = new WeakMap(); // db → { version, snapshot }
+
+function push(map, key, row) {
+  const list = map.get(key);
+  if (list) list.push(row);
+  else map.set(key, [row]);
+}
+
+export function buildMemorySnapshot(rows) {
+  const byType = new Map();
+  const byProject = new Map();
+  const byPerson = new Map();
+  for (const row of rows) {
+    push(byType, row.type, row);
+    if (row.project) push(byProject, row.project, row);
+    if (row.person) push(byPerson, row.person, row);
+  }
+  return { rows, byType, byProject, byPerson };
+}
+
+export async function loadMemorySnapshot(db) {
+  const rows = await db.prepare(
+    'SELECT id, content, project, person, type, source, priority, created_at FROM memories WHERE superseded_by IS NULL ORDER BY created_at ASC, id ASC'
+  ).all();
+  return buildMemorySnapshot(rows);
+}
+
+// Cached snapshot; reloads whenever the memories table has changed. Without
+// change counters (engine lacks triggers) every call reloads.
+export async function getMemorySnapshot(db) {
+  const versions = await getDataVersions(db);
+  const cached = _snapshots.get(db);
+  if (versions && cached && cached.version === versions.memories) return cached.snapshot;
+  const snapshot = await loadMemorySnapshot(db);
+  if (versions) _snapshots.set(db, { version: versions.memories, snapshot });
+  return snapshot;
+}
+
+// --- Slicing helpers (all return new arrays; snapshot rows are shared) ---
+
+export function ofType(snapshot, ...types) {
+  if (types.length === 1) return (snapshot.byType.get(types[0]) || []).slice();
+  const wanted = new Set(types);
+  return snapshot.rows.filter(r => wanted.has(r.type));
+}
+
+export function newestFirst(rows) {
+  return rows.slice().reverse();
+}
+
+export function since(rows, iso) {
+  return rows.filter(r => r.created_at >= iso);
+}
+
+// Per-project activity over active memories with a project:
+// [{ project, memory_count, last_activity }], most recent first
+export function projectActivity(snapshot) {
+  const out = [];
+  for (const [project, rows] of snapshot.byProject) {
+    out.push({ project, memory_count: rows.length, last_activity: rows[rows.length - 1].created_at });
+  }
+  return out.sort((a, b) => (a.last_activity < b.last_activity ? 1 : a.last_activity > b.last_activity ? -1 : 0));
+}
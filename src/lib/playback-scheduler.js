@@ -0,0 +1,240 @@
+// Jitter-buffered scheduler for streamed S2S audio (PCM16 mono)
+// Sits in front of a playback pipeline from audio-worklet.js:
+//  - Each turn starts by buffering until targetDelayMs of audio is queued (or
+//    that long has passed since the first chunk), so bursty delivery does not
+//    stutter. The target adapts: it follows an RFC 3550-style estimate of
+//    late arrivals, grows on every underrun and decays after clean turns.
+//  - While playing, small provider chunks are coalesced into pushes of at
+//    least coalesceMs (fewer worklet messages / AudioBufferSources). Pending
+//    audio is flushed early whenever the scheduled queue runs low.
+//  - cancel() (barge-in) drops pending + queued audio; the worklet clears its
+//    ring before the next render quantum. Chunks still in flight from the
+//    interrupted turn are discarded until endTurn().
+// Timing uses the scheduler's own clock (`now`, ms) rather than the audio
+// context, so metrics are comparable across worklet and fallback playback.
+
+export const JITTER_DEFAULTS = {
+  minDelayMs: 40,
+  initialDelayMs: 80,
+  maxDelayMs: 400,
+  coalesceMs: 40,
+  jitterGain: 3,         // target ≥ minDelay + gain × jitter
+  underrunBackoff: 1.5,  // target × backoff per underrun
+  decay: 0.9,            // target × decay after a turn without underruns
+};
+
+function emptyMetrics() {
+  return {
+    turns: 0,
+    chunks: 0,
+    pushes: 0,
+    underruns: 0,
+    underrunMs: 0,
+    bargeIns: 0,
+    discardedMs: 0,
+    lastResponseMs: null,
+    _startDelaySum: 0,     // first chunk → first audible push, per turn
+    _startCount: 0,
+    _responseSum: 0,       // expectResponse() → first audible push
+    _responseCount: 0,
+  };
+}
+
+export class PlaybackScheduler {
+  constructor(playback, { sampleRate = 24000, now = () => performance.now(), setTimer = setTimeout, clearTimer = clearTimeout, ...opts } = {}) {
+    this.playback = playback;
+    this.opts = { ...JITTER_DEFAULTS, ...opts };
+    this.bytesPerMs = (sampleRate * 2) / 1000;
+    this.now = now;
+    this.setTimer = setTimer;
+    this.clearTimer = clearTimer;
+
+    this.state = 'idle';        // idle | buffering | playing | cancelled
+    this.pending = new Uint8Array(Math.ceil(this.bytesPerMs * this.opts.maxDelayMs * 2));
+    this.pendingBytes = 0;
+    this.playEndsAt = 0;        // clock time when queued audio runs out
+    this.timer = null;
+
+    this.targetDelayMs = this.opts.initialDelayMs;
+    this.jitterMs = 0;
+    this.firstChunkAt = 0;
+    this.lastArrival = 0;
+    this.lastChunkMs = 0;
+    this.turnUnderruns = 0;
+    this.expectedAt = null;
+    this._metrics = emptyMetrics();
+  }
+
+  get remainingSeconds() {
+    return Math.max(0, this.playEndsAt - this.now()) / 1000 + this.pendingBytes / this.bytesPerMs / 1000;
+  }
+
+  get metrics() {
+    const m = this._metrics;
+    return {
+      turns: m.turns,
+      chunks: m.chunks,
+      pushes: m.pushes,
+      underruns: m.underruns,
+      underrunMs: Math.round(m.underrunMs),
+      bargeIns: m.bargeIns,
+      discardedMs: Math.round(m.discardedMs),
+      startDelayMs: m._startCount ? Math.round(m._startDelaySum / m._startCount) : 0,
+      responseMs: m._responseCount ? Math.round(m._responseSum / m._responseCount) : 0,
+      lastResponseMs: m.lastResponseMs,
+      targetDelayMs: Math.round(this.targetDelayMs),
+      jitterMs: Math.round(this.jitterMs),
+    };
+  }
+
+  resetMetrics() { this._metrics = emptyMetrics(); }
+
+  // Mark the moment a reply is expected (user finished / text sent); the
+  // next turn's first audible push records responseMs against it
+  expectResponse() { this.expectedAt = this.now(); }
+
+  push(pcm) {
+    if (this.state === 'cancelled') {
+      this._metrics.discardedMs += pcm.length / this.bytesPerMs;
+      return;
+    }
+    const t = this.now();
+    const chunkMs = pcm.length / this.bytesPerMs;
+    this._metrics.chunks++;
+
+    if (this.state === 'idle') {
+      this.state = 'buffering';
+      this.turnUnderruns = 0;
+      this.firstChunkAt = t;
+      this._metrics.turns++;
+    } else {
+      // Late arrival relative to the media time the previous chunk covered
+      const late = Math.max(0, (t - this.lastArrival) - this.lastChunkMs);
+      this.jitterMs += (late - this.jitterMs) / 16;
+      const wanted = Math.min(this.opts.maxDelayMs, this.opts.minDelayMs + this.opts.jitterGain * this.jitterMs);
+      if (wanted > this.targetDelayMs) this.targetDelayMs = wanted;
+    }
+    this.lastArrival = t;
+    this.lastChunkMs = chunkMs;
+    this._append(pcm);
+
+    if (this.state === 'playing' && this.playEndsAt < t) {
+      // Queue ran dry before this chunk arrived: rebuffer with a deeper target
+      this._metrics.underruns++;
+      this._metrics.underrunMs += t - this.playEndsAt;
+      this.turnUnderruns++;
+      this.targetDelayMs = Math.min(this.opts.maxDelayMs, this.targetDelayMs * this.opts.underrunBackoff);
+      this.state = 'buffering';
+      this.firstChunkAt = t;
+    }
+    this._pump(t);
+  }
+
+  // Provider finished the turn: play out whatever is buffered now
+  endTurn() {
+    if (this.state === 'cancelled') {
+      this.state = 'idle';
+      return;
+    }
+    if (this.state === 'buffering') this._start(this.now());
+    else if (this.pendingBytes) this._flush(this.now());
+    if (this.state !== 'idle' && !this.turnUnderruns) {
+      this.targetDelayMs = Math.max(
+        this.opts.minDelayMs + this.opts.jitterGain * this.jitterMs,
+        this.targetDelayMs * this.opts.decay,
+        this.opts.minDelayMs,
+      );
+    }
+    this.state = 'idle';
+  }
+
+  // Barge-in: drop everything queued for the current turn
+  cancel() {
+    const t = this.now();
+    const queuedMs = Math.max(0, this.playEndsAt - t) + this.pendingBytes / this.bytesPerMs;
+    if (this.state === 'buffering' || this.state === 'playing' || queuedMs > 0) {
+      this._metrics.bargeIns++;
+      this._metrics.discardedMs += queuedMs;
+    }
+    this._clearTimer();
+    this.pendingBytes = 0;
+    this.playEndsAt = t;
+    this.playback.clear();
+    this.state = this.state === 'idle' ? 'idle' : 'cancelled';
+  }
+
+  close() {
+    this._clearTimer();
+    this.pendingBytes = 0;
+    this.state = 'idle';
+  }
+
+  _append(pcm) {
+    const need = this.pendingBytes + pcm.length;
+    if (need > this.pending.length) {
+      let size = this.pending.length * 2;
+      while (size < need) size *= 2;
+      const grown = new Uint8Array(size);
+      grown.set(this.pending.subarray(0, this.pendingBytes));
+      this.pending = grown;
+    }
+    this.pending.set(pcm, this.pendingBytes);
+    this.pendingBytes = need;
+  }
+
+  _pump(t) {
+    const pendingMs = this.pendingBytes / this.bytesPerMs;
+    if (this.state === 'buffering') {
+      if (pendingMs >= this.targetDelayMs || t - this.firstChunkAt >= this.targetDelayMs) {
+        this._start(t);
+      } else {
+        this._arm(this.targetDelayMs - (t - this.firstChunkAt), () => this._start(this.now()));
+      }
+      return;
+    }
+    const queuedMs = Math.max(0, this.playEndsAt - t);
+    if (pendingMs >= this.opts.coalesceMs || queuedMs <= this.opts.coalesceMs) {
+      this._flush(t);
+    } else {
+      // Hold the remainder until the queue gets low
+      this._arm(queuedMs - this.opts.coalesceMs, () => this._flush(this.now()));
+    }
+  }
+
+  _start(t) {
+    if (this.state !== 'buffering') return;
+    const m = this._metrics;
+    if (this.turnUnderruns === 0) {
+      m._startDelaySum += t - this.firstChunkAt;
+      m._startCount++;
+      if (this.expectedAt !== null) {
+        m.lastResponseMs = Math.round(t - this.expectedAt);
+        m._responseSum += t - this.expectedAt;
+        m._responseCount++;
+        this.expectedAt = null;
+      }
+    }
+    this.state = 'playing';
+    this._flush(t);
+  }
+
+  _flush(t) {
+    this._clearTimer();
+    const bytes = this.pendingBytes & ~1;
+    if (!bytes) return;
+    this.playback.push(this.pending.subarray(0, bytes));
+    this._metrics.pushes++;
+    this.playEndsAt = Math.max(this.playEndsAt, t) + bytes / this.bytesPerMs;
+    if (this.pendingBytes > bytes) this.pending[0] = this.pending[bytes];
+    this.pendingBytes -= bytes;
+  }
+
+  _arm(ms, fn) {
+    this._clearTimer();
+    this.timer = this.setTimer(() => { this.timer = null; fn(); }, Math.max(0, ms));
+  }
+
+  _clearTimer() {
+    if (this.timer) { this.clearTimer(this.timer); this.timer = null; }
+  }
+}
@@ -3,15 +3,40 @@
 // The rest of the app just calls callAI({ tier }) and gets a response.
 
 import { buildProviderChain, SESSION_TIER_MAP, getAllProviders, PROVIDERS } from './providers.js';
-import { callWithFallback, ensureFreshToken } from './provider.js';
+import { callWithFallback, callHedged, observeSSE, ensureFreshToken, HEDGE_DEFAULTS, ttftKey, rankChain } from './provider.js';
+import { createTtftHistogram, recordTtft, ttftPercentile, classifyError } from './latency.js';
 import { calculateCost } from './usage.js';
-import { getSetting, getConnection, updateAccessToken, storeUsage } from './db.js';
+import { getSetting, getConnection, updateAccessToken, storeUsage, storeLatency, rollupProviderLatency } from './db.js';
 
 export async function createProviderManager(db) {
   const chains = {};          // { basic: [...], standard: [...], reasoning: [...] }
   let allConnections = [];    // cached connections from init
   let allProviders = PROVIDERS;
-  let _callFn = callWithFallback;  // swappable for tests
+  let _callFn = null;         // swappable for tests
+  let hedge = null;           // { delayMs, fanout } when hedged racing is on (opt-in)
+  const ttft = new Map();     // providerId:model → TTFT histogram
+  const pendingWrites = new Set();
+
+  // A cancelled loser never streamed: its TTFT is censored, at least as long
+  // as it raced and no better than the winner's, so that is what it records.
+  // Providers that keep losing sink instead of staying unmeasured in place.
+  function recordTiming(entry, { outcome, ms }, winnerMs) {
+    const key = ttftKey(entry);
+    if (!ttft.has(key)) ttft.set(key, createTtftHistogram());
+    const h = ttft.get(key);
+    if (outcome === 'error') h.failures++;
+    else if (outcome === 'cancelled') recordTtft(h, Math.max(ms, winnerMs ?? 0));
+    else recordTtft(h, ms);
+  }
+
+  // Latency telemetry writes never block or fail a call
+  function persistLatency(row) {
+    if (!db) return;
+    const write = storeLatency(db, row)
+      .catch(e => console.error('[ProviderManager] latency telemetry failed:', e))
+      .finally(() => pendingWrites.delete(write));
+    pendingWrites.add(write);
+  }
 
   function notifyStatusBar() {
     if (typeof window !== 'undefined') window.dispatchEvent(new Event('statusbar-refresh'));
@@ -50,6 +75,11 @@ export async function createProviderManager(db) {
         }
       }
 
+      // Hedged racing: setting ai_hedge = {"enabled":true,"delayMs":400,"fanout":2}
+      let hedgeCfg = null;
+      try { hedgeCfg = JSON.parse(await getSetting(db, 'ai_hedge') || 'null'); } catch {}
+      hedge = hedgeCfg?.enabled ? { ...HEDGE_DEFAULTS, ...hedgeCfg } : null;
+
       // Build chains for all 3 tiers
       for (const tier of ['basic', 'standard', 'reasoning']) {
         const chain = buildProviderChain(enabledIds, allConnections, tier, allProviders);
@@ -57,13 +87,55 @@ export async function createProviderManager(db) {
         chains[tier] = chain;
       }
 
+      try { await rollupProviderLatency(db); } catch (e) { console.error('[ProviderManager] latency rollup failed:', e); }
+
       notifyProvider();
     },
 
-    async callAI({ system, messages, tier = 'standard' }) {
+    async callAI({ system, messages, tier = 'standard', sessionType = 'chat' }) {
       const chain = chains[tier] || chains.standard;
       if (!chain?.length) throw new Error(`No providers available for tier: ${tier}`);
-      const result = await _callFn(chain, { system, messages });
+      const calledAt = Date.now();
+      const hedged = !!hedge;
+      let hops = 0;
+      let raceTtftMs = null;  // hedged winners are timed while racing
+      const onTiming = (entry, t) => {
+        if (t.outcome === 'first_token') raceTtftMs = t.ms;  // reported before the losers
+        if (hedged) recordTiming(entry, t, raceTtftMs);
+        if (t.outcome !== 'error') return;
+        hops++;
+        persistLatency({
+          provider: entry.providerId, model: entry.model, sessionType, hedged,
+          durationMs: t.ms, errorClass: classifyError(t),
+        });
+      };
+      const result = hedged
+        ? await (_callFn || callHedged)(rankChain(chain, ttft), { system, messages }, {
+          delayMs: hedge.delayMs, fanout: hedge.fanout, onTiming,
+        })
+        : await (_callFn || callWithFallback)(chain, { system, messages }, { onTiming });
+
+      // Served-call telemetry: TTFT and duration from this provider's own
+      // request start; hops = attempts that failed before it
+      const served = result.provider || {};
+      const row = { provider: served.providerId, model: served.model, sessionType, hedged, hops };
+      const startedAt = result.startedAt || calledAt;
+      if (!result.response?.ok) {
+        persistLatency({ ...row, durationMs: Date.now() - startedAt, errorClass: classifyError({ status: result.response?.status }) });
+      } else if (result.response.body?.getReader) {
+        let ttftMs = null;
+        let outputTokens = null;
+        result.response = observeSSE(result.response, {
+          onToken: () => { ttftMs = raceTtftMs ?? Date.now() - startedAt; },
+          onUsage: (u) => { outputTokens = u.output_tokens ?? null; },
+          onEnd: (err) => persistLatency({
+            ...row, ttftMs, outputTokens, durationMs: Date.now() - startedAt,
+            errorClass: err ? classifyError({ stream: true }) : null,
+          }),
+        });
+      } else {
+        persistLatency({ ...row, durationMs: Date.now() - startedAt });
+      }
 
       // Auto-persist refreshed tokens
       const conn = result.provider?.connection;
@@ -132,6 +204,22 @@ export async function createProviderManager(db) {
       return { ...creds, ...extra };
     },
 
+    // Per-provider TTFT summary from hedged calls: { 'id:model': { samples, failures, p50, p90 } }
+    ttftStats() {
+      const out = {};
+      for (const [key, h] of ttft) {
+        out[key] = { samples: h.samples, failures: h.failures, p50: ttftPercentile(h, 0.5), p90: ttftPercentile(h, 0.9) };
+      }
+      return out;
+    },
+
+    get hedging() { return hedge; },
+
+    // Resolves once queued latency telemetry rows are written
+    async flushTelemetry() {
+      await Promise.all([...pendingWrites]);
+    },
+
     get primary() {
       const chain = chains.standard || chains.basic || chains.reasoning;
       if (!chain?.length) return null;
@@ -1,6 +1,9 @@
 // AI provider abstraction — routes calls to the right proxy, with cost-sorted fallback
 // Pure functions (translate*, parse*) are testable without fetch
 import { PROVIDERS } from './providers.js';
+import { ttftPercentile } from './latency.js';
+
+export { TTFT_BUCKETS_MS, createTtftHistogram, recordTtft, ttftPercentile } from './latency.js';
 
 // --- Helpers ---
 
@@ -97,7 +100,7 @@ export async function ensureFreshToken(tokenData) {
 
 const GEMINI_API_BASE = 'https://generativelanguage.googleapis.com/v1beta';
 
-async function callGeminiBrowser(model, system, messages, connection) {
+async function callGeminiBrowser(model, system, messages, connection, signal) {
   const { systemInstruction, contents } = translateToGeminiFormat(system, messages);
   const token = connection?.refresh_token
     ? await ensureFreshToken(connection)
@@ -118,6 +121,7 @@ async function callGeminiBrowser(model, system, messages, connection) {
     method: 'POST',
     headers,
     body: JSON.stringify({ systemInstruction, contents }),
+    signal,
   });
 
   if (!apiResponse.ok) return apiResponse;
@@ -159,13 +163,13 @@ async function callGeminiBrowser(model, system, messages, connection) {
 
 // --- Single provider call ---
 
-async function callSingleProvider(entry, { system, messages }) {
+async function callSingleProvider(entry, { system, messages }, signal) {
   const { providerId, model, endpoint, connection } = entry;
   const p = PROVIDERS[providerId];
 
   // Browser-direct: Gemini with a connection token bypasses server proxy entirely
   if (providerId === 'gemini' && connection?.access_token) {
-    return callGeminiBrowser(model, system, messages, connection);
+    return callGeminiBrowser(model, system, messages, connection, signal);
   }
 
   // Anthropic-compatible endpoints get structured blocks; others get flat string
@@ -192,29 +196,252 @@ async function callSingleProvider(entry, { system, messages }) {
     method: 'POST',
     headers: { 'Content-Type': 'application/json' },
     body: JSON.stringify(body),
+    signal,
   });
 }
 
 // --- Fallback chain: try each provider, skip on 429/503 ---
+// onTiming(entry, { outcome: 'error', ms, status | error }) reports each skipped entry;
+// startedAt in the result is when the returned provider's request began
 
-export async function callWithFallback(chain, { system, messages }) {
+export async function callWithFallback(chain, { system, messages }, { onTiming } = {}) {
   let lastError = null;
   for (const entry of chain) {
+    const startedAt = Date.now();
     try {
       const response = await callSingleProvider(entry, { system, messages });
-      if (response.ok) return { response, provider: entry };
+      if (response.ok) return { response, provider: entry, startedAt };
       if (response.status === 429 || response.status === 503) {
         lastError = { status: response.status, provider: entry.providerId };
+        if (onTiming) onTiming(entry, { outcome: 'error', ms: Date.now() - startedAt, status: response.status });
         continue;
       }
-      return { response, provider: entry };
+      return { response, provider: entry, startedAt };
     } catch (err) {
       lastError = { error: err.message, provider: entry.providerId };
+      if (onTiming) onTiming(entry, { outcome: 'error', ms: Date.now() - startedAt, error: err.message });
     }
   }
   throw new Error(`All providers failed: ${JSON.stringify(lastError)}`);
 }
 
+// --- Hedged race: stagger the top providers, keep the first to stream ---
+// Opt-in alternative to callWithFallback. The first entry starts at once; each
+// hedge delay without a first token starts the next, up to `fanout` racing.
+// A 429/503/throw starts the next entry straight away. The first response to
+// yield a { text } chunk wins and every other attempt is aborted.
+// onTiming(entry, { outcome, ms }) reports 'first_token' (ms = TTFT),
+// 'cancelled' (ms = time raced before losing, a lower bound) and 'error'
+// (with the failing status or error message, as callWithFallback does).
+
+export const HEDGE_DEFAULTS = { delayMs: 400, fanout: 2 };
+
+function isTokenLine(line) {
+  if (!line.startsWith('data: ')) return false;
+  try { return !!JSON.parse(line.slice(6)).text; } catch { return false; }
+}
+
+// Read a normalized SSE response up to its first { text } chunk (or the end of
+// the stream), then return an equivalent Response that replays what was read.
+export async function waitForFirstToken(response) {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  const head = [];
+  let buffer = '';
+  let ended = false;
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) { ended = true; break; }
+    head.push(value);
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split('\n');
+    buffer = lines.pop();
+    if (lines.some(isTokenLine)) break;
+  }
+  const body = new ReadableStream({
+    start(controller) {
+      for (const chunk of head) controller.enqueue(chunk);
+      if (ended) controller.close();
+    },
+    async pull(controller) {
+      const { done, value } = await reader.read();
+      if (done) controller.close();
+      else controller.enqueue(value);
+    },
+    cancel(reason) { return reader.cancel(reason); },
+  });
+  return new Response(body, { status: response.status, statusText: response.statusText, headers: response.headers });
+}
+
+export function callHedged(chain, { system, messages }, { delayMs = HEDGE_DEFAULTS.delayMs, fanout = HEDGE_DEFAULTS.fanout, onTiming } = {}) {
+  return new Promise((resolve, reject) => {
+    const attempts = [];     // { entry, controller, startedAt }
+    let next = 0;
+    let running = 0;
+    let settled = false;
+    let timer = null;
+    let lastError = null;
+    let heldResponse = null; // first non-retryable error response, returned if nothing wins
+
+    const report = (entry, outcome, ms, detail) => {
+      if (onTiming) try { onTiming(entry, { outcome, ms, ...detail }); } catch {}
+    };
+
+    const finish = () => {
+      clearTimeout(timer);
+      if (heldResponse) return resolve(heldResponse);
+      reject(new Error(`All providers failed: ${JSON.stringify(lastError)}`));
+    };
+
+    const armHedge = () => {
+      clearTimeout(timer);
+      if (next >= chain.length || running >= fanout) return;
+      timer = setTimeout(() => { if (!settled) launch(); }, delayMs);
+    };
+
+    const failed = (attempt, error) => {
+      running--;
+      attempt.done = true;
+      lastError = error;
+      const { provider, ...detail } = error;
+      report(attempt.entry, 'error', Date.now() - attempt.startedAt, detail);
+      if (settled) return;
+      if (next < chain.length) launch();
+      else if (running === 0) { settled = true; finish(); }
+    };
+
+    const win = (attempt, response) => {
+      settled = true;
+      clearTimeout(timer);
+      report(attempt.entry, 'first_token', Date.now() - attempt.startedAt);
+      for (const other of attempts) {
+        if (other === attempt || other.done) continue;
+        other.done = true;
+        other.controller.abort();
+        report(other.entry, 'cancelled', Date.now() - other.startedAt);
+      }
+      resolve({ response, provider: attempt.entry, startedAt: attempt.startedAt });
+    };
+
+    async function launch() {
+      const entry = chain[next++];
+      const attempt = { entry, controller: new AbortController(), startedAt: Date.now(), done: false };
+      attempts.push(attempt);
+      running++;
+      armHedge();
+      try {
+        const response = await callSingleProvider(entry, { system, messages }, attempt.controller.signal);
+        if (attempt.done) return;
+        if (!response.ok) {
+          if (response.status !== 429 && response.status !== 503 && !heldResponse) {
+            heldResponse = { response, provider: entry };
+          }
+          return failed(attempt, { status: response.status, provider: entry.providerId });
+        }
+        const streamed = await waitForFirstToken(response);
+        if (attempt.done) return streamed.body.cancel().catch(() => {});
+        attempt.done = true;
+        running--;
+        win(attempt, streamed);
+      } catch (err) {
+        if (!attempt.done) failed(attempt, { error: err.message, provider: entry.providerId });
+      }
+    }
+
+    if (!chain.length) return finish();
+    launch();
+  });
+}
+
+// --- Stream observation (latency telemetry) ---
+// Pass a normalized SSE response through unchanged while reporting the first
+// { text } chunk, the { usage } chunk and how the stream ended:
+// onEnd(null) on completion or cancel, onEnd(err) when the body errors.
+
+export function observeSSE(response, { onToken, onUsage, onEnd } = {}) {
+  if (!response?.body?.getReader) return response;
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let sawToken = false;
+  let ended = false;
+  const end = (err) => {
+    if (ended) return;
+    ended = true;
+    if (onEnd) onEnd(err);
+  };
+  const scan = (text) => {
+    buffer += text;
+    const lines = buffer.split('\n');
+    buffer = lines.pop();
+    for (const line of lines) {
+      if (!line.startsWith('data: ') || line === 'data: [DONE]') continue;
+      let parsed;
+      try { parsed = JSON.parse(line.slice(6)); } catch { continue; }
+      if (parsed.text && !sawToken) { sawToken = true; if (onToken) onToken(); }
+      else if (parsed.usage && onUsage) onUsage(parsed.usage);
+    }
+  };
+  const body = new ReadableStream({
+    async pull(controller) {
+      let result;
+      try {
+        result = await reader.read();
+      } catch (err) {
+        end(err);
+        controller.error(err);
+        return;
+      }
+      if (result.done) {
+        scan(decoder.decode());
+        end(null);
+        controller.close();
+        return;
+      }
+      scan(decoder.decode(result.value, { stream: true }));
+      controller.enqueue(result.value);
+    },
+    cancel(reason) {
+      end(null);
+      return reader.cancel(reason);
+    },
+  });
+  return new Response(body, { status: response.status, statusText: response.statusText, headers: response.headers });
+}
+
+// --- TTFT histograms for adaptive chain ordering ---
+// Histograms (see latency.js) are keyed by providerId:model.
+
+export const TTFT_MIN_SAMPLES = 5;
+
+export function ttftKey(entry) {
+  return `${entry.providerId}:${entry.model}`;
+}
+
+// Reorder a chain by observed median TTFT. Entries with too few samples keep
+// their (cost-sorted) slot; measured entries are sorted among their own slots,
+// with each recorded failure counted as one extra maximum-bucket sample.
+export function rankChain(chain, histograms) {
+  const score = (entry) => {
+    const h = histograms.get(ttftKey(entry));
+    if (!h || h.samples + h.failures < TTFT_MIN_SAMPLES) return null;
+    if (!h.samples) return Infinity;
+    const p50 = ttftPercentile(h, 0.5);
+    return p50 * (1 + h.failures / h.samples);
+  };
+  const slots = [];
+  const measured = [];
+  chain.forEach((entry, i) => {
+    const s = score(entry);
+    if (s !== null) { slots.push(i); measured.push({ entry, s }); }
+  });
+  const ranked = chain.slice();
+  measured.sort((a, b) => a.s - b.s);
+  slots.forEach((slot, k) => { ranked[slot] = measured[k].entry; });
+  ranked._tier = chain._tier;
+  return ranked;
+}
+
 // --- Legacy single-provider call (backward compat) ---
 
 export async function callProvider(provider, { system, messages, model, accessToken }) {
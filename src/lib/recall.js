@@ -1,4 +1,5 @@
 // Subconscious Memory Recall — Keyword-based search for memories and past conversations
+// FTS5 + BM25 where available (see ensureFullTextIndex in db.js), LIKE scan otherwise
 const STOPWORDS = new Set([
   'the', 'and', 'but', 'for', 'not', 'you', 'all', 'can', 'had', 'her', 'was',
   'one', 'our', 'out', 'are', 'has', 'his', 'how', 'its', 'may', 'new', 'now',
@@ -33,9 +34,34 @@ export function buildRecallQuery(session) {
   const combined = parts.join(' ');
   return combined.slice(0, 500);
 }
-// Search memories by keywords
+// FTS5 MATCH expression: any keyword, prefix-matched (dentist → dentists)
+export function buildMatchQuery(keywords) {
+  return keywords.map(kw => `"${kw.replace(/"/g, '')}"*`).join(' OR ');
+}
+// FTS5 tables are created by ensureSchema when the engine supports them
+const _ftsTables = new WeakMap();
+async function hasFts(db, table) {
+  let tables = _ftsTables.get(db);
+  if (!tables) {
+    const rows = await db.prepare("SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE '%_fts'").all();
+    tables = new Set(rows.map(r => r.name));
+    _ftsTables.set(db, tables);
+  }
+  return tables.has(`${table}_fts`);
+}
+// Search memories by keywords, best BM25 match first
 export async function searchMemories(db, keywords, limit = 5) {
   if (!keywords || keywords.length === 0) return [];
+  if (await hasFts(db, 'memories')) {
+    return db.prepare(`
+      SELECT m.id, m.content, m.type, m.project, m.person FROM memories_fts
+      JOIN memories m ON m.id = memories_fts.rowid
+      WHERE memories_fts MATCH ?
+        AND m.superseded_by IS NULL
+        AND m.type NOT IN ('blocker', 'commitment', 'waiting_for')
+      ORDER BY bm25(memories_fts) LIMIT ?
+    `).all(buildMatchQuery(keywords), limit);
+  }
   const conditions = keywords.map(() => 'content LIKE ?').join(' OR ');
   const sql = `
     SELECT id, content, type, project, person FROM memories
@@ -48,9 +74,18 @@ export async function searchMemories(db, keywords, limit = 5) {
   const results = await db.prepare(sql).all(...params);
   return results;
 }
-// Search past conversations by keywords
+// Search past conversations by keywords, best BM25 match first
 export async function searchConversations(db, keywords, limit = 3) {
   if (!keywords || keywords.length === 0) return [];
+  if (await hasFts(db, 'conversations')) {
+    return db.prepare(`
+      SELECT c.id, c.session_type, c.started_at, c.summary FROM conversations_fts
+      JOIN conversations c ON c.id = conversations_fts.rowid
+      WHERE conversations_fts MATCH ?
+        AND c.ended_at IS NOT NULL AND c.summary IS NOT NULL
+      ORDER BY bm25(conversations_fts) LIMIT ?
+    `).all(buildMatchQuery(keywords), limit);
+  }
   const conditions = keywords.map(() => 'summary LIKE ?').join(' OR ');
   const sql = `
     SELECT id, session_type, started_at, summary FROM conversations
@@ -1,7 +1,7 @@
 // Routines Engine — Atomic Habits features: formatting, stacking, analytics, progression
 // Builds on routines.js CRUD layer
 //
-import { getDueRoutines, calcStreak } from './routines.js';
+import { getDueRoutines, calcStreak, computeRoutineStats, getRoutineStats, STATS_WINDOW } from './routines.js';
 //
 export function formatHabitForMeeting(routine, completions, frequency, days) {
   const parts = [routine.name];
@@ -54,52 +54,36 @@ export async function getRoutinesForMeeting(db, meetingType, date) {
   return due;
 }
 //
-export async function getHabitAnalytics(db, routineId, days = 30) {
-  const routine = await db.prepare('SELECT * FROM routines WHERE id = ?').get(routineId);
+// The default 30-day window is served from routine_stats; other windows
+// are computed from completions on the spot
+export async function getHabitAnalytics(db, routineId, days = STATS_WINDOW) {
+  const routine = await db.prepare('SELECT id, frequency, days FROM routines WHERE id = ?').get(routineId);
   if (!routine) return null;
-  const cutoff = new Date(Date.now() - days * 86400000).toISOString().slice(0, 10);
-  const completions = await db.prepare(
-    'SELECT completed_date, quality, used_two_min FROM completions WHERE routine_id = ? AND completed_date >= ? ORDER BY completed_date'
-  ).all(routineId, cutoff);
-  // Count applicable days
-  const dayNames = ['sun', 'mon', 'tue', 'wed', 'thu', 'fri', 'sat'];
-  const completionSet = new Set(completions.map(c => c.completed_date));
-  const dayCount = {};
-  let applicableDays = 0;
-  for (let i = 0; i < days; i++) {
-    const d = new Date(Date.now() - i * 86400000);
-    const ds = d.toISOString().slice(0, 10);
-    const dn = dayNames[d.getDay()];
-    let isApplicable = true;
-    if (routine.frequency === 'weekdays' && ['sat', 'sun'].includes(dn)) isApplicable = false;
-    if (routine.frequency === 'weekends' && !['sat', 'sun'].includes(dn)) isApplicable = false;
-    if (routine.frequency === 'weekly' && routine.days) {
-      const routineDays = JSON.parse(routine.days);
-      if (!routineDays.includes(dn)) isApplicable = false;
-    }
-    if (isApplicable) {
-      applicableDays++;
-      dayCount[dn] = (dayCount[dn] || 0) + 1;
-      if (!completionSet.has(ds)) dayCount[dn + '_missed'] = (dayCount[dn + '_missed'] || 0) + 1;
-    }
+  let stats;
+  if (days === STATS_WINDOW) {
+    stats = (await getRoutineStats(db, [routine])).get(routine.id);
+  } else {
+    const cutoff = new Date(Date.now() - days * 86400000).toISOString().slice(0, 10);
+    const completions = await db.prepare(
+      'SELECT completed_date, quality, used_two_min FROM completions WHERE routine_id = ? AND completed_date >= ? ORDER BY completed_date'
+    ).all(routineId, cutoff);
+    stats = computeRoutineStats(routine, completions, days);
   }
-  const completionRate = applicableDays > 0 ? completions.length / applicableDays : 0;
-  // Streak
-  const allDates = completions.map(c => c.completed_date);
-  const streak = calcStreak(allDates, routine.frequency, routine.days);
-  // Average quality
-  const rated = completions.filter(c => c.quality != null);
-  const avgQuality = rated.length ? rated.reduce((s, c) => s + c.quality, 0) / rated.length : null;
-  // Two-min rate
-  const twoMinCount = completions.filter(c => c.used_two_min).length;
-  const twoMinRate = completions.length > 0 ? twoMinCount / completions.length : 0;
+  return analyticsFromStats(stats);
+}
+//
+function analyticsFromStats(stats) {
+  const { applicableDays, completions, qualitySum, qualityCount, twoMinCount, dayCounts, streak } = stats;
+  const completionRate = applicableDays > 0 ? completions / applicableDays : 0;
+  const avgQuality = qualityCount ? qualitySum / qualityCount : null;
+  const twoMinRate = completions > 0 ? twoMinCount / completions : 0;
   // Weak days (highest miss rate)
-  const weakDays = Object.entries(dayCount)
-    .filter(([k]) => !k.includes('_missed') && dayCount[k + '_missed'])
-    .sort((a, b) => (dayCount[b[0] + '_missed'] || 0) / b[1] - (dayCount[a[0] + '_missed'] || 0) / a[1])
+  const weakDays = Object.entries(dayCounts)
+    .filter(([k]) => !k.includes('_missed') && dayCounts[k + '_missed'])
+    .sort((a, b) => (dayCounts[b[0] + '_missed'] || 0) / b[1] - (dayCounts[a[0] + '_missed'] || 0) / a[1])
     .slice(0, 2)
     .map(([day]) => day);
-  return { completionRate, streak, avgQuality, twoMinRate, weakDays, totalCompletions: completions.length, applicableDays };
+  return { completionRate, streak, avgQuality, twoMinRate, weakDays, totalCompletions: completions, applicableDays };
 }
 //
 export async function suggestProgression(db, routineId) {
@@ -46,6 +46,45 @@ export function calcStreak(completionDates, frequency, days) {
   return streak;
 }
 //
+// Window aggregates for one routine: the `days` days ending today, the same
+// walk getHabitAnalytics has always done. completions: rows with
+// completed_date / quality / used_two_min (extra older rows are ignored
+// for the window but still count toward the streak).
+export function computeRoutineStats(routine, completions, days = STATS_WINDOW) {
+  const cutoff = new Date(Date.now() - days * 86400000).toISOString().slice(0, 10);
+  const inWindow = completions.filter(c => c.completed_date >= cutoff);
+  const completionSet = new Set(inWindow.map(c => c.completed_date));
+  const dayCounts = {};
+  let applicableDays = 0;
+  for (let i = 0; i < days; i++) {
+    const d = new Date(Date.now() - i * 86400000);
+    const ds = d.toISOString().slice(0, 10);
+    const dn = DAY_NAMES[d.getDay()];
+    if (!isApplicableDay(routine, dn)) continue;
+    applicableDays++;
+    dayCounts[dn] = (dayCounts[dn] || 0) + 1;
+    if (!completionSet.has(ds)) dayCounts[dn + '_missed'] = (dayCounts[dn + '_missed'] || 0) + 1;
+  }
+  const rated = inWindow.filter(c => c.quality != null);
+  return {
+    windowDays: days,
+    applicableDays,
+    completions: inWindow.length,
+    qualitySum: rated.reduce((s, c) => s + c.quality, 0),
+    qualityCount: rated.length,
+    twoMinCount: inWindow.filter(c => c.used_two_min).length,
+    dayCounts,
+    streak: calcStreak(completions.map(c => c.completed_date), routine.frequency, routine.days),
+  };
+}
+//
+function isApplicableDay(routine, dn) {
+  if (routine.frequency === 'weekdays' && ['sat', 'sun'].includes(dn)) return false;
+  if (routine.frequency === 'weekends' && !['sat', 'sun'].includes(dn)) return false;
+  if (routine.frequency === 'weekly' && routine.days && !JSON.parse(routine.days).includes(dn)) return false;
+  return true;
+}
+//
 // --- Database operations ---
 //
 function defaultKind(frequency) {
@@ -100,13 +139,10 @@ export async function getDueRoutines(db, date) {
   const completed = new Set(completedRows.map(r => r.routine_id));
   const due = rows.filter(r => isDue(r, dayName, date) && !completed.has(r.id));
   const upcoming = rows.filter(r => !due.includes(r) && isUpcoming(r, date));
-  // Calculate streaks for habits
-  const habits = [];
-  for (const r of due.filter(r => r.kind === 'habit')) {
-    const dates = await db.prepare('SELECT completed_date FROM completions WHERE routine_id = ?').all(r.id);
-    const streak = calcStreak(dates.map(c => c.completed_date), r.frequency, r.days);
-    habits.push({ ...r, streak });
-  }
+  // Streaks for habits, from routine_stats
+  const dueHabits = due.filter(r => r.kind === 'habit');
+  const stats = await getRoutineStats(db, dueHabits);
+  const habits = dueHabits.map(r => ({ ...r, streak: stats.get(r.id)?.streak || 0 }));
   const reminders = due.filter(r => r.kind === 'reminder');
   const events = due.filter(r => r.kind === 'event');
   return { habits, reminders, events, upcoming };
@@ -121,6 +157,7 @@ export async function completeRoutine(db, routineId, opts = {}) {
     await db.prepare(
       'INSERT INTO completions (routine_id, completed_date, completed_at, notes, quality, quantity, used_two_min) VALUES (?,?,?,?,?,?,?)'
     ).run(routineId, date, now, opts.notes || null, opts.quality || null, opts.quantity || null, opts.used_two_min ? 1 : 0);
+    await applyCompletionToStats(db, routineId, date, 1, { quality: opts.quality || null, used_two_min: opts.used_two_min ? 1 : 0 });
   }
   // Deactivate once-frequency routines
   const routine = await db.prepare('SELECT frequency FROM routines WHERE id = ?').get(routineId);
@@ -129,11 +166,19 @@ export async function completeRoutine(db, routineId, opts = {}) {
   }
 }
 //
+export async function uncompleteRoutine(db, routineId, date) {
+  const row = await db.prepare(
+    'SELECT id, quality, used_two_min FROM completions WHERE routine_id = ? AND completed_date = ?'
+  ).get(routineId, date);
+  if (!row) return false;
+  await db.prepare('DELETE FROM completions WHERE id = ?').run(row.id);
+  await applyCompletionToStats(db, routineId, date, -1, row);
+  return true;
+}
+//
 export async function getStreak(db, routineId) {
-  const routine = await db.prepare('SELECT frequency, days FROM routines WHERE id = ?').get(routineId);
-  if (!routine) return 0;
-  const dates = await db.prepare('SELECT completed_date FROM completions WHERE routine_id = ?').all(routineId);
-  return calcStreak(dates.map(c => c.completed_date), routine.frequency, routine.days);
+  const stats = await getRoutineStats(db, [routineId]);
+  return stats.get(routineId)?.streak || 0;
 }
 //
 export async function pauseRoutine(db, id) {
@@ -145,6 +190,7 @@ export async function resumeRoutine(db, id) {
 }
 //
 export async function removeRoutine(db, id) {
+  await db.prepare('DELETE FROM routine_stats WHERE routine_id = ?').run(id);
   await db.prepare('DELETE FROM completions WHERE routine_id = ?').run(id);
   await db.prepare('DELETE FROM routines WHERE id = ?').run(id);
 }
@@ -170,4 +216,114 @@ export async function updateRoutine(db, id, changes) {
   params.push(new Date().toISOString());
   params.push(id);
   await db.prepare(`UPDATE routines SET ${sets.join(', ')} WHERE id = ?`).run(...params);
+  // A schedule change alters which days count; re-derive on next read
+  if ('frequency' in changes || 'days' in changes) {
+    await db.prepare('DELETE FROM routine_stats WHERE routine_id = ?').run(id);
+  }
+}
+//
+// --- Materialized stats (routine_stats) ---
+//
+// One row per routine describing the STATS_WINDOW days ending at as_of, plus
+// the current streak. completeRoutine/uncompleteRoutine apply a completion
+// dated today as a delta on a fresh row; anything else (a backfilled date,
+// a schedule edit, a new day) re-derives just that routine from its last
+// year of completions. Readers cost one indexed lookup per routine.
+export const STATS_WINDOW = 30;
+const STREAK_HORIZON = 366; // calcStreak looks back at most 365 days
+//
+function statsFromRow(row) {
+  return {
+    windowDays: row.window_days,
+    applicableDays: row.applicable_days,
+    completions: row.completions,
+    qualitySum: row.quality_sum,
+    qualityCount: row.quality_count,
+    twoMinCount: row.two_min_count,
+    dayCounts: JSON.parse(row.day_counts || '{}'),
+    streak: row.streak,
+  };
+}
+//
+async function writeRoutineStats(db, routineId, asOf, st) {
+  await db.prepare(
+    `INSERT OR REPLACE INTO routine_stats
+      (routine_id, as_of, window_days, applicable_days, completions, quality_sum, quality_count, two_min_count, day_counts, streak, updated_at)
+     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`
+  ).run(routineId, asOf, st.windowDays, st.applicableDays, st.completions, st.qualitySum, st.qualityCount,
+    st.twoMinCount, JSON.stringify(st.dayCounts), st.streak, new Date().toISOString());
+}
+//
+// Re-derive one routine's row from its completions; returns the stats
+export async function refreshRoutineStats(db, routineOrId) {
+  const routine = typeof routineOrId === 'object'
+    ? routineOrId
+    : await db.prepare('SELECT id, frequency, days FROM routines WHERE id = ?').get(routineOrId);
+  if (!routine) return null;
+  const horizon = new Date(Date.now() - STREAK_HORIZON * 86400000).toISOString().slice(0, 10);
+  const completions = await db.prepare(
+    'SELECT completed_date, quality, used_two_min FROM completions WHERE routine_id = ? AND completed_date >= ? ORDER BY completed_date'
+  ).all(routine.id, horizon);
+  const stats = computeRoutineStats(routine, completions);
+  await writeRoutineStats(db, routine.id, new Date().toISOString().slice(0, 10), stats);
+  return stats;
+}
+//
+// Map of routine id → stats for the given routines (rows or ids), refreshing
+// any that are missing or from an earlier day
+export async function getRoutineStats(db, routines) {
+  const out = new Map();
+  if (!routines.length) return out;
+  const ids = routines.map(r => (typeof r === 'object' ? r.id : r));
+  const today = new Date().toISOString().slice(0, 10);
+  const rows = await db.prepare(
+    `SELECT * FROM routine_stats WHERE routine_id IN (${ids.map(() => '?').join(', ')})`
+  ).all(...ids);
+  const byId = new Map(rows.map(r => [r.routine_id, r]));
+  for (let i = 0; i < ids.length; i++) {
+    const row = byId.get(ids[i]);
+    if (row && row.as_of === today && row.window_days === STATS_WINDOW) out.set(ids[i], statsFromRow(row));
+    else {
+      const stats = await refreshRoutineStats(db, routines[i]);
+      if (stats) out.set(ids[i], stats);
+    }
+  }
+  return out;
+}
+//
+// Rebuild every routine's row (Settings → Rebuild Habit Stats)
+export async function rebuildRoutineStats(db) {
+  await db.exec('DELETE FROM routine_stats');
+  const routines = await db.prepare('SELECT id, frequency, days FROM routines').all();
+  for (const r of routines) await refreshRoutineStats(db, r);
+  return routines.length;
+}
+//
+// sign: +1 after inserting a completion, -1 after deleting one
+async function applyCompletionToStats(db, routineId, date, sign, completion) {
+  const now = new Date();
+  const today = now.toISOString().slice(0, 10);
+  const row = await db.prepare('SELECT * FROM routine_stats WHERE routine_id = ?').get(routineId);
+  if (!row || row.as_of !== today || row.window_days !== STATS_WINDOW || date !== today) {
+    await refreshRoutineStats(db, routineId);
+    return;
+  }
+  const routine = await db.prepare('SELECT frequency, days FROM routines WHERE id = ?').get(routineId);
+  const st = statsFromRow(row);
+  st.completions += sign;
+  if (completion.quality != null) {
+    st.qualitySum += sign * completion.quality;
+    st.qualityCount += sign;
+  }
+  if (completion.used_two_min) st.twoMinCount += sign;
+  // Today is the first day of the window walk: it flips between missed and done
+  const dn = DAY_NAMES[now.getDay()];
+  if (routine && isApplicableDay(routine, dn)) {
+    const missed = (st.dayCounts[dn + '_missed'] || 0) - sign;
+    if (missed > 0) st.dayCounts[dn + '_missed'] = missed;
+    else delete st.dayCounts[dn + '_missed'];
+  }
+  // calcStreak counts today first, then walks back: today adds or removes one
+  st.streak += sign;
+  await writeRoutineStats(db, routineId, today, st);
 }
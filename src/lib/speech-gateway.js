@@ -0,0 +1,198 @@
+// Clustered speech gateway for server.js (SPEECH_WORKERS=N | auto)
+// The primary process keeps Astro SSR and the HTTP listener. Each /ws/speech
+// upgrade is handed — raw socket plus request line/headers and any bytes read
+// past them — to one worker process, which completes the WebSocket handshake
+// and owns the connection for its whole life. Connections never move, so a
+// session's state stays on one event loop; the worker is picked by fewest
+// live sessions (last load report + hand-offs since). Processes rather than
+// worker_threads, because only processes can receive socket handles.
+//
+// Workers report load every reportMs, exited workers are respawned, and
+// shutdown stops hand-offs, gives sessions graceMs to end, then closes the
+// rest with 1001 (going away) so clients reconnect.
+import { availableParallelism } from 'node:os';
+import { monitorEventLoopDelay } from 'node:perf_hooks';
+import { createSpeechMetrics } from './speech-ws.js';
+import { createLogger } from './log.js';
+
+export const GATEWAY_DEFAULTS = { reportMs: 2000, graceMs: 10000, respawnMs: 1000 };
+
+const log = createLogger('speech-gateway');
+const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+// SPEECH_WORKERS → worker count; 0 keeps speech in the SSR process
+export function speechWorkerCount(value, cores = availableParallelism()) {
+  if (value === 'auto') return Math.max(1, cores - 1);
+  const n = parseInt(value, 10);
+  return n > 0 ? n : 0;
+}
+
+// Let sessions finish for up to graceMs, then close what is left with 1001
+export async function drainSpeechClients(wss, graceMs = GATEWAY_DEFAULTS.graceMs) {
+  const deadline = Date.now() + graceMs;
+  while (wss.clients.size && Date.now() < deadline) await sleep(100);
+  for (const ws of wss.clients) ws.close(1001, 'server shutting down');
+  const closeBy = Date.now() + 1000;
+  while (wss.clients.size && Date.now() < closeBy) await sleep(50);
+  for (const ws of wss.clients) ws.terminate();
+}
+
+// --- Primary ---
+
+// fork() → cluster Worker-like { process: { pid }, send(msg, handle, cb), on('message' | 'exit'), kill() }
+export function createSpeechGateway({ count, fork, respawnMs = GATEWAY_DEFAULTS.respawnMs, logger = log }) {
+  const slots = new Array(count).fill(null);
+  let closing = false;
+  let rr = 0;
+
+  function spawn(slot) {
+    const proc = fork();
+    const w = { slot, proc, pid: proc.process?.pid, ready: false, sessions: 0, handedOff: 0, load: null };
+    slots[slot] = w;
+    proc.on('message', (msg) => {
+      if (msg?.type === 'speech:ready') {
+        w.ready = true;
+      } else if (msg?.type === 'speech:load') {
+        w.load = msg.load;
+        w.sessions = msg.load.active;
+        w.handedOff = 0;
+      }
+    });
+    proc.on('exit', (code, signal) => {
+      if (slots[slot] === w) slots[slot] = null;
+      if (closing) return;
+      logger.warn('worker.exit', { slot, pid: w.pid, code, signal, sessions: w.sessions + w.handedOff });
+      setTimeout(() => { if (!closing && !slots[slot]) spawn(slot); }, respawnMs);
+    });
+    return w;
+  }
+
+  for (let slot = 0; slot < count; slot++) spawn(slot);
+
+  function pick() {
+    let best = null;
+    for (let i = 0; i < count; i++) {
+      const w = slots[(rr + i) % count];
+      if (!w?.ready) continue;
+      if (!best || w.sessions + w.handedOff < best.sessions + best.handedOff) best = w;
+    }
+    rr = (rr + 1) % count;
+    return best;
+  }
+
+  return {
+    // Hand an upgrade to a worker; false (and a 503) when none can take it.
+    // Clients send nothing before the 101 response, so `head` is the only
+    // data the primary has read from the socket.
+    handleUpgrade(req, socket, head) {
+      const w = closing ? null : pick();
+      if (!w) {
+        socket.end('HTTP/1.1 503 Service Unavailable\r\nConnection: close\r\nContent-Length: 0\r\n\r\n');
+        return false;
+      }
+      w.handedOff++;
+      const msg = {
+        type: 'speech:upgrade',
+        req: { method: req.method, url: req.url, headers: req.headers },
+        head: head?.length ? head.toString('base64') : '',
+      };
+      w.proc.send(msg, socket, (err) => {
+        if (!err) return;
+        w.handedOff--;
+        logger.warn('handoff.error', { slot: w.slot, error: err.message });
+        socket.destroy();
+      });
+      return true;
+    },
+
+    // Per-worker load as last reported, plus hand-offs not yet reflected
+    stats() {
+      const workers = slots.map((w, slot) => (w
+        ? { slot, pid: w.pid, ready: w.ready, sessions: w.sessions + w.handedOff, load: w.load }
+        : { slot, pid: null, ready: false, sessions: 0, load: null }));
+      return { workers, sessions: workers.reduce((s, w) => s + w.sessions, 0) };
+    },
+
+    // Drain every worker; kills stragglers graceMs + 2s after asking
+    // (SIGKILL: workers ignore SIGTERM so a group-wide one can't cut sessions)
+    async close({ graceMs = GATEWAY_DEFAULTS.graceMs } = {}) {
+      closing = true;
+      await Promise.all(slots.filter(Boolean).map(w => new Promise((resolve) => {
+        const timer = setTimeout(() => { w.proc.kill('SIGKILL'); resolve(); }, graceMs + 2000);
+        w.proc.on('exit', () => { clearTimeout(timer); resolve(); });
+        w.proc.send({ type: 'speech:shutdown', graceMs });
+      })));
+    },
+  };
+}
+
+// --- Worker ---
+
+// Runs inside a forked worker: takes hand-offs from the primary, reports
+// load, drains on 'speech:shutdown' or when the primary goes away
+export function runSpeechWorker({
+  WebSocketServer,
+  handleConnection,
+  deps = {},
+  proc = process,
+  reportMs = GATEWAY_DEFAULTS.reportMs,
+  logger = log,
+}) {
+  const wss = new WebSocketServer({ noServer: true });
+  const metrics = createSpeechMetrics();
+  const loopDelay = monitorEventLoopDelay({ resolution: 10 });
+  loopDelay.enable();
+  let lastCpu = proc.cpuUsage();
+  let draining = false;
+
+  function load() {
+    const mem = proc.memoryUsage();
+    const cpu = proc.cpuUsage(lastCpu);
+    lastCpu = proc.cpuUsage();
+    const ms = (ns) => Math.round(ns / 1e4) / 100;
+    const speech = metrics.snapshot();
+    const out = {
+      pid: proc.pid,
+      active: speech.active,
+      rss: mem.rss,
+      heapUsed: mem.heapUsed,
+      cpuMs: Math.round((cpu.user + cpu.system) / 1000),
+      loopDelayMs: { p50: ms(loopDelay.percentile(50)), p99: ms(loopDelay.percentile(99)), max: ms(loopDelay.max) },
+      speech,
+    };
+    loopDelay.reset();
+    return out;
+  }
+
+  const report = () => { if (proc.connected !== false) proc.send({ type: 'speech:load', load: load() }); };
+  const timer = setInterval(report, reportMs);
+
+  async function shutdown(graceMs = GATEWAY_DEFAULTS.graceMs) {
+    if (draining) return;
+    draining = true;
+    clearInterval(timer);
+    logger.info('worker.drain', { pid: proc.pid, sessions: wss.clients.size, graceMs });
+    await drainSpeechClients(wss, graceMs);
+    report();
+    loopDelay.disable();
+    proc.exit(0);
+  }
+
+  proc.on('message', (msg, socket) => {
+    if (msg?.type === 'speech:upgrade') {
+      if (!socket) return;
+      if (draining) { socket.destroy(); return; }
+      const head = msg.head ? Buffer.from(msg.head, 'base64') : Buffer.alloc(0);
+      wss.handleUpgrade({ ...msg.req, socket }, socket, head, (ws) => {
+        handleConnection(ws, { ...deps, metrics });
+      });
+    } else if (msg?.type === 'speech:shutdown') {
+      shutdown(msg.graceMs);
+    }
+  });
+  // Primary gone: no new hand-offs will come; finish what we have
+  proc.on('disconnect', () => shutdown());
+
+  proc.send({ type: 'speech:ready', pid: proc.pid });
+  return { wss, metrics, load, shutdown };
+}
@@ -1,7 +1,8 @@
 // Browser-direct speech provider implementations.
-// Uses fetch(), Uint8Array, Blob, atob()/btoa(), browser WebSocket.
+// Uses fetch(), Uint8Array, Blob, browser WebSocket; base64 via audio-buffers.js.
 // No Buffer, no node:crypto. Mirrors speech-providers.js API surface.
 // IMPORTANT: Do NOT import from speech-providers.js — it pulls in aws-sign.js → node:crypto.
+import { encodeBase64, decodeBase64 } from './audio-buffers.js';
 
 // Pure data duplicated here to avoid server-only dependency chain.
 export const TTS_DEFAULTS = {
@@ -32,19 +33,6 @@ export const BROWSER_DIRECT_S2S = new Set(['gemini-live']);
 
 // --- Helpers ---
 
-function uint8ToBase64(bytes) {
-  let binary = '';
-  for (let i = 0; i < bytes.length; i++) binary += String.fromCharCode(bytes[i]);
-  return btoa(binary);
-}
-
-function base64ToUint8(b64) {
-  const binary = atob(b64);
-  const bytes = new Uint8Array(binary.length);
-  for (let i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
-  return bytes;
-}
-
 // Wrap raw PCM bytes in a WAV container so decodeAudioData() can play it.
 // Gemini Live returns PCM 16-bit signed LE at 24kHz mono.
 export function pcmToWav(pcmData, sampleRate = 24000, numChannels = 1, bitsPerSample = 16) {
@@ -148,7 +136,7 @@ async function* streamTtsGoogleCloud(text, config, fetchFn) {
     throw new Error(`Provider error (${res.status}): ${detail}`);
   }
   const json = await res.json();
-  yield base64ToUint8(json.audioContent);
+  yield decodeBase64(json.audioContent);
 }
 
 async function* streamTtsPlayht(text, config, fetchFn) {
@@ -260,7 +248,7 @@ async function sttDeepgram(chunks, config, fetchFn) {
 
 async function sttGoogleCloud(chunks, config, fetchFn) {
   const audioBytes = concatUint8Arrays(chunks);
-  const base64Audio = uint8ToBase64(audioBytes);
+  const base64Audio = encodeBase64(audioBytes);
   const url = config.accessToken
     ? 'https://speech.googleapis.com/v1/speech:recognize'
     : `https://speech.googleapis.com/v1/speech:recognize?key=${config.apiKey}`;
@@ -336,6 +324,7 @@ export function openGeminiLiveSession(config) {
   let onTurnAudioCb = null;    // (wavData, transcript) — full turn audio + text
   let onTranscriptCb = null;   // (text) — streaming text chunks
   let onAudioChunkCb = null;   // (pcmUint8Array) — per-chunk streaming audio
+  let onInterruptedCb = null;  // () — server VAD cut the current model turn
   let onErrorCb = null;
 
   ws.addEventListener('open', () => {
@@ -375,6 +364,8 @@ export function openGeminiLiveSession(config) {
         if (onTranscriptCb) onTranscriptCb(sc.outputTranscription.text);
       }
 
+      if (sc.interrupted && onInterruptedCb) onInterruptedCb();
+
       if (sc.modelTurn?.parts) {
         for (const part of sc.modelTurn.parts) {
           if (part.text && !part.thought) {
@@ -383,7 +374,7 @@ export function openGeminiLiveSession(config) {
             if (onTranscriptCb) onTranscriptCb(part.text);
           }
           if (part.inlineData?.data) {
-            const pcm = base64ToUint8(part.inlineData.data);
+            const pcm = decodeBase64(part.inlineData.data);
             currentAudioChunks.push(pcm);
             if (onAudioChunkCb) onAudioChunkCb(pcm);
           }
@@ -452,6 +443,7 @@ export function openGeminiLiveSession(config) {
     onReady(cb) { onReadyCb = cb; if (setupDone) setTimeout(cb, 0); },
     onTurnAudio(cb) { onTurnAudioCb = cb; },
     onAudioChunk(cb) { onAudioChunkCb = cb; },
+    onInterrupted(cb) { onInterruptedCb = cb; },
     onTranscript(cb) { onTranscriptCb = cb; },
     onError(cb) { onErrorCb = cb; },
 
@@ -487,7 +479,7 @@ export function openGeminiLiveSession(config) {
       if (destroyed) { console.warn('[gemini-live] sendAudio: session destroyed'); return; }
       if (ws.readyState !== 1) { console.warn(`[gemini-live] sendAudio: WS not open (readyState=${ws.readyState})`); return; }
       const data = chunk instanceof Uint8Array ? chunk : new Uint8Array(chunk);
-      const base64 = uint8ToBase64(data);
+      const base64 = encodeBase64(data);
       ws.send(JSON.stringify({
         realtimeInput: { audio: { mimeType: 'audio/pcm;rate=16000', data: base64 } },
       }));
@@ -540,7 +532,7 @@ export function speakViaS2s(provider, text, config, createWs) {
         if (!sc) return;
         if (sc.modelTurn?.parts) {
           for (const part of sc.modelTurn.parts) {
-            if (part.inlineData?.data) audioChunks.push(base64ToUint8(part.inlineData.data));
+            if (part.inlineData?.data) audioChunks.push(decodeBase64(part.inlineData.data));
           }
         }
         if (sc.turnComplete) {
@@ -616,7 +608,7 @@ export function createS2sSession(provider, config, createWs) {
           rejectFinish = reject;
           timeoutId = setTimeout(() => { ws.close(); reject(new Error('timeout')); }, session._timeout || 30000);
           const merged = concatUint8Arrays(audioChunks);
-          ws.send(JSON.stringify({ realtimeInput: { audio: { mimeType: 'audio/pcm;rate=16000', data: uint8ToBase64(merged) } } }));
+          ws.send(JSON.stringify({ realtimeInput: { audio: { mimeType: 'audio/pcm;rate=16000', data: encodeBase64(merged) } } }));
         });
       },
       onAudio(cb) { audioCb = cb; },
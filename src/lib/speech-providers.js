@@ -282,6 +282,85 @@ async function sttAwsTranscribe() {
   err.status = 501;
   throw err;
 }
+// Streaming uplink for S2S sockets — frames go upstream as they are fed.
+// Until the socket is ready, or while its bufferedAmount is above
+// highWaterMark, frames wait in a bounded queue (oldest dropped past
+// maxPendingBytes, counted in stats.droppedBytes) and are coalesced into
+// messages of up to maxMessageBytes when the socket drains. Memory stays
+// flat however long the user talks.
+export const UPLINK_DEFAULTS = {
+  highWaterMark: 64 * 1024,   // upstream bufferedAmount that counts as congested
+  maxPendingBytes: 320000,    // 10 s of 16 kHz PCM16
+  maxMessageBytes: 32000,     // 1 s per coalesced message
+  drainPollMs: 20,
+};
+export function createAudioUplink(ws, encode, opts = {}) {
+  const { highWaterMark, maxPendingBytes, maxMessageBytes, drainPollMs } = { ...UPLINK_DEFAULTS, ...opts };
+  const pending = [];
+  let pendingBytes = 0;
+  let ready = false;
+  let closed = false;
+  let drainTimer = null;
+  let onDrained = null;
+  const stats = { framesIn: 0, bytesIn: 0, messagesSent: 0, bytesSent: 0, droppedBytes: 0, peakPendingBytes: 0 };
+  const flush = () => {
+    drainTimer = null;
+    if (closed || !ready) return;
+    while (pending.length) {
+      if ((ws.bufferedAmount || 0) > highWaterMark) {
+        drainTimer = setTimeout(flush, drainPollMs);
+        return;
+      }
+      let n = 1;
+      let size = pending[0].length;
+      while (n < pending.length && size + pending[n].length <= maxMessageBytes) size += pending[n++].length;
+      const batch = pending.splice(0, n);
+      pendingBytes -= size;
+      ws.send(encode(n === 1 ? batch[0] : Buffer.concat(batch, size)));
+      stats.messagesSent++;
+      stats.bytesSent += size;
+    }
+    if (onDrained) {
+      const fn = onDrained;
+      onDrained = null;
+      fn();
+    }
+  };
+  return {
+    push(chunk) {
+      if (closed) return;
+      stats.framesIn++;
+      stats.bytesIn += chunk.length;
+      pending.push(chunk);
+      pendingBytes += chunk.length;
+      while (pendingBytes > maxPendingBytes && pending.length > 1) {
+        const dropped = pending.shift();
+        pendingBytes -= dropped.length;
+        stats.droppedBytes += dropped.length;
+      }
+      if (pendingBytes > stats.peakPendingBytes) stats.peakPendingBytes = pendingBytes;
+      if (!drainTimer) flush();
+    },
+    // Socket (and provider setup) ready — start sending
+    open() {
+      ready = true;
+      flush();
+    },
+    // Run fn once everything queued so far has been sent
+    end(fn) {
+      onDrained = fn;
+      if (!drainTimer) flush();
+    },
+    close() {
+      closed = true;
+      if (drainTimer) clearTimeout(drainTimer);
+      pending.length = 0;
+      pendingBytes = 0;
+    },
+    get pendingBytes() { return pendingBytes; },
+    stats,
+  };
+}
 // createS2sSession — returns { feed(chunk), finish(), onAudio(cb), onTranscript(cb), destroy() }
 export function createS2sSession(provider, config, createWs) {
   if (provider === 'gemini-live') {
@@ -296,35 +375,53 @@ export function createS2sSession(provider, config, createWs) {
 function s2sGeminiLive(config, createWs) {
   const wsUrl = `wss://generativelanguage.googleapis.com/ws/google.ai.generativelanguage.v1beta.GenerativeService.BidiGenerateContent?key=${config.apiKey}`;
   const ws = createWs(wsUrl);
-  const audioChunks = [];
+  const uplink = createAudioUplink(ws, (chunk) => JSON.stringify({
+    realtimeInput: { audio: { mimeType: 'audio/pcm;rate=16000', data: chunk.toString('base64') } },
+  }), config.uplink);
   let audioCb = null;
   let transcriptCb = null;
   let resolveFinish = null;
   let rejectFinish = null;
   let resolved = false;
   let timeoutId = null;
+  let setupDone = false;
+  let activity = false;
   const done = () => {
     if (resolved) return;
     resolved = true;
     if (timeoutId) clearTimeout(timeoutId);
   };
+  // Manual activity: the turn spans the first frame to finish()
+  const startActivity = () => {
+    if (activity) return;
+    activity = true;
+    ws.send(JSON.stringify({ realtimeInput: { activityStart: {} } }));
+  };
   ws.on('open', () => {
     const setup = {
       setup: {
         model: 'models/gemini-2.5-flash-native-audio-latest',
         generationConfig: { responseModalities: ['AUDIO'] },
+        inputAudioTranscription: {},
+        // listen.stop ends the turn; automatic activity detection would answer mid-utterance
+        realtimeInputConfig: { automaticActivityDetection: { disabled: true } },
       },
     };
     if (config.systemPrompt) setup.setup.systemInstruction = { parts: [{ text: config.systemPrompt }] };
     ws.send(JSON.stringify(setup));
   });
   ws.on('message', (raw) => {
+    if (resolved) return;
     const msg = JSON.parse(raw.toString());
     if (msg.setupComplete) {
+      setupDone = true;
+      if (uplink.stats.framesIn) startActivity();
+      uplink.open();
       return;
     }
     const sc = msg.serverContent;
     if (!sc) return;
+    if (sc.inputTranscription?.text && config.onInterim) config.onInterim(sc.inputTranscription.text, false);
     if (sc.modelTurn?.parts) {
       for (const part of sc.modelTurn.parts) {
         if (part.text && transcriptCb) transcriptCb(part.text);
@@ -342,11 +439,13 @@ function s2sGeminiLive(config, createWs) {
     if (!resolved && rejectFinish) rejectFinish(err);
   });
   ws.on('close', () => {
+    uplink.close();
     done();
     if (resolveFinish) resolveFinish();
   });
   const feed = (chunk) => {
-    audioChunks.push(chunk);
+    if (setupDone) startActivity();
+    uplink.push(chunk);
   };
   const finish = () => {
     return new Promise((resolve, reject) => {
@@ -356,11 +455,10 @@ function s2sGeminiLive(config, createWs) {
         ws.close();
         reject(new Error('timeout'));
       }, session._timeout || 30000);
-      const audioBytes = Buffer.concat(audioChunks);
-      const base64Input = audioBytes.toString('base64');
-      ws.send(JSON.stringify({
-        realtimeInput: { audio: { mimeType: 'audio/pcm;rate=16000', data: base64Input } },
-      }));
+      uplink.end(() => {
+        startActivity();
+        ws.send(JSON.stringify({ realtimeInput: { activityEnd: {} } }));
+      });
     });
   };
   const session = {
@@ -368,7 +466,8 @@ function s2sGeminiLive(config, createWs) {
     finish,
     onAudio: (cb) => { audioCb = cb; },
     onTranscript: (cb) => { transcriptCb = cb; },
-    destroy: () => ws.close(),
+    destroy: () => { uplink.close(); ws.close(); },
+    stats: uplink.stats,
     _timeout: 30000,
   };
   return session;
@@ -382,7 +481,9 @@ function s2sOpenaiRealtime(config, createWs) {
     },
   };
   const ws = createWs(wsUrl, wsOpts);
-  const audioChunks = [];
+  const uplink = createAudioUplink(ws, (chunk) => JSON.stringify({
+    type: 'input_audio_buffer.append', audio: chunk.toString('base64'),
+  }), config.uplink);
   let audioCb = null;
   let transcriptCb = null;
   let resolveFinish = null;
@@ -399,13 +500,19 @@ function s2sOpenaiRealtime(config, createWs) {
       modalities: ['text', 'audio'],
       input_audio_format: 'pcm16',
       output_audio_format: 'pcm16',
+      input_audio_transcription: { model: STT_DEFAULTS.whisper.model },
+      // listen.stop commits the turn; server VAD would answer mid-utterance
+      turn_detection: null,
     };
     if (config.systemPrompt) sessionUpdate.instructions = config.systemPrompt;
     ws.send(JSON.stringify({ type: 'session.update', session: sessionUpdate }));
+    uplink.open();
   });
   ws.on('message', (raw) => {
+    if (resolved) return;
     const msg = JSON.parse(raw.toString());
-    if (msg.type === 'response.audio.delta' && audioCb) audioCb(msg.delta);
+    if (msg.type === 'conversation.item.input_audio_transcription.completed' && config.onInterim) config.onInterim(msg.transcript, true);
+    else if (msg.type === 'response.audio.delta' && audioCb) audioCb(msg.delta);
     else if (msg.type === 'response.audio_transcript.delta' && transcriptCb) transcriptCb(msg.delta);
     else if (msg.type === 'response.done') {
       ws.close();
@@ -418,12 +525,11 @@ function s2sOpenaiRealtime(config, createWs) {
     if (!resolved && rejectFinish) rejectFinish(err);
   });
   ws.on('close', () => {
+    uplink.close();
     done();
     if (resolveFinish) resolveFinish();
   });
-  const feed = (chunk) => {
-    audioChunks.push(chunk);
-  };
+  const feed = (chunk) => uplink.push(chunk);
   const finish = () => {
     return new Promise((resolve, reject) => {
       resolveFinish = resolve;
@@ -432,11 +538,10 @@ function s2sOpenaiRealtime(config, createWs) {
         ws.close();
         reject(new Error('timeout'));
       }, session._timeout || 30000);
-      const audioBytes = Buffer.concat(audioChunks);
-      const base64Input = audioBytes.toString('base64');
-      ws.send(JSON.stringify({ type: 'input_audio_buffer.append', audio: base64Input }));
-      ws.send(JSON.stringify({ type: 'input_audio_buffer.commit' }));
-      ws.send(JSON.stringify({ type: 'response.create' }));
+      uplink.end(() => {
+        ws.send(JSON.stringify({ type: 'input_audio_buffer.commit' }));
+        ws.send(JSON.stringify({ type: 'response.create' }));
+      });
     });
   };
   const session = {
@@ -444,7 +549,8 @@ function s2sOpenaiRealtime(config, createWs) {
     finish,
     onAudio: (cb) => { audioCb = cb; },
     onTranscript: (cb) => { transcriptCb = cb; },
-    destroy: () => ws.close(),
+    destroy: () => { uplink.close(); ws.close(); },
+    stats: uplink.stats,
     _timeout: 30000,
   };
   return session;
@@ -6,6 +6,8 @@ import {
   streamTts as browserStreamTts, createSttSession as browserSttSession,
   openGeminiLiveSession,
 } from './speech-providers-browser.js';
+import { createCapturePipeline, createPlaybackPipeline } from './audio-worklet.js';
+import { PlaybackScheduler } from './playback-scheduler.js';
 
 // Map speech provider keys → connection table keys (for API key lookup)
 export const SPEECH_PROVIDER_CONNECTION_MAP = {
@@ -130,6 +132,7 @@ function createLocalService(profileId, mode, options = {}) {
     SpeechRecognition: options.SpeechRecognition || globalThis.SpeechRecognition || globalThis.webkitSpeechRecognition,
     SpeechSynthesis: options.SpeechSynthesis || globalThis.speechSynthesis,
     SpeechSynthesisUtterance: options.SpeechSynthesisUtterance || globalThis.SpeechSynthesisUtterance,
+    AudioWorkletNode: options.AudioWorkletNode || globalThis.AudioWorkletNode,
   };
   return {
     profileId,
@@ -206,21 +209,13 @@ function createLocalService(profileId, mode, options = {}) {
 }
 
 // --- PCM conversion helpers ---
-export function pcm16ToFloat32(pcmData) {
-  const samples = pcmData.length / 2;
-  const float32 = new Float32Array(samples);
-  const view = new DataView(pcmData.buffer, pcmData.byteOffset, pcmData.byteLength);
-  for (let i = 0; i < samples; i++) float32[i] = view.getInt16(i * 2, true) / 32768;
-  return float32;
-}
+// Implemented in audio-buffers.js (optional `out` arrays for reuse)
+export { pcm16ToFloat32, float32ToPcm16 } from './audio-buffers.js';
 
-export function float32ToPcm16(float32) {
-  const pcm = new Int16Array(float32.length);
-  for (let i = 0; i < float32.length; i++) {
-    pcm[i] = Math.max(-32768, Math.min(32767, Math.floor(float32[i] * 32768)));
-  }
-  return pcm;
-}
+// Barge-in: mic level held at/above `level` for `holdMs` while the AI is
+// speaking cancels its playback and unmutes the mic (options.bargeIn: false
+// disables; an object overrides these defaults)
+export const BARGE_IN_DEFAULTS = { level: 0.35, holdMs: 200 };
 
 function createDirectService(profileId, mode, options) {
   let ttsSeconds = 0;
@@ -236,10 +231,12 @@ function createDirectService(profileId, mode, options) {
   let ttsAbort = null;
 
   // --- Voice session state ---
-  let voiceState = null;   // { micCtx, processor, micStream, playbackCtx, playhead, sttRecog }
+  let voiceState = null;   // { micCtx, capture, micStream, playbackCtx, playback, scheduler, sttRecog }
   let userTranscriptCb = null;
   let micLevelCb = null;
   let speakingState = false;
+  let playbackMetrics = null; // last voice session's scheduler metrics
+  const bargeIn = options.bargeIn === false ? null : { ...BARGE_IN_DEFAULTS, ...options.bargeIn };
 
   // Injectable browser deps (production defaults → real browser APIs; tests → mocks)
   const deps = {
@@ -248,6 +245,7 @@ function createDirectService(profileId, mode, options) {
     SpeechRecognition: options.SpeechRecognition || globalThis.SpeechRecognition || globalThis.webkitSpeechRecognition,
     SpeechSynthesis: options.SpeechSynthesis || globalThis.speechSynthesis,
     SpeechSynthesisUtterance: options.SpeechSynthesisUtterance || globalThis.SpeechSynthesisUtterance,
+    AudioWorkletNode: options.AudioWorkletNode || globalThis.AudioWorkletNode,
   };
 
   const config = {
@@ -274,6 +272,13 @@ function createDirectService(profileId, mode, options) {
     geminiSession.onAudioChunk((pcm) => {
       if (streamingAudioCb) streamingAudioCb(pcm);
     });
+    // Server VAD heard the user over the model: drop the rest of this turn
+    geminiSession.onInterrupted(() => {
+      if (!voiceState?.scheduler) return;
+      voiceState.scheduler.cancel();
+      voiceState.scheduler.endTurn();
+      speakingState = false;
+    });
     geminiSession.onTranscript((text) => {
       if (streamingTranscriptCb) streamingTranscriptCb(text);
     });
@@ -296,7 +301,14 @@ function createDirectService(profileId, mode, options) {
             session.onError((err) => { clearTimeout(timeout); reject(err); });
             session.onReady(() => { clearTimeout(timeout); resolve(); });
           });
+          voiceState?.scheduler?.expectResponse();
           const result = await session.sendText(text);
+          // speak() turns resolve here instead of via onTurnAudio: play out + unmute
+          const scheduler = voiceState?.scheduler;
+          if (scheduler) {
+            scheduler.endTurn();
+            setTimeout(() => { speakingState = false; }, scheduler.remainingSeconds * 1000);
+          }
           const elapsed = Date.now() - startTime;
           ttsSeconds += elapsed / 1000;
           _speaking = false;
@@ -341,6 +353,13 @@ function createDirectService(profileId, mode, options) {
     stopSpeaking() {
       _speaking = false;
       if (ttsAbort) { ttsAbort.abort(); ttsAbort = null; }
+      if (voiceState?.scheduler) this.interrupt();
+    },
+    // Barge-in: flush queued S2S playback and unmute the mic
+    interrupt() {
+      if (!voiceState?.scheduler) return;
+      voiceState.scheduler.cancel();
+      speakingState = false;
     },
     listen(onResult) {
       listenCallback = onResult;
@@ -370,7 +389,8 @@ function createDirectService(profileId, mode, options) {
       const chunk = buf instanceof Uint8Array ? buf : new Uint8Array(buf);
       // S2S: stream PCM to persistent Gemini session
       if (mode === 's2s' && geminiSession) { geminiSession.sendAudio(chunk); return; }
-      if (activeStt) activeStt.feed(chunk);
+      // STT sessions keep chunks until finish(); capture frames are recycled
+      if (activeStt) activeStt.feed(chunk.slice());
     },
     // Register callback for AI audio during S2S listen mode
     onAiAudio(cb) { aiAudioCallback = cb; },
@@ -392,29 +412,24 @@ function createDirectService(profileId, mode, options) {
 
       if (mode === 's2s') {
         // S2S mode: playback + mic pipeline + STT
-        // 1. Create playback AudioContext (24kHz for Gemini output)
+        // 1. Create playback AudioContext (24kHz for Gemini output) + worklet ring buffer
         const playbackCtx = new deps.AudioContext({ sampleRate: 24000 });
-        let playhead = playbackCtx.currentTime;
+        const playback = await createPlaybackPipeline(playbackCtx, { sampleRate: 24000, AudioWorkletNode: deps.AudioWorkletNode });
 
-        // 2. Wire streaming audio → gapless playback + speaking state
+        const scheduler = new PlaybackScheduler(playback, { sampleRate: 24000 });
+
+        // 2. Wire streaming audio → jitter buffer → gapless playback + speaking state
         streamingAudioCb = (pcm) => {
-          if (!speakingState) { speakingState = true; }
-          const float32 = pcm16ToFloat32(pcm);
-          const buffer = playbackCtx.createBuffer(1, float32.length, 24000);
-          buffer.copyToChannel(float32, 0);
-          const source = playbackCtx.createBufferSource();
-          source.buffer = buffer;
-          source.connect(playbackCtx.destination);
-          const startAt = Math.max(playbackCtx.currentTime, playhead);
-          source.start(startAt);
-          playhead = startAt + buffer.duration;
+          // Chunks of a barged-in turn are discarded: keep the mic open
+          if (scheduler.state !== 'cancelled') speakingState = true;
+          scheduler.push(pcm);
         };
 
-        // 3. Wire turn complete → schedule unmute after playback drains
+        // 3. Wire turn complete → play out the buffer, unmute once it drains
         const origTurnCb = aiAudioCallback;
         aiAudioCallback = (wav, transcript) => {
-          const remaining = Math.max(0, playhead - (playbackCtx?.currentTime || 0));
-          setTimeout(() => { speakingState = false; }, remaining * 1000);
+          scheduler.endTurn();
+          setTimeout(() => { speakingState = false; }, scheduler.remainingSeconds * 1000);
           if (origTurnCb) origTurnCb(wav, transcript);
         };
 
@@ -425,22 +440,24 @@ function createDirectService(profileId, mode, options) {
         const micCtx = new deps.AudioContext({ sampleRate: 16000 });
         if (micCtx.state === 'suspended') await micCtx.resume();
         const micSource = micCtx.createMediaStreamSource(micStream);
-        const processor = micCtx.createScriptProcessor(4096, 1, 1);
         const svc = this; // capture for closure
-        processor.onaudioprocess = (e) => {
-          const float32 = e.inputBuffer.getChannelData(0);
+        let lastLevel = 0;
+        let loudMs = 0;
+        const capture = await createCapturePipeline(micCtx, micSource, {
+          AudioWorkletNode: deps.AudioWorkletNode,
           // Fire mic level regardless of mute state
-          if (micLevelCb) {
-            let sum = 0;
-            for (let i = 0; i < float32.length; i++) sum += float32[i] * float32[i];
-            micLevelCb(Math.min(1, Math.sqrt(sum / float32.length) * 10));
-          }
-          if (speakingState) return; // auto-mute while AI speaks
-          const pcm = float32ToPcm16(float32);
-          svc.sendAudio(new Uint8Array(pcm.buffer));
-        };
-        micSource.connect(processor);
-        processor.connect(micCtx.destination);
+          onLevel: (level) => { lastLevel = level; if (micLevelCb) micLevelCb(level); },
+          onFrame: (pcm) => {
+            if (speakingState) {
+              // auto-mute while AI speaks, unless the user keeps talking over it
+              loudMs = bargeIn && lastLevel >= bargeIn.level ? loudMs + pcm.length / 32 : 0;
+              if (!bargeIn || loudMs < bargeIn.holdMs) return;
+              svc.interrupt();
+            }
+            loudMs = 0;
+            svc.sendAudio(pcm);
+          },
+        });
 
         // 5. Start browser SpeechRecognition for user transcript (injectable)
         let sttRecog = null;
@@ -456,6 +473,7 @@ function createDirectService(profileId, mode, options) {
               transcript += event.results[i][0].transcript;
               if (event.results[i].isFinal) hasFinal = true;
             }
+            if (hasFinal) scheduler.expectResponse();
             if (userTranscriptCb) userTranscriptCb(transcript, hasFinal);
           };
           sttRecog.onend = () => {
@@ -466,11 +484,11 @@ function createDirectService(profileId, mode, options) {
           sttRecog.start();
         }
 
-        voiceState = { micCtx, processor, micStream, playbackCtx, playhead, sttRecog };
+        voiceState = { micCtx, capture, micStream, playbackCtx, playback, scheduler, sttRecog };
       } else {
         // TTS+STT mode
         const sttProvider = resolveSttProvider(profileId);
-        let micCtx = null, processor = null, micStream = null, sttRecog = null;
+        let micCtx = null, capture = null, micStream = null, sttRecog = null;
 
         if (sttProvider === 'browser') {
           // Browser STT: just SpeechRecognition, no mic AudioContext needed
@@ -503,22 +521,15 @@ function createDirectService(profileId, mode, options) {
           micCtx = new deps.AudioContext({ sampleRate: 16000 });
           if (micCtx.state === 'suspended') await micCtx.resume();
           const micSource = micCtx.createMediaStreamSource(micStream);
-          processor = micCtx.createScriptProcessor(4096, 1, 1);
           const svc = this;
-          processor.onaudioprocess = (e) => {
-            const float32 = e.inputBuffer.getChannelData(0);
-            // RMS for mic level
-            if (micLevelCb) {
-              let sum = 0;
-              for (let i = 0; i < float32.length; i++) sum += float32[i] * float32[i];
-              micLevelCb(Math.min(1, Math.sqrt(sum / float32.length) * 10));
-            }
-            if (speakingState) return; // auto-mute
-            const pcm = float32ToPcm16(float32);
-            svc.sendAudio(new Uint8Array(pcm.buffer));
-          };
-          micSource.connect(processor);
-          processor.connect(micCtx.destination);
+          capture = await createCapturePipeline(micCtx, micSource, {
+            AudioWorkletNode: deps.AudioWorkletNode,
+            onLevel: (level) => { if (micLevelCb) micLevelCb(level); },
+            onFrame: (pcm) => {
+              if (speakingState) return; // auto-mute
+              svc.sendAudio(pcm);
+            },
+          });
 
           // Also start browser STT for transcripts if available
           if (deps.SpeechRecognition) {
@@ -542,23 +553,35 @@ function createDirectService(profileId, mode, options) {
           }
         }
 
-        voiceState = { micCtx, processor, micStream, sttRecog };
+        voiceState = { micCtx, capture, micStream, sttRecog };
       }
     },
     stopVoice() {
       if (!voiceState) return;
       speakingState = false;
-      voiceState.processor?.disconnect();
+      voiceState.capture?.disconnect();
+      if (voiceState.scheduler) {
+        playbackMetrics = voiceState.scheduler.metrics;
+        voiceState.scheduler.close();
+      }
+      voiceState.playback?.close();
       voiceState.micStream?.getTracks().forEach(t => t.stop());
       voiceState.micCtx?.close().catch(() => {});
       voiceState.playbackCtx?.close().catch(() => {});
       if (voiceState.sttRecog) { voiceState.sttRecog.abort(); }
       voiceState = null;
     },
+    // playback: S2S jitter-buffer metrics (underruns, latency, barge-ins), or
+    // null when no voice session has streamed audio
     getUsage() {
-      return { ttsSeconds, sttSeconds, estimatedCost: estimateCost(profileId, ttsSeconds, sttSeconds) };
+      const playback = voiceState?.scheduler?.metrics || playbackMetrics;
+      return { ttsSeconds, sttSeconds, estimatedCost: estimateCost(profileId, ttsSeconds, sttSeconds), playback };
+    },
+    resetUsage() {
+      ttsSeconds = 0; sttSeconds = 0;
+      playbackMetrics = null;
+      voiceState?.scheduler?.resetMetrics();
     },
-    resetUsage() { ttsSeconds = 0; sttSeconds = 0; },
     _addUsage(tts, stt) { ttsSeconds += tts; sttSeconds += stt; },
     destroy() {
       this.stopVoice();
@@ -1,5 +1,12 @@
 // WebSocket speech handler — bidirectional speech streaming
+// Per connection: outbound sends watch ws.bufferedAmount (TTS waits for the
+// socket to drain, S2S audio is dropped past a cap, interim transcript deltas
+// are coalesced or dropped while congested), inbound audio is paced by a token
+// bucket, and frame/byte counters feed an optional createSpeechMetrics()
+// registry. Logging is structured and sampled (see log.js); per-frame events
+// are debug-level.
 import { resolveMode, resolveTtsProvider, resolveSttProvider, resolveS2sProvider, estimateCost } from './speech-service.js';
+import { createLogger } from './log.js';
 
 const KEY_ENV_MAP = {
   elevenlabs: 'ELEVENLABS_API_KEY',
@@ -14,8 +21,80 @@ const KEY_ENV_MAP = {
   'openai-realtime': 'OPENAI_API_KEY',
 };
 
+// Outbound: above highWaterBytes TTS waits and deltas are held back; above
+// maxBufferedBytes S2S audio frames are dropped. deltaPolicy: 'coalesce'
+// merges held deltas per stream, 'drop' discards them.
+export const SEND_LIMITS = {
+  highWaterBytes: 256 * 1024,
+  maxBufferedBytes: 1024 * 1024,
+  drainPollMs: 20,
+  deltaPolicy: 'coalesce',
+};
+
+// Inbound audio token bucket: 4× real-time 16 kHz PCM16, 2 s burst
+export const INBOUND_LIMITS = { bytesPerSec: 128000, burstBytes: 256000 };
+
+export const LOG_SAMPLE = { 'frame.in': 250, 'frame.in.drop': 50, 'audio.out.drop': 50, send: 50 };
+
+const log = createLogger('speech-ws', { sample: LOG_SAMPLE });
+let nextConnectionId = 1;
+
+function createConnectionCounters() {
+  return {
+    framesIn: 0,
+    bytesIn: 0,
+    framesInDropped: 0,
+    bytesInDropped: 0,
+    messagesIn: 0,
+    framesOut: 0,
+    bytesOut: 0,
+    framesOutDropped: 0,
+    bytesOutDropped: 0,
+    messagesOut: 0,
+    deltasCoalesced: 0,
+    deltasDropped: 0,
+    drainWaits: 0,
+    peakBufferedBytes: 0,
+  };
+}
+
+// Process-wide rollup of connection counters: pass as deps.metrics
+export function createSpeechMetrics() {
+  const live = new Set();
+  const closed = createConnectionCounters();
+  let connections = 0;
+  return {
+    open(counters) {
+      live.add(counters);
+      connections++;
+    },
+    close(counters) {
+      if (!live.delete(counters)) return;
+      for (const key in closed) {
+        closed[key] = key === 'peakBufferedBytes' ? Math.max(closed[key], counters[key]) : closed[key] + counters[key];
+      }
+    },
+    snapshot() {
+      const totals = { ...closed };
+      for (const c of live) {
+        for (const key in totals) {
+          totals[key] = key === 'peakBufferedBytes' ? Math.max(totals[key], c[key]) : totals[key] + c[key];
+        }
+      }
+      return { active: live.size, connections, ...totals };
+    },
+  };
+}
+
+// Returns { counters } for this connection
 export function handleSpeechConnection(ws, deps = {}) {
-  console.log('[speech-ws] New connection');
+  const counters = createConnectionCounters();
+  const clog = (deps.log || log).child({ conn: nextConnectionId++ });
+  const limits = { ...SEND_LIMITS, ...deps.sendLimits };
+  const inbound = { ...INBOUND_LIMITS, ...deps.inboundLimits };
+  const now = deps.now || Date.now;
+  deps.metrics?.open(counters);
+  clog.info('open');
   const providers = deps.providers;
   const getApiKey = deps.getApiKey || defaultGetApiKey;
   const resolvers = deps.resolvers || { resolveMode, resolveTtsProvider, resolveSttProvider, resolveS2sProvider, estimateCost };
@@ -28,15 +107,105 @@ export function handleSpeechConnection(ws, deps = {}) {
   let sttSeconds = 0;
   let listenStartTime = null;
   let audioStartTime = null;
+  let tokens = inbound.burstBytes;
+  let refilledAt = now();
+  const heldDeltas = new Map(); // stream → pending transcript message
+  let drainTimer = null;
+
+  function buffered() {
+    const bytes = ws.bufferedAmount || 0;
+    if (bytes > counters.peakBufferedBytes) counters.peakBufferedBytes = bytes;
+    return bytes;
+  }
 
   function sendJSON(obj) {
-    console.log(`[speech-ws] sendJSON: ${obj.type}`, obj.type === 'error' ? obj.message : '');
-    if (ws.readyState === ws.OPEN) ws.send(JSON.stringify(obj));
-    else console.warn(`[speech-ws] sendJSON skipped — ws not OPEN (readyState=${ws.readyState})`);
+    if (ws.readyState !== ws.OPEN) {
+      clog.warn('send.skipped', { type: obj.type, readyState: ws.readyState });
+      return;
+    }
+    if (heldDeltas.size) flushDeltas(); // keep held deltas ahead of this message
+    writeJSON(obj);
+  }
+
+  function writeJSON(obj) {
+    const text = JSON.stringify(obj);
+    ws.send(text);
+    counters.messagesOut++;
+    counters.bytesOut += text.length;
+    clog.debug('send', { type: obj.type });
+  }
+
+  function sendBinary(chunk) {
+    ws.send(chunk);
+    counters.framesOut++;
+    counters.bytesOut += chunk.length || chunk.byteLength || 0;
+  }
+
+  // S2S audio arrives by callback and cannot be paused: drop past the cap
+  function sendAudio(chunk) {
+    if (ws.readyState !== ws.OPEN) return;
+    if (buffered() > limits.maxBufferedBytes) {
+      counters.framesOutDropped++;
+      counters.bytesOutDropped += chunk.length || chunk.byteLength || 0;
+      clog.warn('audio.out.drop', { buffered: ws.bufferedAmount });
+      return;
+    }
+    sendBinary(chunk);
+  }
+
+  // Interim transcript deltas (stream: 'input' = user, 'output' = model).
+  // Finals go straight out, after any held deltas.
+  function sendTranscript(stream, text, isFinal) {
+    if (isFinal || (!heldDeltas.size && buffered() < limits.highWaterBytes)) {
+      return sendJSON({ type: 'transcript', text, isFinal });
+    }
+    if (ws.readyState !== ws.OPEN) return;
+    if (limits.deltaPolicy === 'drop') {
+      counters.deltasDropped++;
+      return;
+    }
+    const held = heldDeltas.get(stream);
+    if (held) {
+      held.text += text;
+      counters.deltasCoalesced++;
+    } else {
+      heldDeltas.set(stream, { type: 'transcript', text, isFinal });
+    }
+    if (!drainTimer) drainTimer = setTimeout(pollDrain, limits.drainPollMs);
+  }
+
+  function pollDrain() {
+    drainTimer = null;
+    if (ws.readyState !== ws.OPEN) { heldDeltas.clear(); return; }
+    if (buffered() < limits.highWaterBytes) flushDeltas();
+    else drainTimer = setTimeout(pollDrain, limits.drainPollMs);
+  }
+
+  function flushDeltas() {
+    if (drainTimer) { clearTimeout(drainTimer); drainTimer = null; }
+    for (const msg of heldDeltas.values()) writeJSON(msg);
+    heldDeltas.clear();
+  }
+
+  async function waitForDrain(isAborted) {
+    while (buffered() > limits.highWaterBytes && ws.readyState === ws.OPEN && !isAborted()) {
+      counters.drainWaits++;
+      await new Promise(resolve => setTimeout(resolve, limits.drainPollMs));
+    }
+  }
+
+  // Token bucket over inbound audio bytes
+  function admit(bytes) {
+    const t = now();
+    tokens = Math.min(inbound.burstBytes, tokens + ((t - refilledAt) * inbound.bytesPerSec) / 1000);
+    refilledAt = t;
+    if (bytes > tokens) return false;
+    tokens -= bytes;
+    return true;
   }
 
   function sendError(code, message) {
-    console.error(`[speech-ws] ERROR: ${code} — ${message}`);
+    clog.warn('error.sent', { code, message });
     sendJSON({ type: 'error', code, message });
   }
 
@@ -64,7 +233,15 @@ export function handleSpeechConnection(ws, deps = {}) {
     // Binary audio frame → route to active STT or S2S
     if (str === null) {
       const buf = Buffer.isBuffer(data) ? data : Buffer.from(data);
-      console.log(`[speech-ws] binary frame: ${buf.length} bytes → S2S=${!!activeS2s} STT=${!!activeStt}`);
+      counters.framesIn++;
+      counters.bytesIn += buf.length;
+      if (!admit(buf.length)) {
+        counters.framesInDropped++;
+        counters.bytesInDropped += buf.length;
+        clog.warn('frame.in.drop', { bytes: buf.length });
+        return;
+      }
+      clog.debug('frame.in', { bytes: buf.length, s2s: !!activeS2s, stt: !!activeStt });
       if (activeS2s) {
         activeS2s.feed(buf);
         return;
@@ -76,13 +253,14 @@ export function handleSpeechConnection(ws, deps = {}) {
       return;
     }
 
+    counters.messagesIn++;
     let msg;
     try {
       msg = JSON.parse(str);
     } catch {
       return sendError('invalid_json', 'Invalid JSON');
     }
-    console.log(`[speech-ws] msg: ${msg.type}`, msg.type === 'session.start' ? `profile=${msg.profile}` : msg.type === 'speak' ? `text="${(msg.text||'').slice(0,50)}..."` : '');
+    clog.debug('msg', { type: msg.type });
 
     // session.start
     if (msg.type === 'session.start') {
@@ -96,31 +274,30 @@ export function handleSpeechConnection(ws, deps = {}) {
       } catch (err) {
         return sendError('invalid_profile', 'Unknown speech profile');
       }
-      console.log(`[speech-ws] session.start: profile=${profileId} mode=${mode} hasClientKey=${!!msg.api_key}`);
+      clog.info('session.start', { profile: profileId, mode, clientKey: !!msg.api_key });
       // Check API key requirement
       if (mode !== 'browser') {
         let ttsProvider, sttProvider, s2sProvider;
         if (mode === 's2s') {
           s2sProvider = resolvers.resolveS2sProvider(profileId);
           const apiKey = await getApiKey(s2sProvider, msg.api_key);
-          console.log(`[speech-ws] S2S: provider=${s2sProvider} hasKey=${!!apiKey}`);
+          clog.debug('key.check', { provider: s2sProvider, hasKey: !!apiKey });
           if (!apiKey) {
             return sendError('missing_api_key', `API key required for ${s2sProvider}`);
           }
         } else {
           ttsProvider = resolvers.resolveTtsProvider(profileId);
           sttProvider = resolvers.resolveSttProvider(profileId);
-          console.log(`[speech-ws] TTS+STT: tts=${ttsProvider} stt=${sttProvider}`);
           if (ttsProvider !== 'browser') {
             const apiKey = await getApiKey(ttsProvider, msg.api_key);
-            console.log(`[speech-ws] TTS key check: provider=${ttsProvider} hasKey=${!!apiKey} (env=${KEY_ENV_MAP[ttsProvider]})`);
+            clog.debug('key.check', { provider: ttsProvider, hasKey: !!apiKey, env: KEY_ENV_MAP[ttsProvider] });
             if (!apiKey) {
               return sendError('missing_api_key', `API key required for ${ttsProvider}`);
             }
           }
           if (sttProvider !== 'browser') {
             const apiKey = await getApiKey(sttProvider, msg.api_key || session?.clientApiKey);
-            console.log(`[speech-ws] STT key check: provider=${sttProvider} hasKey=${!!apiKey} (env=${KEY_ENV_MAP[sttProvider]})`);
+            clog.debug('key.check', { provider: sttProvider, hasKey: !!apiKey, env: KEY_ENV_MAP[sttProvider] });
             if (!apiKey) {
               return sendError('missing_api_key', `API key required for ${sttProvider}`);
             }
@@ -132,7 +309,6 @@ export function handleSpeechConnection(ws, deps = {}) {
       if (mode === 'browser') {
         response.note = 'Browser-only mode. Server operations not available.';
       }
-      console.log(`[speech-ws] → session.ready mode=${mode}`);
       sendJSON(response);
       return;
     }
@@ -145,7 +321,6 @@ export function handleSpeechConnection(ws, deps = {}) {
     switch (msg.type) {
       case 'speak': {
         // TTS
-        console.log(`[speech-ws] speak: mode=${session.mode} text="${(msg.text||'').slice(0,60)}..."`);
         if (session.mode === 's2s') {
           return sendError('wrong_mode', 'Use listen.start for S2S mode');
         }
@@ -158,34 +333,35 @@ export function handleSpeechConnection(ws, deps = {}) {
         }
         const ttsProvider = resolvers.resolveTtsProvider(session.profileId);
         const apiKey = await getApiKey(ttsProvider, msg.api_key || session.clientApiKey);
-        console.log(`[speech-ws] speak: provider=${ttsProvider} hasKey=${!!apiKey}`);
+        clog.debug('speak', { provider: ttsProvider, chars: text.length, hasKey: !!apiKey });
         try {
           audioStartTime = Date.now();
-          console.log(`[speech-ws] calling providers.streamTts(${ttsProvider})...`);
           const stream = providers.streamTts(ttsProvider, text, { apiKey });
-          activeTts = { aborted: false };
+          const tts = activeTts = { aborted: false };
           let started = false;
           let chunkCount = 0;
           let totalBytes = 0;
           for await (const chunk of stream) {
             if (!started) {
-              console.log('[speech-ws] first chunk received, sending audio.start');
               sendJSON({ type: 'audio.start', contentType: 'audio/mpeg' });
               started = true;
             }
-            if (activeTts?.aborted) { console.log('[speech-ws] TTS aborted'); break; }
+            if (tts.aborted) { clog.info('tts.aborted'); break; }
+            // Backpressure: stop pulling from the provider until the socket drains
+            if (buffered() > limits.highWaterBytes) await waitForDrain(() => tts.aborted);
+            if (tts.aborted) { clog.info('tts.aborted'); break; }
             chunkCount++;
             totalBytes += chunk.length || chunk.byteLength || 0;
-            ws.send(chunk);
+            sendBinary(chunk);
           }
           const durationMs = Date.now() - audioStartTime;
           ttsSeconds += durationMs / 1000;
-          console.log(`[speech-ws] TTS complete: ${chunkCount} chunks, ${totalBytes} bytes, ${durationMs}ms`);
+          clog.info('tts.done', { provider: ttsProvider, chunks: chunkCount, bytes: totalBytes, ms: durationMs });
           sendJSON({ type: 'audio.end', durationMs });
           sendUsage();
           activeTts = null;
         } catch (err) {
-          console.error(`[speech-ws] TTS error:`, err);
+          clog.error('tts.error', { error: err.message });
           sendError('provider_error', err.message);
           activeTts = null;
         }
@@ -194,7 +370,6 @@ export function handleSpeechConnection(ws, deps = {}) {
 
       case 'listen.start': {
         // STT start
-        console.log(`[speech-ws] listen.start: mode=${session.mode}`);
         if (activeStt || activeS2s) {
           return sendError('already_listening', 'Already listening');
         }
@@ -204,29 +379,21 @@ export function handleSpeechConnection(ws, deps = {}) {
         if (session.mode === 's2s') {
           const s2sProvider = resolvers.resolveS2sProvider(session.profileId);
           const apiKey = await getApiKey(s2sProvider, msg.api_key || session.clientApiKey);
-          console.log(`[speech-ws] creating S2S session: provider=${s2sProvider}`);
+          clog.info('s2s.start', { provider: s2sProvider });
           activeS2s = providers.createS2sSession(s2sProvider, {
             apiKey,
-            onInterim: (text, isFinal) => {
-              sendJSON({ type: 'transcript', text, isFinal });
-            },
-          });
-          activeS2s.onAudio((audioChunk) => {
-            ws.send(audioChunk);
-          });
-          activeS2s.onTranscript((text, isFinal) => {
-            sendJSON({ type: 'transcript', text, isFinal });
+            onInterim: (text, isFinal) => sendTranscript('input', text, isFinal),
           });
+          activeS2s.onAudio(sendAudio);
+          activeS2s.onTranscript((text, isFinal) => sendTranscript('output', text, isFinal));
           listenStartTime = Date.now();
         } else {
           const sttProvider = resolvers.resolveSttProvider(session.profileId);
           const apiKey = await getApiKey(sttProvider, msg.api_key || session?.clientApiKey);
-          console.log(`[speech-ws] creating STT session: provider=${sttProvider} hasKey=${!!apiKey}`);
+          clog.info('stt.start', { provider: sttProvider, hasKey: !!apiKey });
           activeStt = providers.createSttSession(sttProvider, {
             apiKey,
-            onInterim: (text, isFinal) => {
-              sendJSON({ type: 'transcript', text, isFinal });
-            },
+            onInterim: (text, isFinal) => sendTranscript('input', text, isFinal),
           });
           listenStartTime = Date.now();
         }
@@ -235,32 +402,33 @@ export function handleSpeechConnection(ws, deps = {}) {
 
       case 'listen.stop': {
         // STT stop
-        console.log(`[speech-ws] listen.stop: S2S=${!!activeS2s} STT=${!!activeStt}`);
         if (activeS2s) {
+          // finish() sends the end of turn once queued audio is upstream;
+          // the reply streams back until the provider completes the turn
+          const s2s = activeS2s;
+          const durationMs = Date.now() - listenStartTime;
           try {
-            activeS2s.finish();
-            const durationMs = Date.now() - listenStartTime;
+            await s2s.finish();
             sttSeconds += durationMs / 1000;
-            console.log(`[speech-ws] S2S finished: ${durationMs}ms`);
+            clog.info('s2s.done', { ms: durationMs });
             sendUsage();
-            activeS2s.destroy();
-            activeS2s = null;
           } catch (err) {
-            console.error('[speech-ws] S2S finish error:', err);
+            clog.error('s2s.error', { error: err.message });
             sendError('provider_error', err.message);
           }
+          s2s.destroy();
+          if (activeS2s === s2s) activeS2s = null;
         } else if (activeStt) {
           try {
-            console.log('[speech-ws] finishing STT...');
             const result = await activeStt.finish();
             const durationMs = result.durationMs || (Date.now() - listenStartTime);
             sttSeconds += durationMs / 1000;
-            console.log(`[speech-ws] STT result: "${(result.transcript||'').slice(0,60)}" ${durationMs}ms`);
+            clog.info('stt.done', { chars: (result.transcript || '').length, ms: durationMs });
             sendJSON({ type: 'transcript', text: result.transcript, isFinal: true, durationMs });
             sendUsage();
             activeStt = null;
           } catch (err) {
-            console.error('[speech-ws] STT finish error:', err);
+            clog.error('stt.error', { error: err.message });
             sendError('provider_error', err.message);
             activeStt = null;
           }
@@ -289,10 +457,16 @@ export function handleSpeechConnection(ws, deps = {}) {
     }
   });
 
-  ws.on('close', (code, reason) => { console.log(`[speech-ws] connection closed: code=${code} reason=${reason}`); cleanup(); });
-  ws.on('error', (err) => { console.error('[speech-ws] connection error:', err?.message || err); cleanup(); });
+  ws.on('close', (code, reason) => {
+    clog.info('close', { code, reason: String(reason || ''), ...counters });
+    cleanup();
+  });
+  ws.on('error', (err) => { clog.warn('ws.error', { error: err?.message || String(err) }); cleanup(); });
 
   function cleanup() {
+    if (drainTimer) { clearTimeout(drainTimer); drainTimer = null; }
+    heldDeltas.clear();
+    deps.metrics?.close(counters);
     if (activeTts) {
       activeTts.aborted = true;
       activeTts = null;
@@ -304,6 +478,8 @@ export function handleSpeechConnection(ws, deps = {}) {
     }
     session = null;
   }
+
+  return { counters };
 }
 
 function defaultGetApiKey(provider, clientKey) {
@@ -47,3 +47,11 @@ export function formatTokens(n) {
   if (n >= 1_000) return `${(n / 1_000).toFixed(1)}K`;
   return String(n);
 }
+
+// Latency percentiles are histogram bucket upper bounds (see latency.js)
+export function formatLatency(ms) {
+  if (ms == null) return '—';
+  if (ms === Infinity) return '>60s';
+  if (ms >= 1000) return `${(ms / 1000).toFixed(1)}s`;
+  return `${ms}ms`;
+}
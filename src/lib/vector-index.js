@@ -0,0 +1,248 @@
+// In-memory ANN index over memory embeddings (browser db layer)
+// Turso WASM has no vector_top_k, so semanticSearch keeps one of these per db
+// instead of pulling every embedding blob across the WASM boundary per query.
+//
+// Binary quantization + rerank: each vector also gets a signature of one bit
+// per dimension (sign after subtracting the corpus mean). A query ranks all
+// signatures by Hamming distance — 12 XOR/popcounts for 384 dims instead of
+// 384 multiply-adds — and only the closest candidates are scored exactly.
+// Adds and removes are O(dim); there is nothing to train. The mean is
+// re-estimated (and signatures rebuilt) each time the index doubles.
+
+const FLAT_MAX = 2048; // exact scan below this — already sub-millisecond
+const MIN_CANDIDATES = 1000;
+const CANDIDATES_PER_RESULT = 100;
+
+function popcount(x) {
+  x -= (x >>> 1) & 0x55555555;
+  x = (x & 0x33333333) + ((x >>> 2) & 0x33333333);
+  return Math.imul((x + (x >>> 4)) & 0x0f0f0f0f, 0x01010101) >>> 24;
+}
+
+function dot(a, aOff, b, bOff, dim) {
+  let s = 0;
+  for (let i = 0; i < dim; i++) s += a[aOff + i] * b[bOff + i];
+  return s;
+}
+
+// Bounded best-first list of { id, similarity } (k is small — insertion is fine)
+function pushTop(top, k, id, similarity) {
+  if (top.length === k && similarity <= top[k - 1].similarity) return;
+  let i = top.length < k ? top.length : k - 1;
+  while (i > 0 && top[i - 1].similarity < similarity) {
+    top[i] = top[i - 1];
+    i--;
+  }
+  top[i] = { id, similarity };
+}
+
+export class VectorIndex {
+  constructor({ dim = 384 } = {}) {
+    this.dim = dim;
+    this.words = Math.ceil(dim / 32);
+    this.capacity = 256;
+    this.vectors = new Float32Array(dim * this.capacity);
+    this.bits = new Uint32Array(this.words * this.capacity);
+    this.ids = [];
+    this.slotOf = new Map(); // id -> slot
+    this.mean = new Float32Array(dim);
+    this.centeredAt = 0; // size when the mean was last estimated
+  }
+
+  get size() {
+    return this.ids.length;
+  }
+
+  has(id) {
+    return this.slotOf.has(id);
+  }
+
+  add(id, vector) {
+    if (vector.length !== this.dim) throw new Error(`Expected ${this.dim}-dim vector, got ${vector.length}`);
+    if (this.slotOf.has(id)) this.remove(id);
+    const slot = this.ids.length;
+    if (slot === this.capacity) this._grow();
+    this.vectors.set(vector, slot * this.dim);
+    this.ids.push(id);
+    this.slotOf.set(id, slot);
+    if (this.size >= FLAT_MAX && this.size >= this.centeredAt * 2) this._recenter();
+    else this._sign(slot);
+  }
+
+  remove(id) {
+    const slot = this.slotOf.get(id);
+    if (slot === undefined) return false;
+    const last = this.ids.length - 1;
+    if (slot !== last) {
+      // Move the last entry into the hole so storage stays dense
+      const { dim, words } = this;
+      this.vectors.copyWithin(slot * dim, last * dim, (last + 1) * dim);
+      this.bits.copyWithin(slot * words, last * words, (last + 1) * words);
+      this.ids[slot] = this.ids[last];
+      this.slotOf.set(this.ids[slot], slot);
+    }
+    this.ids.pop();
+    this.slotOf.delete(id);
+    return true;
+  }
+
+  clear() {
+    this.ids = [];
+    this.slotOf.clear();
+    this.mean.fill(0);
+    this.centeredAt = 0;
+  }
+
+  _grow() {
+    this.capacity *= 2;
+    const vectors = new Float32Array(this.dim * this.capacity);
+    vectors.set(this.vectors);
+    this.vectors = vectors;
+    const bits = new Uint32Array(this.words * this.capacity);
+    bits.set(this.bits);
+    this.bits = bits;
+  }
+
+  // Embedding dims carry a shared bias; signs are only informative around the mean
+  _recenter() {
+    const { dim, vectors, mean } = this;
+    const n = this.size;
+    mean.fill(0);
+    for (let slot = 0; slot < n; slot++) {
+      for (let d = 0; d < dim; d++) mean[d] += vectors[slot * dim + d];
+    }
+    for (let d = 0; d < dim; d++) mean[d] /= n;
+    for (let slot = 0; slot < n; slot++) this._sign(slot);
+    this.centeredAt = n;
+  }
+
+  _signature(vec, off, out, outOff) {
+    const { dim, mean } = this;
+    for (let w = 0; w < this.words; w++) {
+      let word = 0;
+      const end = Math.min(dim, (w + 1) * 32);
+      for (let d = w * 32; d < end; d++) {
+        if (vec[off + d] > mean[d]) word |= 1 << (d & 31);
+      }
+      out[outOff + w] = word;
+    }
+  }
+
+  _sign(slot) {
+    this._signature(this.vectors, slot * this.dim, this.bits, slot * this.words);
+  }
+
+  // Top-k by dot product (== cosine for normalised embeddings)
+  search(query, { limit = 10, threshold = -Infinity } = {}) {
+    const { dim, vectors } = this;
+    const n = this.size;
+    const top = [];
+    const consider = (slot) => {
+      const sim = dot(vectors, slot * dim, query, 0, dim);
+      if (sim >= threshold) pushTop(top, limit, this.ids[slot], sim);
+    };
+    const candidates = Math.max(MIN_CANDIDATES, limit * CANDIDATES_PER_RESULT);
+    if (n <= Math.max(FLAT_MAX, candidates)) {
+      for (let slot = 0; slot < n; slot++) consider(slot);
+      return top;
+    }
+
+    // Hamming distance to every signature, then a counting pass to find the
+    // distance cutoff that admits ~`candidates` slots (no sort)
+    const { words, bits } = this;
+    const q = new Uint32Array(words);
+    this._signature(query, 0, q, 0);
+    if (!this._dist || this._dist.length < n) this._dist = new Uint16Array(this.capacity);
+    const dist = this._dist;
+    const histogram = new Uint32Array(dim + 1);
+    for (let slot = 0, off = 0; slot < n; slot++) {
+      let h = 0;
+      for (let w = 0; w < words; w++, off++) {
+        h += popcount(bits[off] ^ q[w]);
+      }
+      dist[slot] = h;
+      histogram[h]++;
+    }
+    let cutoff = 0;
+    for (let seen = histogram[0]; seen < candidates && cutoff < dim; seen += histogram[++cutoff]);
+    for (let slot = 0; slot < n; slot++) {
+      if (dist[slot] <= cutoff) consider(slot);
+    }
+    return top;
+  }
+}
+
+// --- Per-db index kept in sync with the memories table ---
+
+const _indexes = new WeakMap();
+
+// BLOB columns come back as Uint8Array/Buffer (possibly a view into a pool) or ArrayBuffer
+export function toVector(blob) {
+  if (blob instanceof Float32Array) return blob;
+  if (blob instanceof ArrayBuffer) return new Float32Array(blob);
+  if (blob.byteOffset % 4 === 0) return new Float32Array(blob.buffer, blob.byteOffset, blob.byteLength / 4);
+  return new Float32Array(new Uint8Array(blob.buffer, blob.byteOffset, blob.byteLength).slice().buffer);
+}
+
+export function dropVectorIndex(db) {
+  _indexes.delete(db);
+}
+
+// Load embeddings the index hasn't seen. memories ids only grow (a supersede
+// inserts a new row), so MAX(id) — a rowid lookup — detects new rows cheaply;
+// superseded rows are pruned lazily when a search hydrates them.
+async function syncIndex(db, dim) {
+  let entry = _indexes.get(db);
+  const { maxId } = await db.prepare('SELECT MAX(id) AS maxId FROM memories').get() || {};
+  if (entry && (maxId ?? 0) < entry.maxId) entry = null; // table was cleared
+  if (!entry) {
+    entry = { index: new VectorIndex({ dim }), maxId: 0 };
+    _indexes.set(db, entry);
+  }
+  if ((maxId ?? 0) > entry.maxId) {
+    const rows = await db.prepare(
+      'SELECT id, embedding FROM memories WHERE id > ? AND superseded_by IS NULL AND embedding IS NOT NULL'
+    ).all(entry.maxId);
+    for (const row of rows) {
+      const vec = toVector(row.embedding);
+      if (vec.length === entry.index.dim) entry.index.add(row.id, vec);
+    }
+    entry.maxId = maxId;
+  }
+  return entry.index;
+}
+
+export async function getVectorIndex(db, { dim = 384 } = {}) {
+  return syncIndex(db, dim);
+}
+
+const MEMORY_COLUMNS = 'id, content, compressed, project, person, type, priority, created_at';
+
+// ANN search over active memories; rows come back with a similarity field
+export async function searchMemoryVectors(db, queryEmbedding, opts = {}) {
+  const { limit = 10, threshold = 0.3 } = opts;
+  const index = await syncIndex(db, queryEmbedding.length);
+  let want = limit * 2;
+  for (;;) {
+    const hits = index.search(queryEmbedding, { limit: want, threshold });
+    if (!hits.length) return [];
+    const placeholders = hits.map(() => '?').join(', ');
+    const rows = await db.prepare(
+      `SELECT ${MEMORY_COLUMNS}, superseded_by FROM memories WHERE id IN (${placeholders})`
+    ).all(...hits.map((h) => h.id));
+    const byId = new Map(rows.map((r) => [r.id, r]));
+    const results = [];
+    for (const hit of hits) {
+      const row = byId.get(hit.id);
+      if (!row || row.superseded_by != null) {
+        index.remove(hit.id); // superseded, archived or deleted since indexed
+        continue;
+      }
+      const { superseded_by, ...memory } = row;
+      results.push({ ...memory, similarity: hit.similarity });
+    }
+    // Stale hits crowded out live ones — they're pruned now, so look again
+    if (results.length >= limit || hits.length < want) return results.slice(0, limit);
+    want *= 2;
+  }
+}
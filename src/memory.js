@@ -4,17 +4,35 @@
 import { createClient } from '@libsql/client';
 import { dirname, join } from 'path';
 import { fileURLToPath } from 'url';
-import { existsSync, statSync, mkdirSync } from 'fs';
+import { existsSync, statSync, mkdirSync, readFileSync, readdirSync } from 'fs';
+import { EMBEDDING_MODEL, CACHE_MAX_ENTRIES, EMBEDDING_CACHE_SCHEMA, embedWithCache } from './lib/embedding-cache.js';
 // --- config ---
 const __dir = dirname(fileURLToPath(import.meta.url));
 let DB_PATH = process.env.THINKDONE_DB || join(__dir, '..', '..', '.claude', 'memory.db');
 const TURSO_URL = process.env.THINKDONE_TURSO_URL || '';
 const TURSO_TOKEN = process.env.THINKDONE_TURSO_TOKEN || '';
 const TYPES = new Set(['decision','blocker','status','pattern','dependency','commitment','idea','insight']);
-// --- embedding (lazy) ---
+// --- embedding (lazy, batched, cached in embedding_cache — see src/lib/embedding-cache.js) ---
+const BATCH = 32;
+const CACHE_MAX = +process.env.THINKDONE_EMBED_CACHE || CACHE_MAX_ENTRIES;
 let _emb = null;
-const getEmb = async () => _emb ??= await (await import('@huggingface/transformers')).pipeline('feature-extraction', 'Xenova/bge-small-en-v1.5', { dtype: 'fp32' });
-const embed = async text => Array.from((await (await getEmb())(text, { pooling: 'cls', normalize: true })).data);
+const getEmb = async () => _emb ??= await (await import('@huggingface/transformers')).pipeline('feature-extraction', EMBEDDING_MODEL, { dtype: 'fp32' });
+// one forward pass per BATCH texts (length-sorted to limit padding), input order kept
+const embedBatch = async texts => {
+  const emb = await getEmb(), out = new Array(texts.length);
+  const order = texts.map((_, i) => i).sort((a, b) => texts[a].length - texts[b].length);
+  for (let i = 0; i < order.length; i += BATCH) {
+    const idx = order.slice(i, i + BATCH);
+    const r = await emb(idx.map(j => texts[j]), { pooling: 'cls', normalize: true });
+    const d = r.dims[r.dims.length - 1];
+    idx.forEach((j, row) => { out[j] = r.data.slice(row * d, (row + 1) * d); });
+  }
+  return out;
+};
+// plain arrays: vectors go to libsql as vector(JSON)
+const embedAll = async (db, texts) =>
+  (await embedWithCache(db, texts, embedBatch, { maxEntries: CACHE_MAX })).map(v => Array.from(v));
+const embed = async (db, text) => (await embedAll(db, [text]))[0];
 // --- db ---
 const getDb = (path = DB_PATH) => {
   const dir = dirname(path);
@@ -44,7 +62,8 @@ const schema = db => db.batch([
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     routine_id INTEGER NOT NULL, completed_date TEXT NOT NULL,
     completed_at TEXT NOT NULL,
-    FOREIGN KEY (routine_id) REFERENCES routines(id))`, args: [] }
+    FOREIGN KEY (routine_id) REFERENCES routines(id))`, args: [] },
+  ...EMBEDDING_CACHE_SCHEMA.map(sql => ({ sql, args: [] })),
 ]);
 const sync = db => TURSO_URL ? db.sync().catch(() => {}) : Promise.resolve();
 // --- queries ---
@@ -65,19 +84,19 @@ const cmds = {
     const mode = TURSO_URL ? `Turso (${TURSO_URL})` : 'local';
     console.log(`Database: ${DB_PATH} (${mode})`);
     console.log('Testing embedding model (first run downloads ~100MB)...');
-    const vec = await embed('test memory');
+    const [vec] = await embedBatch(['test memory']);
     console.log(`  ${vec.length} dimensions — setup complete.`);
   },
   async store(db, { _: [content], project = '', type = 'insight' }) {
     const t = type.toLowerCase();
     if (!TYPES.has(t)) { console.log(`Invalid type. Valid: ${[...TYPES].sort().join(', ')}`); process.exit(1); }
     await schema(db);
-    await store(db, content, project, t, await embed(content));
+    await store(db, content, project, t, await embed(db, content));
     console.log(`Stored ${t}${project ? ` [${project}]` : ''}: ${content}`);
   },
   async search(db, { _: [query], n = 5, includeSuperseded = false }) {
     await schema(db);
-    const rows = await search(db, await embed(query), n, includeSuperseded);
+    const rows = await search(db, await embed(db, query), n, includeSuperseded);
     if (!rows.length) return console.log('No results.');
     rows.forEach(r => console.log(`  #${r.id} ${r.type}${r.project ? ` [${r.project}]` : ''}: ${r.content}${r.superseded_by ? ' [SUPERSEDED]' : ''}`));
   },
@@ -85,27 +104,29 @@ const cmds = {
     await schema(db);
     const cutoff = new Date(Date.now() - 3 * 86400000).toISOString();
     const sections = [], focus = new Set();
+    // one pass: every active memory (+ recent decisions, superseded or not), grouped by type
+    const rows = await q(db, "SELECT content, project, type, created_at FROM memories WHERE superseded_by IS NULL OR (type='decision' AND created_at>=?) ORDER BY created_at DESC", [cutoff]);
+    const by = {};
+    rows.forEach(r => (by[r.type] ||= []).push(r));
+    const of = t => by[t] || [];
     // blockers
-    const bl = await q(db, 'SELECT content, project FROM memories WHERE type=? AND superseded_by IS NULL ORDER BY created_at DESC', ['blocker']);
+    const bl = of('blocker');
     if (bl.length) { bl.forEach(r => r.project && focus.add(r.project)); sections.push(['BLOCKERS', bl.map(r => `  - ${strip(r.content)}`)]); }
     // commitments
-    const cm = await q(db, 'SELECT content, project FROM memories WHERE type=? AND superseded_by IS NULL ORDER BY created_at DESC', ['commitment']);
+    const cm = of('commitment');
     if (cm.length) { cm.forEach(r => r.project && focus.add(r.project)); sections.push(['COMMITMENTS', cm.map(r => `  - ${strip(r.content)}`)]); }
     // recent decisions
-    const dc = await q(db, 'SELECT content FROM memories WHERE type=? AND created_at>=? ORDER BY created_at DESC', ['decision', cutoff]);
+    const dc = of('decision').filter(r => r.created_at >= cutoff);
     if (dc.length) sections.push(['RECENT DECISIONS (3 days)', dc.map(r => `  - ${strip(r.content)}`)]);
     // patterns
-    const pt = await q(db, 'SELECT content FROM memories WHERE type=? AND superseded_by IS NULL ORDER BY created_at DESC', ['pattern']);
+    const pt = of('pattern');
     if (pt.length) sections.push(['PATTERNS', pt.map(r => `  - ${strip(r.content)}`)]);
     // dependencies
-    const dp = await q(db, 'SELECT content FROM memories WHERE type=? AND superseded_by IS NULL ORDER BY created_at DESC', ['dependency']);
+    const dp = of('dependency');
     if (dp.length) sections.push(['DEPENDENCIES', dp.map(r => `  - ${strip(r.content)}`)]);
     // context: statuses/ideas for focus projects + recent
     const fp = [...focus].sort();
-    const ctxSql = fp.length
-      ? `SELECT content FROM memories WHERE type IN ('status','idea') AND superseded_by IS NULL AND (project IN (${fp.map(()=>'?').join(',')}) OR created_at>=?) ORDER BY type, created_at DESC`
-      : `SELECT content FROM memories WHERE type IN ('status','idea') AND superseded_by IS NULL AND created_at>=? ORDER BY type, created_at DESC`;
-    const ctx = await q(db, ctxSql, fp.length ? [...fp, cutoff] : [cutoff]);
+    const ctx = [...of('idea'), ...of('status')].filter(r => focus.has(r.project) || r.created_at >= cutoff);
     if (ctx.length) sections.push([`ACTIVE CONTEXT (focus: ${fp.join(', ') || 'general'})`, ctx.map(r => `  - ${strip(r.content)}`)]);
     // output
     const d = new Date();
@@ -130,13 +151,33 @@ const cmds = {
     await schema(db);
     const old = (await q(db, 'SELECT project, type, content FROM memories WHERE id=?', [+id]))[0];
     if (!old) { console.log(`Memory #${id} not found.`); process.exit(1); }
-    const vec = await embed(content);
+    const vec = await embed(db, content);
     const r = await db.execute({ sql: 'INSERT INTO memories (content, project, type, created_at, embedding) VALUES (?,?,?,?,vector(?))', args: [content, project ?? old.project, type ?? old.type, new Date().toISOString(), JSON.stringify(vec)] });
     const newId = Number(r.lastInsertRowid);
     await db.execute({ sql: 'UPDATE memories SET superseded_by=? WHERE id=?', args: [newId, +id] });
     await sync(db);
     console.log(`Superseded #${id} -> #${newId}\n  OLD: ${old.content}\n  NEW: ${content}`);
   },
+  async import(db, { _: [path], project = '', type = 'insight' }) {
+    const t = type.toLowerCase();
+    if (!path || !TYPES.has(t)) { console.log('Usage: import <file|dir> [-p project] [-t type]'); process.exit(1); }
+    await schema(db);
+    // every list item in the markdown file(s) becomes one memory
+    const files = statSync(path).isDirectory()
+      ? readdirSync(path, { recursive: true }).filter(f => f.endsWith('.md')).map(f => join(path, f))
+      : [path];
+    const items = files.flatMap(f => readFileSync(f, 'utf8').split('\n'))
+      .map(l => l.match(/^\s*[-*]\s+(?:\[[ xX]\]\s+)?(.+)$/)?.[1].trim()).filter(Boolean);
+    const existing = new Set((await q(db, 'SELECT content FROM memories WHERE project=? AND superseded_by IS NULL', [project])).map(r => r.content));
+    const fresh = [...new Set(items)].filter(c => !existing.has(c));
+    if (!fresh.length) return console.log(`Nothing new in ${files.length} file(s).`);
+    const started = Date.now();
+    const vecs = await embedAll(db, fresh);
+    const now = new Date().toISOString();
+    await db.batch(fresh.map((c, i) => ({ sql: 'INSERT INTO memories (content, project, type, created_at, embedding) VALUES (?,?,?,?,vector(?))', args: [c, project, t, now, JSON.stringify(vecs[i])] })), 'write');
+    await sync(db);
+    console.log(`Imported ${fresh.length} ${t} memories${project ? ` [${project}]` : ''} from ${files.length} file(s) in ${((Date.now() - started) / 1000).toFixed(1)}s (${items.length - fresh.length} already stored).`);
+  },
   async consolidate(db) {
     await schema(db);
     let n = 0;
@@ -392,6 +433,7 @@ Commands:
   recent [--days 3]                   Recent memories
   project <name>                      Project memories
   supersede <id> <text> [-t type]     Supersede old → new
+  import <file|dir> [-p project] [-t type]  Store every list item in .md files
   consolidate                         Weekly compression
   stats                               Memory health
 
@@ -403,7 +445,7 @@ Commands:
   habit resume <id>                   Reactivate
   habit remove <id>                   Delete permanently
   habit streak [<id>]                 Show streaks
-Env: THINKDONE_DB, THINKDONE_TURSO_URL, THINKDONE_TURSO_TOKEN`;
+Env: THINKDONE_DB, THINKDONE_TURSO_URL, THINKDONE_TURSO_TOKEN, THINKDONE_EMBED_CACHE (default 5000)`;
 const argv = process.argv.slice(2);
 if (!argv.length) { console.log(USAGE); process.exit(0); }
 const dbIdx = argv.indexOf('--db');
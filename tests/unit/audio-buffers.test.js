@@ -0,0 +1,157 @@
+import { describe, it } from 'node:test';
+import assert from 'node:assert/strict';
+import {
+  encodeBase64, decodeBase64, decodedBase64Length,
+  pcm16ToFloat32, float32ToPcm16, PcmRingBuffer,
+} from '../../src/lib/audio-buffers.js';
+import { PCM_WORKLET_SOURCE, createCapturePipeline, createPlaybackPipeline } from '../../src/lib/audio-worklet.js';
+
+function bytesOf(n) {
+  const b = new Uint8Array(n);
+  for (let i = 0; i < n; i++) b[i] = (i * 37 + 11) & 0xff;
+  return b;
+}
+
+// Table codec only: hide the native toBase64 / fromBase64 fast paths
+function plain(bytes) {
+  const copy = new Uint8Array(bytes);
+  Object.defineProperty(copy, 'toBase64', { value: undefined });
+  return copy;
+}
+
+describe('base64 codec', () => {
+  it('matches Buffer for every tail length and across encode slices', () => {
+    for (const n of [0, 1, 2, 3, 4, 5, 24575, 24576, 24577, 70000]) {
+      const bytes = bytesOf(n);
+      const expected = Buffer.from(bytes).toString('base64');
+      assert.equal(encodeBase64(plain(bytes)), expected, `encode ${n}`);
+      assert.equal(encodeBase64(bytes), expected);
+      assert.deepEqual(decodeBase64(expected, new Uint8Array(decodedBase64Length(expected))), bytes, `decode ${n}`);
+    }
+  });
+  //
+  it('decodes into a reusable buffer and returns an exact-length view', () => {
+    const out = new Uint8Array(64);
+    const view = decodeBase64(Buffer.from([1, 2, 3, 4]).toString('base64'), out);
+    assert.deepEqual([...view], [1, 2, 3, 4]);
+    assert.equal(view.buffer, out.buffer);
+    assert.throws(() => decodeBase64('AAAAAAAA', new Uint8Array(2)), RangeError);
+    assert.throws(() => decodeBase64('AA!A', new Uint8Array(3)));
+  });
+});
+
+describe('PCM conversion', () => {
+  it('converts into caller-supplied arrays', () => {
+    const pcm = new Uint8Array(new Int16Array([0, 16384, -32768, 32767]).buffer);
+    const scratch = new Float32Array(8);
+    const f32 = pcm16ToFloat32(pcm, scratch);
+    assert.equal(f32.buffer, scratch.buffer);
+    assert.deepEqual([...f32], [0, 0.5, -1, 32767 / 32768]);
+    const out = new Int16Array(8);
+    assert.deepEqual([...float32ToPcm16(f32, out)], [0, 16384, -32768, 32767]);
+  });
+});
+
+describe('PcmRingBuffer', () => {
+  it('wraps around and reads in order', () => {
+    const ring = new PcmRingBuffer(4);
+    ring.write([1, 2, 3]);
+    const out = new Float32Array(2);
+    assert.equal(ring.read(out), 2);
+    ring.write([4, 5, 6]);
+    const rest = new Float32Array(8);
+    assert.equal(ring.read(rest), 4);
+    assert.deepEqual([...rest.subarray(0, 4)], [3, 4, 5, 6]);
+    assert.equal(ring.available, 0);
+  });
+  //
+  it('overwrites the oldest samples when full and counts them', () => {
+    const ring = new PcmRingBuffer(2);
+    ring.writePcm16(new Uint8Array(new Int16Array([8192, 16384, -16384]).buffer));
+    assert.equal(ring.dropped, 1);
+    const out = new Float32Array(2);
+    ring.read(out);
+    assert.deepEqual([...out], [0.5, -0.5]);
+  });
+});
+
+// Evaluate the worklet module with a minimal AudioWorkletGlobalScope
+function loadProcessors() {
+  const registered = {};
+  class AudioWorkletProcessor {
+    constructor() {
+      this.port = { posted: [], onmessage: null, postMessage(msg) { this.posted.push(msg); } };
+    }
+  }
+  new Function('AudioWorkletProcessor', 'registerProcessor', 'sampleRate', PCM_WORKLET_SOURCE)(
+    AudioWorkletProcessor, (name, cls) => { registered[name] = cls; }, 24000,
+  );
+  return registered;
+}
+
+describe('PCM worklet processors', () => {
+  it('capture emits fixed-size PCM16 frames with a level and recycles buffers', () => {
+    const Capture = loadProcessors()['pcm-capture'];
+    const proc = new Capture({ processorOptions: { frameSamples: 256 } });
+    const quantum = new Float32Array(128).fill(0.5);
+    proc.process([[quantum]]);
+    assert.equal(proc.port.posted.length, 0);
+    proc.process([[quantum]]);
+    const [{ buffer, level }] = proc.port.posted;
+    assert.equal(buffer.byteLength, 512);
+    assert.equal(new Int16Array(buffer)[0], 16384);
+    assert.equal(level, 1);
+    proc.port.onmessage({ data: buffer });
+    for (let i = 0; i < 4; i++) proc.process([[quantum]]);
+    // frame 2 was already allocated when frame 1 went out; frame 3 reuses it
+    assert.notEqual(proc.port.posted[1].buffer, buffer);
+    assert.equal(proc.port.posted[2].buffer, buffer);
+  });
+  //
+  it('playback renders queued PCM then posts drained once', () => {
+    const Playback = loadProcessors()['pcm-playback'];
+    const proc = new Playback({ processorOptions: { capacity: 1024 } });
+    proc.port.onmessage({ data: new Uint8Array(new Int16Array(100).fill(16384).buffer) });
+    const out = new Float32Array(128);
+    proc.process([], [[out]]);
+    assert.equal(out[0], 0.5);
+    assert.equal(out[127], 0);
+    proc.process([], [[out]]);
+    assert.deepEqual(proc.port.posted, [{ type: 'drained' }]);
+  });
+});
+
+describe('pipeline fallback (no audioWorklet)', () => {
+  it('capture converts ScriptProcessor blocks into reused PCM16 frames', async () => {
+    const processor = { connect() {}, disconnect() {} };
+    const ctx = { destination: {}, createScriptProcessor: () => processor };
+    const frames = [];
+    const levels = [];
+    await createCapturePipeline(ctx, { connect() {} }, {
+      onFrame: (pcm) => frames.push(pcm), onLevel: (l) => levels.push(l), AudioWorkletNode: null,
+    });
+    const block = new Float32Array(4096).fill(-0.5);
+    processor.onaudioprocess({ inputBuffer: { getChannelData: () => block } });
+    processor.onaudioprocess({ inputBuffer: { getChannelData: () => block } });
+    assert.equal(frames[0].length, 8192);
+    assert.equal(frames[0].buffer, frames[1].buffer);
+    assert.equal(new Int16Array(frames[0].buffer)[0], -16384);
+    assert.deepEqual(levels, [1, 1]);
+  });
+  //
+  it('playback schedules gapless sources and tracks remaining time', async () => {
+    const starts = [];
+    const ctx = {
+      currentTime: 1, destination: {}, sampleRate: 24000,
+      createBuffer: (_c, length) => ({ length, copyToChannel() {} }),
+      createBufferSource: () => ({ connect() {}, start(t) { starts.push(t); }, stop() {} }),
+    };
+    const playback = await createPlaybackPipeline(ctx, { sampleRate: 24000, AudioWorkletNode: null });
+    playback.push(new Uint8Array(48000)); // 1s
+    playback.push(new Uint8Array(24000)); // 0.5s
+    assert.deepEqual(starts, [1, 2]);
+    assert.equal(playback.remainingSeconds, 1.5);
+    playback.clear();
+    assert.equal(playback.remainingSeconds, 0);
+  });
+});
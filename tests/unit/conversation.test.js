@@ -3,7 +3,7 @@ import assert from 'node:assert/strict';
 import {
   createSession, transitionState, parseMeetingState, assembleSystemPrompt,
   getMeetingRules, stripExtractionFormat, assembleS2sSystemPrompt,
-  deliverOpeningTurn, initializeSession,
+  deliverOpeningTurn, initializeSession, getPromptCacheStats, resetPromptCache,
 } from '../../src/lib/conversation.js';
 import { createTestDb } from '../helpers/test-db.js';
 import { ensureSchema, storeMemory, seedPersonality } from '../../src/lib/db.js';
@@ -243,6 +243,60 @@ describe('assembleSystemPrompt', () => {
   });
 });
 
+describe('assembleSystemPrompt caching', () => {
+  beforeEach(() => resetPromptCache());
+
+  it('reuses soul and memory context across turns when nothing changed', async () => {
+    await storeMemory(db, 'Server deployment blocked', { type: 'blocker', project: 'ocean' });
+    const session = createSession('morning_meeting');
+    session.state = 'AGENDA_LOOP';
+    const first = await assembleSystemPrompt(session, db);
+    session.messages.push({ role: 'user', content: 'Next item' });
+    const second = await assembleSystemPrompt(session, db);
+    const stats = getPromptCacheStats();
+    assert.deepEqual(stats.soul, { hits: 1, rebuilds: 1 });
+    assert.deepEqual(stats.context, { hits: 1, rebuilds: 1 });
+    assert.equal(second.blocks[0].text, first.blocks[0].text);
+  });
+
+  it('rebuilds memory context after a memory is stored', async () => {
+    const session = createSession('morning_meeting');
+    session.state = 'AGENDA_LOOP';
+    await assembleSystemPrompt(session, db);
+    await storeMemory(db, 'Waiting on legal review', { type: 'blocker' });
+    const result = await assembleSystemPrompt(session, db);
+    assert.ok(result.flat.includes('Waiting on legal review'));
+    assert.deepEqual(getPromptCacheStats().context, { hits: 0, rebuilds: 2 });
+    assert.deepEqual(getPromptCacheStats().soul, { hits: 1, rebuilds: 1 });
+  });
+
+  it('rebuilds after raw SQL updates to memories', async () => {
+    const id = await storeMemory(db, 'Server deployment blocked', { type: 'blocker' });
+    const session = createSession('morning_meeting');
+    await assembleSystemPrompt(session, db);
+    await db.prepare('UPDATE memories SET superseded_by = -1 WHERE id = ?').run(id);
+    const result = await assembleSystemPrompt(session, db);
+    assert.ok(!result.flat.includes('Server deployment blocked'));
+  });
+
+  it('rebuilds the soul block when personality changes', async () => {
+    const session = createSession('morning_meeting');
+    await assembleSystemPrompt(session, db);
+    await db.prepare('UPDATE personality SET disposition = ? WHERE id = 1').run(JSON.stringify({ humor: 'dry' }));
+    const result = await assembleSystemPrompt(session, db);
+    assert.ok(result.blocks[0].text.includes('humor: dry'));
+    assert.deepEqual(getPromptCacheStats().soul, { hits: 0, rebuilds: 2 });
+  });
+
+  it('shares cached blocks with the S2S prompt', async () => {
+    const session = createSession('morning_meeting');
+    await assembleSystemPrompt(session, db);
+    await assembleS2sSystemPrompt(session, db);
+    assert.deepEqual(getPromptCacheStats().soul, { hits: 1, rebuilds: 1 });
+    assert.deepEqual(getPromptCacheStats().context, { hits: 1, rebuilds: 1 });
+  });
+});
+
 describe('getMeetingRules', () => {
   it('returns rules for morning_meeting', () => {
     const rules = getMeetingRules('morning_meeting');
@@ -3,10 +3,11 @@ import assert from 'node:assert/strict';
 import { createTestDb } from '../helpers/test-db.js';
 import {
   ensureSchema,
-  getTasks, addTask, toggleTask, deleteTask, editTask, reorderTasks,
+  getTasks, addTask, addTasks, toggleTask, deleteTask, editTask, reorderTasks, POSITION_GAP,
   storeMemory, getActiveMemories, supersedeMemory,
+  withTransaction, writeBatch,
   seedPersonality,
-  getActiveSession, saveSessionState, createActiveSession,
+  getActiveSession, saveSessionState, createActiveSession, getConversationMessages,
 } from '../../src/lib/db.js';
 
 let db;
@@ -53,15 +54,54 @@ describe('Task CRUD', () => {
     assert.equal(tasks[0].checked, 0);
   });
 
-  it('new tasks insert at position 0 and shift others', async () => {
+  it('new tasks insert on top without shifting others', async () => {
     await addTask(db, 'First task', { planDate: '2026-02-10' });
     await addTask(db, 'Second task', { planDate: '2026-02-10' });
     const tasks = await getTasks(db, '2026-02-10');
     assert.equal(tasks.length, 2);
     assert.equal(tasks[0].text, 'Second task');
-    assert.equal(tasks[0].position, 0);
+    assert.equal(tasks[0].position, -POSITION_GAP);
     assert.equal(tasks[1].text, 'First task');
-    assert.equal(tasks[1].position, 1);
+    assert.equal(tasks[1].position, 0);
+  });
+
+  it('addTasks bulk-inserts in the same order as repeated addTask', async () => {
+    await addTask(db, 'Existing', { planDate: '2026-02-10' });
+    const ids = await addTasks(db, [
+      'One ~15m — work',
+      { text: 'Two', source: 'meeting' },
+      { text: 'Elsewhere', planDate: '2026-02-11' },
+      'Three',
+    ], { planDate: '2026-02-10' });
+    const tasks = await getTasks(db, '2026-02-10');
+    assert.deepEqual(tasks.map(t => t.text), ['Three', 'Two', 'One ~15m — work', 'Existing']);
+    assert.deepEqual(tasks.slice(0, 3).map(t => t.id), [ids[3], ids[1], ids[0]]);
+    assert.equal(tasks[2].minutes, 15);
+    assert.equal(tasks[2].project, 'work');
+    const row = await db.prepare('SELECT source FROM tasks WHERE id = ?').get(ids[1]);
+    assert.equal(row.source, 'meeting');
+    assert.deepEqual((await getTasks(db, '2026-02-11')).map(t => t.id), [ids[2]]);
+  });
+
+  it('addTasks keeps order across insert chunks', async () => {
+    const texts = Array.from({ length: 250 }, (_, i) => `Task ${i}`);
+    await addTasks(db, texts, { planDate: '2026-02-10' });
+    const tasks = await getTasks(db, '2026-02-10');
+    assert.deepEqual(tasks.map(t => t.text), texts.reverse());
+  });
+
+  it('addTasks rolls back every chunk when a later one fails', async () => {
+    let inserts = 0;
+    const failing = Object.assign(Object.create(db), {
+      prepare(sql) {
+        if (sql.startsWith('INSERT INTO tasks') && ++inserts === 2) throw new Error('disk full');
+        return db.prepare(sql);
+      },
+      exec: (sql) => db.exec(sql),
+    });
+    const texts = Array.from({ length: 150 }, (_, i) => `Task ${i}`);
+    await assert.rejects(addTasks(failing, texts, { planDate: '2026-02-10' }), /disk full/);
+    assert.equal((await getTasks(db, '2026-02-10')).length, 0);
   });
 
   it('toggles task checked state', async () => {
@@ -113,6 +153,17 @@ describe('Task CRUD', () => {
     assert.equal(tasks[2].text, 'C');
   });
 
+  it('reorder leaves gaps so later inserts do not collide', async () => {
+    await addTasks(db, ['A', 'B', 'C'], { planDate: '2026-02-10' });
+    const ids = (await getTasks(db, '2026-02-10')).map(t => t.id);
+    await reorderTasks(db, ids.reverse());
+    let tasks = await getTasks(db, '2026-02-10');
+    assert.deepEqual(tasks.map(t => t.position), [0, POSITION_GAP, 2 * POSITION_GAP]);
+    await addTask(db, 'D', { planDate: '2026-02-10' });
+    tasks = await getTasks(db, '2026-02-10');
+    assert.deepEqual(tasks.map(t => t.text), ['D', 'A', 'B', 'C']);
+  });
+
   it('only returns tasks for the requested date', async () => {
     await addTask(db, 'Today', { planDate: '2026-02-10' });
     await addTask(db, 'Tomorrow', { planDate: '2026-02-11' });
@@ -172,6 +223,80 @@ describe('Memory CRUD', () => {
   });
 });
 
+describe('Batch writes', () => {
+  it('writeBatch inserts tasks, memories and statements and returns ids', async () => {
+    await seedPersonality(db);
+    const created = await writeBatch(db, {
+      tasks: [{ text: 'Ship it', planDate: '2026-02-10', source: 'meeting' }],
+      memories: [
+        { content: 'Use Postgres', type: 'decision', project: 'ocean' },
+        { content: 'Send deck', type: 'commitment', person: 'Ana' },
+      ],
+      statements: [['UPDATE personality SET disposition = ? WHERE id = 1', '{"tone":"dry"}']],
+    });
+    assert.equal(created.tasks.length, 1);
+    assert.equal((await getTasks(db, '2026-02-10'))[0].id, created.tasks[0]);
+    const mems = await db.prepare('SELECT id, type, person FROM memories ORDER BY id').all();
+    assert.deepEqual(mems.map(m => m.id), created.memories);
+    assert.equal(mems[1].person, 'Ana');
+    const row = await db.prepare('SELECT disposition FROM personality WHERE id = 1').get();
+    assert.equal(row.disposition, '{"tone":"dry"}');
+  });
+
+  it('writeBatch rolls back the whole batch on error', async () => {
+    await assert.rejects(writeBatch(db, {
+      memories: [{ content: 'Kept?' }],
+      statements: [['INSERT INTO no_such_table VALUES (1)']],
+    }));
+    assert.equal((await getActiveMemories(db)).length, 0);
+    // The connection is usable again afterwards
+    await writeBatch(db, { memories: [{ content: 'After' }] });
+    assert.equal((await getActiveMemories(db)).length, 1);
+  });
+
+  it('withTransaction serializes concurrent callers', async () => {
+    const order = [];
+    const slow = withTransaction(db, async () => {
+      order.push('a:start');
+      await new Promise(r => setTimeout(r, 10));
+      order.push('a:end');
+    });
+    const fast = withTransaction(db, async () => { order.push('b'); });
+    await Promise.all([slow, fast]);
+    assert.deepEqual(order, ['a:start', 'a:end', 'b']);
+  });
+
+  it('writes on the shared db wait for an open batch instead of joining it', async () => {
+    const taskId = await addTask(db, 'Toggle me');
+    let began;
+    const opened = new Promise(r => { began = r; });
+    const batch = withTransaction(db, async (tx) => {
+      await tx.prepare("INSERT INTO memories (content, created_at) VALUES ('Rolled back', '2026-01-01')").run();
+      began();
+      await new Promise(r => setTimeout(r, 10));
+      throw new Error('batch failed');
+    });
+    await opened;
+    const toggled = toggleTask(db, taskId);    // UI handler mid-batch
+    await assert.rejects(batch, /batch failed/);
+    await toggled;
+    assert.equal((await db.prepare('SELECT checked FROM tasks WHERE id = ?').get(taskId)).checked, 1);
+    assert.equal((await getActiveMemories(db)).length, 0);
+  });
+
+  it('queued writes given tx run inside the transaction; nesting throws', async () => {
+    const { prepare, exec } = db;
+    const taskId = await addTask(db, 'Inside');
+    const result = await withTransaction(db, async (tx) => {
+      await assert.rejects(withTransaction(tx, async () => {}), /already inside a transaction/);
+      return toggleTask(tx, taskId);
+    });
+    assert.equal(result, 'checked');
+    assert.equal(db.prepare, prepare);        // connection is never patched
+    assert.equal(db.exec, exec);
+  });
+});
+
 describe('seedPersonality', () => {
   it('inserts default SOUL', async () => {
     await seedPersonality(db);
@@ -229,7 +354,51 @@ describe('Active Session helpers', () => {
     await saveSessionState(db, id, session);
     const row = await db.prepare('SELECT * FROM conversations WHERE id = ?').get(id);
     assert.equal(row.state, 'AGENDA_LOOP');
-    assert.deepEqual(JSON.parse(row.messages), [{ role: 'user', content: 'Hello' }]);
+    assert.deepEqual(await getConversationMessages(db, id), [{ role: 'user', content: 'Hello' }]);
     assert.deepEqual(JSON.parse(row.agenda), [{ id: 'a1', status: 'pending', content: 'Review' }]);
   });
+
+  it('saveSessionState appends only new messages', async () => {
+    const id = await createActiveSession(db, 'morning_meeting', '2026-02-13T09:00:00.000Z');
+    const session = { type: 'morning_meeting', state: 'OPENING', messages: [{ role: 'user', content: 'Hi' }], agenda: [] };
+    await saveSessionState(db, id, session);
+    // Tamper with the stored first row: a delta save must not rewrite it
+    await db.prepare('UPDATE conversation_messages SET content = ? WHERE conversation_id = ? AND seq = 0').run('stored', id);
+    session.messages.push({ role: 'assistant', content: 'Hello!' }, { role: 'user', content: 'Plan my day' });
+    await saveSessionState(db, id, session);
+    const msgs = await getConversationMessages(db, id);
+    assert.deepEqual(msgs.map(m => m.content), ['stored', 'Hello!', 'Plan my day']);
+  });
+
+  it('saveSessionState rewrites the tail when the last message was edited', async () => {
+    const id = await createActiveSession(db, 'morning_meeting', '2026-02-13T09:00:00.000Z');
+    const session = { type: 'morning_meeting', state: 'OPENING', messages: [{ role: 'user', content: 'Hi' }, { role: 'assistant', content: 'Hel' }], agenda: [] };
+    await saveSessionState(db, id, session);
+    session.messages[1].content = 'Hello!';
+    await saveSessionState(db, id, session);
+    session.messages.pop();
+    await saveSessionState(db, id, session);
+    assert.deepEqual((await getConversationMessages(db, id)).map(m => m.content), ['Hi']);
+  });
+
+  it('getActiveSession resumes with parsed messages and agenda', async () => {
+    const id = await createActiveSession(db, 'morning_meeting', '2026-02-13T09:00:00.000Z');
+    const session = {
+      type: 'morning_meeting', state: 'AGENDA_LOOP',
+      messages: [{ role: 'user', content: 'Hi' }, { role: 'assistant', content: 'Hello!' }],
+      agenda: [{ id: 'a1', status: 'pending', content: 'Review' }],
+    };
+    await saveSessionState(db, id, session);
+    const active = await getActiveSession(db);
+    assert.equal(active.id, id);
+    assert.deepEqual(active.messages, session.messages);
+    assert.deepEqual(active.agenda, session.agenda);
+  });
+
+  it('getActiveSession falls back to legacy messages JSON', async () => {
+    const id = await createActiveSession(db, 'morning_meeting', '2026-02-13T09:00:00.000Z');
+    await db.prepare('UPDATE conversations SET messages = ? WHERE id = ?').run(JSON.stringify([{ role: 'user', content: 'Old' }]), id);
+    const active = await getActiveSession(db);
+    assert.deepEqual(active.messages, [{ role: 'user', content: 'Old' }]);
+  });
 });
@@ -0,0 +1,122 @@
+import { describe, it, beforeEach } from 'node:test';
+import assert from 'node:assert/strict';
+import { createHash } from 'crypto';
+import { createTestDb } from '../helpers/test-db.js';
+import { ensureSchema } from '../../src/lib/db.js';
+import {
+  EMBEDDING_MODEL,
+  embeddingKey,
+  getCachedEmbeddings,
+  putCachedEmbeddings,
+  evictEmbeddingCache,
+  embedWithCache,
+} from '../../src/lib/embedding-cache.js';
+
+// Fake model: vector derived from text length, records every batch it sees
+function fakeEmbedder() {
+  const batches = [];
+  const embedBatch = async (texts) => {
+    batches.push(texts);
+    return texts.map((t) => Float32Array.from([t.length, 1, 0, 0]));
+  };
+  return { batches, embedBatch };
+}
+
+let db;
+beforeEach(async () => {
+  db = await createTestDb();
+  await ensureSchema(db);
+});
+
+describe('embeddingKey', () => {
+  it('matches the CLI key (sha256 of model + text)', async () => {
+    const expected = createHash('sha256').update(`${EMBEDDING_MODEL}\nship it`).digest('hex');
+    assert.equal(await embeddingKey('ship it'), expected);
+  });
+});
+
+describe('getCachedEmbeddings / putCachedEmbeddings', () => {
+  it('round-trips vectors by key', async () => {
+    await putCachedEmbeddings(db, [['a', Float32Array.from([0.5, -1, 2, 0])]]);
+    const found = await getCachedEmbeddings(db, ['a', 'missing']);
+    assert.equal(found.size, 1);
+    assert.deepEqual(Array.from(found.get('a')), [0.5, -1, 2, 0]);
+  });
+});
+
+describe('evictEmbeddingCache', () => {
+  it('drops least recently used entries beyond the limit', async () => {
+    const vec = Float32Array.from([1, 0, 0, 0]);
+    for (const key of ['old', 'mid', 'new']) {
+      await putCachedEmbeddings(db, [[key, vec]]);
+      await db.prepare('UPDATE embedding_cache SET used_at = ? WHERE hash = ?').run({ old: 1, mid: 2, new: 3 }[key], key);
+    }
+    // A hit refreshes used_at, so 'old' becomes the most recent
+    await getCachedEmbeddings(db, ['old']);
+    assert.equal(await evictEmbeddingCache(db, 2), 1);
+    const left = (await db.prepare('SELECT hash FROM embedding_cache ORDER BY hash').all()).map((r) => r.hash);
+    assert.deepEqual(left, ['new', 'old']);
+  });
+  //
+  it('does nothing under the limit', async () => {
+    await putCachedEmbeddings(db, [['a', Float32Array.from([1, 0, 0, 0])]]);
+    assert.equal(await evictEmbeddingCache(db, 10), 0);
+  });
+});
+
+describe('embedWithCache', () => {
+  it('embeds only distinct misses, in one batch, and keeps input order', async () => {
+    const { batches, embedBatch } = fakeEmbedder();
+    const out = await embedWithCache(db, ['aa', 'b', 'aa', 'cccc'], embedBatch);
+    assert.deepEqual(batches, [['aa', 'b', 'cccc']]);
+    assert.deepEqual(out.map((v) => v[0]), [2, 1, 2, 4]);
+  });
+  //
+  it('serves repeated text from the cache', async () => {
+    const { batches, embedBatch } = fakeEmbedder();
+    await embedWithCache(db, ['status: shipping'], embedBatch);
+    const out = await embedWithCache(db, ['status: shipping', 'new'], embedBatch);
+    assert.deepEqual(batches, [['status: shipping'], ['new']]);
+    assert.deepEqual(out.map((v) => v[0]), [16, 3]);
+  });
+  //
+  it('keeps the cache bounded', async () => {
+    const { embedBatch } = fakeEmbedder();
+    await embedWithCache(db, ['a', 'bb', 'ccc', 'dddd'], embedBatch, { maxEntries: 3 });
+    const { n } = await db.prepare('SELECT COUNT(*) AS n FROM embedding_cache').get();
+    assert.equal(n, 3);
+  });
+});
+
+// libsql client shape (src/memory.js): execute({ sql, args }) → { rows }, BLOBs as ArrayBuffer
+function executeView(db) {
+  const toArrayBuffer = (v) => (ArrayBuffer.isView(v) ? v.buffer.slice(v.byteOffset, v.byteOffset + v.byteLength) : v);
+  return {
+    async execute({ sql, args }) {
+      if (!/^\s*SELECT/i.test(sql)) return db.prepare(sql).run(...args);
+      const rows = await db.prepare(sql).all(...args);
+      return { rows: rows.map((r) => Object.fromEntries(Object.entries(r).map(([k, v]) => [k, toArrayBuffer(v)]))) };
+    },
+  };
+}
+
+describe('embedding cache over an execute-style client', () => {
+  it('shares rows with the prepare-style connection', async () => {
+    const { batches, embedBatch } = fakeEmbedder();
+    const cli = executeView(db);
+    await embedWithCache(cli, ['from the cli'], embedBatch);
+    const out = await embedWithCache(db, ['from the cli', 'from the app'], embedBatch);
+    assert.deepEqual(batches, [['from the cli'], ['from the app']]);
+    assert.deepEqual(out.map((v) => v[0]), [12, 12]);
+    const again = await embedWithCache(cli, ['from the app'], embedBatch);
+    assert.equal(batches.length, 2);
+    assert.deepEqual(Array.from(again[0]), [12, 1, 0, 0]);
+  });
+  //
+  it('evicts through execute', async () => {
+    const { embedBatch } = fakeEmbedder();
+    await embedWithCache(executeView(db), ['a', 'bb', 'ccc'], embedBatch, { maxEntries: 2 });
+    const { n } = await db.prepare('SELECT COUNT(*) AS n FROM embedding_cache').get();
+    assert.equal(n, 2);
+  });
+});
@@ -6,7 +6,7 @@ import {
   processExtractions, persistConversation, carryOverDeferred, extractFromTranscript,
   snapshotConversation, ensureExtractions, persistResolutions,
 } from '../../src/lib/extraction.js';
-import { getTasks } from '../../src/lib/db.js';
+import { getTasks, getConversationMessages } from '../../src/lib/db.js';
 //
 let db;
 beforeEach(async () => {
@@ -130,7 +130,7 @@ describe('snapshotConversation', () => {
     await snapshotConversation(db, session);
     const row = await db.prepare('SELECT * FROM conversations WHERE id = ?').get(session._convId);
     assert.equal(row.state, 'AGENDA_LOOP');
-    const msgs = JSON.parse(row.messages);
+    const msgs = await getConversationMessages(db, session._convId);
     assert.equal(msgs.length, 2);
     assert.equal(msgs[0].content, 'Hi');
     const agenda = JSON.parse(row.agenda);
@@ -154,7 +154,7 @@ describe('snapshotConversation', () => {
     await snapshotConversation(db, session);
     const row = await db.prepare('SELECT * FROM conversations WHERE id = ?').get(session._convId);
     assert.equal(row.state, 'AGENDA_LOOP');
-    assert.equal(JSON.parse(row.messages).length, 2);
+    assert.equal((await getConversationMessages(db, session._convId)).length, 2);
     assert.equal(JSON.parse(row.agenda)[0].status, 'resolved');
   });
 });
@@ -80,6 +80,19 @@ describe('getProjects', () => {
     const stale = projects.find(p => p.project === 'stale-proj');
     assert.equal(stale.stale, true);
   });
+  //
+  it('uses one query however many projects there are', async () => {
+    const today = new Date().toISOString().slice(0, 10);
+    for (let i = 0; i < 20; i++) await storeMemory(db, `Status ${i}`, { type: 'status', project: `p${i}` });
+    await addTask(db, 'Ship — p3', { planDate: today });
+    let queries = 0;
+    const counting = { prepare: (sql) => { queries++; return db.prepare(sql); } };
+    const projects = await getProjects(counting);
+    assert.equal(queries, 1);
+    assert.equal(projects.length, 20);
+    assert.equal(projects.find(p => p.project === 'p3').task_count, 1);
+    assert.equal(projects.find(p => p.project === 'p4').task_count, 0);
+  });
 });
 //
 describe('getWaitingFor', () => {
@@ -0,0 +1,74 @@
+import { describe, it, beforeEach } from 'node:test';
+import assert from 'node:assert/strict';
+import { createTestDb } from '../helpers/test-db.js';
+import { ensureSchema, storeMemory, supersedeMemory } from '../../src/lib/db.js';
+import {
+  buildMemorySnapshot, getMemorySnapshot, ofType, newestFirst, since, projectActivity,
+} from '../../src/lib/memory-snapshot.js';
+import { generateMorningAgenda } from '../../src/lib/agenda.js';
+import { buildContext } from '../../src/lib/memory-engine.js';
+import { generateWeeklyReview } from '../../src/lib/gtd-engine.js';
+
+let db;
+beforeEach(async () => {
+  db = await createTestDb();
+  await ensureSchema(db);
+});
+
+// Count reads that touch the memories table
+function counting(db) {
+  const wrapped = {
+    memoryReads: 0,
+    exec: (sql) => db.exec(sql),
+    prepare(sql) {
+      if (/^\s*SELECT[\s\S]*\bFROM memories\b/.test(sql)) wrapped.memoryReads++;
+      return db.prepare(sql);
+    },
+  };
+  return wrapped;
+}
+
+describe('buildMemorySnapshot', () => {
+  const rows = [
+    { id: 1, type: 'status', project: 'ocean', person: '', content: 'a', created_at: '2026-02-01' },
+    { id: 2, type: 'blocker', project: '', person: 'Ana', content: 'b', created_at: '2026-02-02' },
+    { id: 3, type: 'status', project: 'ocean', person: '', content: 'c', created_at: '2026-02-03' },
+  ];
+  //
+  it('indexes rows by type, project and person', () => {
+    const snap = buildMemorySnapshot(rows);
+    assert.deepEqual(ofType(snap, 'status').map(r => r.id), [1, 3]);
+    assert.deepEqual(ofType(snap, 'status', 'blocker').map(r => r.id), [1, 2, 3]);
+    assert.deepEqual(ofType(snap, 'idea'), []);
+    assert.deepEqual(snap.byProject.get('ocean').map(r => r.id), [1, 3]);
+    assert.deepEqual(snap.byPerson.get('Ana').map(r => r.id), [2]);
+  });
+  //
+  it('slices newest first and by date', () => {
+    const snap = buildMemorySnapshot(rows);
+    assert.deepEqual(newestFirst(since(snap.rows, '2026-02-02')).map(r => r.id), [3, 2]);
+    assert.deepEqual(projectActivity(snap), [{ project: 'ocean', memory_count: 2, last_activity: '2026-02-03' }]);
+  });
+});
+
+describe('getMemorySnapshot', () => {
+  it('serves back-to-back builders from one memories read', async () => {
+    await storeMemory(db, 'API blocked', { type: 'blocker', project: 'ocean' });
+    await storeMemory(db, 'Send deck', { type: 'commitment', person: 'Ana' });
+    await storeMemory(db, 'Shipping', { type: 'status', project: 'ocean' });
+    const cdb = counting(db);
+    await generateMorningAgenda(cdb);
+    await buildContext(cdb);
+    await generateWeeklyReview(cdb);
+    assert.equal(cdb.memoryReads, 1);
+  });
+  //
+  it('reloads after memories change', async () => {
+    const id = await storeMemory(db, 'Old status', { type: 'status', project: 'ocean' });
+    assert.equal(ofType(await getMemorySnapshot(db), 'status')[0].content, 'Old status');
+    await supersedeMemory(db, id, 'New status');
+    assert.deepEqual(ofType(await getMemorySnapshot(db), 'status').map(r => r.content), ['New status']);
+    await db.prepare("UPDATE memories SET superseded_by = -1 WHERE content = 'New status'").run();
+    assert.deepEqual(ofType(await getMemorySnapshot(db), 'status'), []);
+  });
+});
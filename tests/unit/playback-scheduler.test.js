@@ -0,0 +1,115 @@
+import { describe, it } from 'node:test';
+import assert from 'node:assert/strict';
+import { PlaybackScheduler, JITTER_DEFAULTS } from '../../src/lib/playback-scheduler.js';
+
+// 24 kHz PCM16 → 48 bytes per ms
+const ms = (n) => new Uint8Array(n * 48);
+
+// Manual clock + timers; playback records pushed byte counts
+function harness(opts = {}) {
+  const h = { t: 0, timers: [], pushes: [], clears: 0 };
+  h.playback = {
+    push(pcm) { h.pushes.push(pcm.length / 48); },
+    clear() { h.clears++; },
+  };
+  h.scheduler = new PlaybackScheduler(h.playback, {
+    now: () => h.t,
+    setTimer: (fn, delay) => { const timer = { at: h.t + delay, fn }; h.timers.push(timer); return timer; },
+    clearTimer: (timer) => { h.timers = h.timers.filter(x => x !== timer); },
+    ...opts,
+  });
+  h.advance = (n) => {
+    const until = h.t + n;
+    for (;;) {
+      const due = h.timers.filter(x => x.at <= until).sort((a, b) => a.at - b.at)[0];
+      if (!due) break;
+      h.timers = h.timers.filter(x => x !== due);
+      h.t = due.at;
+      due.fn();
+    }
+    h.t = until;
+  };
+  return h;
+}
+
+describe('PlaybackScheduler', () => {
+  it('buffers to the target delay before the first push', () => {
+    const h = harness();
+    h.scheduler.push(ms(20));
+    h.scheduler.push(ms(20));
+    assert.deepEqual(h.pushes, []);
+    h.scheduler.push(ms(40));
+    assert.deepEqual(h.pushes, [80]);
+    assert.equal(h.scheduler.metrics.startDelayMs, 0);
+  });
+  //
+  it('starts on the timer when the provider trickles', () => {
+    const h = harness();
+    h.scheduler.push(ms(20));
+    h.advance(JITTER_DEFAULTS.initialDelayMs);
+    assert.deepEqual(h.pushes, [20]);
+    assert.equal(h.scheduler.metrics.startDelayMs, JITTER_DEFAULTS.initialDelayMs);
+  });
+  //
+  it('coalesces small chunks while the queue is deep', () => {
+    const h = harness();
+    h.scheduler.push(ms(200));                 // starts: 200 ms queued
+    for (let i = 0; i < 4; i++) h.scheduler.push(ms(10));
+    assert.deepEqual(h.pushes, [200, 40]);
+    h.scheduler.push(ms(10));
+    h.advance(200);                            // held remainder flushes before the queue runs dry
+    assert.deepEqual(h.pushes, [200, 40, 10]);
+    assert.equal(h.scheduler.metrics.underruns, 0);
+    assert.equal(h.scheduler.metrics.chunks, 6);
+  });
+  //
+  it('counts underruns, rebuffers and raises the target', () => {
+    const h = harness();
+    h.scheduler.push(ms(100));
+    h.advance(150);                            // 50 ms of silence
+    h.scheduler.push(ms(20));
+    const m = h.scheduler.metrics;
+    assert.equal(m.underruns, 1);
+    assert.equal(m.underrunMs, 50);
+    assert.ok(m.targetDelayMs > JITTER_DEFAULTS.initialDelayMs);
+    assert.deepEqual(h.pushes, [100]);         // rebuffering, not playing yet
+    h.scheduler.endTurn();
+    assert.deepEqual(h.pushes, [100, 20]);
+  });
+  //
+  it('decays the target after clean turns', () => {
+    const h = harness({ initialDelayMs: 200 });
+    h.scheduler.push(ms(300));
+    h.scheduler.endTurn();
+    assert.ok(h.scheduler.metrics.targetDelayMs < 200);
+    assert.ok(h.scheduler.metrics.targetDelayMs >= JITTER_DEFAULTS.minDelayMs);
+  });
+  //
+  it('barge-in clears playback and drops the rest of the turn', () => {
+    const h = harness();
+    h.scheduler.push(ms(300));
+    h.advance(100);
+    h.scheduler.cancel();
+    assert.equal(h.clears, 1);
+    assert.equal(h.scheduler.remainingSeconds, 0);
+    h.scheduler.push(ms(50));                  // still in flight from the old turn
+    assert.deepEqual(h.pushes, [300]);
+    h.scheduler.endTurn();
+    h.scheduler.push(ms(100));                 // next turn plays
+    assert.deepEqual(h.pushes, [300, 100]);
+    const m = h.scheduler.metrics;
+    assert.equal(m.bargeIns, 1);
+    assert.equal(m.discardedMs, 250);
+    assert.equal(m.turns, 2);
+  });
+  //
+  it('measures response latency from expectResponse()', () => {
+    const h = harness();
+    h.scheduler.expectResponse();
+    h.advance(500);
+    h.scheduler.push(ms(100));
+    assert.equal(h.scheduler.metrics.lastResponseMs, 500);
+    h.scheduler.resetMetrics();
+    assert.equal(h.scheduler.metrics.lastResponseMs, null);
+  });
+});
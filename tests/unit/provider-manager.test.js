@@ -119,6 +119,100 @@ describe('callAI', () => {
   });
 });
 //
+describe('hedged mode', () => {
+  it('is off unless enabled in settings', async () => {
+    const pm = await createProviderManager(db);
+    await pm.init();
+    assert.equal(pm.hedging, null);
+    let args = null;
+    pm._setCallFn(async (...a) => { args = a; return { response: { ok: true }, provider: a[0][0] }; });
+    await pm.callAI({ system: 'test', messages: [] });
+    assert.equal(args[2].delayMs, undefined);
+  });
+  //
+  it('passes hedge options and records TTFT per provider', async () => {
+    await setSetting(db, 'ai_hedge', JSON.stringify({ enabled: true, delayMs: 250 }));
+    const pm = await createProviderManager(db);
+    await pm.init();
+    assert.deepEqual(pm.hedging, { enabled: true, delayMs: 250, fanout: 2 });
+    pm._setCallFn(async (chain, _opts, hedgeOpts) => {
+      assert.equal(chain._tier, 'standard');
+      assert.equal(hedgeOpts.delayMs, 250);
+      hedgeOpts.onTiming(chain[0], { outcome: 'first_token', ms: 180 });
+      return { response: { ok: true }, provider: chain[0] };
+    });
+    await pm.callAI({ system: 'test', messages: [] });
+    const stats = Object.values(pm.ttftStats());
+    assert.equal(stats.length, 1);
+    assert.deepEqual(stats[0], { samples: 1, failures: 0, p50: 200, p90: 200 });
+  });
+  //
+  it('records cancelled hedges as censored samples, no faster than the winner', async () => {
+    await setSetting(db, 'ai_hedge', JSON.stringify({ enabled: true }));
+    const pm = await createProviderManager(db);
+    await pm.init();
+    const loser = { providerId: 'groq', model: 'llama' };
+    pm._setCallFn(async (chain, _opts, { onTiming }) => {
+      onTiming(chain[0], { outcome: 'first_token', ms: 450 });
+      onTiming(loser, { outcome: 'cancelled', ms: 50 });  // hedge started late
+      return { response: { ok: true }, provider: chain[0] };
+    });
+    await pm.callAI({ system: 'test', messages: [] });
+    const stats = pm.ttftStats();
+    assert.equal(stats['groq:llama'].samples, 1);
+    assert.ok(stats['groq:llama'].p50 >= Object.values(stats)[0].p50);
+  });
+  //
+  it('demotes a head-of-chain provider that keeps losing the race', async () => {
+    await upsertConnection(db, 'gemini', { access_token: 'AIzaSy-test', refresh_token: '', expires_at: 0 });
+    await setSetting(db, 'ai_hedge', JSON.stringify({ enabled: true }));
+    const pm = await createProviderManager(db);
+    await pm.init();
+    const heads = [];
+    pm._setCallFn(async (chain, _opts, { onTiming }) => {
+      heads.push(chain[0].providerId);
+      const [slow, fast] = chain;
+      onTiming(fast, { outcome: 'first_token', ms: 200 });
+      onTiming(slow, { outcome: 'cancelled', ms: 1400 });
+      return { response: { ok: true }, provider: fast };
+    });
+    for (let i = 0; i < 6; i++) await pm.callAI({ system: 'test', messages: [] });
+    assert.equal(new Set(heads.slice(0, 5)).size, 1);
+    assert.notEqual(heads[5], heads[0]);
+  });
+});
+//
+describe('latency telemetry', () => {
+  it('records failed hops and the served stream for each callAI', async () => {
+    const pm = await createProviderManager(db);
+    await pm.init();
+    const encoder = new TextEncoder();
+    pm._setCallFn(async (chain, _opts, { onTiming }) => {
+      onTiming({ providerId: 'groq', model: 'llama' }, { outcome: 'error', ms: 30, status: 429 });
+      const body = new ReadableStream({
+        start(c) {
+          c.enqueue(encoder.encode('data: {"text":"Hello"}\n\ndata: {"usage":{"input_tokens":5,"output_tokens":12}}\n\n'));
+          c.close();
+        },
+      });
+      return { response: new Response(body, { status: 200 }), provider: chain[0], startedAt: Date.now() };
+    });
+    const result = await pm.callAI({ system: 'test', messages: [], sessionType: 'morning_meeting' });
+    await result.response.text();
+    await pm.flushTelemetry();
+    const rows = await db.prepare('SELECT * FROM provider_latency ORDER BY id').all();
+    assert.equal(rows.length, 2);
+    assert.equal(rows[0].provider, 'groq');
+    assert.equal(rows[0].error_class, 'rate_limited');
+    assert.equal(rows[1].provider, 'thinkdone');
+    assert.equal(rows[1].session_type, 'morning_meeting');
+    assert.equal(rows[1].hops, 1);
+    assert.equal(rows[1].output_tokens, 12);
+    assert.equal(rows[1].error_class, null);
+    assert.ok(rows[1].ttft_ms >= 0 && rows[1].duration_ms >= rows[1].ttft_ms);
+  });
+});
+//
 describe('trackUsage', () => {
   it('stores usage in api_usage table', async () => {
     const pm = await createProviderManager(db);
@@ -3,6 +3,7 @@ import assert from 'node:assert/strict';
 import {
   translateToGeminiFormat, parseGeminiSSEChunk,
   translateToOpenAIFormat, parseOpenAISSEChunk,
+  callHedged, waitForFirstToken, observeSSE, createTtftHistogram, recordTtft, ttftPercentile, rankChain,
 } from '../../src/lib/provider.js';
 //
 describe('translateToGeminiFormat', () => {
@@ -205,3 +206,135 @@ describe('parseOpenAISSEChunk', () => {
     assert.equal(parseOpenAISSEChunk({}), null);
   });
 });
+//
+// Normalized SSE response that emits `tokens` after `delay` ms; aborts with the signal
+function sseResponse(tokens, { delay = 0, signal } = {}) {
+  const encoder = new TextEncoder();
+  let timer;
+  const body = new ReadableStream({
+    start(controller) {
+      timer = setTimeout(() => {
+        for (const t of tokens) controller.enqueue(encoder.encode(`data: ${JSON.stringify({ text: t })}\n\n`));
+        controller.enqueue(encoder.encode('data: [DONE]\n\n'));
+        controller.close();
+      }, delay);
+      signal?.addEventListener('abort', () => { clearTimeout(timer); controller.error(new Error('aborted')); });
+    },
+    cancel() { clearTimeout(timer); },
+  });
+  return new Response(body, { status: 200, headers: { 'Content-Type': 'text/event-stream' } });
+}
+
+async function readText(response) {
+  const raw = await response.text();
+  return raw.split('\n').filter(l => l.startsWith('data: {')).map(l => JSON.parse(l.slice(6)).text).join('');
+}
+
+// Stub fetch by endpoint: { '/a': (signal) => Response | Promise<Response> }
+async function withFetch(routes, fn) {
+  const original = globalThis.fetch;
+  globalThis.fetch = async (url, init) => routes[url](init.signal);
+  try { return await fn(); } finally { globalThis.fetch = original; }
+}
+
+const entry = (id) => ({ providerId: 'thinkdone', model: id, endpoint: `/${id}`, connection: null });
+//
+describe('waitForFirstToken', () => {
+  it('returns a response that replays the consumed head', async () => {
+    const res = await waitForFirstToken(sseResponse(['Hel', 'lo']));
+    assert.equal(res.status, 200);
+    assert.equal(await readText(res), 'Hello');
+  });
+});
+//
+describe('observeSSE', () => {
+  it('reports the first token, usage and end without altering the stream', async () => {
+    const encoder = new TextEncoder();
+    const events = [];
+    const source = new Response(new ReadableStream({
+      start(c) {
+        c.enqueue(encoder.encode('data: {"text":"Hi"}\n\ndata: {"te'));
+        c.enqueue(encoder.encode('xt":" there"}\n\ndata: {"usage":{"output_tokens":2}}\n\ndata: [DONE]\n\n'));
+        c.close();
+      },
+    }), { status: 200 });
+    const res = observeSSE(source, {
+      onToken: () => events.push('token'),
+      onUsage: (u) => events.push(`usage:${u.output_tokens}`),
+      onEnd: (err) => events.push(err ? 'error' : 'end'),
+    });
+    assert.equal(await readText(res), 'Hi there');
+    assert.deepEqual(events, ['token', 'usage:2', 'end']);
+  });
+});
+//
+describe('callHedged', () => {
+  it('starts the next provider after the hedge delay and cancels the loser', async () => {
+    let aborted = false;
+    const timings = [];
+    const result = await withFetch({
+      '/slow': (signal) => {
+        signal.addEventListener('abort', () => { aborted = true; });
+        return sseResponse(['slow'], { delay: 500, signal });
+      },
+      '/fast': (signal) => sseResponse(['fast'], { delay: 5, signal }),
+    }, () => callHedged([entry('slow'), entry('fast')], { system: '', messages: [] }, {
+      delayMs: 20, fanout: 2, onTiming: (e, t) => timings.push([e.model, t.outcome]),
+    }));
+    assert.equal(result.provider.model, 'fast');
+    assert.equal(await readText(result.response), 'fast');
+    assert.ok(aborted);
+    assert.deepEqual(timings.sort(), [['fast', 'first_token'], ['slow', 'cancelled']]);
+  });
+  //
+  it('keeps the first provider when it streams before the delay', async () => {
+    const called = [];
+    const result = await withFetch({
+      '/a': (signal) => { called.push('a'); return sseResponse(['a'], { signal }); },
+      '/b': (signal) => { called.push('b'); return sseResponse(['b'], { signal }); },
+    }, () => callHedged([entry('a'), entry('b')], { system: '', messages: [] }, { delayMs: 50 }));
+    assert.equal(result.provider.model, 'a');
+    assert.deepEqual(called, ['a']);
+  });
+  //
+  it('moves on immediately after a 429 and never exceeds the fanout', async () => {
+    const result = await withFetch({
+      '/limited': () => new Response('rate limited', { status: 429 }),
+      '/ok': (signal) => sseResponse(['ok'], { signal }),
+      '/unused': () => { throw new Error('should not be called'); },
+    }, () => callHedged([entry('limited'), entry('ok'), entry('unused')], { system: '', messages: [] }, { delayMs: 1000, fanout: 2 }));
+    assert.equal(result.provider.model, 'ok');
+  });
+  //
+  it('rejects when every provider fails', async () => {
+    await withFetch({
+      '/a': () => new Response('', { status: 503 }),
+      '/b': () => { throw new Error('offline'); },
+    }, () => assert.rejects(
+      callHedged([entry('a'), entry('b')], { system: '', messages: [] }, { delayMs: 10 }),
+      /All providers failed/,
+    ));
+  });
+});
+//
+describe('TTFT histograms', () => {
+  it('reports bucket upper bounds for percentiles', () => {
+    const h = createTtftHistogram();
+    for (const ms of [90, 150, 150, 300, 5000]) recordTtft(h, ms);
+    assert.equal(ttftPercentile(h, 0.5), 150);
+    assert.equal(ttftPercentile(h, 0.9), 6400);
+    assert.equal(ttftPercentile(createTtftHistogram(), 0.5), null);
+  });
+  //
+  it('ranks measured entries by median, leaving unmeasured ones in place', () => {
+    const chain = [entry('slow'), entry('new'), entry('fast')];
+    chain._tier = 'standard';
+    const slow = createTtftHistogram();
+    const fast = createTtftHistogram();
+    for (let i = 0; i < 5; i++) { recordTtft(slow, 3000); recordTtft(fast, 150); }
+    const ranked = rankChain(chain, new Map([['thinkdone:slow', slow], ['thinkdone:fast', fast]]));
+    assert.deepEqual(ranked.map(e => e.model), ['fast', 'new', 'slow']);
+    assert.equal(ranked._tier, 'standard');
+    assert.deepEqual(rankChain(chain, new Map()).map(e => e.model), ['slow', 'new', 'fast']);
+  });
+});
@@ -0,0 +1,185 @@
+// Query-plan regression suite: every query issued by the exported functions
+// of db.js, gtd-engine.js, agenda.js and heartbeat.js must reach the large
+// tables through an index. Statements are captured through a recording db
+// wrapper, then re-run under EXPLAIN QUERY PLAN against 100k seeded rows.
+import { describe, it, before } from 'node:test';
+import assert from 'node:assert/strict';
+import { createTestDb } from '../helpers/test-db.js';
+import * as dbjs from '../../src/lib/db.js';
+import { getInbox, getProjects, getWaitingFor, getStaleProjects, generateWeeklyReview, triageIdea } from '../../src/lib/gtd-engine.js';
+import { generateMorningAgenda, generateCheckInAgenda, generateEveningAgenda, generateWeeklyAgenda } from '../../src/lib/agenda.js';
+import { detectDataGaps } from '../../src/lib/heartbeat.js';
+
+const ROWS = 100_000;
+// Tables that grow without bound; small config tables may be scanned
+const LARGE_TABLES = new Set([
+  'tasks', 'memories', 'api_usage', 'completions', 'conversations', 'conversation_messages', 'embedding_cache',
+  'provider_latency',
+]);
+
+const seq = (n) => `WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < ${n})`;
+
+async function seed(db) {
+  await db.exec(`
+    INSERT INTO memories (content, project, person, type, source, priority, created_at, superseded_by)
+    ${seq(ROWS)}
+    SELECT 'memory ' || i, 'project' || (i % 50), CASE WHEN i % 7 = 0 THEN 'person' || (i % 30) ELSE '' END,
+      CASE i % 8 WHEN 0 THEN 'status' WHEN 1 THEN 'commitment' WHEN 2 THEN 'waiting_for' WHEN 3 THEN 'blocker'
+        WHEN 4 THEN 'idea' WHEN 5 THEN 'discovery' ELSE 'insight' END,
+      'conversation', i % 3, strftime('%Y-%m-%dT%H:%M:%fZ', '2024-01-01', '+' || (i * 10) || ' minutes'),
+      CASE WHEN i % 5 = 0 THEN i + 1 ELSE NULL END
+    FROM n
+  `);
+  await db.exec(`
+    INSERT INTO tasks (text, project, minutes, checked, position, plan_date, created_at, source)
+    ${seq(ROWS)}
+    SELECT 'task ' || i, 'project' || (i % 50), CASE WHEN i % 3 = 0 THEN NULL ELSE 15 END, i % 2, i % 40,
+      date('2024-01-01', '+' || (i / 40) || ' days'), '2024-01-01T00:00:00.000Z', 'manual'
+    FROM n
+  `);
+  await db.exec(`
+    INSERT INTO api_usage (session_type, model, input_tokens, output_tokens, cost_usd, provider, created_at)
+    ${seq(ROWS)}
+    SELECT 'chat', 'model' || (i % 4), 100, 50, 0.01, 'provider' || (i % 3),
+      strftime('%Y-%m-%dT%H:%M:%fZ', '2024-01-01', '+' || (i * 10) || ' minutes')
+    FROM n
+  `);
+  await db.exec(`
+    INSERT INTO provider_latency (provider, model, ttft_ms, duration_ms, output_tokens, error_class, created_at)
+    ${seq(ROWS)}
+    SELECT 'provider' || (i % 3), 'model' || (i % 4), 100 + i % 900, 2000, 120, CASE WHEN i % 20 = 0 THEN 'rate_limited' END,
+      strftime('%Y-%m-%dT%H:%M:%fZ', '2024-01-01', '+' || (i * 10) || ' minutes')
+    FROM n
+  `);
+  await db.exec(`
+    INSERT INTO routines (name, kind, active, created_at, updated_at)
+    ${seq(20)}
+    SELECT 'routine ' || i, 'habit', 1, '2024-01-01', '2024-01-01' FROM n
+  `);
+  await db.exec(`
+    INSERT INTO completions (routine_id, completed_date, completed_at)
+    ${seq(ROWS)}
+    SELECT 1 + i % 20, date('2024-01-01', '+' || (i / 20) || ' days'), '2024-01-01T00:00:00.000Z' FROM n
+  `);
+  await db.exec(`
+    INSERT INTO conversations (session_type, started_at, ended_at, summary)
+    ${seq(ROWS)}
+    SELECT 'morning_meeting', '2024-01-01T00:00:00.000Z', CASE WHEN i = ${ROWS} THEN NULL ELSE '2024-01-01T01:00:00.000Z' END, 'summary ' || i
+    FROM n
+  `);
+}
+
+// Wrap a db so every prepared statement is recorded with its parameters
+function recording(db) {
+  const calls = [];
+  return {
+    calls,
+    exec: (sql) => db.exec(sql),
+    prepare(sql) {
+      const stmt = db.prepare(sql);
+      const track = (method) => (...params) => {
+        calls.push({ sql, params });
+        return stmt[method](...params);
+      };
+      return { all: track('all'), get: track('get'), run: track('run') };
+    },
+  };
+}
+
+function fullScans(plan) {
+  const scans = [];
+  for (const { detail } of plan) {
+    const m = detail.match(/^SCAN (\w+)/);
+    if (m && LARGE_TABLES.has(m[1]) && !/USING (COVERING )?INDEX|USING INTEGER PRIMARY KEY/.test(detail)) {
+      scans.push(detail);
+    }
+  }
+  return scans;
+}
+
+let db;
+before(async () => {
+  db = await createTestDb();
+  await dbjs.ensureSchema(db);
+  await seed(db);
+});
+
+// Each entry calls exported functions through the recording wrapper
+const CASES = {
+  'db.js tasks': async (rdb) => {
+    await dbjs.getTasks(rdb, '2024-06-01');
+    const id = await dbjs.addTask(rdb, 'New task ~15m — project1', { planDate: '2024-06-01' });
+    await dbjs.addTasks(rdb, ['Bulk a', { text: 'Bulk b', planDate: '2024-06-02' }], { planDate: '2024-06-01' });
+    await dbjs.toggleTask(rdb, id);
+    await dbjs.editTask(rdb, id, 'Edited');
+    await dbjs.reorderTasks(rdb, [id, 1, 2]);
+    await dbjs.deleteTask(rdb, id);
+  },
+  'db.js memories': async (rdb) => {
+    const id = await dbjs.storeMemory(rdb, 'fresh', { project: 'project1' });
+    await dbjs.getActiveMemories(rdb, { type: 'status', project: 'project1' });
+    await dbjs.getActiveMemories(rdb, { person: 'person1' });
+    await dbjs.supersedeMemory(rdb, id, 'fresher');
+    await dbjs.writeBatch(rdb, { tasks: ['Batch task'], memories: [{ content: 'Batch memory' }] });
+  },
+  'db.js usage': async (rdb) => {
+    const range = { from: '2025-01-01', to: '2025-01-07' };
+    await dbjs.storeUsage(rdb, { model: 'm', inputTokens: 1, outputTokens: 1, costUsd: 0 });
+    await dbjs.getUsageSummary(rdb, range);
+    await dbjs.getUsageByDay(rdb, range);
+    await dbjs.getUsageBySession(rdb, range);
+    await dbjs.getUsageByModel(rdb, range);
+    await dbjs.getUsageByProvider(rdb, range);
+    await dbjs.getCacheSavings(rdb, range);
+    await dbjs.storeLatency(rdb, { provider: 'p', model: 'm', ttftMs: 200, durationMs: 900 });
+    await dbjs.getLatencyByProvider(rdb, range);
+    await dbjs.getLatencyByModel(rdb, range);
+    await dbjs.rollupProviderLatency(rdb, { now: new Date('2024-01-03T00:00:00Z') });
+  },
+  'db.js sessions': async (rdb) => {
+    const active = await dbjs.getActiveSession(rdb);
+    const session = { type: 'morning_meeting', state: 'OPENING', messages: [{ role: 'user', content: 'Hi' }], agenda: [] };
+    await dbjs.saveSessionState(rdb, active.id, session);
+    session.messages[0].content = 'Hello';
+    await dbjs.saveSessionState(rdb, active.id, session);
+    await dbjs.getConversationMessages(rdb, active.id);
+    await dbjs.getDataVersions(rdb);
+  },
+  'gtd-engine.js': async (rdb) => {
+    await getInbox(rdb);
+    await getProjects(rdb);
+    await getWaitingFor(rdb);
+    await getStaleProjects(rdb);
+    await generateWeeklyReview(rdb);
+    await triageIdea(rdb, 5, { action: 'someday' });
+  },
+  'agenda.js': async (rdb) => {
+    await generateMorningAgenda(rdb);
+    await generateCheckInAgenda(rdb, 'how is project1 going?');
+    await generateEveningAgenda(rdb);
+    await generateWeeklyAgenda(rdb);
+  },
+  'heartbeat.js': async (rdb) => {
+    await detectDataGaps(rdb);
+  },
+};
+
+describe('query plans over 100k rows', () => {
+  for (const [name, run] of Object.entries(CASES)) {
+    it(`${name} reaches large tables through indexes`, async () => {
+      const rdb = recording(db);
+      await run(rdb);
+      assert.ok(rdb.calls.length > 0);
+      const seen = new Set();
+      const offenders = [];
+      for (const { sql, params } of rdb.calls) {
+        if (seen.has(sql)) continue;
+        seen.add(sql);
+        const plan = await db.prepare(`EXPLAIN QUERY PLAN ${sql}`).all(...params);
+        const scans = fullScans(plan);
+        if (scans.length) offenders.push(`${sql.replace(/\s+/g, ' ').trim()}\n    -> ${scans.join('; ')}`);
+      }
+      assert.deepEqual(offenders, [], `full table scans:\n  ${offenders.join('\n  ')}`);
+    });
+  }
+});
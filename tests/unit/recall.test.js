@@ -8,7 +8,8 @@ import {
   searchMemories,
   searchConversations,
   recallForTurn,
-  formatRecalledContext
+  formatRecalledContext,
+  buildMatchQuery
 } from '../../src/lib/recall.js';
 
 let db;
@@ -133,6 +134,62 @@ describe('searchMemories', () => {
   });
 });
 
+describe('searchMemories (full-text index)', () => {
+  it('ranks the most relevant memory first, not the newest', async () => {
+    await storeMemory(db, 'Dentist appointment moved; dentist wants x-rays before the dentist visit', { type: 'decision' });
+    await storeMemory(db, 'Quarterly budget review with finance', { type: 'status' });
+    await storeMemory(db, 'Buy toothpaste on the way home from the dentist', { type: 'insight' });
+    const results = await searchMemories(db, ['dentist', 'xrays']);
+    assert.equal(results.length, 2);
+    assert.ok(results[0].content.startsWith('Dentist appointment moved'));
+  });
+  it('matches word prefixes and stems', async () => {
+    await storeMemory(db, 'Scheduled two dentists for the kids', { type: 'decision' });
+    const results = await searchMemories(db, ['dentist', 'schedule']);
+    assert.equal(results.length, 1);
+  });
+  it('stays in sync with content updates and deletes', async () => {
+    const id = await storeMemory(db, 'Dentist appointment Monday', { type: 'decision' });
+    await db.prepare('UPDATE memories SET content = ? WHERE id = ?').run('Gym session Monday', id);
+    assert.equal((await searchMemories(db, ['dentist'])).length, 0);
+    assert.equal((await searchMemories(db, ['gym'])).length, 1);
+    await db.prepare('DELETE FROM memories WHERE id = ?').run(id);
+    assert.equal((await searchMemories(db, ['gym'])).length, 0);
+  });
+  it('indexes rows that predate the full-text table', async () => {
+    await storeMemory(db, 'Legacy dentist note', { type: 'insight' });
+    await db.exec('DROP TABLE memories_fts');
+    await ensureSchema(db);
+    const results = await searchMemories(db, ['dentist']);
+    assert.equal(results.length, 1);
+  });
+  it('finishes an index whose triggers were never created', async () => {
+    for (const suffix of ['ai', 'ad', 'au']) await db.exec(`DROP TRIGGER memories_fts_${suffix}`);
+    await storeMemory(db, 'Dentist before the restart', { type: 'insight' });
+    await ensureSchema(db);
+    await storeMemory(db, 'Dentist after the restart', { type: 'insight' });
+    assert.equal((await searchMemories(db, ['dentist'])).length, 2);
+  });
+  it('falls back to LIKE scans without FTS5', async () => {
+    for (const t of ['memories', 'conversations']) {
+      for (const suffix of ['ai', 'ad', 'au']) await db.exec(`DROP TRIGGER ${t}_fts_${suffix}`);
+      await db.exec(`DROP TABLE ${t}_fts`);
+    }
+    await storeMemory(db, 'Dentist appointment scheduled', { type: 'decision' });
+    const results = await searchMemories(db, ['dentist']);
+    assert.equal(results.length, 1);
+  });
+});
+
+describe('buildMatchQuery', () => {
+  it('ORs quoted prefix terms', () => {
+    assert.equal(buildMatchQuery(['dentist', 'march']), '"dentist"* OR "march"*');
+  });
+  it('strips double quotes from terms', () => {
+    assert.equal(buildMatchQuery(['a"b']), '"ab"*');
+  });
+});
+
 describe('searchConversations', () => {
   it('finds past conversations by summary keywords', async () => {
     await db.prepare(
@@ -6,6 +6,7 @@ import {
   addRoutine, listRoutines, getDueRoutines, completeRoutine,
   getStreak, pauseRoutine, resumeRoutine, removeRoutine, updateRoutine,
   isDue, isUpcoming, calcStreak,
+  uncompleteRoutine, getRoutineStats, refreshRoutineStats, rebuildRoutineStats, STATS_WINDOW,
 } from '../../src/lib/routines.js';
 //
 let db;
@@ -406,3 +407,72 @@ describe('updateRoutine', () => {
     assert.ok(after.updated_at >= before.updated_at);
   });
 });
+//
+// --- routine_stats ---
+//
+describe('routine_stats', () => {
+  const dayOffset = (i) => new Date(Date.now() - i * 86400000).toISOString().slice(0, 10);
+  const statsRow = (id) => db.prepare('SELECT * FROM routine_stats WHERE routine_id = ?').get(id);
+  const strip = ({ updated_at, day_counts, ...rest }) => ({ ...rest, day_counts: JSON.parse(day_counts) });
+  //
+  it('today\'s completion is applied as a delta matching a full refresh', async () => {
+    const id = await addRoutine(db, 'Read', { frequency: 'daily' });
+    for (const i of [1, 2, 4]) await completeRoutine(db, id, { date: dayOffset(i), quality: 3 });
+    await getRoutineStats(db, [id]);
+    await completeRoutine(db, id, { quality: 5, used_two_min: true });
+    const delta = strip(await statsRow(id));
+    assert.equal(delta.streak, 3);
+    await refreshRoutineStats(db, id);
+    assert.deepEqual(delta, strip(await statsRow(id)));
+  });
+  //
+  it('uncompleteRoutine removes the completion and reverts the stats', async () => {
+    const id = await addRoutine(db, 'Read', { frequency: 'daily' });
+    await completeRoutine(db, id, { date: dayOffset(1) });
+    await completeRoutine(db, id, { quality: 4 });
+    assert.equal(await getStreak(db, id), 2);
+    assert.equal(await uncompleteRoutine(db, id, dayOffset(0)), true);
+    assert.equal(await uncompleteRoutine(db, id, dayOffset(0)), false);
+    const delta = strip(await statsRow(id));
+    assert.equal(delta.streak, 1);
+    assert.equal(delta.quality_count, 0);
+    await refreshRoutineStats(db, id);
+    assert.deepEqual(delta, strip(await statsRow(id)));
+  });
+  //
+  it('backfilled dates re-derive the row', async () => {
+    const id = await addRoutine(db, 'Read', { frequency: 'daily' });
+    await completeRoutine(db, id, { date: dayOffset(0) });
+    await completeRoutine(db, id, { date: dayOffset(1) });
+    const stats = (await getRoutineStats(db, [id])).get(id);
+    assert.equal(stats.streak, 2);
+    assert.equal(stats.completions, 2);
+    assert.equal(stats.windowDays, STATS_WINDOW);
+  });
+  //
+  it('refreshes rows from an earlier day and after a schedule change', async () => {
+    const id = await addRoutine(db, 'Read', { frequency: 'daily' });
+    await completeRoutine(db, id, { date: dayOffset(0) });
+    await db.prepare("UPDATE routine_stats SET as_of = '2000-01-01', streak = 99 WHERE routine_id = ?").run(id);
+    assert.equal(await getStreak(db, id), 1);
+    await updateRoutine(db, id, { frequency: 'weekly', days: ['mon'] });
+    assert.equal(await statsRow(id), null);
+  });
+  //
+  it('rebuildRoutineStats recomputes every routine', async () => {
+    const a = await addRoutine(db, 'A', { frequency: 'daily' });
+    const b = await addRoutine(db, 'B', { frequency: 'daily' });
+    await completeRoutine(db, a, { date: dayOffset(0) });
+    await db.prepare('UPDATE routine_stats SET streak = 42').run();
+    assert.equal(await rebuildRoutineStats(db), 2);
+    assert.equal((await statsRow(a)).streak, 1);
+    assert.equal((await statsRow(b)).streak, 0);
+  });
+  //
+  it('removeRoutine drops the stats row', async () => {
+    const id = await addRoutine(db, 'Read', { frequency: 'daily' });
+    await completeRoutine(db, id, { date: dayOffset(0) });
+    await removeRoutine(db, id);
+    assert.equal(await statsRow(id), null);
+  });
+});
@@ -0,0 +1,171 @@
+import { describe, it } from 'node:test';
+import assert from 'node:assert/strict';
+import { EventEmitter } from 'node:events';
+import { speechWorkerCount, createSpeechGateway, runSpeechWorker } from '../../src/lib/speech-gateway.js';
+
+const quiet = { info() {}, warn() {}, error() {}, debug() {} };
+
+// cluster.Worker stand-in
+class FakeWorker extends EventEmitter {
+  static pid = 100;
+  process = { pid: FakeWorker.pid++ };
+  sent = [];
+  send(msg, handle, cb) { this.sent.push({ msg, handle }); if (cb) cb(null); }
+  kill(signal = 'SIGTERM') { this.killedWith = signal; this.emit('exit', null, signal); }
+  report(active) { this.emit('message', { type: 'speech:load', load: { active } }); }
+}
+
+function gateway(count, opts = {}) {
+  const forked = [];
+  const gw = createSpeechGateway({
+    count,
+    fork: () => { const w = new FakeWorker(); forked.push(w); return w; },
+    logger: quiet,
+    ...opts,
+  });
+  return { gw, forked };
+}
+
+function fakeSocket() {
+  return { ended: null, destroyed: false, end(data) { this.ended = data; }, destroy() { this.destroyed = true; } };
+}
+
+const upgradeReq = { method: 'GET', url: '/ws/speech', headers: { upgrade: 'websocket' } };
+
+describe('speechWorkerCount', () => {
+  it('parses SPEECH_WORKERS', () => {
+    assert.equal(speechWorkerCount(undefined, 8), 0);
+    assert.equal(speechWorkerCount('0', 8), 0);
+    assert.equal(speechWorkerCount('3', 8), 3);
+    assert.equal(speechWorkerCount('auto', 8), 7);
+    assert.equal(speechWorkerCount('auto', 1), 1);
+    assert.equal(speechWorkerCount('lots', 8), 0);
+  });
+});
+
+describe('createSpeechGateway', () => {
+  it('hands upgrades to the least-loaded ready worker', () => {
+    const { gw, forked } = gateway(3);
+    const [a, b, c] = forked;
+    a.emit('message', { type: 'speech:ready' });
+    b.emit('message', { type: 'speech:ready' });
+    a.report(5);
+    b.report(2);
+    const socket = fakeSocket();
+    assert.equal(gw.handleUpgrade(upgradeReq, socket, Buffer.from('hi')), true);
+    assert.equal(b.sent.length, 1);
+    assert.equal(b.sent[0].handle, socket);
+    assert.deepEqual(b.sent[0].msg, { type: 'speech:upgrade', req: upgradeReq, head: Buffer.from('hi').toString('base64') });
+    assert.equal(c.sent.length, 0); // not ready yet
+    gw.handleUpgrade(upgradeReq, fakeSocket(), Buffer.alloc(0));
+    gw.handleUpgrade(upgradeReq, fakeSocket(), Buffer.alloc(0));
+    assert.equal(b.sent.length, 3);            // 2 → 5 sessions, now tied with a
+    gw.handleUpgrade(upgradeReq, fakeSocket(), Buffer.alloc(0));
+    assert.equal(a.sent.length, 1);            // tie broken by the rotating start
+    assert.deepEqual(gw.stats().workers.map(w => w.sessions), [6, 5, 0]);
+    assert.equal(gw.stats().sessions, 11);
+    b.report(1);                               // report replaces the estimate
+    assert.equal(gw.stats().workers[1].sessions, 1);
+  });
+  //
+  it('answers 503 when no worker is ready', () => {
+    const { gw } = gateway(1);
+    const socket = fakeSocket();
+    assert.equal(gw.handleUpgrade(upgradeReq, socket, Buffer.alloc(0)), false);
+    assert.match(socket.ended, /^HTTP\/1\.1 503/);
+  });
+  //
+  it('destroys the socket when the hand-off fails', () => {
+    const { gw, forked } = gateway(1);
+    forked[0].emit('message', { type: 'speech:ready' });
+    forked[0].send = (msg, handle, cb) => cb(new Error('channel closed'));
+    const socket = fakeSocket();
+    gw.handleUpgrade(upgradeReq, socket, Buffer.alloc(0));
+    assert.equal(socket.destroyed, true);
+    assert.equal(gw.stats().sessions, 0);
+  });
+  //
+  it('respawns a worker that exits, but not while closing', async () => {
+    const { gw, forked } = gateway(1, { respawnMs: 5 });
+    forked[0].emit('exit', 1, null);
+    assert.equal(gw.stats().workers[0].pid, null);
+    await new Promise(resolve => setTimeout(resolve, 20));
+    assert.equal(forked.length, 2);
+    forked[1].send = (msg) => { if (msg.type === 'speech:shutdown') setImmediate(() => forked[1].emit('exit', 0, null)); };
+    await gw.close({ graceMs: 50 });
+    await new Promise(resolve => setTimeout(resolve, 20));
+    assert.equal(forked.length, 2);
+    assert.equal(gw.handleUpgrade(upgradeReq, fakeSocket(), Buffer.alloc(0)), false);
+  });
+  //
+  it('kills workers that outlive the grace period', async () => {
+    const { gw, forked } = gateway(1);
+    forked[0].send = () => {};                 // never drains
+    await gw.close({ graceMs: 0 });            // killed 2 s after asking
+    assert.equal(forked[0].killedWith, 'SIGKILL');
+  });
+});
+
+// Worker process stand-in
+class FakeProc extends EventEmitter {
+  pid = 4242;
+  connected = true;
+  sent = [];
+  exitCode = null;
+  send(msg) { this.sent.push(msg); }
+  cpuUsage() { return { user: 0, system: 0 }; }
+  memoryUsage() { return { rss: 1, heapUsed: 1 }; }
+  exit(code) { this.exitCode = code; }
+}
+
+class FakeWss {
+  clients = new Set();
+  upgrades = [];
+  handleUpgrade(req, socket, head, cb) {
+    this.upgrades.push({ req, head: head.toString() });
+    const clients = this.clients;
+    const ws = { closedWith: null, close(code) { this.closedWith = code; clients.delete(this); }, terminate() { clients.delete(this); } };
+    clients.add(ws);
+    cb(ws);
+  }
+}
+
+describe('runSpeechWorker', () => {
+  it('completes hand-offs and reports load with the shared metrics', async () => {
+    const proc = new FakeProc();
+    const handled = [];
+    const worker = runSpeechWorker({
+      WebSocketServer: FakeWss,
+      handleConnection: (ws, deps) => { handled.push(deps); deps.metrics.open({ framesIn: 0 }); },
+      deps: { providers: 'p' },
+      proc,
+      reportMs: 10,
+      logger: quiet,
+    });
+    assert.deepEqual(proc.sent[0], { type: 'speech:ready', pid: 4242 });
+    proc.emit('message', { type: 'speech:upgrade', req: upgradeReq, head: Buffer.from('x').toString('base64') }, fakeSocket());
+    assert.deepEqual(worker.wss.upgrades[0].req.headers, upgradeReq.headers);
+    assert.equal(worker.wss.upgrades[0].head, 'x');
+    assert.equal(handled[0].providers, 'p');
+    assert.equal(handled[0].metrics, worker.metrics);
+    await new Promise(resolve => setTimeout(resolve, 25));
+    const report = proc.sent.find(m => m.type === 'speech:load');
+    assert.equal(report.load.active, 1);
+    assert.equal(report.load.pid, 4242);
+    await worker.shutdown(0);
+  });
+  //
+  it('drains on shutdown: refuses hand-offs, closes sessions with 1001, exits', async () => {
+    const proc = new FakeProc();
+    const worker = runSpeechWorker({ WebSocketServer: FakeWss, handleConnection() {}, proc, logger: quiet });
+    proc.emit('message', { type: 'speech:upgrade', req: upgradeReq, head: '' }, fakeSocket());
+    const [ws] = worker.wss.clients;
+    const done = worker.shutdown(0);
+    const late = fakeSocket();
+    proc.emit('message', { type: 'speech:upgrade', req: upgradeReq, head: '' }, late);
+    assert.equal(late.destroyed, true);
+    await done;
+    assert.equal(ws.closedWith, 1001);
+    assert.equal(proc.exitCode, 0);
+  });
+});
@@ -1,7 +1,7 @@
 // TTS, STT, S2S provider tests using dependency injection (fetchFn, createWs)
 import { test, describe } from 'node:test';
 import assert from 'node:assert/strict';
-import { streamTts, createSttSession, createS2sSession, TTS_DEFAULTS, STT_DEFAULTS } from '../../src/lib/speech-providers.js';
+import { streamTts, createSttSession, createS2sSession, createAudioUplink, TTS_DEFAULTS, STT_DEFAULTS } from '../../src/lib/speech-providers.js';
 // mockFetch helper — returns async function matching fetch signature
 function mockFetch(status, body, opts = {}) {
   return async () => ({
@@ -411,3 +411,96 @@ describe('S2S - createS2sSession', () => {
     });
   });
 });
+// STREAMING UPLINK TESTS
+// Local stand-in for an upstream provider socket: records every message,
+// exposes a settable bufferedAmount and lets tests push server messages.
+class UpstreamStandIn {
+  constructor() {
+    this.handlers = {};
+    this.sent = [];
+    this.bufferedAmount = 0;
+    setImmediate(() => this.emit('open'));
+  }
+  on(event, cb) { this.handlers[event] = cb; }
+  emit(event, ...args) { if (this.handlers[event]) this.handlers[event](...args); }
+  reply(msg) { this.emit('message', Buffer.from(JSON.stringify(msg))); }
+  send(data) { this.sent.push(JSON.parse(data)); }
+  close() { setImmediate(() => this.emit('close')); }
+}
+const tick = () => new Promise((r) => setImmediate(r));
+const frame = (n, size = 640) => Buffer.alloc(size, n);
+describe('S2S - streaming uplink', () => {
+  test('gemini-live forwards each frame as it arrives once setup completes', async () => {
+    let ws;
+    const interims = [];
+    const session = createS2sSession('gemini-live', { apiKey: 'k', onInterim: (text) => interims.push(text) }, () => (ws = new UpstreamStandIn()));
+    session.feed(frame(1));
+    await tick();
+    assert.ok(ws.sent[0].setup.inputAudioTranscription);
+    assert.equal(ws.sent[0].setup.realtimeInputConfig.automaticActivityDetection.disabled, true);
+    assert.equal(ws.sent.length, 1); // audio waits for setupComplete
+    ws.reply({ setupComplete: true });
+    assert.deepEqual(ws.sent[1], { realtimeInput: { activityStart: {} } });
+    assert.equal(ws.sent.filter(m => m.realtimeInput?.audio).length, 1);
+    for (let i = 2; i <= 50; i++) session.feed(frame(i));
+    assert.equal(ws.sent.filter(m => m.realtimeInput?.audio).length, 50);
+    ws.reply({ serverContent: { inputTranscription: { text: 'hello' } } });
+    assert.deepEqual(interims, ['hello']); // before finish(), whatever the utterance length
+    const finished = session.finish();
+    assert.deepEqual(ws.sent.at(-1), { realtimeInput: { activityEnd: {} } });
+    assert.equal(ws.sent.filter(m => m.realtimeInput?.activityStart).length, 1);
+    ws.reply({ serverContent: { turnComplete: true } });
+    await finished;
+    assert.equal(session.stats.bytesSent, 50 * 640);
+  });
+  test('gemini-live starts activity with the first frame and ignores pauses until finish', async () => {
+    let ws;
+    const session = createS2sSession('gemini-live', { apiKey: 'k' }, () => (ws = new UpstreamStandIn()));
+    await tick();
+    ws.reply({ setupComplete: true });
+    assert.equal(ws.sent.length, 1); // no frames yet, no activity
+    session.feed(frame(1));
+    assert.deepEqual(ws.sent.slice(1).map(m => Object.keys(m.realtimeInput)[0]), ['activityStart', 'audio']);
+    await new Promise((r) => setTimeout(r, 20)); // mid-utterance pause
+    session.feed(frame(2));
+    const finished = session.finish();
+    assert.deepEqual(ws.sent.slice(1).map(m => Object.keys(m.realtimeInput)[0]), ['activityStart', 'audio', 'audio', 'activityEnd']);
+    ws.reply({ serverContent: { turnComplete: true } });
+    await finished;
+  });
+  test('openai-realtime appends frames incrementally and commits on finish', async () => {
+    let ws;
+    const session = createS2sSession('openai-realtime', { apiKey: 'k' }, () => (ws = new UpstreamStandIn()));
+    await tick();
+    assert.equal(ws.sent[0].session.turn_detection, null);
+    for (let i = 0; i < 5; i++) session.feed(frame(i));
+    assert.deepEqual(ws.sent.slice(1).map(m => m.type), Array(5).fill('input_audio_buffer.append'));
+    const finished = session.finish();
+    assert.deepEqual(ws.sent.slice(-2).map(m => m.type), ['input_audio_buffer.commit', 'response.create']);
+    ws.reply({ type: 'response.done' });
+    await finished;
+  });
+  test('holds frames while the socket is congested, then sends them coalesced', async () => {
+    const ws = new UpstreamStandIn();
+    const uplink = createAudioUplink(ws, (chunk) => JSON.stringify({ n: chunk.length }), { highWaterMark: 1000, maxMessageBytes: 2000, drainPollMs: 5 });
+    uplink.open();
+    uplink.push(frame(0));
+    ws.bufferedAmount = 5000;
+    for (let i = 1; i <= 6; i++) uplink.push(frame(i));
+    assert.equal(ws.sent.length, 1);
+    assert.equal(uplink.pendingBytes, 6 * 640);
+    ws.bufferedAmount = 0;
+    await new Promise((r) => setTimeout(r, 20));
+    assert.deepEqual(ws.sent.map(m => m.n), [640, 1920, 1920]);
+    assert.equal(uplink.pendingBytes, 0);
+  });
+  test('bounds the queue by dropping the oldest frames', () => {
+    const ws = new UpstreamStandIn();
+    const uplink = createAudioUplink(ws, (chunk) => chunk[0], { maxPendingBytes: 3 * 640 });
+    for (let i = 0; i < 10; i++) uplink.push(frame(i));
+    assert.equal(uplink.pendingBytes, 3 * 640);
+    assert.equal(uplink.stats.droppedBytes, 7 * 640);
+    uplink.open();
+    assert.deepEqual(ws.sent, [7]); // frames 7-9, coalesced into one message
+  });
+});
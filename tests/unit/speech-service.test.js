@@ -711,6 +711,77 @@ describe('direct S2S service voice session', () => {
     svc.stopVoice();
     svc.destroy();
   });
+
+  it('reports playback metrics through getUsage() and keeps them after stopVoice', async () => {
+    const opts = voiceOpts();
+    const svc = createSpeechService('gemini-live', opts);
+    assert.equal(svc.getUsage().playback, null);
+    await svc.startVoice();
+    svc.interrupt(); // nothing playing: no barge-in recorded
+    const live = svc.getUsage().playback;
+    assert.equal(live.underruns, 0);
+    assert.equal(live.bargeIns, 0);
+    svc.stopVoice();
+    assert.deepEqual(svc.getUsage().playback, live);
+    svc.resetUsage();
+    assert.equal(svc.getUsage().playback, null);
+    svc.destroy();
+  });
+
+  it('barge-in keeps the mic open while the cancelled turn is still arriving', async () => {
+    // Browser WebSocket stand-in for the Gemini Live session
+    class MockGeminiWS extends EventEmitter {
+      readyState = 1;
+      constructor() { super(); sockets.push(this); }
+      addEventListener(type, fn) { this.on(type, fn); }
+      send() {}
+      close() { this.readyState = 3; }
+      audio(ms) {
+        const data = Buffer.alloc(ms * 48).toString('base64');
+        this.emit('message', { data: JSON.stringify({ serverContent: { modelTurn: { parts: [{ inlineData: { data } }] } } }) });
+      }
+    }
+    const sockets = [];
+    const realWS = globalThis.WebSocket;
+    globalThis.WebSocket = MockGeminiWS;
+    try {
+      const opts = voiceOpts();
+      const processors = [];
+      const AudioContext = opts.AudioContext;
+      opts.AudioContext = function(o) {
+        const ctx = AudioContext(o);
+        ctx.createScriptProcessor = () => { const p = { onaudioprocess: null, connect() {}, disconnect() {} }; processors.push(p); return p; };
+        return ctx;
+      };
+      // 4096-sample frames are 256 ms: two loud frames to barge in
+      const svc = createSpeechService('gemini-live', { ...opts, bargeIn: { holdMs: 400 } });
+      await svc.startVoice();
+      svc.listen(() => {});
+      const sent = [];
+      svc.sendAudio = (pcm) => sent.push(pcm.length);
+      const loud = { inputBuffer: { getChannelData: () => new Float32Array(4096).fill(0.5) } };
+      const speak = () => processors[0].onaudioprocess(loud);
+
+      sockets[0].audio(300);
+      assert.equal(svc.isSpeaking, true);
+      speak();
+      assert.equal(sent.length, 0);              // muted: one loud frame is not enough
+      speak();
+      assert.equal(sent.length, 1);              // held: barge-in
+      assert.equal(svc.isSpeaking, false);
+      for (let i = 0; i < 3; i++) {
+        sockets[0].audio(100);                   // rest of the cancelled turn
+        assert.equal(svc.isSpeaking, false);
+        speak();
+      }
+      assert.equal(sent.length, 4);              // every frame after barge-in goes up
+      assert.equal(svc.getUsage().playback.bargeIns, 1);
+      svc.stopVoice();
+      svc.destroy();
+    } finally {
+      globalThis.WebSocket = realWS;
+    }
+  });
 });
 
 describe('pcm16ToFloat32 / float32ToPcm16', () => {
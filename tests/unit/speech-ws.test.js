@@ -2,7 +2,8 @@
 import { test } from 'node:test';
 import assert from 'node:assert/strict';
 import { MockWebSocket } from '../helpers/mock-ws.js';
-import { handleSpeechConnection } from '../../src/lib/speech-ws.js';
+import { handleSpeechConnection, createSpeechMetrics } from '../../src/lib/speech-ws.js';
+import { createLogger } from '../../src/lib/log.js';
 
 // Mock providers for dependency injection
 const mockProviders = {
@@ -392,7 +393,7 @@ test('listen.start twice sends error', async () => {
   assert.equal(json[0].code, 'already_listening');
 });
 
-// --- S2S Tests (7) ---
+// --- S2S Tests (8) ---
 
 test('S2S session routes binary frames to audio and transcript callbacks', async () => {
   const ws = new MockWebSocket();
@@ -424,6 +425,41 @@ test('finish triggers final audio and transcript', async () => {
   assert.ok(transcript);
 });
 
+test('listen.stop waits for the S2S turn before destroying the session', async () => {
+  const ws = new MockWebSocket();
+  const events = [];
+  let endTurn;
+  const deferredProviders = {
+    ...mockProviders,
+    createS2sSession() {
+      let audioCb;
+      return {
+        feed() {},
+        // End of turn goes upstream later (setup pending / congested uplink)
+        finish() { events.push('finish'); return new Promise(resolve => { endTurn = () => { audioCb(Buffer.from('reply')); resolve(); }; }); },
+        onAudio(cb) { audioCb = cb; },
+        onTranscript() {},
+        destroy() { events.push('destroy'); },
+      };
+    },
+  };
+  createHandler(ws, { providers: deferredProviders });
+  ws.receiveJSON({ type: 'session.start', profile: 'gemini-live' });
+  await new Promise(resolve => setImmediate(resolve));
+  ws.receiveJSON({ type: 'listen.start' });
+  await new Promise(resolve => setImmediate(resolve));
+  ws.sent = [];
+  ws.receiveJSON({ type: 'listen.stop' });
+  await new Promise(resolve => setImmediate(resolve));
+  assert.deepEqual(events, ['finish']);
+  assert.equal(ws.sentJSON().find(m => m.type === 'usage'), undefined);
+  endTurn();
+  await new Promise(resolve => setImmediate(resolve));
+  assert.deepEqual(events, ['finish', 'destroy']);
+  assert.equal(ws.sentBinary().length, 1);
+  assert.ok(ws.sentJSON().find(m => m.type === 'usage'));
+});
+
 test('stop destroys S2S session', async () => {
   const ws = new MockWebSocket();
   let destroyed = false;
@@ -616,3 +652,138 @@ test('usage sent after each operation completes', async () => {
   const usage = json.find(m => m.type === 'usage');
   assert.ok(usage);
 });
+
+// --- Backpressure, Rate & Logging Tests (6) ---
+
+// S2S provider whose callbacks the test drives directly
+function drivenS2s() {
+  const driven = {};
+  const providers = {
+    ...mockProviders,
+    createS2sSession(provider, config) {
+      driven.interim = config.onInterim;
+      return {
+        feed() {},
+        finish() {},
+        onAudio(cb) { driven.audio = cb; },
+        onTranscript(cb) { driven.transcript = cb; },
+        destroy() {},
+      };
+    },
+  };
+  return { driven, providers };
+}
+
+async function startS2s(ws, overrides) {
+  createHandler(ws, overrides);
+  ws.receiveJSON({ type: 'session.start', profile: 'gemini-live' });
+  await new Promise(resolve => setImmediate(resolve));
+  ws.receiveJSON({ type: 'listen.start' });
+  await new Promise(resolve => setImmediate(resolve));
+  ws.sent = [];
+}
+
+test('transcript deltas coalesce per stream while congested and flush before the final', async () => {
+  const ws = new MockWebSocket();
+  const { driven, providers } = drivenS2s();
+  await startS2s(ws, { providers, sendLimits: { highWaterBytes: 100, drainPollMs: 5 } });
+  ws.bufferedAmount = 500;
+  driven.transcript('Hel');
+  driven.transcript('lo');
+  driven.interim('user ', false);
+  driven.interim('words', false);
+  assert.equal(ws.sent.length, 0);
+  driven.interim('user words', true);
+  assert.deepEqual(ws.sentJSON(), [
+    { type: 'transcript', text: 'Hello' },
+    { type: 'transcript', text: 'user words', isFinal: false },
+    { type: 'transcript', text: 'user words', isFinal: true },
+  ]);
+  driven.transcript(' again');
+  ws.bufferedAmount = 0;
+  await new Promise(resolve => setTimeout(resolve, 20));
+  assert.deepEqual(ws.sentJSON().at(-1), { type: 'transcript', text: ' again' });
+});
+
+test('deltaPolicy drop discards deltas while congested', async () => {
+  const ws = new MockWebSocket();
+  const { driven, providers } = drivenS2s();
+  const metrics = createSpeechMetrics();
+  await startS2s(ws, { providers, metrics, sendLimits: { highWaterBytes: 100, deltaPolicy: 'drop' } });
+  ws.bufferedAmount = 500;
+  driven.transcript('lost');
+  assert.equal(ws.sent.length, 0);
+  assert.equal(metrics.snapshot().deltasDropped, 1);
+});
+
+test('S2S audio is dropped and counted past maxBufferedBytes', async () => {
+  const ws = new MockWebSocket();
+  const { driven, providers } = drivenS2s();
+  const metrics = createSpeechMetrics();
+  await startS2s(ws, { providers, metrics, sendLimits: { maxBufferedBytes: 1000 } });
+  driven.audio(Buffer.alloc(400));
+  ws.bufferedAmount = 2000;
+  driven.audio(Buffer.alloc(400));
+  assert.equal(ws.sentBinary().length, 1);
+  const snap = metrics.snapshot();
+  assert.deepEqual([snap.framesOut, snap.framesOutDropped, snap.bytesOutDropped, snap.peakBufferedBytes], [1, 1, 400, 2000]);
+});
+
+test('TTS waits for the socket to drain before sending more audio', async () => {
+  const ws = new MockWebSocket();
+  const handler = createHandler(ws, { sendLimits: { highWaterBytes: 100, drainPollMs: 5 } });
+  ws.receiveJSON({ type: 'session.start', profile: 'elevenlabs-direct' });
+  await new Promise(resolve => setImmediate(resolve));
+  ws.bufferedAmount = 500;
+  ws.receiveJSON({ type: 'speak', text: 'hello' });
+  await new Promise(resolve => setTimeout(resolve, 30));
+  assert.equal(ws.sentBinary().length, 0);
+  assert.ok(handler.counters.drainWaits > 0);
+  ws.bufferedAmount = 0;
+  await new Promise(resolve => setTimeout(resolve, 30));
+  assert.equal(ws.sentBinary().length, 2);
+  assert.ok(ws.sentJSON().some(m => m.type === 'audio.end'));
+});
+
+test('inbound audio over the rate limit is dropped and counted', async () => {
+  const ws = new MockWebSocket();
+  const fed = [];
+  const providers = { ...mockProviders, createSttSession: () => ({ feed: (c) => fed.push(c.length), finish: async () => ({ transcript: '' }) }) };
+  let t = 0;
+  const metrics = createSpeechMetrics();
+  createHandler(ws, { providers, metrics, now: () => t, inboundLimits: { bytesPerSec: 1000, burstBytes: 1000 } });
+  ws.receiveJSON({ type: 'session.start', profile: 'whisper-direct' });
+  await new Promise(resolve => setImmediate(resolve));
+  ws.receiveJSON({ type: 'listen.start' });
+  await new Promise(resolve => setImmediate(resolve));
+  ws.receiveBinary(Buffer.alloc(600));
+  ws.receiveBinary(Buffer.alloc(600)); // over burst
+  t = 500;
+  ws.receiveBinary(Buffer.alloc(600)); // 400 left + 500 refilled
+  assert.deepEqual(fed, [600, 600]);
+  const snap = metrics.snapshot();
+  assert.deepEqual([snap.framesIn, snap.bytesIn, snap.framesInDropped, snap.bytesInDropped], [3, 1800, 1, 600]);
+  assert.equal(snap.active, 1);
+  ws.close();
+  assert.equal(metrics.snapshot().active, 0);
+  assert.equal(metrics.snapshot().framesIn, 3);
+});
+
+test('logger is structured, level-gated and samples hot events across children', () => {
+  const lines = [];
+  const sink = { log: (l) => lines.push(l), warn: (l) => lines.push(l), error: (l) => lines.push(l) };
+  const quiet = createLogger('t', { level: 'info', sink });
+  quiet.debug('frame.in', { bytes: 1 });
+  assert.equal(lines.length, 0);
+  const logger = createLogger('t', { level: 'debug', sample: { 'frame.in': 3 }, sink });
+  const a = logger.child({ conn: 1 });
+  const b = logger.child({ conn: 2 });
+  a.debug('frame.in', { bytes: 1 });
+  b.debug('frame.in', { bytes: 2 });
+  b.debug('frame.in', { bytes: 3 });
+  a.info('open');
+  assert.equal(lines.length, 2);
+  const [sampled, open] = lines.map(JSON.parse);
+  assert.deepEqual([sampled.event, sampled.conn, sampled.bytes, sampled.count], ['frame.in', 2, 3, 3]);
+  assert.deepEqual([open.level, open.scope, open.event, open.conn], ['info', 't', 'open', 1]);
+});
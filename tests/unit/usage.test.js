@@ -1,8 +1,9 @@
 import { describe, it, beforeEach } from 'node:test';
 import assert from 'node:assert/strict';
 import { createTestDb } from '../helpers/test-db.js';
-import { ensureSchema, storeUsage, getUsageSummary, getUsageByDay, getUsageBySession, getUsageByModel, getUsageByProvider, getCacheSavings } from '../../src/lib/db.js';
-import { calculateCost, formatCost, formatTokens } from '../../src/lib/usage.js';
+import { ensureSchema, storeUsage, getUsageSummary, getUsageByDay, getUsageBySession, getUsageByModel, getUsageByProvider, getCacheSavings,
+  storeLatency, getLatencyByProvider, getLatencyByModel, rollupProviderLatency } from '../../src/lib/db.js';
+import { calculateCost, formatCost, formatTokens, formatLatency } from '../../src/lib/usage.js';
 
 let db;
 
@@ -65,6 +66,15 @@ describe('formatTokens', () => {
   });
 });
 
+describe('formatLatency', () => {
+  it('formats milliseconds, seconds and the open top bucket', () => {
+    assert.equal(formatLatency(400), '400ms');
+    assert.equal(formatLatency(1600), '1.6s');
+    assert.equal(formatLatency(Infinity), '>60s');
+    assert.equal(formatLatency(null), '—');
+  });
+});
+
 describe('storeUsage', () => {
   it('inserts a usage row', async () => {
     await storeUsage(db, {
@@ -119,6 +129,15 @@ describe('getUsageSummary', () => {
     assert.equal(summary.total_input, 2000);
     assert.equal(summary.session_count, 1);
   });
+
+  it('includes the whole last day, across month ends', async () => {
+    await storeUsage(db, { model: 'claude-haiku-4-5-20251001', inputTokens: 7, outputTokens: 0, costUsd: 0, createdAt: '2026-02-28T23:59:59.999Z' });
+    await storeUsage(db, { model: 'claude-haiku-4-5-20251001', inputTokens: 9, outputTokens: 0, costUsd: 0, createdAt: '2026-03-01T00:00:00.000Z' });
+    const feb = await getUsageSummary(db, { from: '2026-02-28', to: '2026-02-28' });
+    assert.equal(feb.total_input, 7);
+    const mar = await getUsageSummary(db, { from: '2026-03-01', to: '2026-03-01' });
+    assert.equal(mar.total_input, 9);
+  });
 });
 
 describe('getUsageByDay', () => {
@@ -273,3 +292,47 @@ describe('getUsageByDay with cache columns', () => {
     assert.equal(days[0].cache_write, 150);
   });
 });
+//
+describe('provider latency', () => {
+  const served = (provider, ttftMs, createdAt, extra = {}) => storeLatency(db, {
+    provider, model: `${provider}-model`, ttftMs, durationMs: ttftMs + 2000, outputTokens: 100, createdAt, ...extra,
+  });
+  //
+  it('reports TTFT percentiles, throughput, hops and error classes per provider', async () => {
+    for (const ms of [120, 140, 180, 350, 900]) await served('gemini', ms, '2026-02-01T10:00:00Z');
+    await served('gemini', 130, '2026-02-02T10:00:00Z', { hops: 1 });
+    await storeLatency(db, { provider: 'groq', model: 'groq-model', durationMs: 40, errorClass: 'rate_limited', createdAt: '2026-02-02T09:59:59Z' });
+    await served('groq', 90, '2026-02-03T10:00:00Z');
+    await served('groq', 90, '2026-03-01T00:00:00Z'); // outside the range
+    const rows = await getLatencyByProvider(db, { from: '2026-02-01', to: '2026-02-28' });
+    assert.deepEqual(rows.map(r => r.provider), ['groq', 'gemini']);
+    const [groq, gemini] = rows;
+    assert.equal(groq.calls, 2);
+    assert.equal(groq.error_rate, 0.5);
+    assert.deepEqual(groq.error_counts, { rate_limited: 1 });
+    assert.equal(gemini.ttft_p50, 150);
+    assert.equal(gemini.ttft_p99, 1200);
+    assert.equal(gemini.tokens_per_sec, 50);
+    assert.equal(gemini.avg_hops, 1 / 6);
+    assert.deepEqual((await getLatencyByModel(db, { from: '2026-02-01', to: '2026-02-28' })).map(r => r.model), ['groq-model', 'gemini-model']);
+  });
+  //
+  it('rolls old rows into daily buckets without changing the totals', async () => {
+    for (const ms of [120, 140, 180]) await served('gemini', ms, '2026-02-01T10:00:00Z');
+    await storeLatency(db, { provider: 'gemini', model: 'gemini-model', durationMs: 30, errorClass: 'network', createdAt: '2026-02-01T11:00:00Z' });
+    await served('gemini', 700, '2026-02-20T10:00:00Z');
+    const range = { from: '2026-02-01', to: '2026-02-28' };
+    const before = await getLatencyByProvider(db, range);
+    assert.equal(await rollupProviderLatency(db, { now: new Date('2026-02-21T00:00:00Z') }), 4);
+    assert.equal((await db.prepare('SELECT COUNT(*) AS c FROM provider_latency').get()).c, 1);
+    await served('gemini', 160, '2026-02-01T12:00:00Z');
+    assert.equal(await rollupProviderLatency(db, { now: new Date('2026-02-21T00:00:00Z') }), 1);
+    const daily = await db.prepare('SELECT * FROM provider_latency_daily').all();
+    assert.equal(daily.length, 1);
+    assert.equal(daily[0].calls, 5);
+    const after = await getLatencyByProvider(db, range);
+    assert.equal(after[0].calls, before[0].calls + 1);
+    assert.equal(after[0].errors, 1);
+    assert.equal(after[0].ttft_p90, before[0].ttft_p90);
+  });
+});
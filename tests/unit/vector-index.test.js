@@ -0,0 +1,142 @@
+import { describe, it, beforeEach } from 'node:test';
+import assert from 'node:assert/strict';
+import { createTestDb } from '../helpers/test-db.js';
+import { ensureSchema, storeMemory, supersedeMemory, clearDatabase } from '../../src/lib/db.js';
+import { VectorIndex, searchMemoryVectors, toVector } from '../../src/lib/vector-index.js';
+
+const DIM = 16;
+
+// Deterministic pseudo-random unit vectors
+function makeRng(seed) {
+  return () => {
+    seed = (seed * 1103515245 + 12345) & 0x7fffffff;
+    return seed / 0x7fffffff - 0.5;
+  };
+}
+function unit(values) {
+  const norm = Math.sqrt(values.reduce((s, v) => s + v * v, 0));
+  return Float32Array.from(values, (v) => v / norm);
+}
+function randomVector(rng, dim = DIM) {
+  return unit(Array.from({ length: dim }, rng));
+}
+function bruteForce(vectors, query, k) {
+  return vectors
+    .map((v, i) => ({ id: i + 1, sim: v.reduce((s, x, d) => s + x * query[d], 0) }))
+    .sort((a, b) => b.sim - a.sim)
+    .slice(0, k)
+    .map((r) => r.id);
+}
+function blob(vec) {
+  return Buffer.from(vec.buffer, vec.byteOffset, vec.byteLength);
+}
+
+let db;
+beforeEach(async () => {
+  db = await createTestDb();
+  await ensureSchema(db);
+});
+
+describe('VectorIndex', () => {
+  it('returns exact top-k for small indexes', () => {
+    const rng = makeRng(7);
+    const vectors = Array.from({ length: 200 }, () => randomVector(rng));
+    const index = new VectorIndex({ dim: DIM });
+    vectors.forEach((v, i) => index.add(i + 1, v));
+    const query = randomVector(rng);
+    const hits = index.search(query, { limit: 5 });
+    assert.deepEqual(hits.map((h) => h.id), bruteForce(vectors, query, 5));
+    assert.ok(hits[0].similarity >= hits[4].similarity);
+  });
+  //
+  it('applies the similarity threshold', () => {
+    const index = new VectorIndex({ dim: 4 });
+    index.add(1, unit([1, 0, 0, 0]));
+    index.add(2, unit([0, 1, 0, 0]));
+    const hits = index.search(unit([1, 0.1, 0, 0]), { limit: 10, threshold: 0.5 });
+    assert.deepEqual(hits.map((h) => h.id), [1]);
+  });
+  //
+  it('keeps high recall once the Hamming prefilter kicks in', () => {
+    const rng = makeRng(42);
+    const dim = 64;
+    const vectors = Array.from({ length: 6000 }, () => randomVector(rng, dim));
+    const index = new VectorIndex({ dim });
+    vectors.forEach((v, i) => index.add(i + 1, v));
+    let found = 0;
+    for (let q = 0; q < 10; q++) {
+      const query = randomVector(rng, dim);
+      const got = new Set(index.search(query, { limit: 10 }).map((h) => h.id));
+      found += bruteForce(vectors, query, 10).filter((id) => got.has(id)).length;
+    }
+    assert.ok(found >= 90, `recall@10 ${found}%`);
+  });
+  //
+  it('removes entries and keeps the rest searchable', () => {
+    const index = new VectorIndex({ dim: 4 });
+    index.add(1, unit([1, 0, 0, 0]));
+    index.add(2, unit([0, 1, 0, 0]));
+    index.add(3, unit([0, 0, 1, 0]));
+    assert.equal(index.remove(1), true);
+    assert.equal(index.remove(1), false);
+    assert.equal(index.size, 2);
+    assert.equal(index.search(unit([1, 0, 0, 0]), { limit: 1, threshold: 0.5 }).length, 0);
+    assert.equal(index.search(unit([0, 0, 1, 0]), { limit: 1 })[0].id, 3);
+  });
+  //
+  it('re-adding an id replaces its vector', () => {
+    const index = new VectorIndex({ dim: 4 });
+    index.add(1, unit([1, 0, 0, 0]));
+    index.add(1, unit([0, 1, 0, 0]));
+    assert.equal(index.size, 1);
+    assert.equal(index.search(unit([0, 1, 0, 0]), { limit: 1 })[0].id, 1);
+  });
+});
+
+describe('toVector', () => {
+  it('reads unaligned buffer views', () => {
+    const vec = unit([1, 2, 3, 4]);
+    const padded = Buffer.alloc(17);
+    blob(vec).copy(padded, 1);
+    assert.deepEqual(Array.from(toVector(padded.subarray(1))), Array.from(vec));
+  });
+});
+
+describe('searchMemoryVectors', () => {
+  it('returns active memories ranked by similarity', async () => {
+    await storeMemory(db, 'Ship the release', { embedding: blob(unit([1, 0, 0, 0])) });
+    await storeMemory(db, 'Call the dentist', { embedding: blob(unit([0, 1, 0, 0])) });
+    await storeMemory(db, 'No embedding yet');
+    const results = await searchMemoryVectors(db, unit([1, 0.2, 0, 0]), { threshold: 0.1 });
+    assert.deepEqual(results.map((r) => r.content), ['Ship the release', 'Call the dentist']);
+    assert.ok(results[0].similarity > results[1].similarity);
+    assert.equal(results[0].embedding, undefined);
+  });
+  //
+  it('picks up new memories and drops superseded ones', async () => {
+    const id = await storeMemory(db, 'Old plan', { embedding: blob(unit([1, 0, 0, 0])) });
+    assert.equal((await searchMemoryVectors(db, unit([1, 0, 0, 0])))[0].content, 'Old plan');
+    await supersedeMemory(db, id, 'New plan', { embedding: blob(unit([1, 0.1, 0, 0])) });
+    const results = await searchMemoryVectors(db, unit([1, 0, 0, 0]));
+    assert.deepEqual(results.map((r) => r.content), ['New plan']);
+  });
+  //
+  it('drops memories archived outside supersedeMemory', async () => {
+    const id = await storeMemory(db, 'Archived', { embedding: blob(unit([1, 0, 0, 0])) });
+    await storeMemory(db, 'Kept', { embedding: blob(unit([0.9, 0.4, 0, 0])) });
+    await searchMemoryVectors(db, unit([1, 0, 0, 0]));
+    await db.prepare('UPDATE memories SET superseded_by = -1 WHERE id = ?').run(id);
+    const results = await searchMemoryVectors(db, unit([1, 0, 0, 0]), { limit: 1 });
+    assert.deepEqual(results.map((r) => r.content), ['Kept']);
+  });
+  //
+  it('starts over after clearDatabase', async () => {
+    await storeMemory(db, 'Before reset', { embedding: blob(unit([1, 0, 0, 0])) });
+    await searchMemoryVectors(db, unit([1, 0, 0, 0]));
+    await clearDatabase(db);
+    assert.deepEqual(await searchMemoryVectors(db, unit([1, 0, 0, 0])), []);
+    await storeMemory(db, 'After reset', { embedding: blob(unit([0, 1, 0, 0])) });
+    const results = await searchMemoryVectors(db, unit([0, 1, 0, 0]));
+    assert.deepEqual(results.map((r) => r.content), ['After reset']);
+  });
+});